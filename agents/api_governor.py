@@ -1,6 +1,7 @@
 import time
 import asyncio
 import logging
+import threading
 import random
 from typing import Dict, Optional, Callable, Any
 from dataclasses import dataclass, field
@@ -39,7 +40,9 @@ class APIGovernor:
             "gemini-flash": APIQuota(rpm_limit=100, tpm_limit=1000000),
             "default": APIQuota(rpm_limit=10, tpm_limit=10000)
         }
-        self.lock = asyncio.Lock()
+        # Plain lock: the critical section never awaits, and an asyncio.Lock
+        # would bind to the first event loop that contends for it
+        self.lock = threading.Lock()
         self._initialized = True
 
     async def acquire_permission(self, model_key: str, estimated_tokens: int = 500) -> bool:
@@ -47,7 +50,7 @@ class APIGovernor:
         Requests permission to make an API call.
         Implements a simple token bucket / sliding window logic.
         """
-        async with self.lock:
+        with self.lock:
             quota = self.quotas.get(model_key, self.quotas["default"])
             now = time.time()
 
@@ -4,10 +4,18 @@ Task Queue System
 
 Manages work items for the autonomous agents.
 Tasks are prioritized and processed in order.
+
+Persistence is an append-only journal (one JSON line per change) next to a
+snapshot file. Replaying the journal over the snapshot recovers the queue
+after a crash, and the journal is folded into a new snapshot once it
+outgrows the task table. Pending tasks are kept in a heap keyed by
+(priority, created_at), so dequeue is O(log n) however long the history is.
 """
 
+import heapq
 import json
 import logging
+import os
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
@@ -134,22 +142,38 @@ class TaskQueue:
     Priority queue for managing agent tasks.
 
     Features:
-    - Priority-based ordering
-    - Persistence to disk
+    - Priority-based ordering (heap of pending tasks)
+    - Persistence to disk (snapshot + append-only journal)
     - Thread-safe operations
     - Task history tracking
+
+    Status and priority changes must go through the queue methods
+    (update_task, complete_task, ...) to be journaled and re-queued.
     """
 
     _instance = None
     _lock = threading.Lock()
 
+    HISTORY_LIMIT = 100
+    COMPACT_MIN_RECORDS = 1000  # Journal records before compaction is considered
+
     def __init__(self, storage_path: Optional[Path] = None):
         self.storage_path = storage_path or Path("data/agent_tasks.json")
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self.journal_path = self.storage_path.with_suffix(".journal")
 
         self.tasks: Dict[str, Task] = {}
         self.history: List[str] = []  # Completed task IDs
 
+        # Pending heap of (priority, created_at, task_id); entries whose key no
+        # longer matches _queued[task_id] are stale and skipped when popped
+        self._heap: List[tuple] = []
+        self._queued: Dict[str, tuple] = {}
+
+        self._seq = 0  # Sequence number of the last journal record
+        self._journal_records = 0
+        self._journal = None
+
         self._load()
 
     @classmethod
@@ -165,7 +189,7 @@ class TaskQueue:
         """Add a new task to the queue"""
         with self._lock:
             self.tasks[task.id] = task
-            self._save()
+            self._save(task)
             logger.info(f"Task added: {task.id} - {task.title}")
         return task.id
 
@@ -196,23 +220,15 @@ class TaskQueue:
     def get_next_task(self, agent_name: Optional[str] = None) -> Optional[Task]:
         """Get the highest priority pending task"""
         with self._lock:
-            pending = [
-                t for t in self.tasks.values()
-                if t.status == TaskStatus.PENDING
-            ]
-
-            if not pending:
+            task = self._pop_pending()
+            if task is None:
                 return None
 
-            # Sort by priority (lower number = higher priority)
-            pending.sort(key=lambda t: (t.priority.value, t.created_at))
-
-            task = pending[0]
             task.status = TaskStatus.IN_PROGRESS
             task.assigned_agent = agent_name
             task.started_at = datetime.now(timezone.utc)
 
-            self._save()
+            self._save(task)
             return task
 
     def get_task(self, task_id: str) -> Optional[Task]:
@@ -223,7 +239,7 @@ class TaskQueue:
         """Update a task"""
         with self._lock:
             self.tasks[task.id] = task
-            self._save()
+            self._save(task)
 
     def complete_task(self, task_id: str, success: bool = True, error_message: str = None) -> None:
         """Mark a task as completed"""
@@ -235,7 +251,7 @@ class TaskQueue:
                 task.error_message = error_message
                 task.completed_at = datetime.now(timezone.utc)
                 self.history.append(task_id)
-                self._save()
+                self._save(task, history=True)
 
     def retry_task(self, task_id: str) -> bool:
         """Retry a failed task"""
@@ -245,7 +261,7 @@ class TaskQueue:
                 task.status = TaskStatus.PENDING
                 task.retry_count += 1
                 task.error_message = None
-                self._save()
+                self._save(task)
                 return True
             return False
 
@@ -272,14 +288,15 @@ class TaskQueue:
                     return False
 
         task.status = TaskStatus.ROLLED_BACK
-        self._save()
+        with self._lock:
+            self._save(task)
         return True
 
     def get_pending_tasks(self) -> List[Task]:
         """Get all pending tasks sorted by priority"""
-        pending = [t for t in self.tasks.values() if t.status == TaskStatus.PENDING]
-        pending.sort(key=lambda t: (t.priority.value, t.created_at))
-        return pending
+        with self._lock:
+            live = sorted(entry for entry in self._heap if self._queued.get(entry[2]) == entry)
+        return [self.tasks[task_id] for _, _, task_id in live if self.tasks[task_id].status == TaskStatus.PENDING]
 
     def get_in_progress_tasks(self) -> List[Task]:
         """Get all in-progress tasks"""
@@ -339,29 +356,97 @@ class TaskQueue:
 
             for task_id in to_remove:
                 del self.tasks[task_id]
+                self._queued.pop(task_id, None)
+                self._append({"op": "delete", "id": task_id})
                 removed += 1
 
-            if removed > 0:
-                self._save()
-
         return removed
 
-    def _save(self) -> None:
-        """Save queue to disk"""
+    # ---- pending heap ------------------------------------------------------
+
+    def _enqueue(self, task: Task) -> None:
+        """Index a pending task in the heap (no-op if already queued under the same key)"""
+        if task.status != TaskStatus.PENDING:
+            if self._queued.pop(task.id, None) and len(self._heap) > 2 * len(self._queued) + 64:
+                # Tasks leaving the queue outside get_next_task leave stale entries behind
+                self._heap = list(self._queued.values())
+                heapq.heapify(self._heap)
+            return
+        entry = (task.priority.value, task.created_at, task.id)
+        if self._queued.get(task.id) != entry:
+            self._queued[task.id] = entry
+            heapq.heappush(self._heap, entry)
+
+    def _pop_pending(self) -> Optional[Task]:
+        """Pop the highest priority pending task, dropping stale heap entries"""
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            task_id = entry[2]
+            if self._queued.get(task_id) != entry:
+                continue
+            del self._queued[task_id]
+            task = self.tasks.get(task_id)
+            if task is not None and task.status == TaskStatus.PENDING:
+                return task
+        return None
+
+    def _rebuild_heap(self) -> None:
+        """Index every pending task (after loading)"""
+        self._queued = {
+            task.id: (task.priority.value, task.created_at, task.id)
+            for task in self.tasks.values()
+            if task.status == TaskStatus.PENDING
+        }
+        self._heap = list(self._queued.values())
+        heapq.heapify(self._heap)
+
+    # ---- persistence -------------------------------------------------------
+
+    def _save(self, task: Task, history: bool = False) -> None:
+        """Journal a task's current state (caller holds the lock)"""
+        self._enqueue(task)
+        record = {"op": "put", "task": task.to_dict()}
+        if history:
+            record["history"] = True
+        self._append(record)
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        """Append one journal record, compacting once the journal outgrows the task table"""
         try:
-            data = {
-                "tasks": {k: v.to_dict() for k, v in self.tasks.items()},
-                "history": self.history[-100:],  # Keep last 100
-            }
-            self.storage_path.write_text(
-                json.dumps(data, indent=2, default=str),
-                encoding='utf-8'
-            )
+            if self._journal is None:
+                self._journal = open(self.journal_path, "a", encoding='utf-8')
+            self._seq += 1
+            record["seq"] = self._seq
+            self._journal.write(json.dumps(record, default=str) + "\n")
+            self._journal.flush()
+            self._journal_records += 1
+            if len(self.history) > 2 * self.HISTORY_LIMIT:
+                del self.history[:-self.HISTORY_LIMIT]
+            if self._journal_records >= max(self.COMPACT_MIN_RECORDS, len(self.tasks)):
+                self._compact()
         except Exception as e:
             logger.error(f"Failed to save task queue: {e}")
 
+    def _compact(self) -> None:
+        """Write a snapshot of every task, then truncate the journal"""
+        data = {
+            "seq": self._seq,
+            "tasks": {k: v.to_dict() for k, v in self.tasks.items()},
+            "history": self.history[-self.HISTORY_LIMIT:],
+        }
+        tmp_path = self.storage_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(data, default=str), encoding='utf-8')
+        os.replace(tmp_path, self.storage_path)
+
+        # A crash before the truncate is harmless: replay skips records
+        # with seq <= the snapshot's seq
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding='utf-8')
+        self._journal_records = 0
+
     def _load(self) -> None:
-        """Load queue from disk"""
+        """Load the snapshot, replay the journal over it and compact"""
         try:
             if self.storage_path.exists():
                 data = json.loads(self.storage_path.read_text(encoding='utf-8'))
@@ -370,9 +455,41 @@ class TaskQueue:
                     for k, v in data.get("tasks", {}).items()
                 }
                 self.history = data.get("history", [])
+                self._seq = data.get("seq", 0)
         except Exception as e:
             logger.error(f"Failed to load task queue: {e}")
             self.tasks = {}
             self.history = []
 
+        self._replay()
+        self._rebuild_heap()
+        if self.journal_path.exists() and self.journal_path.stat().st_size > 0:
+            try:
+                self._compact()
+            except Exception as e:
+                logger.error(f"Failed to compact task queue: {e}")
+
+    def _replay(self) -> None:
+        """Apply journal records newer than the snapshot; stops at a torn final line"""
+        if not self.journal_path.exists():
+            return
+
+        with open(self.journal_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning(f"Task journal {self.journal_path} ends with a partial record; ignoring it")
+                    break
+                if record.get("seq", 0) <= self._seq:
+                    continue
+                self._seq = record["seq"]
+                if record["op"] == "put":
+                    task = Task.from_dict(record["task"])
+                    self.tasks[task.id] = task
+                    if record.get("history"):
+                        self.history.append(task.id)
+                elif record["op"] == "delete":
+                    self.tasks.pop(record["id"], None)
+
 
@@ -21,6 +21,8 @@ import logging
 import pickle
 import os
 import sys
+import threading
+from collections import OrderedDict
 from datetime import timedelta
 from typing import List
 from typing import Optional
@@ -53,6 +55,23 @@ class FeatureEngineer:
     Calculate technical, fundamental, and sentiment features for ML model
     """
 
+    # Feature store version of the technical features; bump it when they change
+    TECHNICAL_FEATURE_VERSION = "technical-v1"
+
+    # Column order of calculate_technical_features / calculate_technical_feature_frame
+    TECHNICAL_FEATURES = [
+        "ma_20", "ma_50", "ma_200",
+        "price_to_ma20", "price_to_ma50", "price_to_ma200",
+        "ma20_slope", "ma50_slope",
+        "rsi_14",
+        "macd", "macd_signal", "macd_histogram",
+        "bb_position", "bb_width",
+        "volume_ma_20", "volume_ratio",
+        "return_1d", "return_5d", "return_20d", "return_60d",
+        "volatility_20d",
+        "atr_14",
+    ]
+
     @staticmethod
     def calculate_technical_features(price_data: pd.DataFrame) -> Dict[str, float]:
         """
@@ -131,6 +150,120 @@ class FeatureEngineer:
 
         return features
 
+    @staticmethod
+    def calculate_technical_feature_frame(price_data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calculate technical indicators for every row in one vectorized pass
+
+        Row i holds the same values calculate_technical_features would return
+        for price_data.iloc[: i + 1]. Rows before index 199 (fewer than 200
+        bars of history) are NaN.
+
+        Args:
+            price_data: DataFrame with columns: date, open, high, low, close, volume
+
+        Returns:
+            DataFrame indexed like price_data with TECHNICAL_FEATURES columns
+        """
+        close = price_data["close"].to_numpy(dtype=np.float64)
+        high = price_data["high"].to_numpy(dtype=np.float64)
+        low = price_data["low"].to_numpy(dtype=np.float64)
+        volume = price_data["volume"].to_numpy(dtype=np.float64)
+
+        rolling_mean = FeatureEngineer._rolling_mean
+        align = FeatureEngineer._align_diff
+        f = {}
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Moving Averages
+            f["ma_20"] = rolling_mean(close, 20)
+            f["ma_50"] = rolling_mean(close, 50)
+            f["ma_200"] = rolling_mean(close, 200)
+
+            # Price position relative to MAs
+            f["price_to_ma20"] = (close / f["ma_20"]) - 1
+            f["price_to_ma50"] = (close / f["ma_50"]) - 1
+            f["price_to_ma200"] = (close / f["ma_200"]) - 1
+
+            # MA trends (MA of the window ending 5 bars earlier)
+            ma20_lag5 = FeatureEngineer._lag(f["ma_20"], 5)
+            ma50_lag5 = FeatureEngineer._lag(f["ma_50"], 5)
+            f["ma20_slope"] = (f["ma_20"] - ma20_lag5) / ma20_lag5
+            f["ma50_slope"] = (f["ma_50"] - ma50_lag5) / ma50_lag5
+
+            # RSI (14-day)
+            deltas = np.diff(close)
+            avg_gain = align(rolling_mean(np.where(deltas > 0, deltas, 0), 14))
+            avg_loss = align(rolling_mean(np.where(deltas < 0, -deltas, 0), 14))
+            f["rsi_14"] = np.where(avg_loss == 0, 100, 100 - (100 / (1 + avg_gain / avg_loss)))
+
+            # MACD (EMAs are causal from the first bar, so one series serves every prefix)
+            macd_series = FeatureEngineer._ema_series(close, 12) - FeatureEngineer._ema_series(close, 26)
+            signal_series = FeatureEngineer._ema_series(macd_series, 9)
+            f["macd"] = macd_series
+            f["macd_signal"] = signal_series
+            f["macd_histogram"] = macd_series - signal_series
+
+            # Bollinger Bands
+            bb_middle = f["ma_20"]
+            bb_std = FeatureEngineer._rolling_std(close, 20)
+            bb_upper = bb_middle + (2 * bb_std)
+            bb_lower = bb_middle - (2 * bb_std)
+            f["bb_position"] = np.where(bb_upper != bb_lower, (close - bb_lower) / (bb_upper - bb_lower), 0.5)
+            f["bb_width"] = np.where(bb_middle != 0, (bb_upper - bb_lower) / bb_middle, 0)
+
+            # Volume features
+            f["volume_ma_20"] = rolling_mean(volume, 20)
+            f["volume_ratio"] = np.where(f["volume_ma_20"] > 0, volume / f["volume_ma_20"], 1)
+
+            # Momentum features
+            for days in (1, 5, 20, 60):
+                f[f"return_{days}d"] = (close / FeatureEngineer._lag(close, days)) - 1
+
+            # Volatility (standard deviation of returns)
+            returns = np.diff(close) / close[:-1]
+            f["volatility_20d"] = align(FeatureEngineer._rolling_std(returns, 20)) * np.sqrt(252)  # Annualized
+
+            # ATR (Average True Range) over the 13 true ranges inside a 14-bar window
+            true_range = np.maximum(
+                high[1:] - low[1:],
+                np.maximum(np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])),
+            )
+            f["atr_14"] = align(rolling_mean(true_range, 13))
+
+        frame = pd.DataFrame({name: f[name] for name in FeatureEngineer.TECHNICAL_FEATURES}, index=price_data.index)
+        frame.iloc[:199] = np.nan
+        return frame
+
+    @staticmethod
+    def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+        """Mean of each trailing window, NaN until the window is full"""
+        out = np.full(len(values), np.nan)
+        if len(values) >= window:
+            out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window).mean(axis=1)
+        return out
+
+    @staticmethod
+    def _rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+        """Population std of each trailing window, NaN until the window is full"""
+        out = np.full(len(values), np.nan)
+        if len(values) >= window:
+            out[window - 1:] = np.lib.stride_tricks.sliding_window_view(values, window).std(axis=1)
+        return out
+
+    @staticmethod
+    def _lag(values: np.ndarray, periods: int) -> np.ndarray:
+        """Value from periods bars earlier, NaN where there is no history"""
+        out = np.full(len(values), np.nan)
+        if periods < len(values):
+            out[periods:] = values[: len(values) - periods]
+        return out
+
+    @staticmethod
+    def _align_diff(values: np.ndarray) -> np.ndarray:
+        """Align a series built from np.diff (one element shorter) with the bar it ends on"""
+        return np.concatenate(([np.nan], values))
+
     @staticmethod
     def _calculate_rsi(prices: np.ndarray, period: int = 14) -> float:
         """Calculate Relative Strength Index"""
@@ -292,7 +425,7 @@ class AIScoreModel:
         self.is_trained = False
 
     def collect_training_data(
-        self, symbols: List[str], start_date: str, end_date: str, polygon: PolygonService
+        self, symbols: List[str], start_date: str, end_date: str, polygon: PolygonService, feature_store=None
     ) -> pd.DataFrame:
         """
         Collect historical data for training
@@ -302,10 +435,15 @@ class AIScoreModel:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             polygon: PolygonService instance
+            feature_store: FeatureStore for technical features (default: the shared store;
+                needs an app context)
 
         Returns:
             DataFrame with features and labels
         """
+        from src.services.feature_store import get_feature_store
+
+        store = feature_store or get_feature_store()
         logger.info(
             f"Collecting training data for {len(symbols)} symbols from {start_date} to {end_date}"
         )
@@ -321,70 +459,80 @@ class AIScoreModel:
                     logger.warning(f"Insufficient data for {symbol}")
                     continue
 
-                # Generate samples for each month
-                for i in range(
-                    200, len(price_data) - 30
-                ):  # Need 200 for features, 30 for forward return
-                    sample_data = price_data.iloc[: i + 1].copy()
+                # All features in one pass; row i matches the prefix iloc[: i + 1]
+                tech_features = self._technical_feature_frame(symbol, price_data, store)
 
-                    # Calculate features
-                    tech_features = FeatureEngineer.calculate_technical_features(sample_data)
+                # Need 200 for features, 30 for forward return
+                rows = slice(200, len(price_data) - 30)
+                close = price_data["close"].to_numpy()
 
-                    # Calculate forward return (label)
-                    current_price = price_data.iloc[i]["close"]
-                    future_price = price_data.iloc[i + 20]["close"]  # 20 trading days (~1 month)
-                    forward_return = (future_price / current_price) - 1
+                # Calculate forward return (label) - 20 trading days (~1 month)
+                forward_return = close[rows.start + 20 : rows.stop + 20] / close[rows] - 1
 
-                    # Combine features
-                    sample = {
-                        "symbol": symbol,
-                        "date": price_data.iloc[i]["date"],
-                        "forward_return_20d": forward_return,
-                        **tech_features,
-                    }
-
-                    all_data.append(sample)
+                samples = pd.DataFrame({
+                    "symbol": symbol,
+                    "date": price_data["date"].iloc[rows].to_numpy(),
+                    "forward_return_20d": forward_return,
+                })
+                samples = pd.concat(
+                    [samples, tech_features.iloc[rows].reset_index(drop=True)], axis=1
+                )
+                all_data.append(samples)
 
-                logger.info(f"Collected {len(all_data)} samples for {symbol}")
+                logger.info(f"Collected {len(samples)} samples for {symbol}")
 
             except Exception as e:
                 logger.error(f"Error collecting data for {symbol}: {e}", exc_info=True)
                 continue
 
-        df = pd.DataFrame(all_data)
+        df = pd.concat(all_data, ignore_index=True) if all_data else pd.DataFrame()
         logger.info(f"Total training samples: {len(df)}")
 
         return df
 
+    def _technical_feature_frame(self, symbol: str, price_data: pd.DataFrame, store) -> pd.DataFrame:
+        """
+        calculate_technical_feature_frame(price_data), served from the feature store.
+
+        Rows with 200 days of history are stored by date. If every one of them
+        is already stored nothing is recomputed; otherwise the frame is computed
+        and written back. Stored rows are trusted, so a change to the feature
+        math needs a new TECHNICAL_FEATURE_VERSION.
+        """
+        version = FeatureEngineer.TECHNICAL_FEATURE_VERSION
+        names = FeatureEngineer.TECHNICAL_FEATURES
+        dates = price_data["date"].to_numpy().astype("datetime64[D]")[199:]
+
+        stored = store.read(version, symbol, start=dates[0], end=dates[-1])
+        if len(stored) == len(dates) and (stored.dates == dates).all():
+            frame = pd.DataFrame(np.nan, index=price_data.index, columns=names)
+            frame.iloc[199:] = stored.values[:, [stored.features.index(name) for name in names]]
+            return frame
+
+        frame = FeatureEngineer.calculate_technical_feature_frame(price_data)
+        store.write(version, symbol, dates, {name: frame[name].to_numpy()[199:] for name in names})
+        return frame
+
     def _fetch_historical_prices(
         self, symbol: str, start_date: str, end_date: str, polygon: PolygonService
     ) -> Optional[pd.DataFrame]:
-        """Fetch historical price data from Polygon"""
+        """Fetch historical daily prices (local bar store, only missing days come from Polygon)"""
         try:
-            endpoint = f"/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}"
-            params = {"adjusted": "true", "sort": "asc", "limit": 50000}
-
-            data = polygon._make_request(endpoint, params)
+            series = polygon.get_bar_series(symbol, 1, "day", start_date, end_date)
 
-            if not data or "results" not in data:
+            if not len(series):
                 return None
 
-            results = data["results"]
-
-            df = pd.DataFrame(results)
-            df.rename(
-                columns={
-                    "o": "open",
-                    "h": "high",
-                    "l": "low",
-                    "c": "close",
-                    "v": "volume",
-                    "t": "timestamp",
-                },
-                inplace=True,
+            df = pd.DataFrame(
+                {
+                    "date": pd.to_datetime(series.t.astype(np.int64), unit="ms"),
+                    "open": series.o,
+                    "high": series.h,
+                    "low": series.l,
+                    "close": series.c,
+                    "volume": series.v,
+                }
             )
-            df["date"] = pd.to_datetime(df["timestamp"], unit="ms")
-            df = df[["date", "open", "high", "low", "close", "volume"]]
 
             return df
 
@@ -574,21 +722,98 @@ class AIScoreModel:
             logger.error(f"Error extracting model components: {e}")
             return False
 
+# Horizon -> per-horizon model file (training output); the bundle holds all three
+HORIZON_MODEL_FILES = {
+    "short_term": "ai_score_model_5d.pkl",
+    "medium_term": "ai_score_model_20d.pkl",
+    "long_term": "ai_score_model_60d.pkl",
+}
+BUNDLE_FILENAME = "ai_score_models.pkl"
+
+# Class probabilities -> 0-100 score (Strong Sell=0, Sell=25, Hold=50, Buy=75, Strong Buy=100)
+SCORE_WEIGHTS = (0, 25, 50, 75, 100)
+
+class ModelBundle:
+    """
+    Every horizon's model, scaler and feature names from one pickle.
+
+    load() reads ai_score_models.pkl when it is newer than the per-horizon
+    files; otherwise it reads those and writes the bundle for the next process.
+    """
+
+    def __init__(self, horizons: Dict[str, Dict]):
+        self.horizons = horizons  # horizon -> {"model", "scaler", "feature_names"}
+
+    @classmethod
+    def load(cls, model_dir: str) -> "ModelBundle":
+        bundle_path = os.path.join(model_dir, BUNDLE_FILENAME)
+        sources = [os.path.join(model_dir, f) for f in HORIZON_MODEL_FILES.values()]
+        source_mtime = max((os.path.getmtime(p) for p in sources if os.path.exists(p)), default=0)
+
+        if os.path.exists(bundle_path) and os.path.getmtime(bundle_path) >= source_mtime:
+            try:
+                with open(bundle_path, "rb") as f:
+                    horizons = pickle.load(f)  # nosec B301 - loading trusted model files
+                logger.info(f"Model bundle loaded from {bundle_path} ({', '.join(horizons)})")
+                return cls(horizons)
+            except Exception as e:
+                logger.warning(f"Model bundle unreadable, loading per-horizon models: {e}")
+
+        horizons = {}
+        for horizon, filename in HORIZON_MODEL_FILES.items():
+            model = AIScoreModel(model_dir=model_dir)
+            if model.load(filename):
+                horizons[horizon] = {"model": model.model, "scaler": model.scaler, "feature_names": model.feature_names}
+
+        bundle = cls(horizons)
+        if len(horizons) == len(HORIZON_MODEL_FILES):
+            bundle.save(bundle_path)
+        return bundle
+
+    def save(self, path: str):
+        """Write the bundle atomically (best effort: the models directory may be read-only)"""
+        try:
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(self.horizons, f)
+            os.replace(path + ".tmp", path)
+            logger.info(f"Model bundle saved to {path}")
+        except OSError as e:
+            logger.warning(f"Could not write model bundle {path}: {e}")
+
+    def is_complete(self) -> bool:
+        return all(horizon in self.horizons for horizon in HORIZON_MODEL_FILES)
+
+_bundles: Dict[str, ModelBundle] = {}
+_bundles_lock = threading.Lock()
+
+def get_model_bundle(model_dir: str) -> ModelBundle:
+    """Process-wide bundle for a model directory, loaded on first use"""
+    key = os.path.abspath(model_dir)
+    with _bundles_lock:
+        if key not in _bundles:
+            _bundles[key] = ModelBundle.load(model_dir)
+        return _bundles[key]
+
 class MultiTimeframeAIScoreModel:
     """
     Multi-timeframe AI Score predictor
 
-    Loads and manages 3 separate models for different investment horizons:
+    Scores 3 separate models for different investment horizons:
     - Short-term (5-day): For day/swing traders
     - Medium-term (20-day): For position traders
     - Long-term (60-day): For long-term investors
+
+    Models come from the shared ModelBundle (loaded lazily, once per process).
+    predict_batch() scores many tickers with one predict_proba per horizon;
+    scores are memoized by a hash of each ticker's model feature values.
     """
 
-    def __init__(self, model_dir: str = "models"):
+    def __init__(self, model_dir: str = "models", cache_size: int = 4096):
         self.model_dir = model_dir
-        self.short_term_model = None
-        self.medium_term_model = None
-        self.long_term_model = None
+        self.bundle: Optional[ModelBundle] = None
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[bytes, Dict[str, Optional[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
 
     def load_all_models(self) -> bool:
         """
@@ -598,27 +823,98 @@ class MultiTimeframeAIScoreModel:
             True if all models loaded successfully
         """
         logger.info("Loading multi-timeframe AI Score models...")
+        self.bundle = get_model_bundle(self.model_dir)
 
-        # Load short-term model (5-day)
-        self.short_term_model = AIScoreModel(model_dir=self.model_dir)
-        short_loaded = self.short_term_model.load("ai_score_model_5d.pkl")
+        if self.bundle.is_complete():
+            logger.info("✓ All 3 timeframe models loaded successfully")
+            return True
+        logger.warning(
+            "Some models failed to load: "
+            + ", ".join(f"{h}={h in self.bundle.horizons}" for h in HORIZON_MODEL_FILES)
+        )
+        return False
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Union of every horizon's features, in first-seen order"""
+        names = {}
+        for horizon in self._bundle().horizons.values():
+            names.update(dict.fromkeys(horizon["feature_names"]))
+        return list(names)
+
+    def _bundle(self) -> ModelBundle:
+        if self.bundle is None:
+            self.load_all_models()
+        return self.bundle
+
+    def feature_matrix(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """N x len(feature_names) float64 matrix (missing features are 0, None rows are NaN)"""
+        names = self.feature_names
+        X = np.zeros((len(features_list), len(names)))
+        for i, features in enumerate(features_list):
+            try:
+                X[i] = [float(features.get(name, 0)) for name in names]
+            except (TypeError, ValueError):
+                X[i] = np.nan  # Non-numeric feature: no ML score for this row
+        return X
 
-        # Load medium-term model (20-day)
-        self.medium_term_model = AIScoreModel(model_dir=self.model_dir)
-        medium_loaded = self.medium_term_model.load("ai_score_model_20d.pkl")
+    def predict_batch(self, features_list: List[Dict[str, float]]) -> List[Dict[str, Optional[int]]]:
+        """
+        Predict AI scores for all timeframes for many tickers
 
-        # Load long-term model (60-day)
-        self.long_term_model = AIScoreModel(model_dir=self.model_dir)
-        long_loaded = self.long_term_model.load("ai_score_model_60d.pkl")
+        Args:
+            features_list: One feature dict per ticker
 
-        if short_loaded and medium_loaded and long_loaded:
-            logger.info("✓ All 3 timeframe models loaded successfully")
-            return True
-        else:
-            logger.warning(
-                f"Some models failed to load: short={short_loaded}, medium={medium_loaded}, long={long_loaded}"
-            )
-            return False
+        Returns:
+            One dict per input (same order) with short_term_score,
+            medium_term_score, long_term_score (None if unavailable)
+        """
+        bundle = self._bundle()
+        names = self.feature_names
+        X = self.feature_matrix(features_list)
+        keys = [row.tobytes() for row in X]
+
+        results: List[Optional[Dict[str, Optional[int]]]] = [None] * len(X)
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = dict(cached)
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        valid = [i for i in pending if not np.isnan(X[i]).any()]
+        scores = {f"{horizon}_score": np.full(len(valid), -1, dtype=np.int64) for horizon in HORIZON_MODEL_FILES}
+
+        if valid:
+            for horizon, entry in bundle.horizons.items():
+                columns = [names.index(name) for name in entry["feature_names"]]
+                X_scaled = entry["scaler"].transform(X[np.ix_(valid, columns)])
+                proba = entry["model"].predict_proba(X_scaled)
+                # Same term order, dtype and int() truncation as predict_score
+                score = sum(proba[:, k] * weight for k, weight in enumerate(SCORE_WEIGHTS))
+                scores[f"{horizon}_score"] = score.astype(np.int64)
+
+        for horizon in HORIZON_MODEL_FILES:
+            if horizon not in bundle.horizons:
+                logger.warning(f"{horizon.replace('_', '-').capitalize()} model not available")
+
+        positions = {i: k for k, i in enumerate(valid)}
+        for i in pending:
+            k = positions.get(i)
+            results[i] = {
+                name: int(values[k]) if k is not None and values[k] >= 0 else None
+                for name, values in scores.items()
+            }
+
+        with self._lock:
+            for i in valid:
+                self._cache[keys[i]] = dict(results[i])
+                self._cache.move_to_end(keys[i])
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return results
 
     def predict_all_timeframes(self, features: Dict[str, float]) -> Dict[str, int]:
         """
@@ -630,27 +926,7 @@ class MultiTimeframeAIScoreModel:
         Returns:
             Dictionary with keys: short_term_score, medium_term_score, long_term_score
         """
-        scores = {}
-
-        if self.short_term_model and self.short_term_model.is_trained:
-            scores["short_term_score"] = self.short_term_model.predict_score(features)
-        else:
-            scores["short_term_score"] = None
-            logger.warning("Short-term model not available")
-
-        if self.medium_term_model and self.medium_term_model.is_trained:
-            scores["medium_term_score"] = self.medium_term_model.predict_score(features)
-        else:
-            scores["medium_term_score"] = None
-            logger.warning("Medium-term model not available")
-
-        if self.long_term_model and self.long_term_model.is_trained:
-            scores["long_term_score"] = self.long_term_model.predict_score(features)
-        else:
-            scores["long_term_score"] = None
-            logger.warning("Long-term model not available")
-
-        return scores
+        return self.predict_batch([features])[0]
 
     def get_ratings(self, scores: Dict[str, int]) -> Dict[str, str]:
         """
@@ -740,11 +1016,14 @@ if __name__ == "__main__":
     print("QUNEX AI SCORE - ML MODEL TRAINING")
     print("=" * 80)
 
-    # Collect training data (2015-2023)
+    # Collect training data (2015-2023); stored technical features live in the database
     print("\n[1/4] Collecting historical data...")
-    training_data = ai_model.collect_training_data(
-        symbols=sp500_symbols, start_date="2015-01-01", end_date="2023-12-31", polygon=polygon
-    )
+    from web.app import app
+
+    with app.app_context():
+        training_data = ai_model.collect_training_data(
+            symbols=sp500_symbols, start_date="2015-01-01", end_date="2023-12-31", polygon=polygon
+        )
 
     # Prepare features and labels
     print("\n[2/4] Preparing features and labels...")
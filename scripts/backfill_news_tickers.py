@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Backfill: News Ticker Index
+
+Rebuilds NewsTicker rows for articles stored before ticker mentions were
+indexed at ingestion time (or after the extraction rules change). Walks
+news_articles by id in batches, so it can be stopped and resumed with
+--start-id. Re-running is safe: each batch replaces its articles' rows.
+
+Stored articles no longer have their provider ticker tags, so mentions come
+from titles and descriptions only (cashtags, exchange references and known
+tickers).
+
+Usage:
+    python scripts/backfill_news_tickers.py
+    python scripts/backfill_news_tickers.py --batch-size 5000 --start-id 120000
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory and web directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+web_dir = os.path.join(parent_dir, "web")
+sys.path.insert(0, web_dir)
+sys.path.insert(0, parent_dir)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def backfill_news_tickers(batch_size: int = DEFAULT_BATCH_SIZE, start_id: int = 0) -> dict:
+    """
+    Index every article with id > start_id. Caller holds an app context.
+
+    Returns:
+        {"articles": n, "mentions": n, "last_id": id}
+    """
+    from web.database import db, NewsArticle
+    from src.services.news_tickers import index_articles, known_tickers
+
+    known = known_tickers()
+    totals = {"articles": 0, "mentions": 0, "last_id": start_id}
+
+    while True:
+        batch = (
+            db.session.query(NewsArticle.id, NewsArticle.title, NewsArticle.description, NewsArticle.published_at)
+            .filter(NewsArticle.id > totals["last_id"])
+            .order_by(NewsArticle.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        articles = [
+            {"id": id_, "title": title, "description": description, "published_at": published_at}
+            for id_, title, description, published_at in batch
+        ]
+        totals["mentions"] += index_articles(articles, known)
+        db.session.commit()
+
+        totals["articles"] += len(batch)
+        totals["last_id"] = batch[-1][0]
+        logger.info(f"Indexed {totals['articles']} articles ({totals['mentions']} mentions), last id {totals['last_id']}")
+
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the news ticker index")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Articles per transaction")
+    parser.add_argument("--start-id", type=int, default=0, help="Resume after this article id")
+    args = parser.parse_args()
+
+    from web.app import app
+
+    with app.app_context():
+        totals = backfill_news_tickers(args.batch_size, args.start_id)
+    logger.info(f"Backfill done: {totals['articles']} articles, {totals['mentions']} ticker mentions")
+    return True
+
+
+if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("backfill_news_tickers")
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: TaskQueue dequeue/complete cost vs. history size
+
+Fills a temporary queue with N completed tasks plus a small pending backlog,
+then times get_next_task + complete_task. With the journal and pending heap
+the per-task cost should stay flat as N grows (the old full-JSON rewrite
+grew linearly with N).
+
+Usage:
+    python scripts/bench_task_queue.py
+    python scripts/bench_task_queue.py --sizes 1000 100000 --ops 500
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def run(history: int, ops: int) -> float:
+    """Average milliseconds per get_next_task + complete_task with `history` completed tasks"""
+    from agents.autonomous.task_queue import Task, TaskPriority, TaskQueue, TaskStatus, TaskType
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = TaskQueue(Path(tmp) / "tasks.json")
+        now = datetime.now(timezone.utc)
+        for i in range(history + ops):
+            queue.tasks[f"t{i}"] = Task(
+                id=f"t{i}",
+                title=f"Task {i}",
+                description="benchmark",
+                task_type=TaskType.IMPROVEMENT,
+                priority=TaskPriority(1 + i % 5),
+                status=TaskStatus.COMPLETED if i < history else TaskStatus.PENDING,
+                created_at=now,
+            )
+        queue._rebuild_heap()
+        queue._compact()
+
+        start = time.perf_counter()
+        for _ in range(ops):
+            task = queue.get_next_task("bench")
+            queue.complete_task(task.id)
+        elapsed = time.perf_counter() - start
+        queue._journal.close()
+    return elapsed / ops * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TaskQueue dequeue/complete")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Completed tasks in history")
+    parser.add_argument("--ops", type=int, default=1000, help="Tasks dequeued and completed per size")
+    args = parser.parse_args()
+
+    print(f"{'history':>10}  {'ms/task':>8}")
+    for size in args.sizes:
+        print(f"{size:>10}  {run(size, args.ops):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Boot Time Report
+
+Imports the web app with per-module import timing enabled and prints where
+boot time goes: create_app phases, top packages and modules by self time.
+
+Usage:
+    python scripts/boot_report.py            # as configured (LAZY_BLUEPRINTS from env)
+    python scripts/boot_report.py --lazy     # with lazy blueprint loading
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+os.environ["BOOT_REPORT"] = "true"
+if "--lazy" in sys.argv:
+    os.environ["LAZY_BLUEPRINTS"] = "true"
+
+
+def main():
+    import web.app  # noqa: F401  (boot happens on import)
+    from web.boot_report import boot
+
+    for line in boot.summary_lines(limit=25):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Build the Lazy Blueprint Manifest
+
+Registers every API blueprint eagerly and writes web/blueprint_manifest.json,
+the route list LAZY_BLUEPRINTS=true boots from. Rerun after adding or
+changing routes (tests/test_lazy_blueprints.py fails while it is stale).
+"""
+
+import os
+import sys
+
+# Add parent directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+os.environ["LAZY_BLUEPRINTS"] = "false"
+os.environ["AUTO_CREATE_TABLES"] = "false"
+
+
+def main():
+    from web.app import app
+    from web.lazy_blueprints import MANIFEST_PATH, write_manifest
+
+    write_manifest(app)
+    print(f"Wrote {MANIFEST_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,19 @@ Render Cron Job: Check Price Alerts
 
 This script checks if stock prices have hit user-defined alert thresholds.
 Runs every 5 minutes to monitor watchlist stocks and trigger notifications.
+Run with --stream for a long-lived worker that evaluates live ticks instead.
 
 Features:
-- Fetches current prices from Polygon API
-- Compares against user alert thresholds
+- Fetches current prices from Polygon API (one targeted snapshot)
+- Evaluates thresholds with the in-memory alert index (web/alert_engine.py)
 - Sends email notifications when alerts trigger
-- Updates alert status in database
+- Updates alert status in database in batches
 """
 
 import os
 import sys
 import logging
 import time
-from datetime import datetime, timezone
-from decimal import Decimal
-from datetime import timezone
 
 # Add parent directory and web directory to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -31,12 +29,62 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def build_alert_email(alert: dict):
+    """Flask-Mail message for one triggered alert (recipient filled in by the caller)"""
+    from flask_mail import Message
+
+    return Message(
+        subject=f"Price Alert: {alert['ticker']}",
+        body=f"""
+Your price alert for {alert['ticker']} has been triggered!
+
+Alert Condition: {alert['condition'].upper()} ${alert['threshold']:.2f}
+Current Price: ${alert['triggered_price']:.2f}
+Triggered At: {alert['triggered_at'].strftime('%Y-%m-%d %H:%M UTC')}
+
+View your watchlist: https://qunextrade.com/dashboard
+
+---
+QUNEX Trade - Smart Trading Platform
+        """.strip(),
+    )
+
+
+def send_alert_emails(triggered: list) -> int:
+    """Email every triggered alert (users loaded in one query). Caller holds an app context."""
+    from web.database import User
+    from web.extensions import mail
+
+    if not triggered:
+        return 0
+
+    user_ids = {alert["user_id"] for alert in triggered}
+    emails = dict(User.query.with_entities(User.id, User.email).filter(User.id.in_(user_ids)).all())
+
+    sent = 0
+    for alert in triggered:
+        email = emails.get(alert["user_id"])
+        if not email:
+            continue
+        try:
+            msg = build_alert_email(alert)
+            msg.recipients = [email]
+            mail.send(msg)
+            sent += 1
+            logger.info(f"Email sent to {email}")
+        except Exception as e:
+            logger.error(f"Failed to send email: {e}")
+    return sent
+
+
 def check_price_alerts():
     """
     Check if any stock prices have hit user alert thresholds.
 
-    Fetches current prices for all stocks with active alerts,
-    compares against thresholds, and sends notifications when triggered.
+    One-shot mode: loads every active alert into the in-memory AlertIndex,
+    evaluates them against one targeted market snapshot (live prices, not
+    prevClose), writes all triggers in one batch and, once that batch is
+    committed, sends notifications.
 
     Returns:
         bool: True if check succeeded, False otherwise
@@ -47,10 +95,6 @@ def check_price_alerts():
         - Logs all alert checks and triggers
     """
     try:
-        from flask import Flask
-        from flask_sqlalchemy import SQLAlchemy
-        from flask_mail import Mail, Message
-
         logger.info("Starting price alert check...")
 
         # CRITICAL: Validate required API keys
@@ -59,144 +103,88 @@ def check_price_alerts():
             logger.critical("CRITICAL ERROR: POLYGON_API_KEY is missing. Cannot fetch prices.")
             return False
 
-        # Get DATABASE_URL and fix driver
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            logger.critical("CRITICAL ERROR: DATABASE_URL is missing.")
-            return False
-
-        # Fix psycopg2 driver issue
-        if database_url.startswith("postgresql://"):
-            database_url = database_url.replace("postgresql://", "postgresql+psycopg://")
-        elif database_url.startswith("postgres://"):
-            database_url = database_url.replace("postgres://", "postgresql+psycopg://")
-
-        # Create minimal Flask app
-        app = Flask(__name__)
-        app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-        app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-
-        # Mail configuration
-        app.config["MAIL_SERVER"] = "smtp.gmail.com"
-        app.config["MAIL_PORT"] = 587
-        app.config["MAIL_USE_TLS"] = True
-        app.config["MAIL_USERNAME"] = os.getenv("MAIL_USERNAME")
-        app.config["MAIL_PASSWORD"] = os.getenv("MAIL_PASSWORD")
-        app.config["MAIL_DEFAULT_SENDER"] = os.getenv("MAIL_USERNAME")
+        from web.app import app
+        from web.alert_engine import PriceAlertEngine
+        from web.polygon_service import PolygonService
 
-        db = SQLAlchemy(app)
-        mail = Mail(app)
+        engine = PriceAlertEngine(app)
+        with app.app_context():
+            if not engine.load():
+                logger.info("No active alerts to check")
+                return True
 
-        # Import models and services after db is created
-        from database import PriceAlert, User
-        from polygon_service import PolygonService
+            logger.info(f"Checking {len(engine.index)} active alerts on {len(engine.index.tickers())} tickers")
+            triggered = engine.evaluate_snapshot(PolygonService())
+            if engine.flush() < len(triggered):
+                # Nothing was committed; the alerts stay active and trigger again next run
+                logger.error(f"Could not save {len(triggered)} triggered alerts; skipping notifications")
+                return False
+            send_alert_emails(triggered)
 
-        polygon = PolygonService()
+        logger.info(f"Alert check complete. Triggered: {len(triggered)}")
+        return True
 
-        with app.app_context():
-            # Get all active price alerts
-            active_alerts = PriceAlert.query.filter_by(is_triggered=False).all()
+    except Exception as e:
+        logger.critical(f"CRITICAL ERROR in price alert check: {e}", exc_info=True)
+        return False
 
-            if not active_alerts:
-                logger.info("No active alerts to check")
-                return True
 
-            logger.info(f"Checking {len(active_alerts)} active alerts")
-
-            # Group alerts by ticker to minimize API calls
-            ticker_alerts = {}
-            for alert in active_alerts:
-                if alert.ticker not in ticker_alerts:
-                    ticker_alerts[alert.ticker] = []
-                ticker_alerts[alert.ticker].append(alert)
-
-            triggered_count = 0
-
-            # Check each ticker (with rate limiting)
-            for ticker, alerts in ticker_alerts.items():
-                try:
-                    # Fetch current price from Polygon
-                    logger.debug(f"Fetching price for {ticker}")
-                    ticker_data = polygon.get_ticker_details(ticker)
-
-                    if not ticker_data or "results" not in ticker_data:
-                        logger.warning(f"No price data for {ticker}")
-                        continue
-
-                    # Get previous close as current price proxy
-                    current_price = ticker_data["results"].get("prevClose")
-                    if not current_price:
-                        logger.warning(f"No price found for {ticker}")
-                        continue
-
-                    current_price = Decimal(str(current_price))
-                    logger.debug(f"{ticker} current price: ${current_price}")
-
-                    # Check each alert for this ticker
-                    for alert in alerts:
-                        triggered = False
-
-                        # Check threshold based on condition
-                        if alert.condition == "above" and current_price >= alert.threshold:
-                            triggered = True
-                        elif alert.condition == "below" and current_price <= alert.threshold:
-                            triggered = True
-
-                        if triggered:
-                            logger.info(
-                                f"ALERT TRIGGERED: {ticker} {alert.condition} "
-                                f"${alert.threshold} (current: ${current_price})"
-                            )
-
-                            # Update alert status
-                            alert.is_triggered = True
-                            alert.triggered_at = datetime.now(timezone.utc)
-                            alert.triggered_price = float(current_price)
-
-                            # Send email notification
-                            try:
-                                user = User.query.get(alert.user_id)
-                                if user and user.email:
-                                    msg = Message(
-                                        subject=f"Price Alert: {ticker}",
-                                        recipients=[user.email],
-                                        body="""
-Your price alert for {ticker} has been triggered!
-
-Alert Condition: {alert.condition.upper()} ${alert.threshold}
-Current Price: ${current_price}
-Triggered At: {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}
+def run_streaming(snapshot_interval: float = 30.0):
+    """
+    Long-running mode: trigger alerts within a second of the crossing.
 
-View your watchlist: https://qunextrade.com/dashboard
+    Ticks from the market data bus (fed by scripts/polygon_websocket_client.py)
+    are evaluated as they arrive; a targeted snapshot every snapshot_interval
+    seconds covers tickers the websocket isn't subscribed to. Emails are sent
+    from a separate thread so slow SMTP never delays tick evaluation.
+    """
+    import queue
+    import threading
 
----
-QUNEX Trade - Smart Trading Platform
-                                        """.strip(),
-                                    )
-                                    mail.send(msg)
-                                    logger.info(f"Email sent to {user.email}")
-                            except Exception as e:
-                                logger.error(f"Failed to send email: {e}")
+    from web.app import app
+    from web.alert_engine import PriceAlertEngine
+    from web.polygon_service import PolygonService
+    from web.tick_bus import TickBus
 
-                            triggered_count += 1
+    notifications = queue.Queue()
+    engine = PriceAlertEngine(app)
+    engine.add_trigger_listener(notifications.put)
+    engine.load()
 
-                    # Rate limiting: 5 requests per second max
-                    time.sleep(0.2)
+    def mail_loop():
+        while True:
+            alert = notifications.get()
+            with app.app_context():
+                send_alert_emails([alert])
 
-                except Exception as e:
-                    logger.error(f"Error checking {ticker}: {e}")
-                    continue
+    threading.Thread(target=mail_loop, name="alert-mail", daemon=True).start()
 
-            # Commit all changes
-            db.session.commit()
-            logger.info(f"Alert check complete. Triggered: {triggered_count}")
-            return True
+    bus = TickBus()
+    engine.attach(bus.aggregator)
+    bus.start()
+    engine.start()
 
-    except Exception as e:
-        logger.critical(f"CRITICAL ERROR in price alert check: {e}", exc_info=True)
-        return False
+    polygon = PolygonService()
+    try:
+        while True:
+            try:
+                engine.evaluate_snapshot(polygon)
+            except Exception as e:
+                logger.error(f"Snapshot alert check failed: {e}")
+            time.sleep(snapshot_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bus.stop()
+        engine.stop()
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_check_alerts")
+    if "--stream" in sys.argv:
+        run_streaming()
+        sys.exit(0)
     success = check_price_alerts()
     sys.exit(0 if success else 1)
@@ -215,5 +215,8 @@ def refresh_insider_data():
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_refresh_insider")
     success = refresh_insider_data()
     sys.exit(0 if success else 1)
@@ -156,5 +156,8 @@ def main():
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_retrain_model")
     success = main()
     sys.exit(0 if success else 1)
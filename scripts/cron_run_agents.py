@@ -146,4 +146,7 @@ def main():
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_run_agents")
     main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Render Cron Job: Run Backtests
+
+Drains pending BacktestJob rows through the backtest engine
+(src/services/backtest_engine.py). Runs every few minutes.
+
+Features:
+- Jobs are claimed atomically (pending -> running), so overlapping runs never
+  process the same job twice
+- Jobs left running longer than BACKTEST_JOB_TIMEOUT_MINUTES (worker killed
+  or hung) are failed at the start of the next run
+- Adds backtest_jobs.started_at on startup if the table predates it
+  (scripts/migrate_add_backtest_started_at.py)
+- Backtests run in a process pool; results are written as each one finishes
+- Bars come from the local bar store (only missing ranges are downloaded)
+
+BacktestJob has no strategy/timeframe columns, so every job in a run uses
+--strategy and --timeframe.
+
+Runtime: every strategy replays a year of 5-minute bars in about 5-15 s
+(see src/services/backtest_engine.py). Keep BACKTEST_JOB_TIMEOUT_MINUTES
+above the longest expected job.
+
+Usage:
+    python scripts/cron_run_backtests.py
+    python scripts/cron_run_backtests.py --strategy swing --timeframe 240 --workers 2
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+
+# Add parent directory and web directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+web_dir = os.path.join(parent_dir, "web")
+sys.path.insert(0, web_dir)
+sys.path.insert(0, parent_dir)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_LIMIT = int(os.getenv("BACKTEST_JOBS_PER_RUN", "20"))
+JOB_TIMEOUT_MINUTES = int(os.getenv("BACKTEST_JOB_TIMEOUT_MINUTES", "30"))
+
+
+def _to_ms(value: datetime) -> int:
+    """DateTime column (naive values are UTC) -> ms since epoch"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def fail_stale_jobs(timeout_minutes: int = JOB_TIMEOUT_MINUTES) -> int:
+    """
+    Fail jobs stuck in running for longer than timeout_minutes. Caller holds an app context.
+
+    A job is only left running when its worker was killed or hung. It is
+    failed rather than requeued, so a backtest that crashes its worker
+    cannot loop forever. Running jobs without started_at (claimed before
+    the column existed) count as stale.
+    """
+    from web.database import db, BacktestJob
+
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=timeout_minutes)
+    stale = BacktestJob.query.filter(
+        BacktestJob.status == "running",
+        db.or_(BacktestJob.started_at.is_(None), BacktestJob.started_at < cutoff),
+    ).update(
+        {
+            "status": "failed",
+            "error_message": f"Backtest did not finish within {timeout_minutes} minutes (worker killed or timed out)",
+            "completed_at": datetime.now(timezone.utc),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    if stale:
+        logger.warning(f"Failed {stale} stale running backtest jobs")
+    return stale
+
+
+def claim_jobs(limit: int) -> list:
+    """Mark up to `limit` pending jobs as running (oldest first). Caller holds an app context."""
+    from web.database import db, BacktestJob
+
+    candidates = [
+        job_id
+        for (job_id,) in db.session.query(BacktestJob.id)
+        .filter(BacktestJob.status == "pending")
+        .order_by(BacktestJob.created_at)
+        .limit(limit)
+        .all()
+    ]
+
+    claimed = []
+    for job_id in candidates:
+        # Conditional update: a concurrent run that got there first leaves rowcount 0
+        updated = BacktestJob.query.filter_by(id=job_id, status="pending").update(
+            {"status": "running", "started_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        db.session.commit()
+        if updated:
+            claimed.append(db.session.get(BacktestJob, job_id))
+    return claimed
+
+
+def finish_job(job, result: dict = None, error: str = None):
+    from web.database import db
+
+    job.status = "failed" if error else "completed"
+    job.result_json = json.dumps(result) if result is not None else None
+    job.error_message = error
+    job.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+def drain_jobs(strategy: str = "scalp", timeframe: str = "5", workers: int = DEFAULT_WORKERS, limit: int = DEFAULT_LIMIT) -> dict:
+    """
+    Run every claimable pending job. Caller holds an app context.
+
+    Args:
+        strategy: backtest_engine.STRATEGIES key used for every job
+        timeframe: backtest_engine.TIMEFRAMES key ("5", "60", "1D", ...)
+        workers: Process pool size (0 runs backtests inline)
+        limit: Maximum jobs claimed in this run
+
+    Returns:
+        {"completed": n, "failed": n}
+    """
+    from src.services.backtest_engine import backtest_ticker, get_strategy
+
+    get_strategy(strategy)  # Fail fast on a bad --strategy before claiming anything
+    fail_stale_jobs()
+    jobs = claim_jobs(limit)
+    counts = {"completed": 0, "failed": 0}
+    if not jobs:
+        logger.info("No pending backtest jobs")
+        return counts
+    logger.info(f"Running {len(jobs)} backtest jobs ({strategy}, {timeframe})")
+
+    def args(job):
+        return (job.ticker, _to_ms(job.start_date), _to_ms(job.end_date), float(job.initial_capital or 10000), strategy, timeframe)
+
+    def record(job, result=None, error=None):
+        finish_job(job, result, error)
+        counts["failed" if error else "completed"] += 1
+        logger.info(f"Backtest {job.id} {job.ticker}: {'failed - ' + error if error else 'completed'}")
+
+    if workers <= 0:
+        for job in jobs:
+            try:
+                record(job, result=backtest_ticker(*args(job)))
+            except Exception as e:
+                record(job, error=str(e))
+        return counts
+
+    # spawn: the parent holds a DB connection pool that must not be copied into children
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(backtest_ticker, *args(job)): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                record(job, result=future.result())
+            except BrokenProcessPool:
+                record(job, error="Backtest worker process crashed")
+            except Exception as e:
+                record(job, error=str(e))
+    return counts
+
+
+def main():
+    from src.services.backtest_engine import STRATEGIES, TIMEFRAMES
+
+    parser = argparse.ArgumentParser(description="Run pending backtest jobs")
+    parser.add_argument("--strategy", default="scalp", choices=sorted(STRATEGIES), help="Signal generator to replay")
+    parser.add_argument("--timeframe", default="5", choices=list(TIMEFRAMES), help="Bar timeframe")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Process pool size (0 = inline)")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Maximum jobs per run")
+    args = parser.parse_args()
+
+    from web.app import app
+    from scripts.migrate_add_backtest_started_at import migrate
+
+    with app.app_context():
+        migrate()  # Databases created before BacktestJob.started_at lack the column
+        counts = drain_jobs(args.strategy, args.timeframe, args.workers, args.limit)
+    logger.info(f"Backtests done: {counts['completed']} completed, {counts['failed']} failed")
+    return counts["failed"] == 0
+
+
+if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_run_backtests")
+    sys.exit(0 if main() else 1)
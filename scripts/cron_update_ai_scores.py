@@ -6,17 +6,24 @@ This script pre-computes AI scores for all stocks in user watchlists.
 Runs daily at midnight to refresh scores with enhanced features:
 - Technical indicators (RSI, MACD, Moving Averages)
 - Fundamental data (P/E, P/B, EPS growth, Revenue growth)
-- News sentiment (7-day average from NewsArticle table)
+- News sentiment (7-day average rating of articles tagged in the NewsTicker index)
+
+Numeric features are appended to the feature store (the feature_rows table,
+src/services/feature_store.py) once per ticker per day; a second run on the
+same day reuses them instead of refetching. Run with --rescore to re-score every AIScore row from its latest
+stored features (no API calls), e.g. after the models are retrained.
 """
 
 import os
 import sys
 import logging
 import json
+import math
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from datetime import timedelta
-from datetime import timezone
+from typing import Dict, List, Optional
 
 # Add parent directory and web directory to path for imports
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -29,22 +36,109 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+# Default universe when neither AIScore nor watchlists have tickers
+DEFAULT_TICKERS = [
+    # FAANG + Popular Tech
+    "AAPL", "MSFT", "GOOGL", "AMZN", "META", "NVDA", "TSLA",
+    "NFLX", "AMD", "AVGO", "CRM", "ORCL", "ADBE", "INTC",
+    # Major Indices ETFs
+    "SPY", "QQQ", "DIA",
+    # Financials
+    "JPM", "BAC", "V",
+]
+
+# Polygon has no per-minute limit on our plan, so technicals are fetched concurrently
+POLYGON_WORKERS = int(os.getenv("AI_SCORE_POLYGON_WORKERS", "8"))
+POLYGON_CALLS_PER_SECOND = float(os.getenv("POLYGON_CALLS_PER_SECOND", "50"))
+
+# Alpha Vantage free tier: 5 calls/minute, 500 calls/day (one OVERVIEW call per stock)
+ALPHA_VANTAGE_CALLS_PER_MINUTE = float(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+ALPHA_VANTAGE_DAILY_LIMIT = int(os.getenv("ALPHA_VANTAGE_DAILY_LIMIT", "500"))
+
+# Fundamentals only change quarterly; reuse the last fetch (stored in features_json)
+FUNDAMENTALS_TTL_DAYS = 7
+
+DEFAULT_FUNDAMENTALS = {
+    "market_cap_log": 9.0,  # Neutral value
+    "pe_ratio": 20.0,  # Neutral value
+    "pb_ratio": 3.0,  # Neutral value
+    "eps_growth": 0.10,  # Neutral 10% growth
+    "revenue_growth": 0.15,  # Neutral 15% growth
+}
+
+# Numeric features kept per (ticker, day) in the feature store; bump the version when this list changes
+SCORING_FEATURE_VERSION = "ai-score-v1"
+SCORING_FEATURES = ["rsi", "macd", "price_to_ma50", "price_to_ma200", "is_etf", *DEFAULT_FUNDAMENTALS, "news_sentiment_7d"]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for one API provider.
+
+    Refills at `rate` tokens per second up to `capacity`. An optional `budget`
+    caps the total number of calls handed out (e.g. a daily quota).
+    """
+
+    def __init__(self, rate: float, capacity: int = 1, budget: Optional[int] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.budget = budget
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Block until a token is available. Returns False once the budget is spent."""
+        while True:
+            with self._lock:
+                if self.budget is not None and self.budget <= 0:
+                    return False
+
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    if self.budget is not None:
+                        self.budget -= 1
+                    return True
+
+                wait = (1 - self._tokens) / self.rate
+
+            # Sleep outside the lock so other threads can check the bucket
+            time.sleep(wait)
+
+
+def create_provider_buckets() -> Dict[str, TokenBucket]:
+    """Separate budgets per provider so Polygon never waits behind Alpha Vantage"""
+    return {
+        "polygon": TokenBucket(rate=POLYGON_CALLS_PER_SECOND, capacity=POLYGON_WORKERS),
+        "alpha_vantage": TokenBucket(
+            rate=ALPHA_VANTAGE_CALLS_PER_MINUTE / 60.0, capacity=1, budget=ALPHA_VANTAGE_DAILY_LIMIT
+        ),
+    }
+
+
 def update_ai_scores():
     """
     Update AI scores for all stocks in watchlists.
 
-    Fetches unique tickers, computes enhanced features (technical + fundamental + sentiment),
-    calculates AI score, and stores in AIScore table.
+    Scores the whole universe (existing AIScore rows plus watchlist tickers) in one run:
+    - Polygon technicals are fetched concurrently
+    - Alpha Vantage fundamentals are cached across runs and only the
+      stale ones are fetched, throttled by their own token bucket
+    - All AIScore upserts are committed in one transaction at the end
 
     Returns:
         bool: True if update succeeded, False otherwise
     """
     try:
         # Import app first to ensure proper initialization
-        import numpy as np
         from web.app import app
-        from web.database import db, Watchlist, AIScore, NewsArticle
+        from web.database import db, Watchlist, AIScore
         from web.polygon_service import PolygonService
+        from src.services.feature_store import get_feature_store
         from alpha_vantage.fundamentaldata import FundamentalData
 
         logger.info("Starting AI score update...")
@@ -70,170 +164,91 @@ def update_ai_scores():
         alpha_vantage = FundamentalData(key=alpha_vantage_key, output_format="json")
 
         # Initialize Multi-Timeframe ML models (load once for efficiency)
-        ml_model = None
-        try:
-            import sys
-
-            ml_dir = os.path.join(parent_dir, "ml")
-            if ml_dir not in sys.path:
-                sys.path.insert(0, ml_dir)
-
-            from ai_score_system import MultiTimeframeAIScoreModel
-
-            ml_model = MultiTimeframeAIScoreModel(
-                model_dir=os.path.join(parent_dir, "ml", "models")
-            )
-            if ml_model.load_all_models():
-                logger.info("✓ Multi-timeframe ML models loaded successfully (5d, 20d, 60d)")
-            else:
-                logger.warning("Some ML models failed to load, will use rule-based scoring")
-                ml_model = None
-        except Exception as ml_error:
-            logger.warning(f"Could not load ML models: {ml_error}, will use rule-based scoring")
-            ml_model = None
+        ml_model = load_ml_model()
 
         with app.app_context():
-            # RATE LIMITING STRATEGY: Update only 20 oldest stocks per day
-            # This keeps us within Alpha Vantage's 500 calls/day limit
-            # (we make ~2-3 calls per stock: OVERVIEW + INCOME_STATEMENT)
-
-            # Get 20 stocks with oldest updated_at timestamp
-            oldest_stocks = AIScore.query.order_by(AIScore.updated_at.asc()).limit(20).all()
-
-            if oldest_stocks:
-                tickers = [stock.ticker for stock in oldest_stocks]
-                logger.info("Rate limiting: Updating 20 oldest stocks from AIScore table")
-            else:
-                # First run - get stocks from watchlists
-                watchlist_tickers = db.session.query(Watchlist.ticker).distinct().limit(20).all()
-                tickers = [t[0] for t in watchlist_tickers]
-
-                # If no watchlist tickers, use default popular stocks
-                if not tickers:
-                    logger.info("No watchlist tickers found. Using default popular stocks.")
-                    tickers = [
-                        # FAANG + Popular Tech (Top 20)
-                        "AAPL",
-                        "MSFT",
-                        "GOOGL",
-                        "AMZN",
-                        "META",
-                        "NVDA",
-                        "TSLA",
-                        "NFLX",
-                        "AMD",
-                        "AVGO",
-                        "CRM",
-                        "ORCL",
-                        "ADBE",
-                        "INTC",
-                        # Major Indices ETFs
-                        "SPY",
-                        "QQQ",
-                        "DIA",
-                        # Financials
-                        "JPM",
-                        "BAC",
-                        "V",
-                    ][
-                        :20
-                    ]  # Ensure max 20
-                    logger.info(f"Processing {len(tickers)} default tickers")
-
+            tickers = get_universe_tickers(db, Watchlist, AIScore)
             logger.info(f"Processing {len(tickers)} tickers: {', '.join(tickers)}")
 
+            # One query for every existing row; reused for the fundamentals cache and the upsert
+            existing = {
+                record.ticker: record
+                for record in AIScore.query.filter(AIScore.ticker.in_(tickers)).all()
+            }
+            # Tickers whose features were already computed today (an earlier run) are not refetched
+            store = get_feature_store()
+            today = datetime.now(timezone.utc).date()
+            done_today = set(store.as_of(SCORING_FEATURE_VERSION, tickers, today, max_age_days=0).tickers)
+            to_fetch = [ticker for ticker in tickers if ticker not in done_today]
+            if done_today:
+                logger.info(f"Reusing today's stored features for {len(done_today)} tickers")
+
+            cached_fundamentals = {
+                ticker: load_cached_fundamentals(record) for ticker, record in existing.items()
+            }
+
+            collected = collect_features(
+                to_fetch, polygon, alpha_vantage, cached_fundamentals, create_provider_buckets()
+            )
+
             updated_count = 0
             failed_count = 0
+            now = datetime.now(timezone.utc)
+
+            # 3. NEWS SENTIMENT (database, so it stays on the main thread)
+            try:
+                sentiment = calculate_news_sentiment([ticker for ticker in to_fetch if collected.get(ticker)])
+            except Exception as e:
+                logger.error(f"Error calculating news sentiment: {e}", exc_info=True)
+                sentiment = {}
+
+            fresh = {}
+            for ticker in to_fetch:
+                features = collected.get(ticker)
+                if not features or ticker not in sentiment:
+                    logger.warning(f"Could not calculate features for {ticker}")
+                    failed_count += 1
+                    continue
+                features["news_sentiment_7d"] = sentiment[ticker]
+                fresh[ticker] = features
+
+            store.append_day(SCORING_FEATURE_VERSION, today, fresh, SCORING_FEATURES)
+
+            # Inference reads the day's cross-section back from the store in one bulk read
+            day_features = stored_features(store, tickers, today, existing, fresh, max_age_days=0)
+            scored = [(ticker, day_features[ticker]) for ticker in tickers if ticker in day_features]
 
-            for i, ticker in enumerate(tickers):
-                # RATE LIMITING: 15-second delay between API calls to stay within 4 calls/minute
-                if i > 0:
-                    logger.info("Rate limiting: Waiting 15 seconds before next API call...")
-                    time.sleep(15)
+            # Every horizon model runs once over the whole universe
+            ml_scores = predict_scores(ml_model, [features for _, features in scored])
+
+            for (ticker, features), scores_dict in zip(scored, ml_scores):
                 try:
-                    logger.info(f"Processing {ticker}... ({i+1}/{len(tickers)})")
-
-                    # Calculate enhanced features with Alpha Vantage
-                    features = calculate_enhanced_features(ticker, polygon, alpha_vantage, db)
-
-                    if not features:
-                        logger.warning(f"Could not calculate features for {ticker}")
-                        failed_count += 1
-                        continue
-
-                    # Calculate AI scores for all timeframes using ML models
-                    if ml_model:
-                        try:
-                            # Get scores for all 3 timeframes
-                            scores_dict = ml_model.predict_all_timeframes(features)
-                            ratings_dict = ml_model.get_ratings(scores_dict)
-
-                            # Extract values (use medium-term as primary for backward compatibility)
-                            score = scores_dict.get("medium_term_score", 50)
-                            rating = ratings_dict.get("medium_term_rating", "Hold")
-                            short_term_score = scores_dict.get("short_term_score")
-                            short_term_rating = ratings_dict.get("short_term_rating")
-                            long_term_score = scores_dict.get("long_term_score")
-                            long_term_rating = ratings_dict.get("long_term_rating")
-
-                            logger.info(
-                                f"ML model scores for {ticker}: Short={short_term_score}, Medium={score}, Long={long_term_score}"
-                            )
-                        except Exception as ml_error:
-                            logger.warning(
-                                f"ML model prediction error for {ticker}: {ml_error}, using rule-based scoring"
-                            )
-                            score = calculate_ai_score(features)
-                            rating = determine_rating(score)
-                            short_term_score = None
-                            short_term_rating = None
-                            long_term_score = None
-                            long_term_rating = None
-                    else:
-                        # Fallback to rule-based scoring (medium-term only)
-                        score = calculate_ai_score(features)
-                        rating = determine_rating(score)
-                        short_term_score = None
-                        short_term_rating = None
-                        long_term_score = None
-                        long_term_rating = None
+                    result = score_features(ticker, features, ml_model, scores_dict)
 
                     # Calculate feature explanations (simplified SHAP-like)
                     explanation = calculate_feature_contributions(features)
 
-                    # Store in database with all timeframe scores
-                    ai_score_record = AIScore.query.filter_by(ticker=ticker).first()
-
-                    if ai_score_record:
-                        # Update existing
-                        ai_score_record.score = score  # Medium-term (primary)
-                        ai_score_record.rating = rating
-                        ai_score_record.short_term_score = short_term_score
-                        ai_score_record.short_term_rating = short_term_rating
-                        ai_score_record.long_term_score = long_term_score
-                        ai_score_record.long_term_rating = long_term_rating
-                        ai_score_record.features_json = json.dumps(features)
-                        ai_score_record.explanation_json = json.dumps(explanation)
-                        ai_score_record.updated_at = datetime.now(timezone.utc)
-                    else:
-                        # Insert new
-                        ai_score_record = AIScore(
-                            ticker=ticker,
-                            score=score,
-                            rating=rating,
-                            short_term_score=short_term_score,
-                            short_term_rating=short_term_rating,
-                            long_term_score=long_term_score,
-                            long_term_rating=long_term_rating,
-                            explanation_json=json.dumps(explanation),
-                            features_json=json.dumps(features),
-                        )
-                        db.session.add(ai_score_record)
-
-                    db.session.commit()
+                    record = existing.get(ticker)
+                    if record is None:
+                        record = AIScore(ticker=ticker)
+                        db.session.add(record)
+                        existing[ticker] = record
+
+                    record.score = result["score"]  # Medium-term (primary)
+                    record.rating = result["rating"]
+                    record.short_term_score = result["short_term_score"]
+                    record.short_term_rating = result["short_term_rating"]
+                    record.long_term_score = result["long_term_score"]
+                    record.long_term_rating = result["long_term_rating"]
+                    record.features_json = json.dumps(features)
+                    record.explanation_json = json.dumps(explanation)
+                    record.updated_at = now
+
                     updated_count += 1
                     logger.info(
-                        f"{ticker}: Short={short_term_score}/{short_term_rating}, Medium={score}/{rating}, Long={long_term_score}/{long_term_rating}"
+                        f"{ticker}: Short={result['short_term_score']}/{result['short_term_rating']}, "
+                        f"Medium={result['score']}/{result['rating']}, "
+                        f"Long={result['long_term_score']}/{result['long_term_rating']}"
                     )
 
                 except Exception as e:
@@ -241,6 +256,14 @@ def update_ai_scores():
                     failed_count += 1
                     continue
 
+            # Single bulk transaction for every upsert
+            try:
+                db.session.commit()
+            except Exception as commit_error:
+                db.session.rollback()
+                logger.error(f"Bulk AIScore commit failed: {commit_error}", exc_info=True)
+                return False
+
             logger.info(f"AI score update complete: {updated_count} updated, {failed_count} failed")
             return True
 
@@ -249,6 +272,320 @@ def update_ai_scores():
         return False
 
 
+def load_ml_model():
+    """Multi-timeframe model from the shared bundle, or None to use rule-based scoring"""
+    try:
+        ml_dir = os.path.join(parent_dir, "ml")
+        if ml_dir not in sys.path:
+            sys.path.insert(0, ml_dir)
+
+        from ai_score_system import MultiTimeframeAIScoreModel
+
+        ml_model = MultiTimeframeAIScoreModel(
+            model_dir=os.path.join(parent_dir, "ml", "models")
+        )
+        if ml_model.load_all_models():
+            logger.info("✓ Multi-timeframe ML models loaded successfully (5d, 20d, 60d)")
+            return ml_model
+        logger.warning("Some ML models failed to load, will use rule-based scoring")
+    except Exception as ml_error:
+        logger.warning(f"Could not load ML models: {ml_error}, will use rule-based scoring")
+    return None
+
+
+def rescore_ai_scores():
+    """
+    Re-score every AIScore row from its stored features_json (no API calls).
+
+    Used after a model retrain: the whole universe goes through one batched
+    prediction per horizon.
+
+    Returns:
+        bool: True if rescoring succeeded, False otherwise
+    """
+    try:
+        from web.app import app
+        from web.database import db, AIScore
+        from src.services.feature_store import get_feature_store
+
+        ml_model = load_ml_model()
+        if ml_model is None:
+            logger.error("ML models unavailable, nothing to rescore")
+            return False
+
+        with app.app_context():
+            records = AIScore.query.all()
+            # Latest stored features per ticker (features_json for tickers the store has not seen)
+            features_by_ticker = stored_features(
+                get_feature_store(), [r.ticker for r in records], datetime.now(timezone.utc).date(),
+                {r.ticker: r for r in records},
+            )
+            records = [r for r in records if features_by_ticker.get(r.ticker)]
+            features_list = [features_by_ticker[r.ticker] for r in records]
+
+            start = time.perf_counter()
+            ml_scores = predict_scores(ml_model, features_list)
+            logger.info(f"Scored {len(records)} tickers in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+            now = datetime.now(timezone.utc)
+            for record, features, scores_dict in zip(records, features_list, ml_scores):
+                result = score_features(record.ticker, features, ml_model, scores_dict)
+                record.score = result["score"]
+                record.rating = result["rating"]
+                record.short_term_score = result["short_term_score"]
+                record.short_term_rating = result["short_term_rating"]
+                record.long_term_score = result["long_term_score"]
+                record.long_term_rating = result["long_term_rating"]
+                record.updated_at = now
+
+            db.session.commit()
+            logger.info(f"AI score rescore complete: {len(records)} updated")
+            return True
+
+    except Exception as e:
+        logger.error(f"AI score rescore failed: {e}", exc_info=True)
+        return False
+
+
+def stored_features(
+    store, tickers: List[str], as_of_date, existing: Dict, fresh: Optional[Dict] = None, max_age_days: Optional[int] = None
+) -> Dict[str, Dict]:
+    """
+    Feature dicts for scoring: each ticker's latest feature store row on or before as_of_date.
+
+    Non-numeric extras (fundamentals_updated_at) come from this run's fresh
+    features, else the AIScore row's features_json. Tickers without a store
+    row fall back to features_json alone when max_age_days is None.
+    """
+    fresh = fresh or {}
+    rows = store.as_of(SCORING_FEATURE_VERSION, tickers, as_of_date, max_age_days=max_age_days).to_dict()
+
+    features_by_ticker = {}
+    for ticker in tickers:
+        base = fresh.get(ticker)
+        if base is None:
+            record = existing.get(ticker)
+            try:
+                base = json.loads(record.features_json) if record is not None and record.features_json else {}
+            except (ValueError, TypeError):
+                base = {}
+        row = rows.get(ticker)
+        if row is None:
+            if max_age_days is None and base:
+                features_by_ticker[ticker] = base
+            continue
+        features_by_ticker[ticker] = {**base, **{k: v for k, v in row.items() if not math.isnan(v)}}
+    return features_by_ticker
+
+
+def get_universe_tickers(db, Watchlist, AIScore) -> List[str]:
+    """
+    Every ticker to score: existing AIScore rows (oldest first) plus watchlist tickers.
+
+    Oldest-first ordering means the Alpha Vantage budget goes to the stalest
+    fundamentals if it runs out.
+    """
+    tickers = [row[0] for row in db.session.query(AIScore.ticker).order_by(AIScore.updated_at.asc()).all()]
+    tickers += [row[0] for row in db.session.query(Watchlist.ticker).distinct().all()]
+    tickers = list(dict.fromkeys(t.upper() for t in tickers if t))
+
+    # If no tickers anywhere, use default popular stocks
+    if not tickers:
+        logger.info("No watchlist tickers found. Using default popular stocks.")
+        tickers = list(DEFAULT_TICKERS)
+
+    return tickers
+
+
+def collect_features(
+    tickers: List[str],
+    polygon,
+    alpha_vantage,
+    cached_fundamentals: Dict[str, Optional[Dict]],
+    buckets: Dict[str, TokenBucket],
+) -> Dict[str, Dict]:
+    """
+    Fetch technical and fundamental features for every ticker.
+
+    Polygon requests run on a thread pool; Alpha Vantage requests run on a
+    single worker gated by its token bucket, so only that provider waits.
+
+    Returns:
+        dict: ticker -> feature dict (without news sentiment)
+    """
+    results = {}
+
+    with ThreadPoolExecutor(max_workers=POLYGON_WORKERS) as polygon_pool, \
+            ThreadPoolExecutor(max_workers=1) as alpha_vantage_pool:
+        technical_futures = {
+            ticker: polygon_pool.submit(
+                fetch_polygon_features, ticker, polygon, cached_fundamentals.get(ticker), buckets["polygon"]
+            )
+            for ticker in tickers
+        }
+        fundamental_futures = {
+            ticker: alpha_vantage_pool.submit(
+                fetch_fundamentals,
+                ticker,
+                alpha_vantage,
+                technical_futures[ticker],
+                cached_fundamentals.get(ticker),
+                buckets["alpha_vantage"],
+            )
+            for ticker in tickers
+        }
+
+        for ticker in tickers:
+            try:
+                technicals = technical_futures[ticker].result()
+                fundamentals = fundamental_futures[ticker].result()
+                results[ticker] = {**technicals, **fundamentals}
+            except Exception as e:
+                logger.error(f"Error calculating features for {ticker}: {e}", exc_info=True)
+
+    return results
+
+
+def fetch_polygon_features(ticker: str, polygon, cached: Optional[Dict], bucket: TokenBucket) -> Dict:
+    """Technical indicators plus ETF flag for one ticker (runs on the Polygon pool)"""
+    if cached and "is_etf" in cached:
+        is_etf_flag = cached["is_etf"]
+    else:
+        if polygon:
+            bucket.acquire()
+        is_etf_flag = is_etf(ticker, polygon)
+
+    if polygon:
+        bucket.acquire()
+    features = calculate_technical_features(ticker, polygon)
+    features["is_etf"] = is_etf_flag
+    return features
+
+
+def fetch_fundamentals(
+    ticker: str, alpha_vantage, technical_future, cached: Optional[Dict], bucket: TokenBucket
+) -> Dict:
+    """Fundamentals for one ticker: fresh cache, else a throttled Alpha Vantage call"""
+    is_etf_flag = technical_future.result().get("is_etf", False)
+
+    # 2. FUNDAMENTAL INDICATORS
+    # Skip for ETFs - they don't have individual company fundamentals
+    if is_etf_flag:
+        return calculate_fundamental_features(ticker, alpha_vantage, is_etf_flag=True)
+
+    if cached and cached.get("fresh"):
+        logger.info(f"Using cached fundamentals for {ticker} (updated {cached['fundamentals_updated_at']})")
+        return {key: cached[key] for key in list(DEFAULT_FUNDAMENTALS) + ["fundamentals_updated_at"]}
+
+    if not bucket.acquire():
+        logger.warning(f"Alpha Vantage budget exhausted, reusing last fundamentals for {ticker}")
+        return previous_fundamentals(cached)
+
+    features = calculate_fundamental_features(ticker, alpha_vantage, is_etf_flag=False)
+    if features is None:
+        # Failed call: keep the cached values and their old timestamp so the next run retries
+        logger.warning(f"Reusing last fundamentals for {ticker} after a failed Alpha Vantage call")
+        return previous_fundamentals(cached)
+
+    # Only a parsed response counts as fresh
+    features["fundamentals_updated_at"] = datetime.now(timezone.utc).isoformat()
+    return features
+
+
+def previous_fundamentals(cached: Optional[Dict]) -> Dict:
+    """Cached fundamentals with their original timestamp, else unstamped defaults"""
+    if cached and "fundamentals_updated_at" in cached:
+        return {key: cached[key] for key in list(DEFAULT_FUNDAMENTALS) + ["fundamentals_updated_at"]}
+    return dict(DEFAULT_FUNDAMENTALS)
+
+
+def load_cached_fundamentals(record) -> Optional[Dict]:
+    """
+    Fundamentals and ETF flag stored in an AIScore row's features_json.
+
+    Returns None if the row has no cached fundamentals; "fresh" marks whether
+    they are younger than FUNDAMENTALS_TTL_DAYS.
+    """
+    try:
+        features = json.loads(record.features_json) if record.features_json else {}
+    except (ValueError, TypeError):
+        return None
+
+    cached = {}
+    if "is_etf" in features:
+        cached["is_etf"] = bool(features["is_etf"])
+
+    updated_at = features.get("fundamentals_updated_at")
+    if updated_at and all(key in features for key in DEFAULT_FUNDAMENTALS):
+        try:
+            age = datetime.now(timezone.utc) - datetime.fromisoformat(updated_at)
+        except (ValueError, TypeError):
+            age = None
+        cached.update({key: features[key] for key in DEFAULT_FUNDAMENTALS})
+        cached["fundamentals_updated_at"] = updated_at
+        cached["fresh"] = age is not None and age < timedelta(days=FUNDAMENTALS_TTL_DAYS)
+
+    return cached or None
+
+
+def predict_scores(ml_model, features_list: List[Dict]) -> List[Optional[Dict]]:
+    """Batch ML scores for every feature dict (None entries fall back to rule-based scoring)"""
+    if not ml_model or not features_list:
+        return [None] * len(features_list)
+    try:
+        return ml_model.predict_batch(features_list)
+    except Exception as ml_error:
+        logger.warning(f"Batch ML prediction failed: {ml_error}, using rule-based scoring")
+        return [None] * len(features_list)
+
+
+def score_features(ticker: str, features: Dict, ml_model, scores_dict: Optional[Dict] = None) -> Dict:
+    """
+    Calculate AI scores for all timeframes, falling back to rule-based scoring.
+
+    scores_dict is this ticker's row from predict_scores(); without it the
+    model is run for this ticker alone.
+    """
+    if ml_model:
+        try:
+            # Get scores for all 3 timeframes
+            if scores_dict is None:
+                scores_dict = ml_model.predict_all_timeframes(features)
+            if scores_dict.get("medium_term_score") is None:
+                raise ValueError("no medium-term score")
+            ratings_dict = ml_model.get_ratings(scores_dict)
+
+            logger.info(
+                f"ML model scores for {ticker}: Short={scores_dict.get('short_term_score')}, "
+                f"Medium={scores_dict.get('medium_term_score')}, Long={scores_dict.get('long_term_score')}"
+            )
+
+            # Use medium-term as primary for backward compatibility
+            return {
+                "score": scores_dict.get("medium_term_score", 50),
+                "rating": ratings_dict.get("medium_term_rating", "Hold"),
+                "short_term_score": scores_dict.get("short_term_score"),
+                "short_term_rating": ratings_dict.get("short_term_rating"),
+                "long_term_score": scores_dict.get("long_term_score"),
+                "long_term_rating": ratings_dict.get("long_term_rating"),
+            }
+        except Exception as ml_error:
+            logger.warning(
+                f"ML model prediction error for {ticker}: {ml_error}, using rule-based scoring"
+            )
+
+    # Fallback to rule-based scoring (medium-term only)
+    score = calculate_ai_score(features)
+    return {
+        "score": score,
+        "rating": determine_rating(score),
+        "short_term_score": None,
+        "short_term_rating": None,
+        "long_term_score": None,
+        "long_term_rating": None,
+    }
+
+
 def is_etf(ticker: str, polygon) -> bool:
     """
     Check if a ticker is an ETF or fund.
@@ -286,191 +623,148 @@ def is_etf(ticker: str, polygon) -> bool:
         return False
 
 
-def calculate_enhanced_features(ticker: str, polygon, alpha_vantage, db):
-    """
-    Calculate enhanced features for a ticker.
+def calculate_technical_features(ticker: str, polygon) -> Dict:
+    """1. TECHNICAL INDICATORS (from Polygon if available)"""
+    features = {}
 
-    Combines technical, fundamental, and sentiment features.
+    if polygon:
+        technicals = polygon.get_technical_indicators(ticker, days=200)
+        if technicals and technicals.get("current_price"):
+            # Use actual Polygon data
+            features["rsi"] = technicals.get("rsi_14", 50)
+            current_price = technicals.get("current_price", 0)
+            sma_50 = technicals.get("sma_50", current_price)
+            features["price_to_ma50"] = current_price / sma_50 if sma_50 else 1.0
 
-    Args:
-        ticker: Stock ticker symbol
-        polygon: PolygonService instance (for technical indicators)
-        alpha_vantage: Alpha Vantage FundamentalData instance (for fundamentals)
-        db: Database session
-
-    Returns:
-        dict: Feature dictionary or None if calculation failed
-    """
-    try:
-        import numpy as np
-        from web.database import NewsArticle
-
-        features = {}
-
-        # Check if ticker is an ETF (ETFs don't have P/E, EPS, etc.)
-        is_etf_flag = is_etf(ticker, polygon)
+            # MACD not available - use default
+            features["macd"] = 0
+            # MA200 not available - use default
+            features["price_to_ma200"] = 1.0
 
-        # 1. TECHNICAL INDICATORS (from Polygon if available)
-        if polygon:
-            technicals = polygon.get_technical_indicators(ticker, days=200)
-            if technicals and technicals.get("current_price"):
-                # Use actual Polygon data
-                features["rsi"] = technicals.get("rsi_14", 50)
-                current_price = technicals.get("current_price", 0)
-                sma_50 = technicals.get("sma_50", current_price)
-                features["price_to_ma50"] = current_price / sma_50 if sma_50 else 1.0
-
-                # MACD not available - use default
-                features["macd"] = 0
-                # MA200 not available - use default
-                features["price_to_ma200"] = 1.0
-
-                logger.info(
-                    f"Polygon technical data fetched: RSI={features['rsi']:.2f}, Price/MA50={features['price_to_ma50']:.2f}"
-                )
-            else:
-                # Use defaults if no data
-                logger.warning(f"No Polygon technical data for {ticker}, using defaults")
-                features["rsi"] = 50
-                features["macd"] = 0
-                features["price_to_ma50"] = 1.0
-                features["price_to_ma200"] = 1.0
+            logger.info(
+                f"Polygon technical data fetched: RSI={features['rsi']:.2f}, Price/MA50={features['price_to_ma50']:.2f}"
+            )
         else:
-            # No Polygon - use defaults
+            # Use defaults if no data
+            logger.warning(f"No Polygon technical data for {ticker}, using defaults")
             features["rsi"] = 50
             features["macd"] = 0
             features["price_to_ma50"] = 1.0
             features["price_to_ma200"] = 1.0
+    else:
+        # No Polygon - use defaults
+        features["rsi"] = 50
+        features["macd"] = 0
+        features["price_to_ma50"] = 1.0
+        features["price_to_ma200"] = 1.0
 
-        # 2. FUNDAMENTAL INDICATORS (from Alpha Vantage)
-        # Skip for ETFs - they don't have individual company fundamentals
-        if is_etf_flag:
-            logger.info(
-                f"{ticker} is an ETF - using default fundamental values (ETFs don't have P/E, EPS, etc.)"
-            )
-            features["market_cap_log"] = 9.0  # Neutral value
-            features["pe_ratio"] = 20.0  # Neutral value
-            features["pb_ratio"] = 3.0  # Neutral value
-            features["eps_growth"] = 0.10  # Neutral 10% growth
-            features["revenue_growth"] = 0.15  # Neutral 15% growth
-        else:
-            # Fetch fundamentals for stocks (not ETFs)
-            try:
-                logger.info(f"Fetching fundamental data from Alpha Vantage for {ticker}...")
-
-                # Fetch company overview (P/E, P/B, Market Cap, etc.)
-                overview_data, overview_meta = alpha_vantage.get_company_overview(ticker)
-
-                if overview_data and isinstance(overview_data, dict):
-                    # Parse market cap
-                    market_cap_str = overview_data.get("MarketCapitalization", "0")
-                    try:
-                        market_cap = float(market_cap_str) if market_cap_str else 0
-                        features["market_cap_log"] = (
-                            np.log10(market_cap + 1) if market_cap > 0 else 9.0
-                        )
-                    except (ValueError, TypeError):
-                        features["market_cap_log"] = 9.0
-
-                    # Parse P/E ratio
-                    pe_str = overview_data.get("PERatio", "20.0")
-                    try:
-                        features["pe_ratio"] = (
-                            float(pe_str) if pe_str and pe_str != "None" else 20.0
-                        )
-                    except (ValueError, TypeError):
-                        features["pe_ratio"] = 20.0
-
-                    # Parse P/B ratio
-                    pb_str = overview_data.get("PriceToBookRatio", "3.0")
-                    try:
-                        features["pb_ratio"] = float(pb_str) if pb_str and pb_str != "None" else 3.0
-                    except (ValueError, TypeError):
-                        features["pb_ratio"] = 3.0
-
-                    # Parse EPS
-                    eps_str = overview_data.get("EPS", "0")
-                    try:
-                        eps = float(eps_str) if eps_str and eps_str != "None" else 0
-                    except (ValueError, TypeError):
-                        eps = 0
-
-                    # Parse quarterly earnings growth (YoY)
-                    earnings_growth_str = overview_data.get("QuarterlyEarningsGrowthYOY", "0.10")
-                    try:
-                        # Alpha Vantage returns as percentage string like "0.15" for 15%
-                        features["eps_growth"] = (
-                            float(earnings_growth_str)
-                            if earnings_growth_str and earnings_growth_str != "None"
-                            else 0.10
-                        )
-                    except (ValueError, TypeError):
-                        features["eps_growth"] = 0.10
-
-                    # Parse quarterly revenue growth (YoY)
-                    revenue_growth_str = overview_data.get("QuarterlyRevenueGrowthYOY", "0.15")
-                    try:
-                        features["revenue_growth"] = (
-                            float(revenue_growth_str)
-                            if revenue_growth_str and revenue_growth_str != "None"
-                            else 0.15
-                        )
-                    except (ValueError, TypeError):
-                        features["revenue_growth"] = 0.15
+    return features
 
-                    logger.info(
-                        f"Alpha Vantage data fetched: P/E={features['pe_ratio']:.2f}, P/B={features['pb_ratio']:.2f}, EPS Growth={features['eps_growth']:.2%}"
-                    )
 
-                else:
-                    # Alpha Vantage returned empty or error - use defaults
-                    logger.warning(
-                        f"Alpha Vantage returned no data for {ticker}. Using default fundamental values."
-                    )
-                    features["market_cap_log"] = 9.0
-                    features["pe_ratio"] = 20.0
-                    features["pb_ratio"] = 3.0
-                    features["eps_growth"] = 0.10
-                    features["revenue_growth"] = 0.15
-
-            except Exception as av_error:
-                logger.error(f"Alpha Vantage API error for {ticker}: {av_error}", exc_info=True)
-                # Use defaults on API error
+def calculate_fundamental_features(ticker: str, alpha_vantage, is_etf_flag: bool) -> Optional[Dict]:
+    """
+    2. FUNDAMENTAL INDICATORS (from Alpha Vantage)
+
+    Returns None when Alpha Vantage sends no data or the call fails (including
+    rate limits), so callers can keep their last good fundamentals.
+    """
+    import numpy as np
+
+    # Skip for ETFs - they don't have individual company fundamentals
+    if is_etf_flag:
+        logger.info(
+            f"{ticker} is an ETF - using default fundamental values (ETFs don't have P/E, EPS, etc.)"
+        )
+        return dict(DEFAULT_FUNDAMENTALS)
+
+    features = {}
+
+    # Fetch fundamentals for stocks (not ETFs)
+    try:
+        logger.info(f"Fetching fundamental data from Alpha Vantage for {ticker}...")
+
+        # Fetch company overview (P/E, P/B, Market Cap, etc.)
+        overview_data, overview_meta = alpha_vantage.get_company_overview(ticker)
+
+        if overview_data and isinstance(overview_data, dict):
+            # Parse market cap
+            market_cap_str = overview_data.get("MarketCapitalization", "0")
+            try:
+                market_cap = float(market_cap_str) if market_cap_str else 0
+                features["market_cap_log"] = (
+                    float(np.log10(market_cap + 1)) if market_cap > 0 else 9.0
+                )
+            except (ValueError, TypeError):
                 features["market_cap_log"] = 9.0
+
+            # Parse P/E ratio
+            pe_str = overview_data.get("PERatio", "20.0")
+            try:
+                features["pe_ratio"] = (
+                    float(pe_str) if pe_str and pe_str != "None" else 20.0
+                )
+            except (ValueError, TypeError):
                 features["pe_ratio"] = 20.0
+
+            # Parse P/B ratio
+            pb_str = overview_data.get("PriceToBookRatio", "3.0")
+            try:
+                features["pb_ratio"] = float(pb_str) if pb_str and pb_str != "None" else 3.0
+            except (ValueError, TypeError):
                 features["pb_ratio"] = 3.0
+
+            # Parse quarterly earnings growth (YoY)
+            earnings_growth_str = overview_data.get("QuarterlyEarningsGrowthYOY", "0.10")
+            try:
+                # Alpha Vantage returns as percentage string like "0.15" for 15%
+                features["eps_growth"] = (
+                    float(earnings_growth_str)
+                    if earnings_growth_str and earnings_growth_str != "None"
+                    else 0.10
+                )
+            except (ValueError, TypeError):
                 features["eps_growth"] = 0.10
+
+            # Parse quarterly revenue growth (YoY)
+            revenue_growth_str = overview_data.get("QuarterlyRevenueGrowthYOY", "0.15")
+            try:
+                features["revenue_growth"] = (
+                    float(revenue_growth_str)
+                    if revenue_growth_str and revenue_growth_str != "None"
+                    else 0.15
+                )
+            except (ValueError, TypeError):
                 features["revenue_growth"] = 0.15
 
-        # 3. NEWS SENTIMENT (7-day average)
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
-
-        # Query news articles mentioning this ticker
-        recent_news = NewsArticle.query.filter(
-            NewsArticle.published_at >= cutoff_date,
-            NewsArticle.title.contains(ticker),  # Simple keyword match
-        ).all()
-
-        if recent_news:
-            # Calculate average sentiment
-            sentiment_scores = []
-            for article in recent_news:
-                if article.ai_rating:
-                    sentiment_scores.append(article.ai_rating / 5.0)  # Normalize to 0-1
-
-            if sentiment_scores:
-                features["news_sentiment_7d"] = np.mean(sentiment_scores)
-            else:
-                features["news_sentiment_7d"] = 0.5  # Neutral
-        else:
-            features["news_sentiment_7d"] = 0.5  # Neutral
+            logger.info(
+                f"Alpha Vantage data fetched: P/E={features['pe_ratio']:.2f}, P/B={features['pb_ratio']:.2f}, EPS Growth={features['eps_growth']:.2%}"
+            )
 
-        return features
+        else:
+            # Alpha Vantage returned empty or error (e.g. a rate-limit note)
+            logger.warning(f"Alpha Vantage returned no data for {ticker}")
+            return None
 
-    except Exception as e:
-        logger.error(f"Error calculating features for {ticker}: {e}", exc_info=True)
+    except Exception as av_error:
+        logger.error(f"Alpha Vantage API error for {ticker}: {av_error}", exc_info=True)
         return None
 
+    return features
+
+
+def calculate_news_sentiment(tickers: List[str]) -> Dict[str, float]:
+    """
+    3. NEWS SENTIMENT (7-day average of AI ratings, normalized to 0-1)
+
+    One grouped query over the NewsTicker index for every ticker in the run;
+    tickers without rated news get 0.5 (neutral).
+    """
+    from src.services.news_tickers import average_ratings
+
+    cutoff_date = datetime.now(timezone.utc) - timedelta(days=7)
+    ratings = average_ratings(tickers, cutoff_date)
+    return {ticker: ratings[ticker.upper()] / 5.0 if ticker.upper() in ratings else 0.5 for ticker in tickers}
+
 
 def calculate_ai_score(features: dict) -> int:
     """
@@ -624,13 +918,16 @@ def calculate_feature_contributions(features: dict) -> dict:
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("cron_update_ai_scores")
     print("=" * 80)
     print("RENDER CRON JOB: AI Score Update Started")
     print("=" * 80)
 
     start_time = datetime.now()
 
-    success = update_ai_scores()
+    success = rescore_ai_scores() if "--rescore" in sys.argv[1:] else update_ai_scores()
 
     end_time = datetime.now()
     duration = (end_time - start_time).total_seconds()
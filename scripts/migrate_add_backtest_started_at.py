@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Migration: backtest_jobs.started_at
+
+db.create_all() creates missing tables but never adds columns to existing
+ones, so databases created before BacktestJob.started_at need this column
+added before cron_run_backtests can query it. Safe to run repeatedly (and
+concurrently): an existing column is left alone.
+
+cron_run_backtests.py runs this at startup, so deployments of the cron need
+no extra step.
+
+Usage:
+    python scripts/migrate_add_backtest_started_at.py
+"""
+
+import logging
+import os
+import sys
+
+# Add parent directory and web directory to path for imports
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+web_dir = os.path.join(parent_dir, "web")
+sys.path.insert(0, web_dir)
+sys.path.insert(0, parent_dir)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+TABLE = "backtest_jobs"
+COLUMN = "started_at"
+
+
+def _has_column(engine) -> bool:
+    from sqlalchemy import inspect
+
+    return COLUMN in {column["name"] for column in inspect(engine).get_columns(TABLE)}
+
+
+def migrate(engine=None) -> bool:
+    """
+    Add backtest_jobs.started_at if it is missing. Caller holds an app context
+    unless an engine is given.
+
+    Returns:
+        True if the column was added, False if it already existed (or the
+        table does not exist yet; create_all builds it with the column)
+    """
+    from sqlalchemy import inspect, text
+    from sqlalchemy.exc import SQLAlchemyError
+
+    if engine is None:
+        from web.database import db
+
+        engine = db.engine
+
+    if not inspect(engine).has_table(TABLE) or _has_column(engine):
+        return False
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN {COLUMN} TIMESTAMP"))
+    except SQLAlchemyError:
+        # A concurrent run added it first
+        if _has_column(engine):
+            return False
+        raise
+    logger.info(f"Added {TABLE}.{COLUMN}")
+    return True
+
+
+def main():
+    from web.app import app
+
+    with app.app_context():
+        added = migrate()
+    logger.info(f"{TABLE}.{COLUMN}: {'added' if added else 'already present'}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
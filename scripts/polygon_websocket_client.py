@@ -18,12 +18,13 @@ import json
 import logging
 from datetime import datetime
 import backoff
-import redis
 from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from web.tick_bus import CHANNEL_PREFIX, get_pubsub_client, resolve_redis_url
+
 load_dotenv()
 
 # Configure logging
@@ -38,18 +39,17 @@ class PolygonWebSocketClient:
 
     def __init__(self):
         self.api_key = os.getenv("POLYGON_API_KEY")
-        self.redis_url = os.getenv("REDIS_URL", "memory://")
+        self.redis_url = resolve_redis_url()
 
         if not self.api_key:
             raise ValueError("POLYGON_API_KEY environment variable not set")
 
-        # Initialize Redis client
-        if self.redis_url and self.redis_url != "memory://":
-            self.redis_client = redis.from_url(self.redis_url)
+        # Initialize Redis client (in-process pub/sub for memory://, read by web.tick_bus)
+        self.redis_client = get_pubsub_client(self.redis_url)
+        if self.redis_url != "memory://":
             logger.info("Connected to Redis for message publishing")
         else:
-            self.redis_client = None
-            logger.warning("Redis not configured. Running in local mode only.")
+            logger.warning("Redis not configured. Publishing to the in-process tick bus only.")
 
         self.subscribed_tickers = set()
         self.ws = None
@@ -149,7 +149,7 @@ class PolygonWebSocketClient:
 
         try:
             # Publish to Redis channel
-            channel = f"market_data:{data.get('sym', 'unknown')}"
+            channel = f"{CHANNEL_PREFIX}{data.get('sym', 'unknown')}"
             self.redis_client.publish(channel, json.dumps(data))
 
         except Exception as e:
@@ -182,6 +182,8 @@ def main():
         # Subscribe to popular tickers by default
         default_tickers = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "NVDA", "META"]
         logger.info(f"Subscribing to default tickers: {default_tickers}")
+        # Subscribed in _on_open once the socket is authenticated
+        client.subscribed_tickers.update(default_tickers)
 
         # Connect (with auto-reconnection via backoff)
         client.connect()
@@ -31,6 +31,7 @@ from web.app import app
 from web.database import db, NewsArticle, EconomicEvent
 from src.news_collector import collect_news
 from src.news_analyzer import NewsAnalyzer
+from src.services import news_tickers
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -49,7 +50,7 @@ def refresh_news_data():
         bool: True if refresh succeeded, False otherwise
 
     Side Effects:
-        - Adds new NewsArticle records to database
+        - Adds new NewsArticle records (and their NewsTicker mentions) to database
         - Deletes NewsArticle records older than 30 days
         - Commits database transactions
     """
@@ -104,6 +105,7 @@ def refresh_news_data():
             saved_count = 0
             skipped_count = 0
             error_count = 0
+            added = []  # (article, provider ticker tags) for the ticker index
 
             for i, article_data in enumerate(news_articles, 1):
                 try:
@@ -175,6 +177,7 @@ def refresh_news_data():
                     )
 
                     db.session.add(article)
+                    added.append((article, article_data.get("tickers")))
                     saved_count += 1
                     logger.info(
                         f"Added article [{saved_count}]: {article_data['title'][:60]} (rating={analysis.get('importance')})"
@@ -194,9 +197,28 @@ def refresh_news_data():
                 db.session.rollback()
                 return False
 
+            # Index ticker mentions (a failure here is repaired by scripts/backfill_news_tickers.py)
+            try:
+                indexed = news_tickers.index_articles(
+                    {
+                        "id": article.id,
+                        "title": article.title,
+                        "description": article.description,
+                        "published_at": article.published_at,
+                        "tickers": tickers,
+                    }
+                    for article, tickers in added
+                )
+                db.session.commit()
+                logger.info(f"Indexed {indexed} ticker mentions")
+            except Exception as e:
+                logger.error(f"Failed to index ticker mentions: {e}", exc_info=True)
+                db.session.rollback()
+
             # Clean up old articles (keep last 30 days)
             try:
                 cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
+                news_tickers.delete_before(cutoff_date)
                 deleted = NewsArticle.query.filter(NewsArticle.published_at < cutoff_date).delete()
                 db.session.commit()
                 logger.info(f"Deleted {deleted} old articles")
@@ -387,4 +409,7 @@ def main():
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("refresh_data_cron")
     main()
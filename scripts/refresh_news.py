@@ -93,4 +93,7 @@ def main():
 
 
 if __name__ == "__main__":
+    from web import instrumentation
+
+    instrumentation.report_at_exit("refresh_news")
     main()
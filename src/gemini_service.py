@@ -9,6 +9,8 @@ import logging
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 import google.generativeai as genai
+
+from web.instrumentation import timed
 from typing import Dict
 from typing import Optional
 from typing import Any
@@ -80,10 +82,11 @@ class GeminiService:
             if system_instruction:
                 generation_config["system_instruction"] = system_instruction
 
-            response = self.model.generate_content(
-                full_prompt,
-                generation_config=generation_config,
-            )
+            with timed("upstream", "gemini"):
+                response = self.model.generate_content(
+                    full_prompt,
+                    generation_config=generation_config,
+                )
 
             response_text = response.text.strip()
 
@@ -10,6 +10,8 @@ import logging
 from datetime import datetime
 from typing import List, Dict
 import google.generativeai as genai
+
+from web.instrumentation import timed
 from pathlib import Path
 from typing import Dict
 
@@ -130,13 +132,14 @@ SOURCE: {source}"""
                 system_instruction=self.system_prompt
             )
 
-            response = model_with_system.generate_content(
-                user_prompt,
-                generation_config={
-                    "temperature": 0.3,  # Lower temperature for more consistent analysis
-                    "max_output_tokens": 1024,
-                },
-            )
+            with timed("upstream", "gemini"):
+                response = model_with_system.generate_content(
+                    user_prompt,
+                    generation_config={
+                        "temperature": 0.3,  # Lower temperature for more consistent analysis
+                        "max_output_tokens": 1024,
+                    },
+                )
 
             # Extract JSON from response
             response_text = response.text.strip()
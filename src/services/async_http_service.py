@@ -11,25 +11,36 @@ from typing import Optional, Any, Dict
 logger = logging.getLogger(__name__)
 
 class AsyncHttpClient:
-    """Shared aiohttp client session wrapper"""
+    """
+    Shared aiohttp client session wrapper.
 
-    _session: Optional[aiohttp.ClientSession] = None
+    Sessions are bound to an event loop, so one pooled session is kept per loop;
+    callers on different loops (run_async helpers, background loop threads)
+    never share a session.
+    """
+
+    _sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
 
     @classmethod
     async def get_session(cls) -> aiohttp.ClientSession:
-        """Get or create a shared ClientSession"""
-        if cls._session is None or cls._session.closed:
+        """Get or create the ClientSession for the running event loop"""
+        loop = asyncio.get_running_loop()
+        session = cls._sessions.get(loop)
+        if session is None or session.closed:
+            # Drop sessions whose loops have been closed
+            for stale in [lp for lp in cls._sessions if lp.is_closed()]:
+                cls._sessions.pop(stale, None)
             # Use a connector with limit to prevent too many open connections
             connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
-            cls._session = aiohttp.ClientSession(connector=connector)
-        return cls._session
+            session = cls._sessions[loop] = aiohttp.ClientSession(connector=connector)
+        return session
 
     @classmethod
     async def close(cls):
-        """Close the shared session"""
-        if cls._session and not cls._session.closed:
-            await cls._session.close()
-            cls._session = None
+        """Close the session for the running event loop"""
+        session = cls._sessions.pop(asyncio.get_running_loop(), None)
+        if session and not session.closed:
+            await session.close()
 
     @classmethod
     async def get(cls, url: str, params: Optional[Dict] = None, timeout: int = 10, **kwargs) -> Optional[Dict]:
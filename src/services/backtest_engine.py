@@ -0,0 +1,419 @@
+"""
+Backtest Engine
+Replays stored bars through the live signal generators, one bar at a time:
+- Each strategy sees a fixed trailing window (a BarSeries view, or a signal
+  stream over one pre-built bar list), so a step costs the same at bar 100 and
+  bar 100,000
+- Signals are only evaluated while flat; entries fill at the next bar's open
+- Stop, target and time exits are found with a vectorized scan over the bars
+  after entry, and the replay jumps straight to the exit bar
+- The equity curve is marked to market with NumPy over every bar
+
+Strategies (STRATEGIES):
+- "scalp": ScalpAnalyzer.evaluate_signal (entry_price / stop_loss / take_profit)
+- "scalp_zones": web.scalp_service.generate_scalp_signal (entry / stop / tp1),
+  replayed through ScalpSignalStream
+- "swing": web.swing_service.generate_swing_signal (entry / stop / tp1),
+  replayed through SwingSignalStream
+
+The two streams detect order blocks, FVGs, swing points and liquidity levels
+once per series and carry them across bars, returning exactly what the
+generator returns on each window. Measured on a year of 24/7 5-minute bars
+(about 105k, trades included): scalp about 13 s, scalp_zones about 7 s and
+swing about 7 s, against about a minute each when the generators re-ran
+every window.
+"""
+
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.services.bar_series import BarSeries
+from src.services.bar_store import (
+    TIMESPAN_MS,
+    binance_range_fetcher,
+    default_refresh_seconds,
+    get_bar_store,
+    polygon_range_fetcher,
+    timeframe_key,
+)
+from src.services.risk_engine import EquityCurve, compute_risk
+
+logger = logging.getLogger(__name__)
+
+RISK_PER_TRADE = 0.01  # Fraction of equity lost if a stop is hit
+FEE_BPS = 1.0  # Per side, on notional
+EQUITY_POINTS = 500  # Equity curve is downsampled to about this many points
+EXIT_SCAN_CHUNK = 256  # Bars checked per vectorized exit scan
+
+# Backtest timeframe -> (multiplier, timespan, Binance interval)
+TIMEFRAMES = {
+    "1": (1, "minute", "1m"),
+    "5": (5, "minute", "5m"),
+    "15": (15, "minute", "15m"),
+    "60": (1, "hour", "1h"),
+    "240": (4, "hour", "4h"),
+    "1D": (1, "day", "1d"),
+}
+
+# Evaluates a strategy at bar i (using bars up to and including i); returns a setup or None
+SignalFn = Callable[[int], Optional[Dict]]
+
+
+def _setup(signal: Optional[str], stop, target) -> Optional[Dict]:
+    if signal not in ("LONG", "SHORT") or stop is None or target is None:
+        return None
+    return {"direction": signal, "stop": float(stop), "target": float(target)}
+
+
+class Strategy(ABC):
+    """A signal generator plus the lookback it needs and how long a trade may run"""
+
+    name = ""
+    window = 100  # Trailing bars passed to the generator
+    max_hold = 48  # Bars before a trade is closed at market
+
+    @abstractmethod
+    def prepare(self, series: BarSeries) -> SignalFn:
+        """Signal function over series (called once per backtest)"""
+
+
+class ScalpStrategy(Strategy):
+    """ScalpAnalyzer confluence signals on the live 100-bar window"""
+
+    name = "scalp"
+    window = 100
+    max_hold = 24
+
+    def __init__(self):
+        from src.services.scalp_engine import ScalpAnalyzer
+
+        self.analyzer = ScalpAnalyzer()
+
+    def prepare(self, series: BarSeries) -> SignalFn:
+        window = self.window
+
+        def evaluate(i: int) -> Optional[Dict]:
+            core = self.analyzer.evaluate_signal(series[i - window + 1:i + 1])
+            setup = core["trade_setup"]
+            return _setup(core["signal_result"]["signal"], setup.get("stop_loss"), setup.get("take_profit"))
+
+        return evaluate
+
+
+class _CandleStrategy(Strategy):
+    """Generators over candle dicts that return entry/stop/tp1, replayed through their signal streams"""
+
+    @abstractmethod
+    def stream(self, candles: List[Dict]):
+        """Signal stream over all candles; stream.signal(i) is the generator's result on the window ending at i"""
+
+    def prepare(self, series: BarSeries) -> SignalFn:
+        stream = self.stream(series.to_bars())  # Zones are detected once; each step only assembles its window
+
+        def evaluate(i: int) -> Optional[Dict]:
+            result = stream.signal(i)
+            if not result:
+                return None
+            return _setup(result.get("signal"), result.get("stop"), result.get("tp1"))
+
+        return evaluate
+
+
+class ScalpZoneStrategy(_CandleStrategy):
+    """Order block / FVG zone scalps from the scalp API"""
+
+    name = "scalp_zones"
+    window = 100
+    max_hold = 24
+
+    def stream(self, candles: List[Dict]):
+        from web.scalp_service import ScalpSignalStream
+
+        return ScalpSignalStream(candles, window=self.window)
+
+
+class SwingStrategy(_CandleStrategy):
+    """ICT/SMC swing signals from the swing API"""
+
+    name = "swing"
+    window = 100
+    max_hold = 60
+
+    def stream(self, candles: List[Dict]):
+        from web.swing_service import SwingSignalStream
+
+        return SwingSignalStream(candles, window=self.window)
+
+
+STRATEGIES = {cls.name: cls for cls in (ScalpStrategy, ScalpZoneStrategy, SwingStrategy)}
+
+# One instance per strategy per process (process-pool workers reuse theirs)
+_strategies: Dict[str, Strategy] = {}
+
+
+def get_strategy(name: str) -> Strategy:
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}' (choose from {', '.join(sorted(STRATEGIES))})")
+    if name not in _strategies:
+        _strategies[name] = STRATEGIES[name]()
+    return _strategies[name]
+
+
+def find_exit(series: BarSeries, entry_index: int, direction: str, stop: float, target: float, max_hold: int) -> tuple:
+    """
+    First bar at or after entry_index where the stop or target is touched.
+
+    A bar touching both counts as a stop (bar order within a bar is unknown),
+    and a bar opening beyond either level fills at its open. Without a touch
+    the trade closes at the last bar's close (max_hold, or the end of data).
+
+    Returns:
+        (exit index, exit price, reason)
+    """
+    last = min(entry_index + max_hold, len(series)) - 1
+    is_long = direction == "LONG"
+
+    for lo in range(entry_index, last + 1, EXIT_SCAN_CHUNK):
+        hi = min(lo + EXIT_SCAN_CHUNK, last + 1)
+        lows, highs = series.l[lo:hi], series.h[lo:hi]
+        stop_hit = lows <= stop if is_long else highs >= stop
+        target_hit = highs >= target if is_long else lows <= target
+        hits = np.flatnonzero(stop_hit | target_hit)
+        if len(hits) == 0:
+            continue
+
+        k = lo + int(hits[0])
+        bar_open = float(series.o[k])  # Entry bar opens strictly between the levels, so it never gaps
+        if stop_hit[hits[0]]:
+            gapped = bar_open <= stop if is_long else bar_open >= stop
+            return k, bar_open if gapped else stop, "stop"
+        gapped = bar_open >= target if is_long else bar_open <= target
+        return k, bar_open if gapped else target, "target"
+
+    reason = "time" if last == entry_index + max_hold - 1 else "end_of_data"
+    return last, float(series.c[last]), reason
+
+
+def run_backtest(
+    series: BarSeries,
+    strategy: Strategy,
+    initial_capital: float = 10000.0,
+    start_ms: Optional[int] = None,
+    risk_per_trade: float = RISK_PER_TRADE,
+    fee_bps: float = FEE_BPS,
+) -> Dict:
+    """
+    Replay bars through a strategy.
+
+    Args:
+        series: Bars in time order; bars before start_ms only warm up the window
+        strategy: Strategy instance (get_strategy())
+        initial_capital: Starting equity
+        risk_per_trade: Fraction of equity risked per trade (position capped at 1x equity)
+        fee_bps: Cost per side in basis points of notional
+
+    Returns:
+        {"stats", "risk", "trades", "equity_curve"}
+    """
+    n = len(series)
+    first = strategy.window - 1
+    if start_ms is not None:
+        first = max(first, int(np.searchsorted(series.t, start_ms, side="left")))
+    if n - first < 2:
+        raise ValueError(f"Not enough bars to backtest ({n} bars, {strategy.window} needed for warm-up)")
+
+    evaluate = strategy.prepare(series)
+    opens = series.o
+    fee = fee_bps / 10000
+    equity = float(initial_capital)
+    trades: List[Dict] = []
+    evaluated = 0
+
+    i = first
+    while i < n - 1:
+        evaluated += 1
+        setup = evaluate(i)
+        if setup is None:
+            i += 1
+            continue
+
+        entry_index = i + 1
+        entry = float(opens[entry_index])
+        direction, stop, target = setup["direction"], setup["stop"], setup["target"]
+        sign = 1 if direction == "LONG" else -1
+        # The next open may already be through a level; skip setups that no longer make sense
+        if not (sign * (entry - stop) > 0 and sign * (target - entry) > 0):
+            i += 1
+            continue
+
+        risk = abs(entry - stop)
+        quantity = min(equity * risk_per_trade / risk, equity / entry)
+        exit_index, exit_price, reason = find_exit(series, entry_index, direction, stop, target, strategy.max_hold)
+
+        fees = quantity * (entry + exit_price) * fee
+        pnl = sign * quantity * (exit_price - entry) - fees
+        equity += pnl
+        trades.append({
+            "direction": direction,
+            "entry_index": entry_index,
+            "exit_index": exit_index,
+            "entry_t": int(series.t[entry_index]),
+            "exit_t": int(series.t[exit_index]),
+            "entry_price": round(entry, 4),
+            "exit_price": round(exit_price, 4),
+            "stop": round(stop, 4),
+            "target": round(target, 4),
+            "quantity": round(quantity, 6),
+            "pnl": round(pnl, 2),
+            "r_multiple": round(sign * (exit_price - entry) / risk, 2),
+            "bars_held": exit_index - entry_index + 1,
+            "exit_reason": reason,
+        })
+        # Flat again from the exit bar's close
+        i = exit_index
+
+    curve = equity_curve(series, trades, initial_capital, first, fee)
+    return {
+        "stats": trade_stats(series, trades, curve, initial_capital, first, evaluated),
+        "risk": daily_risk(series.t[first:], curve[first:]),
+        "trades": trades,
+        "equity_curve": downsample(series.t[first:], curve[first:]),
+    }
+
+
+def equity_curve(series: BarSeries, trades: List[Dict], initial_capital: float, first: int, fee: float) -> np.ndarray:
+    """Equity at every bar close: realized P&L plus open positions marked at the close"""
+    n = len(series)
+    realized = np.zeros(n)
+    unrealized = np.zeros(n)
+    for trade in trades:
+        e, x = trade["entry_index"], trade["exit_index"]
+        sign = 1 if trade["direction"] == "LONG" else -1
+        realized[x] += trade["pnl"]
+        # Held bars before the exit bar (entry fee already paid)
+        unrealized[e:x] = sign * trade["quantity"] * (series.c[e:x] - trade["entry_price"]) - trade["quantity"] * trade["entry_price"] * fee
+    curve = initial_capital + np.cumsum(realized) + unrealized
+    curve[:first] = initial_capital
+    return curve
+
+
+def trade_stats(
+    series: BarSeries, trades: List[Dict], curve: np.ndarray, initial_capital: float, first: int, evaluated: int
+) -> Dict:
+    pnl = np.array([t["pnl"] for t in trades], dtype=np.float64)
+    r = np.array([t["r_multiple"] for t in trades], dtype=np.float64)
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    gross_loss = -losses.sum()
+
+    peaks = np.maximum.accumulate(curve[first:])
+    drawdown = np.divide(peaks - curve[first:], peaks, out=np.zeros_like(peaks), where=peaks > 0)
+    held = sum(t["bars_held"] for t in trades)
+    bars = len(series) - first
+
+    return {
+        "bars": bars,
+        "bars_evaluated": evaluated,
+        "trades": len(trades),
+        "final_equity": round(float(curve[-1]), 2),
+        "total_return": round((float(curve[-1]) / initial_capital - 1) * 100, 2),
+        "buy_and_hold_return": round((float(series.c[-1]) / float(series.c[first]) - 1) * 100, 2),
+        "win_rate": round(len(wins) / len(trades) * 100, 1) if trades else 0.0,
+        "profit_factor": round(float(wins.sum() / gross_loss), 2) if gross_loss > 0 else None,
+        "avg_win": round(float(wins.mean()), 2) if len(wins) else 0.0,
+        "avg_loss": round(float(losses.mean()), 2) if len(losses) else 0.0,
+        "avg_r": round(float(r.mean()), 2) if trades else 0.0,
+        "max_drawdown": round(float(drawdown.max()) * 100, 2),
+        "exposure": round(held / bars * 100, 1),
+        "exit_reasons": {reason: sum(t["exit_reason"] == reason for t in trades) for reason in ("target", "stop", "time", "end_of_data")},
+    }
+
+
+def daily_risk(t: np.ndarray, curve: np.ndarray) -> Dict:
+    """Sharpe, Sortino, VaR etc. from the last equity of each UTC day (risk_engine.compute_risk)"""
+    days = t.astype(np.int64).astype("datetime64[ms]").astype("datetime64[D]")
+    last_of_day = np.append(np.flatnonzero(days[1:] != days[:-1]), len(days) - 1)
+    if len(last_of_day) < 2:
+        return {}
+    values = curve[last_of_day]
+    risk = compute_risk(EquityCurve(days[last_of_day], values, np.diff(values, prepend=values[0])))
+    risk.pop("series", None)
+    return risk
+
+
+def downsample(t: np.ndarray, curve: np.ndarray, points: int = EQUITY_POINTS) -> List[Dict]:
+    """Evenly spaced equity points (always keeps the first and last bar)"""
+    idx = np.unique(np.linspace(0, len(curve) - 1, min(points, len(curve))).astype(np.int64))
+    return [{"t": int(t[k]), "equity": round(float(curve[k]), 2)} for k in idx]
+
+
+def load_bars(ticker: str, timeframe: str, start_ms: int, end_ms: int, warmup_bars: int) -> BarSeries:
+    """
+    Bars for [start_ms, end_ms] plus at least warmup_bars before start_ms, from the bar store.
+
+    Only ranges the store is missing are downloaded (nothing when BAR_STORE_OFFLINE=true).
+    Crypto is stored under the same keys the scalp engine uses for Binance klines.
+    """
+    from src.services.scalp_engine import ScalpAnalyzer
+
+    if timeframe not in TIMEFRAMES:
+        raise ValueError(f"Unknown timeframe '{timeframe}' (choose from {', '.join(TIMEFRAMES)})")
+    multiplier, timespan, binance_interval = TIMEFRAMES[timeframe]
+    bar_ms = multiplier * TIMESPAN_MS[timespan]
+    ticker = ticker.upper().strip()
+
+    # Stock sessions skip nights and weekends, so over-fetch the warm-up span
+    warmup_days = math.ceil(warmup_bars * bar_ms * 4 / TIMESPAN_MS["day"]) + 4
+    fetch_start = start_ms - warmup_days * TIMESPAN_MS["day"]
+    fetch_end = min(end_ms, int(time.time() * 1000))
+    store = get_bar_store()
+
+    if ScalpAnalyzer().is_crypto(ticker):
+        key = timeframe_key(bar_ms // TIMESPAN_MS["minute"], "minute")
+        fetch = binance_range_fetcher(ticker, binance_interval)
+    else:
+        key = timeframe_key(multiplier, timespan)
+        api_key = os.getenv("POLYGON_API_KEY")
+        if not api_key:
+            return store.read(ticker, key, fetch_start, end_ms)
+        fetch = polygon_range_fetcher(ticker, multiplier, timespan, api_key)
+
+    return store.get_bars(ticker, key, fetch_start, fetch_end, fetch=fetch, refresh_seconds=default_refresh_seconds(timespan))
+
+
+def backtest_ticker(
+    ticker: str,
+    start_ms: int,
+    end_ms: int,
+    initial_capital: float = 10000.0,
+    strategy: str = "scalp",
+    timeframe: str = "5",
+) -> Dict:
+    """
+    Load bars and run one backtest (module level, so it is also the process-pool entry point).
+
+    Runtime grows linearly with the bar count; see the module docstring for
+    per-strategy costs (seconds per year of 5-minute bars).
+    """
+    started = time.perf_counter()
+    runner = get_strategy(strategy)
+    series = load_bars(ticker, timeframe, start_ms, end_ms, runner.window)
+    if len(series) == 0:
+        raise ValueError(f"No stored bars for {ticker} ({timeframe})")
+
+    result = run_backtest(series, runner, initial_capital, start_ms=start_ms)
+    result.update({
+        "ticker": ticker.upper(),
+        "strategy": strategy,
+        "timeframe": timeframe,
+        "initial_capital": initial_capital,
+        "start_t": start_ms,
+        "end_t": end_ms,
+        "runtime_seconds": round(time.perf_counter() - started, 2),
+    })
+    return result
@@ -0,0 +1,100 @@
+"""
+Columnar OHLCV Bar Series
+Stores bars as contiguous float64 arrays so analyzers can run vectorized masks
+instead of walking List[Dict] bars field by field.
+"""
+
+import numpy as np
+from typing import Dict, Iterable, List, Union
+
+FIELDS = ("o", "h", "l", "c", "v", "t")
+
+class BarSeries:
+    """Contiguous o/h/l/c/v/t arrays built once from Polygon/Binance style bar dicts"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, o, h, l, c, v, t):
+        self.o = np.ascontiguousarray(o, dtype=np.float64)
+        self.h = np.ascontiguousarray(h, dtype=np.float64)
+        self.l = np.ascontiguousarray(l, dtype=np.float64)
+        self.c = np.ascontiguousarray(c, dtype=np.float64)
+        self.v = np.ascontiguousarray(v, dtype=np.float64)
+        self.t = np.ascontiguousarray(t, dtype=np.float64)
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Dict]) -> "BarSeries":
+        """Build a series from bar dicts (missing or None fields become 0, as in bar.get(key) or 0)"""
+        bars = list(bars)
+        columns = {key: np.fromiter(((bar.get(key) or 0) for bar in bars), dtype=np.float64, count=len(bars))
+                   for key in FIELDS}
+        return cls(**columns)
+
+    @classmethod
+    def coerce(cls, bars: Union["BarSeries", List[Dict]]) -> "BarSeries":
+        """Return bars unchanged if already columnar, otherwise convert them"""
+        if isinstance(bars, cls):
+            return bars
+        return cls.from_bars(bars)
+
+    def __len__(self) -> int:
+        return len(self.c)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return BarSeries(*(getattr(self, f)[key] for f in FIELDS))
+        return self.bar(key)
+
+    def bar(self, i: int) -> Dict:
+        """Single bar as a plain dict with Python floats"""
+        return {f: float(getattr(self, f)[i]) for f in FIELDS}
+
+    def to_bars(self) -> List[Dict]:
+        """Convert back to a list of bar dicts"""
+        columns = [getattr(self, f).tolist() for f in FIELDS]
+        return [dict(zip(FIELDS, row)) for row in zip(*columns)]
+
+    def resample(self, span_ms: int, complete_only: bool = True) -> "BarSeries":
+        """
+        Aggregate into span_ms buckets aligned to the epoch (5m -> 15m, 1h, ...).
+
+        Open/close come from the first/last bar of each bucket, high/low/volume
+        are max/min/sum. With complete_only, a leading bucket that starts before
+        the first bar (partially covered) is dropped; the live last bucket is kept.
+        """
+        if len(self) == 0:
+            return self
+        buckets = (self.t // span_ms).astype(np.int64)
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        if complete_only and self.t[0] != buckets[0] * span_ms:
+            starts = starts[1:]
+            if len(starts) == 0:
+                return self[0:0]
+        ends = np.append(starts[1:], len(self))
+        return BarSeries(
+            o=self.o[starts],
+            h=np.maximum.reduceat(self.h, starts),
+            l=np.minimum.reduceat(self.l, starts),
+            c=self.c[ends - 1],
+            v=np.add.reduceat(self.v, starts),
+            t=buckets[starts] * span_ms,
+        )
+
+    @property
+    def body_top(self) -> np.ndarray:
+        return np.maximum(self.o, self.c)
+
+    @property
+    def body_bottom(self) -> np.ndarray:
+        return np.minimum(self.o, self.c)
+
+def seq_sum(values: np.ndarray) -> float:
+    """
+    Left-to-right sum matching Python's built-in sum() bit for bit.
+
+    np.sum uses pairwise summation, which can differ from sum() in the last
+    ulp; cumsum accumulates sequentially.
+    """
+    if len(values) == 0:
+        return 0
+    return float(np.cumsum(values)[-1])
@@ -0,0 +1,482 @@
+"""
+Local OHLCV Bar Store
+Persists historical bars on disk per (ticker, timeframe) as raw float64 column
+files (t/o/h/l/c/v) that are read through np.memmap. Callers pass a range
+fetcher; only the missing head/tail of the requested range is downloaded from
+Polygon or Binance and everything else is served locally.
+
+Polygon's per-bar VWAP ("vw") and trade count ("n") are kept in extra
+columns (NaN where the source has none, e.g. Binance) and returned on request.
+
+Set BAR_STORE_OFFLINE=true to serve stored bars without any network calls
+(backtests, retraining).
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import requests
+
+from src.services.bar_series import FIELDS, BarSeries
+from web.instrumentation import timed
+
+try:
+    import fcntl
+except ImportError:  # Windows: per-process locking only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "bars")
+
+# Column files share one dtype so each maps straight into a BarSeries array
+COLUMN_DTYPE = np.float64
+ITEM_SIZE = np.dtype(COLUMN_DTYPE).itemsize
+
+# Optional per-bar columns stored next to t/o/h/l/c/v (NaN where missing)
+EXTRA_FIELDS = ("vw", "n")
+
+# A fetcher returns Polygon-style bar dicts (t/o/h/l/c/v) for [from_ms, to_ms], or None on error
+RangeFetcher = Callable[[int, int], Optional[List[Dict]]]
+
+TIMESPAN_MS = {
+    "minute": 60_000,
+    "hour": 3_600_000,
+    "day": 86_400_000,
+    "week": 7 * 86_400_000,
+}
+
+
+def timeframe_key(multiplier: int, timespan: str) -> str:
+    """Directory name for a timeframe, e.g. (5, "minute") -> "5minute" """
+    return f"{int(multiplier)}{timespan}"
+
+
+def _from_bars(bars: List[Dict]) -> Tuple[BarSeries, Dict[str, np.ndarray]]:
+    """Sorted bar dicts -> (BarSeries, extra columns)"""
+    bars = sorted(bars, key=lambda bar: bar.get("t") or 0)
+    extras = {
+        field: np.fromiter(
+            (np.nan if bar.get(field) is None else bar[field] for bar in bars), dtype=COLUMN_DTYPE, count=len(bars)
+        )
+        for field in EXTRA_FIELDS
+    }
+    return BarSeries.from_bars(bars), extras
+
+
+def default_refresh_seconds(timespan: str) -> int:
+    """How long a tail check stays valid: short for intraday bars, longer for daily+"""
+    return 15 if timespan in ("minute", "hour") else 300
+
+
+class BarStore:
+    """On-disk bar store with incremental head/tail fetching"""
+
+    def __init__(self, root: Optional[str] = None, offline: Optional[bool] = None):
+        self.root = root or os.getenv("BAR_STORE_DIR") or DEFAULT_ROOT
+        if offline is None:
+            offline = os.getenv("BAR_STORE_OFFLINE", "false").lower() == "true"
+        self.offline = offline
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ---- paths and locking -------------------------------------------------
+
+    def _dir(self, ticker: str, timeframe: str) -> str:
+        safe_ticker = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+        return os.path.join(self.root, timeframe, safe_ticker)
+
+    @contextmanager
+    def _locked(self, path: str):
+        """Thread lock plus an flock on the series directory (shared across gunicorn workers)"""
+        with self._locks_guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+
+        with lock:
+            os.makedirs(path, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(path, ".lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ---- raw column IO (caller holds the lock) -----------------------------
+
+    def _read_meta(self, path: str) -> Dict:
+        try:
+            with open(os.path.join(path, "meta.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"count": 0}
+
+    def _write_meta(self, path: str, meta: Dict):
+        tmp = os.path.join(path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, "meta.json"))
+
+    def _map(self, path: str, count: int) -> Dict[str, np.ndarray]:
+        """Memory-map the first count rows of every column (clamped to the shortest column file)"""
+        for field in FIELDS:
+            try:
+                count = min(count, os.path.getsize(os.path.join(path, f"{field}.bin")) // ITEM_SIZE)
+            except OSError:
+                count = 0
+        if count == 0:
+            return {field: np.empty(0, dtype=COLUMN_DTYPE) for field in FIELDS}
+        return {
+            field: np.memmap(os.path.join(path, f"{field}.bin"), dtype=COLUMN_DTYPE, mode="r", shape=(count,))
+            for field in FIELDS
+        }
+
+    def _map_extras(self, path: str, count: int) -> Dict[str, np.ndarray]:
+        """First count rows of each extra column, NaN-padded where the file is shorter"""
+        extras = {}
+        for field in EXTRA_FIELDS:
+            column = os.path.join(path, f"{field}.bin")
+            try:
+                stored = min(count, os.path.getsize(column) // ITEM_SIZE)
+            except OSError:
+                stored = 0
+            values = np.full(count, np.nan, dtype=COLUMN_DTYPE)
+            if stored:
+                values[:stored] = np.memmap(column, dtype=COLUMN_DTYPE, mode="r", shape=(stored,))
+            extras[field] = values
+        return extras
+
+    def _write_columns(self, path: str, series: BarSeries, keep: int, extras: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Keep the first `keep` stored rows and append series after them.
+
+        Full rewrites (keep=0) go through temp files and os.replace. Tail writes
+        truncate in place; the meta count is only advanced afterwards and reads
+        clamp to the shortest column, so a crash loses at most the replaced tail.
+        """
+        for field in FIELDS:
+            self._write_column(path, field, getattr(series, field), keep)
+        for field in EXTRA_FIELDS:
+            values = (extras or {}).get(field)
+            self._write_column(path, field, np.full(len(series), np.nan) if values is None else values, keep)
+
+    def _write_column(self, path: str, field: str, values: np.ndarray, keep: int):
+        column = os.path.join(path, f"{field}.bin")
+        data = np.ascontiguousarray(values, dtype=COLUMN_DTYPE).tobytes()
+        if keep == 0:
+            with open(column + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(column + ".tmp", column)
+            return
+        # An extra column written by an older store may be short (or missing): pad it with NaN
+        missing = keep - (os.path.getsize(column) // ITEM_SIZE if os.path.exists(column) else 0)
+        if missing > 0:
+            with open(column, "ab") as f:
+                f.write(np.full(missing, np.nan, dtype=COLUMN_DTYPE).tobytes())
+        with open(column, "r+b") as f:
+            f.truncate(keep * ITEM_SIZE)
+            f.seek(keep * ITEM_SIZE)
+            f.write(data)
+
+    # ---- public API --------------------------------------------------------
+
+    def read(
+        self,
+        ticker: str,
+        timeframe: str,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+        extras: bool = False,
+    ) -> Union[BarSeries, Tuple[BarSeries, Dict[str, np.ndarray]]]:
+        """Stored bars in [start_ms, end_ms] (copied out of the mapped files); see get_bars for extras"""
+        path = self._dir(ticker, timeframe)
+        with self._locked(path):
+            return self._slice(path, self._read_meta(path).get("count", 0), start_ms, end_ms, extras)
+
+    def _slice(self, path: str, count: int, start_ms: Optional[int], end_ms: Optional[int], extras: bool = False):
+        columns = self._map(path, count)
+        t = columns["t"]
+        lo = int(np.searchsorted(t, start_ms, side="left")) if start_ms is not None else 0
+        hi = int(np.searchsorted(t, end_ms, side="right")) if end_ms is not None else len(t)
+        # Copy so no mapping outlives the lock (a later truncate would invalidate it)
+        series = BarSeries(**{field: np.array(columns[field][lo:hi]) for field in FIELDS})
+        if not extras:
+            return series
+        return series, {field: values[lo:hi] for field, values in self._map_extras(path, len(t)).items()}
+
+    def get_bars(
+        self,
+        ticker: str,
+        timeframe: str,
+        start_ms: int,
+        end_ms: int,
+        fetch: RangeFetcher,
+        refresh_seconds: int = 15,
+        extras: bool = False,
+    ) -> Union[BarSeries, Tuple[BarSeries, Dict[str, np.ndarray]]]:
+        """
+        Bars for [start_ms, end_ms], downloading only what the store is missing.
+
+        Args:
+            ticker: Symbol
+            timeframe: timeframe_key(), e.g. "5minute"
+            start_ms, end_ms: Requested range (ms since epoch)
+            fetch: Range fetcher for this ticker/timeframe
+            refresh_seconds: Skip the tail fetch if the live edge was checked this recently
+            extras: Also return {"vw": ..., "n": ...} arrays aligned with the series
+        """
+        path = self._dir(ticker, timeframe)
+        now_ms = int(time.time() * 1000)
+
+        with self._locked(path):
+            meta = self._read_meta(path)
+            count = meta.get("count", 0)
+
+            if not self.offline:
+                try:
+                    count = self._sync(path, meta, start_ms, min(end_ms, now_ms), fetch, refresh_seconds)
+                except Exception as e:
+                    logger.warning(f"Bar store sync failed for {ticker} {timeframe}, serving stored bars: {e}")
+                    count = self._read_meta(path).get("count", 0)
+
+            return self._slice(path, count, start_ms, end_ms, extras)
+
+    def _sync(self, path: str, meta: Dict, start_ms: int, end_ms: int, fetch: RangeFetcher, refresh_seconds: int) -> int:
+        """Fetch the missing head/tail of [start_ms, end_ms] into the store. Returns the row count."""
+        count = meta.get("count", 0)
+        covered_start = meta.get("covered_start")
+        covered_end = meta.get("covered_end")
+
+        # Stores written before the extra columns existed are refetched once to fill them
+        if covered_start is None or covered_end is None or not meta.get("extras"):
+            bars = fetch(start_ms, end_ms)
+            if bars is None:
+                return count
+            return self._replace(path, bars, start_ms, end_ms)
+
+        # Head: a range earlier than anything requested before means a rewrite (rare)
+        if start_ms < covered_start:
+            head = fetch(start_ms, covered_start)
+            if head is not None:
+                old, old_extras = self._slice(path, count, None, None, extras=True)
+                merged, merged_extras = _from_bars(head)
+                if len(old):
+                    cut = int(np.searchsorted(merged.t, old.t[0], side="left"))
+                    merged = merged[:cut]
+                    merged_extras = {field: values[:cut] for field, values in merged_extras.items()}
+                combined = BarSeries(**{f: np.concatenate([getattr(merged, f), getattr(old, f)]) for f in FIELDS})
+                combined_extras = {f: np.concatenate([merged_extras[f], old_extras[f]]) for f in EXTRA_FIELDS}
+                self._write_columns(path, combined, keep=0, extras=combined_extras)
+                count = len(combined)
+                covered_start = start_ms
+                meta.update(count=count, covered_start=covered_start)
+                self._write_meta(path, meta)
+
+        # Tail: only when the live edge hasn't been checked within refresh_seconds
+        if end_ms <= covered_end + refresh_seconds * 1000:
+            return count
+
+        # Refetch from the second-to-last bar so the last (possibly partial) bar is replaced
+        recent = None
+        if count:
+            columns = self._map(path, count)
+            stored = len(columns["t"])
+            recent = BarSeries(**{field: np.array(columns[field][max(0, stored - 2):stored]) for field in FIELDS})
+        from_ms = int(recent.t[0]) if recent is not None and len(recent) else covered_end
+        tail = fetch(from_ms, end_ms)
+        if tail is None:
+            return count
+
+        tail_series, tail_extras = _from_bars(tail)
+        if len(tail_series):
+            # A changed close on a completed bar means history was re-adjusted (split/dividend)
+            if (
+                recent is not None
+                and len(recent) == 2
+                and recent.t[0] == tail_series.t[0]
+                and not np.isclose(recent.c[0], tail_series.c[0], rtol=1e-9, atol=0)
+            ):
+                logger.info(f"Stored bars in {path} were re-adjusted upstream; refetching full range")
+                bars = fetch(covered_start, end_ms)
+                if bars is None:
+                    return count
+                return self._replace(path, bars, covered_start, end_ms)
+
+            keep = int(np.searchsorted(self._map(path, count)["t"], tail_series.t[0], side="left"))
+            self._write_columns(path, tail_series, keep=keep, extras=tail_extras)
+            count = keep + len(tail_series)
+
+        meta.update(count=count, covered_end=max(covered_end, end_ms), checked_at=time.time())
+        self._write_meta(path, meta)
+        return count
+
+    def _replace(self, path: str, bars: List[Dict], start_ms: int, end_ms: int) -> int:
+        series, extras = _from_bars(bars)
+        self._write_columns(path, series, keep=0, extras=extras)
+        self._write_meta(
+            path,
+            {
+                "count": len(series),
+                "covered_start": start_ms,
+                "covered_end": end_ms,
+                "checked_at": time.time(),
+                "extras": list(EXTRA_FIELDS),
+            },
+        )
+        return len(series)
+
+
+def series_to_bars(series: BarSeries) -> List[Dict]:
+    """Polygon-style bar dicts with integer ms timestamps"""
+    bars = series.to_bars()
+    for bar in bars:
+        bar["t"] = int(bar["t"])
+    return bars
+
+
+HTTP_POOL_SIZE = 16
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session shared by the range fetchers (sized for concurrent timeframe fetches)"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def polygon_range_fetcher(ticker: str, multiplier: int, timespan: str, api_key: str, session=None) -> RangeFetcher:
+    """Fetch adjusted Polygon aggregates for [from_ms, to_ms], following next_url pages"""
+    http = session or get_http_session()
+
+    def fetch(from_ms: int, to_ms: int) -> Optional[List[Dict]]:
+        url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{int(from_ms)}/{int(to_ms)}"
+        params = {"adjusted": "true", "sort": "asc", "limit": 50000, "apiKey": api_key}
+        bars = []
+        try:
+            while url:
+                with timed("upstream", "polygon /v2/aggs"):
+                    response = http.get(url, params=params, timeout=15)
+                response.raise_for_status()
+                data = response.json()
+                if data.get("status") not in ("OK", "DELAYED"):
+                    logger.warning(f"Polygon aggregates for {ticker}: status={data.get('status')}")
+                    return None
+                bars.extend(data.get("results", []))
+                url = data.get("next_url")
+                params = {"apiKey": api_key}
+            return bars
+        except Exception as e:
+            logger.error(f"Polygon aggregates fetch failed for {ticker}: {e}")
+            return None
+
+    return fetch
+
+
+BINANCE_KLINES_ENDPOINTS = [
+    "https://api.binance.us/api/v3/klines",
+    "https://api.binance.com/api/v3/klines",
+]
+
+
+def binance_range_fetcher(symbol: str, interval: str) -> RangeFetcher:
+    """Fetch Binance klines (interval like "5m") for [from_ms, to_ms], 1000 per page"""
+
+    def fetch(from_ms: int, to_ms: int) -> Optional[List[Dict]]:
+        for url in BINANCE_KLINES_ENDPOINTS:
+            bars = []
+            start = int(from_ms)
+            try:
+                while start <= to_ms:
+                    params = {"symbol": symbol.upper(), "interval": interval, "startTime": start, "endTime": int(to_ms), "limit": 1000}
+                    with timed("upstream", "binance /api/v3/klines"):
+                        response = get_http_session().get(url, params=params, timeout=10)
+                    # Skip to next endpoint if geo-restricted (451)
+                    if response.status_code == 451:
+                        logger.warning(f"Binance endpoint geo-restricted: {url}")
+                        break
+                    response.raise_for_status()
+                    data = response.json()
+                    if not isinstance(data, list):
+                        logger.warning(f"Unexpected Binance response format: {data}")
+                        break
+
+                    # Binance returns: [open_time, open, high, low, close, volume, ...]
+                    bars.extend(
+                        {"t": k[0], "o": float(k[1]), "h": float(k[2]), "l": float(k[3]), "c": float(k[4]), "v": float(k[5])}
+                        for k in data
+                    )
+                    if len(data) < 1000:
+                        return bars
+                    start = data[-1][0] + 1
+                else:
+                    return bars
+            except Exception as e:
+                logger.warning(f"Failed to fetch from {url}: {e}")
+                continue
+
+        logger.error(f"All Binance endpoints failed for {symbol}")
+        return None
+
+    return fetch
+
+
+def recent_polygon_bars(
+    ticker: str, multiplier: int, timespan: str, limit: int, days: int, api_key: str
+) -> List[Dict]:
+    """Last `limit` Polygon bars within the past `days` days, served from the bar store"""
+    end_ms = int(time.time() * 1000)
+    start_ms = end_ms - days * TIMESPAN_MS["day"]
+    series = get_bar_store().get_bars(
+        ticker,
+        timeframe_key(multiplier, timespan),
+        start_ms,
+        end_ms,
+        fetch=polygon_range_fetcher(ticker, multiplier, timespan, api_key),
+        refresh_seconds=default_refresh_seconds(timespan),
+    )
+    return series_to_bars(series[-limit:])
+
+
+def recent_binance_bars(symbol: str, interval_minutes: int, binance_interval: str, limit: int) -> List[Dict]:
+    """Last `limit` Binance klines (24/7 market, so the window is exactly limit bars), served from the bar store"""
+    span = interval_minutes * TIMESPAN_MS["minute"]
+    end_ms = int(time.time() * 1000)
+    start_ms = (end_ms // span - limit + 1) * span
+    series = get_bar_store().get_bars(
+        symbol.upper(),
+        timeframe_key(interval_minutes, "minute"),
+        start_ms,
+        end_ms,
+        fetch=binance_range_fetcher(symbol, binance_interval),
+        refresh_seconds=default_refresh_seconds("minute"),
+    )
+    return series_to_bars(series[-limit:])
+
+
+_bar_store: Optional[BarStore] = None
+
+
+def get_bar_store() -> BarStore:
+    """Get or create the process-wide bar store"""
+    global _bar_store
+    if _bar_store is None:
+        _bar_store = BarStore()
+    return _bar_store
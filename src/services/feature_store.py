@@ -0,0 +1,254 @@
+"""
+Feature Store
+Persists model features in the feature_rows table keyed by
+(feature_version, ticker, as_of_date), so the nightly scorer, --rescore and
+model training (which run as separate jobs on fresh machines) all share one
+history through the database.
+
+- write() upserts rows by date: re-running a day replaces that day's row
+- read() returns one ticker's history (training), as_of() returns every
+  ticker's latest row on or before a date (point-in-time inference, no lookahead)
+- A feature version fixes its feature list; changing the features of a
+  producer means bumping its version, so old rows are never misread
+
+Every call needs an app context.
+"""
+
+import json
+import logging
+import math
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from sqlalchemy import func
+
+from web.database import db, FeatureRow
+
+logger = logging.getLogger(__name__)
+
+QUERY_CHUNK = 500  # Keep IN lists well under database parameter limits
+
+
+def _days(dates) -> np.ndarray:
+    """Dates (date, datetime64, ISO strings) -> int64 days since epoch"""
+    return np.atleast_1d(np.asarray(dates, dtype="datetime64[D]")).astype(np.int64)
+
+
+def _date(day: int) -> date:
+    return date(1970, 1, 1) + timedelta(days=int(day))
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _encode(features: List[str], values) -> str:
+    """Row values as JSON, NaN stored as null"""
+    return json.dumps({name: None if math.isnan(value) else value for name, value in zip(features, values)})
+
+
+def _decode(values_json: str, features: List[str]) -> List[float]:
+    values = json.loads(values_json)
+    return [_to_float(values.get(name)) for name in features]
+
+
+class FeatureRows:
+    """Feature rows as a float64 matrix plus their as-of dates (and tickers for cross-sections)"""
+
+    __slots__ = ("features", "dates", "values", "tickers")
+
+    def __init__(self, features: List[str], dates, values, tickers: Optional[List[str]] = None):
+        self.features = list(features)
+        self.dates = np.asarray(dates, dtype=np.int64).astype("datetime64[D]")
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.dates), len(self.features))
+        self.tickers = tickers
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.features.index(name)]
+
+    def row(self, i: int) -> Dict[str, float]:
+        return dict(zip(self.features, self.values[i].tolist()))
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """{ticker: {feature: value}} for a cross-section from as_of()"""
+        return {ticker: self.row(i) for i, ticker in enumerate(self.tickers or [])}
+
+
+class FeatureStore:
+    """Feature store on the feature_rows table"""
+
+    def _features(self, version: str, ticker: str) -> Optional[List[str]]:
+        """Feature list stored for a ticker under a version (None if it has no rows)"""
+        row = (
+            db.session.query(FeatureRow.values_json)
+            .filter(FeatureRow.feature_version == version, FeatureRow.ticker == ticker)
+            .first()
+        )
+        return list(json.loads(row[0])) if row else None
+
+    def _write(self, version: str, ticker: str, days: np.ndarray, columns: Dict[str, np.ndarray]):
+        """Replace the rows of one ticker on days (sorted, unique). Caller commits."""
+        features = list(columns)
+        stored = self._features(version, ticker)
+        if stored is not None and sorted(stored) != sorted(features):
+            raise ValueError(f"{version} stores {stored} for {ticker}; got {features} (bump the feature version)")
+        features = stored or features
+
+        dates = [_date(day) for day in days]
+        for start in range(0, len(dates), QUERY_CHUNK):
+            FeatureRow.query.filter(
+                FeatureRow.feature_version == version,
+                FeatureRow.ticker == ticker,
+                FeatureRow.as_of_date.in_(dates[start : start + QUERY_CHUNK]),
+            ).delete(synchronize_session=False)
+
+        matrix = np.column_stack([columns[name] for name in features])
+        db.session.bulk_insert_mappings(
+            FeatureRow,
+            [
+                {"feature_version": version, "ticker": ticker, "as_of_date": day, "values_json": _encode(features, row)}
+                for day, row in zip(dates, matrix.tolist())
+            ],
+        )
+
+    def write(self, version: str, ticker: str, as_of, columns: Dict[str, Iterable[float]]) -> int:
+        """
+        Upsert rows for one ticker and commit.
+
+        Args:
+            version: Feature version, e.g. "technical-v1"
+            ticker: Symbol
+            as_of: One as-of date per row
+            columns: feature -> values (same length as as_of; NaN for missing)
+
+        Returns:
+            Rows stored for the ticker afterwards
+
+        Raises:
+            ValueError: if the features differ from the ones stored under this version
+        """
+        ticker = ticker.upper()
+        days = _days(as_of)
+        new = {name: np.asarray(values, dtype=np.float64).reshape(-1) for name, values in columns.items()}
+        if any(len(values) != len(days) for values in new.values()):
+            raise ValueError("Every feature column needs one value per as_of date")
+
+        # Sort by date; the last row given for a date wins
+        order = np.argsort(days, kind="stable")
+        days = days[order]
+        last = np.append(days[1:] != days[:-1], True)
+        days = days[last]
+        new = {name: values[order][last] for name, values in new.items()}
+
+        if len(days):
+            try:
+                self._write(version, ticker, days, new)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+        return (
+            db.session.query(func.count())
+            .select_from(FeatureRow)
+            .filter(FeatureRow.feature_version == version, FeatureRow.ticker == ticker)
+            .scalar()
+        )
+
+    def append_day(self, version: str, as_of_date, rows: Dict[str, Dict[str, float]], features: List[str]) -> int:
+        """
+        Store one day's cross-section: {ticker: {feature: value}}, in one transaction.
+
+        Missing or non-numeric features are stored as NaN. Returns tickers written.
+        """
+        days = _days(as_of_date)
+        try:
+            for ticker, values in rows.items():
+                columns = {name: np.array([_to_float(values.get(name))]) for name in features}
+                self._write(version, ticker.upper(), days, columns)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
+
+    def read(self, version: str, ticker: str, start=None, end=None) -> FeatureRows:
+        """One ticker's rows with start <= as_of_date <= end, oldest first"""
+        query = db.session.query(FeatureRow.as_of_date, FeatureRow.values_json).filter(
+            FeatureRow.feature_version == version, FeatureRow.ticker == ticker.upper()
+        )
+        if start is not None:
+            query = query.filter(FeatureRow.as_of_date >= _date(_days(start)[0]))
+        if end is not None:
+            query = query.filter(FeatureRow.as_of_date <= _date(_days(end)[0]))
+        rows = query.order_by(FeatureRow.as_of_date).all()
+        if not rows:
+            return FeatureRows([], [], np.empty((0, 0)))
+
+        features = list(json.loads(rows[0][1]))
+        days = _days([as_of_date for as_of_date, _ in rows])
+        return FeatureRows(features, days, [_decode(values_json, features) for _, values_json in rows])
+
+    def as_of(self, version: str, tickers: Iterable[str], as_of_date, max_age_days: Optional[int] = None) -> FeatureRows:
+        """
+        Each ticker's latest row on or before as_of_date (tickers without one are left out).
+
+        One grouped query per chunk of tickers finds each ticker's latest date
+        and joins back to its row.
+
+        Args:
+            max_age_days: Skip rows older than this many days before as_of_date (0 = that day only)
+        """
+        target = int(_days(as_of_date)[0])
+        tickers = list(dict.fromkeys(t.upper() for t in tickers))
+        latest: Dict[str, tuple] = {}
+
+        for start in range(0, len(tickers), QUERY_CHUNK):
+            filters = [
+                FeatureRow.feature_version == version,
+                FeatureRow.ticker.in_(tickers[start : start + QUERY_CHUNK]),
+                FeatureRow.as_of_date <= _date(target),
+            ]
+            if max_age_days is not None:
+                filters.append(FeatureRow.as_of_date >= _date(target - max_age_days))
+            newest = (
+                db.session.query(FeatureRow.ticker, func.max(FeatureRow.as_of_date).label("as_of_date"))
+                .filter(*filters)
+                .group_by(FeatureRow.ticker)
+                .subquery()
+            )
+            query = db.session.query(FeatureRow.ticker, FeatureRow.as_of_date, FeatureRow.values_json).join(
+                newest,
+                (FeatureRow.ticker == newest.c.ticker) & (FeatureRow.as_of_date == newest.c.as_of_date),
+            ).filter(FeatureRow.feature_version == version)
+            latest.update((ticker, (as_of, values_json)) for ticker, as_of, values_json in query)
+
+        found = [ticker for ticker in tickers if ticker in latest]
+        if not found:
+            return FeatureRows([], [], np.empty((0, 0)), tickers=[])
+        features = list(json.loads(latest[found[0]][1]))
+        dates = _days([latest[ticker][0] for ticker in found])
+        rows = [_decode(latest[ticker][1], features) for ticker in found]
+        return FeatureRows(features, dates, rows, tickers=found)
+
+    def tickers(self, version: str) -> List[str]:
+        """Tickers with any rows under a feature version"""
+        query = db.session.query(FeatureRow.ticker).filter(FeatureRow.feature_version == version).distinct()
+        return sorted(ticker for (ticker,) in query)
+
+
+_feature_store: Optional[FeatureStore] = None
+
+
+def get_feature_store() -> FeatureStore:
+    """Get or create the process-wide feature store"""
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = FeatureStore()
+    return _feature_store
@@ -2,7 +2,7 @@ from datetime import datetime, timezone, timedelta
 import os
 import asyncio
 import logging
-from web.database import db, NewsArticle, EconomicEvent
+from web.database import db, EconomicEvent
 
 try:
     from src.services.async_http_service import AsyncHttpClient
@@ -27,6 +27,17 @@ class MarketDataService:
         try:
             from src.news_collector import NewsCollector
             from src.news_analyzer import NewsAnalyzer
+            from src.services.news_pipeline import (
+                ANALYZED,
+                DEFERRED,
+                FILTERED,
+                analyze_concurrently,
+                build_article_row,
+                bulk_insert_articles,
+                collapse_near_duplicates,
+                select_new_items,
+            )
+            from src.services.news_tickers import index_new_articles
 
             collector = NewsCollector()
             news_items = collector.collect_all_news(limit=limit)
@@ -50,44 +61,26 @@ class MarketDataService:
             else:
                 analyzer_error = "GEMINI_API_KEY not set in environment"
 
-            saved_count = 0
-            analyzed_count = 0
-            filtered_count = 0
+            # Stage 1: collapse syndicated copies, then one bulk existence check
+            unique_items, duplicate_count = collapse_near_duplicates(news_items)
+            new_items = select_new_items(unique_items)
 
-            for item in news_items:
-                try:
-                    # Check if article already exists
-                    existing = NewsArticle.query.filter_by(url=item["url"]).first()
-                    if existing:
-                        continue
-
-                    # Parse published date
-                    published_at = None
-                    if item.get("published_at"):
-                        try:
-                            published_at = datetime.fromisoformat(
-                                item["published_at"].replace("Z", "+00:00")
-                            )
-                        except Exception:
-                            published_at = datetime.now(timezone.utc)
-                    else:
-                        published_at = datetime.now(timezone.utc)
-
-                    # Run AI analysis when available
-                    analysis = None
-                    if analyzer_available and analyzer:
-                        try:
-                            analysis = analyzer.analyze_single_news(item)
-                            if analysis:
-                                analyzed_count += 1
-                            else:
-                                # News was filtered (importance < 4 or credibility < 3)
-                                filtered_count += 1
-                        except Exception as e:
-                            logger.warning(
-                                f"AI analysis failed for '{item.get('title', '')[:50]}': {e}"
-                            )
+            # Stage 2: concurrent AI analysis within the shared Gemini quota
+            if analyzer_available and analyzer:
+                results = analyze_concurrently(analyzer, new_items)
+            else:
+                results = [(None, None)] * len(new_items)
+
+            analyzed_count = sum(1 for status, _ in results if status == ANALYZED)
+            filtered_count = sum(1 for status, _ in results if status == FILTERED)
+            deferred_count = sum(1 for status, _ in results if status == DEFERRED)
 
+            # Stage 3: bulk insert (deferred items are picked up by the next refresh)
+            rows = []
+            for item, (status, analysis) in zip(new_items, results):
+                if status == DEFERRED:
+                    continue
+                try:
                     # Set default analysis if not analyzed
                     if not analysis:
                         # Determine the reason for no analysis
@@ -101,32 +94,19 @@ class MarketDataService:
                             "impact_summary": reason,
                             "sentiment": "neutral",
                         }
-
-                    # Create new article
-                    article = NewsArticle(
-                        title=item["title"][:500],
-                        description=(
-                            item.get("description", "")[:2000]
-                            if item.get("description")
-                            else None
-                        ),
-                        url=item["url"][:1000],
-                        source=item.get("source", "Unknown")[:100],
-                        published_at=published_at,
-                        ai_rating=analysis.get("importance", 3),
-                        ai_analysis=analysis.get("impact_summary", ""),
-                        sentiment=analysis.get("sentiment", "neutral"),
-                    )
-                    db.session.add(article)
-                    saved_count += 1
-
+                    rows.append(build_article_row(item, analysis))
                 except Exception as e:
-                    logger.error(f"Error saving news article: {e}")
+                    logger.error(f"Error preparing news article: {e}")
                     continue
 
-            db.session.commit()
+            saved_count = bulk_insert_articles(rows)
+
+            # Stage 4: ticker index for /api/stock/<ticker>/news and the dashboard
+            if saved_count:
+                index_new_articles(rows, {item["url"][:1000]: item.get("tickers") for item in new_items})
             logger.info(
-                f"Saved {saved_count} new articles (AI analyzed: {analyzed_count}, filtered: {filtered_count})"
+                f"Saved {saved_count} new articles (AI analyzed: {analyzed_count}, filtered: {filtered_count}, "
+                f"deferred: {deferred_count}, duplicates collapsed: {duplicate_count})"
             )
 
             return {
@@ -135,9 +115,11 @@ class MarketDataService:
                     "enabled": analyzer_available,
                     "analyzed": analyzed_count,
                     "filtered": filtered_count,
+                    "deferred": deferred_count,
                     "error": analyzer_error,
                 },
                 "count": saved_count,
+                "duplicates": duplicate_count,
                 "total_collected": len(news_items),
                 "message": f"Collected {len(news_items)} articles, saved {saved_count} new",
             }
@@ -0,0 +1,205 @@
+"""
+News Ingestion Pipeline
+Staged replacement for the per-article loop in MarketDataService.refresh_news:
+1. Collapse near-duplicate titles syndicated across sources
+2. One bulk url IN (...) existence check instead of a query per article
+3. Concurrent Gemini analysis, paced by the shared APIGovernor quotas
+4. One bulk insert
+5. Ticker mentions indexed into NewsTicker (src/services/news_tickers.py)
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from web.database import db, NewsArticle
+
+logger = logging.getLogger(__name__)
+
+NEWS_ANALYSIS_WORKERS = int(os.getenv("NEWS_ANALYSIS_WORKERS", "8"))
+NEWS_ANALYSIS_MODEL_KEY = "gemini-flash"  # APIGovernor quota for NewsAnalyzer's default model
+NEWS_ANALYSIS_DEADLINE = 90  # seconds; items still waiting on quota are left for the next refresh
+
+NEAR_DUPLICATE_THRESHOLD = 0.8  # Jaccard similarity of title word sets
+URL_QUERY_CHUNK = 500  # Keep IN lists well under database parameter limits
+
+# Analysis outcomes
+ANALYZED = "analyzed"
+FILTERED = "filtered"
+DEFERRED = "deferred"
+
+_STOPWORDS = frozenset({"a", "an", "and", "as", "at", "by", "for", "in", "is", "of", "on", "the", "to", "with"})
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+
+
+def title_tokens(title: str) -> frozenset:
+    """Normalized word set for a headline ("Apple beats estimates - Reuters" -> {apple, beats, estimates})"""
+    title = _SOURCE_SUFFIX.sub("", title or "").lower()
+    return frozenset(word for word in re.findall(r"[a-z0-9]+", title) if word not in _STOPWORDS)
+
+
+def collapse_near_duplicates(items: List[Dict], threshold: float = NEAR_DUPLICATE_THRESHOLD) -> Tuple[List[Dict], int]:
+    """
+    Drop syndicated copies of the same story, keeping the first occurrence.
+
+    Tickers of dropped copies are merged into the kept item. Candidates are
+    only compared when they share a word, via an inverted index.
+
+    Returns:
+        (kept items, number of duplicates dropped)
+    """
+    kept: List[Dict] = []
+    kept_tokens: List[frozenset] = []
+    index: Dict[str, List[int]] = {}
+    dropped = 0
+
+    for item in items:
+        tokens = title_tokens(item.get("title", ""))
+        match = None
+        if tokens:
+            candidates = {i for word in tokens for i in index.get(word, ())}
+            for i in sorted(candidates):
+                other = kept_tokens[i]
+                if len(tokens & other) / len(tokens | other) >= threshold:
+                    match = i
+                    break
+
+        if match is None:
+            for word in tokens:
+                index.setdefault(word, []).append(len(kept))
+            kept.append(item)
+            kept_tokens.append(tokens)
+            continue
+
+        dropped += 1
+        original = kept[match]
+        if item.get("tickers"):
+            original["tickers"] = list(dict.fromkeys((original.get("tickers") or []) + item["tickers"]))
+
+    return kept, dropped
+
+
+def existing_urls(urls: Iterable[str]) -> Set[str]:
+    """URLs already stored, in one IN query per URL_QUERY_CHUNK"""
+    urls = list(dict.fromkeys(urls))
+    found: Set[str] = set()
+    for start in range(0, len(urls), URL_QUERY_CHUNK):
+        chunk = urls[start : start + URL_QUERY_CHUNK]
+        found.update(url for (url,) in db.session.query(NewsArticle.url).filter(NewsArticle.url.in_(chunk)))
+    return found
+
+
+def select_new_items(items: List[Dict]) -> List[Dict]:
+    """Items whose (truncated) URL is neither stored nor repeated earlier in the batch"""
+    candidates = [item for item in items if item.get("url")]
+    stored = existing_urls(item["url"][:1000] for item in candidates)
+
+    new_items = []
+    for item in candidates:
+        url = item["url"][:1000]
+        if url in stored:
+            continue
+        stored.add(url)
+        new_items.append(item)
+    return new_items
+
+
+async def _analyze_all(analyzer, items: List[Dict], workers: int, deadline: float) -> List[Tuple[str, Optional[Dict]]]:
+    try:
+        from agents.api_governor import get_governor
+
+        governor = get_governor()
+    except ImportError:
+        governor = None
+
+    semaphore = asyncio.Semaphore(workers)
+
+    async def analyze(item: Dict) -> Tuple[str, Optional[Dict]]:
+        async with semaphore:
+            # acquire_permission refuses (rather than waits) once the minute's quota is spent
+            while governor is not None and not await governor.acquire_permission(NEWS_ANALYSIS_MODEL_KEY):
+                if time.monotonic() >= deadline:
+                    return DEFERRED, None
+                await asyncio.sleep(1)
+
+            try:
+                analysis = await asyncio.to_thread(analyzer.analyze_single_news, item)
+            except Exception as e:
+                logger.warning(f"AI analysis failed for '{item.get('title', '')[:50]}': {e}")
+                analysis = None
+            return (ANALYZED, analysis) if analysis else (FILTERED, None)
+
+    return await asyncio.gather(*(analyze(item) for item in items))
+
+
+def analyze_concurrently(
+    analyzer,
+    items: List[Dict],
+    workers: int = NEWS_ANALYSIS_WORKERS,
+    timeout: float = NEWS_ANALYSIS_DEADLINE,
+) -> List[Tuple[str, Optional[Dict]]]:
+    """
+    Run analyzer.analyze_single_news over items with bounded concurrency.
+
+    Returns:
+        (status, analysis) per item, in input order; status is ANALYZED,
+        FILTERED (low importance/credibility or failed) or DEFERRED (quota)
+    """
+    if not items:
+        return []
+    return asyncio.run(_analyze_all(analyzer, items, workers, time.monotonic() + timeout))
+
+
+def parse_published_at(value: Optional[str]) -> datetime:
+    if value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except Exception:
+            pass
+    return datetime.now(timezone.utc)
+
+
+def build_article_row(item: Dict, analysis: Dict) -> Dict:
+    """Column mapping for one NewsArticle (same truncation as the model columns)"""
+    now = datetime.now(timezone.utc)
+    return {
+        "title": item["title"][:500],
+        "description": item.get("description", "")[:2000] if item.get("description") else None,
+        "url": item["url"][:1000],
+        "source": (item.get("source") or "Unknown")[:100],
+        "published_at": parse_published_at(item.get("published_at")),
+        "ai_rating": analysis.get("importance", 3),
+        "ai_analysis": analysis.get("impact_summary", ""),
+        "sentiment": analysis.get("sentiment", "neutral"),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def bulk_insert_articles(rows: List[Dict]) -> int:
+    """
+    Insert article rows in one statement.
+
+    If a concurrent refresh stored some of the same URLs first, the unique
+    constraint fails the batch; the rows still missing are then inserted.
+    """
+    if not rows:
+        return 0
+    try:
+        db.session.bulk_insert_mappings(NewsArticle, rows)
+        db.session.commit()
+        return len(rows)
+    except IntegrityError:
+        db.session.rollback()
+        stored = existing_urls(row["url"] for row in rows)
+        remaining = [row for row in rows if row["url"] not in stored]
+        if remaining:
+            db.session.bulk_insert_mappings(NewsArticle, remaining)
+            db.session.commit()
+        return len(remaining)
@@ -0,0 +1,199 @@
+"""
+News Ticker Index
+Maps articles to the tickers they mention (NewsTicker rows), written at
+ingestion time, so "news for AAPL" is an index range scan on
+(ticker, published_at) instead of a title LIKE '%AAPL%' over every article.
+
+Mentions come from:
+- Provider tags (Polygon's article "tickers")
+- Cashtags ($AAPL) and exchange references (NASDAQ: AAPL)
+- Bare upper-case words that are known tickers (AIScore/Watchlist), minus
+  common headline acronyms, so "AI" or "CEO" never tag an article
+"""
+
+import logging
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from web.database import db, NewsArticle, NewsTicker
+
+logger = logging.getLogger(__name__)
+
+MAX_TICKER_LENGTH = 10  # NewsTicker.ticker column size
+ID_QUERY_CHUNK = 500  # Keep IN lists well under database parameter limits
+
+_CASHTAG = re.compile(r"\$([A-Z]{1,5}(?:\.[A-Z])?)\b")
+_EXCHANGE = re.compile(r"\b(?:NYSE|NASDAQ|Nasdaq|AMEX|NYSE American|OTC)\s*:\s*([A-Z]{1,5}(?:\.[A-Z])?)\b")
+_WORD = re.compile(r"\b([A-Z]{2,5})\b")
+
+# Upper-case words that headlines use as words, not tickers
+_ACRONYMS = frozenset({
+    "AI", "AM", "API", "AR", "ARE", "BE", "BIG", "CEO", "CFO", "CPI", "CTO", "DOJ", "EPS", "ESG",
+    "ETF", "EU", "EV", "FDA", "FED", "FOMC", "FTC", "GDP", "GO", "IMF", "INC", "IPO", "IRS", "IT",
+    "LLC", "LTD", "NEW", "NOW", "NYSE", "ON", "ONE", "OPEC", "OR", "PLC", "PM", "PPI", "SEC", "SO",
+    "TV", "UK", "UN", "US", "USA", "VR", "WHO", "YOY",
+})
+
+
+def normalize_ticker(ticker: Optional[str]) -> Optional[str]:
+    """Upper-cased ticker, or None if it cannot be one"""
+    ticker = (ticker or "").strip().upper()
+    return ticker if ticker and len(ticker) <= MAX_TICKER_LENGTH and " " not in ticker else None
+
+
+def extract_tickers(
+    title: str,
+    description: Optional[str] = None,
+    tagged: Optional[Iterable[str]] = None,
+    known: Optional[Set[str]] = None,
+) -> List[str]:
+    """
+    Tickers an article mentions, in first-seen order.
+
+    Args:
+        title: Headline
+        description: Summary text (optional)
+        tagged: Provider ticker tags, trusted as-is
+        known: Tickers that bare upper-case words may match
+    """
+    found = [normalize_ticker(t) for t in tagged or []]
+    known = known or set()
+    for text in (title or "", description or ""):
+        found += _CASHTAG.findall(text)
+        found += _EXCHANGE.findall(text)
+        found += [word for word in _WORD.findall(text) if word in known and word not in _ACRONYMS]
+    return [t for t in dict.fromkeys(found) if t]
+
+
+def known_tickers() -> Set[str]:
+    """Tickers users follow or the AI scorer covers (the vocabulary for bare-word mentions)"""
+    from web.database import AIScore, Watchlist
+
+    tickers = {row[0] for row in db.session.query(AIScore.ticker).distinct()}
+    tickers |= {row[0] for row in db.session.query(Watchlist.ticker).distinct()}
+    return {t.upper() for t in tickers if t}
+
+
+def index_articles(articles: Iterable[Dict], known: Optional[Set[str]] = None) -> int:
+    """
+    Replace the NewsTicker rows of articles (dicts with id, title, description,
+    published_at and optional provider "tickers"). Caller commits.
+
+    Returns:
+        NewsTicker rows written
+    """
+    articles = list(articles)
+    if not articles:
+        return 0
+    if known is None:
+        known = known_tickers()
+
+    rows = [
+        {"article_id": article["id"], "ticker": ticker, "published_at": article["published_at"]}
+        for article in articles
+        for ticker in extract_tickers(article["title"], article.get("description"), article.get("tickers"), known)
+    ]
+    ids = [article["id"] for article in articles]
+    for start in range(0, len(ids), ID_QUERY_CHUNK):
+        NewsTicker.query.filter(NewsTicker.article_id.in_(ids[start : start + ID_QUERY_CHUNK])).delete(
+            synchronize_session=False
+        )
+    if rows:
+        db.session.bulk_insert_mappings(NewsTicker, rows)
+    return len(rows)
+
+
+def index_new_articles(rows: List[Dict], tagged: Optional[Dict[str, List[str]]] = None) -> int:
+    """
+    Index freshly inserted article rows (news_pipeline.build_article_row dicts), looked up by URL.
+
+    Args:
+        rows: Inserted article rows
+        tagged: url -> provider ticker tags
+
+    Returns:
+        NewsTicker rows written (0 if indexing failed; the backfill job repairs it)
+    """
+    tagged = tagged or {}
+    urls = [row["url"] for row in rows]
+    try:
+        articles = []
+        for start in range(0, len(urls), ID_QUERY_CHUNK):
+            query = db.session.query(
+                NewsArticle.id, NewsArticle.url, NewsArticle.title, NewsArticle.description, NewsArticle.published_at
+            ).filter(NewsArticle.url.in_(urls[start : start + ID_QUERY_CHUNK]))
+            articles += [
+                {"id": id_, "title": title, "description": description, "published_at": published_at, "tickers": tagged.get(url)}
+                for id_, url, title, description, published_at in query
+            ]
+
+        written = index_articles(articles)
+        db.session.commit()
+        return written
+    except IntegrityError as e:
+        # A concurrent refresh indexed the same articles first
+        db.session.rollback()
+        logger.warning(f"News ticker index conflict; leaving these articles to the backfill job: {e}")
+        return 0
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to index {len(urls)} new articles; leaving them to the backfill job: {e}", exc_info=True)
+        return 0
+
+
+def recent_articles(tickers: Iterable[str], limit: int = 10) -> List[NewsArticle]:
+    """
+    Newest articles mentioning any of tickers.
+
+    One (ticker, published_at) index range read per ticker, merged here, so
+    the cost does not grow with the article table.
+    """
+    tickers = [t for t in dict.fromkeys(normalize_ticker(t) for t in tickers) if t]
+    latest: Dict[int, datetime] = {}
+    for ticker in tickers:
+        query = (
+            db.session.query(NewsTicker.article_id, NewsTicker.published_at)
+            .filter(NewsTicker.ticker == ticker)
+            .order_by(NewsTicker.published_at.desc())
+            .limit(limit)
+        )
+        latest.update(query.all())
+
+    ids = sorted(latest, key=latest.get, reverse=True)[:limit]
+    if not ids:
+        return []
+    articles = {article.id: article for article in NewsArticle.query.filter(NewsArticle.id.in_(ids))}
+    return [articles[i] for i in ids if i in articles]
+
+
+def average_ratings(tickers: Iterable[str], since: datetime) -> Dict[str, float]:
+    """
+    Mean AI rating (1-5 stars) of rated articles mentioning each ticker since a date.
+
+    One grouped join over the (ticker, published_at) index per chunk of
+    tickers; tickers without rated articles are left out.
+    """
+    tickers = [t for t in dict.fromkeys(normalize_ticker(t) for t in tickers) if t]
+    averages: Dict[str, float] = {}
+    for start in range(0, len(tickers), ID_QUERY_CHUNK):
+        query = (
+            db.session.query(NewsTicker.ticker, func.avg(NewsArticle.ai_rating))
+            .join(NewsArticle, NewsArticle.id == NewsTicker.article_id)
+            .filter(
+                NewsTicker.ticker.in_(tickers[start : start + ID_QUERY_CHUNK]),
+                NewsTicker.published_at >= since,
+                NewsArticle.ai_rating > 0,
+            )
+            .group_by(NewsTicker.ticker)
+        )
+        averages.update((ticker, float(average)) for ticker, average in query)
+    return averages
+
+
+def delete_before(cutoff: datetime) -> int:
+    """Drop index rows for articles published before cutoff (ahead of deleting the articles). Caller commits."""
+    return NewsTicker.query.filter(NewsTicker.published_at < cutoff).delete(synchronize_session=False)
@@ -0,0 +1,255 @@
+"""
+Portfolio Risk Engine
+Vectorized risk analytics over a user's daily PortfolioSnapshot history:
+- Snapshots are loaded as arrays with a columnar query (no ORM objects)
+- Returns, Sharpe/Sortino (full-period and rolling), drawdown depth and
+  duration, historical VaR/CVaR are computed with NumPy in one pass
+- Beta/correlation use SPY daily closes from the local bar store
+"""
+
+import logging
+import os
+import time
+from datetime import date
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.services.bar_store import TIMESPAN_MS, get_bar_store, polygon_range_fetcher, timeframe_key
+from web.database import db, PortfolioSnapshot
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.05  # Annual, as the risk-metrics endpoint has always assumed
+ROLLING_WINDOW = 63  # ~3 months of daily snapshots
+VAR_CONFIDENCE = 0.95
+BENCHMARK = "SPY"
+
+
+class EquityCurve:
+    """Snapshot history as parallel arrays (dates as datetime64[D])"""
+
+    __slots__ = ("dates", "values", "pnl")
+
+    def __init__(self, dates, values, pnl):
+        self.dates = np.asarray(dates, dtype="datetime64[D]")
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.pnl = np.ascontiguousarray(pnl, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def load_equity_curve(user_id: int, start_date: Optional[date] = None) -> EquityCurve:
+    """A user's snapshots ordered by date, in one columnar query"""
+    query = db.session.query(
+        PortfolioSnapshot.snapshot_date, PortfolioSnapshot.total_value, PortfolioSnapshot.daily_pnl
+    ).filter(PortfolioSnapshot.user_id == user_id)
+    if start_date is not None:
+        query = query.filter(PortfolioSnapshot.snapshot_date >= start_date)
+    rows = query.order_by(PortfolioSnapshot.snapshot_date).all()
+
+    if not rows:
+        return EquityCurve([], [], [])
+    dates, values, pnl = zip(*rows)
+    return EquityCurve(dates, [float(v) for v in values], [float(p) if p is not None else 0.0 for p in pnl])
+
+
+def benchmark_closes(dates: np.ndarray, ticker: str = BENCHMARK, api_key: Optional[str] = None) -> Optional[np.ndarray]:
+    """
+    Benchmark close on (or last trading day before) each date, from the bar store.
+
+    Returns None if no bars are available (offline store without the ticker,
+    no API key, fetch failure).
+    """
+    if len(dates) == 0:
+        return None
+    api_key = api_key or os.getenv("POLYGON_API_KEY")
+    store = get_bar_store()
+    if not api_key and not store.offline:
+        return None
+
+    # Start a week early so the first snapshot has a prior close (weekends, holidays)
+    start_ms = int(dates[0].astype("datetime64[ms]").astype(np.int64)) - 7 * TIMESPAN_MS["day"]
+    end_ms = int(dates[-1].astype("datetime64[ms]").astype(np.int64)) + TIMESPAN_MS["day"] - 1
+    try:
+        series = store.get_bars(
+            ticker,
+            timeframe_key(1, "day"),
+            start_ms,
+            min(end_ms, int(time.time() * 1000)),
+            fetch=polygon_range_fetcher(ticker, 1, "day", api_key),
+            refresh_seconds=300,
+        )
+    except Exception as e:
+        logger.warning(f"Benchmark bars unavailable for {ticker}: {e}")
+        return None
+    if len(series) == 0:
+        return None
+
+    bar_days = series.t.astype(np.int64).astype("datetime64[ms]").astype("datetime64[D]")
+    idx = np.searchsorted(bar_days, dates, side="right") - 1
+    closes = np.where(idx >= 0, series.c[np.clip(idx, 0, None)], np.nan)
+    return closes
+
+
+def _period_returns(values: np.ndarray) -> tuple:
+    """Simple returns between consecutive points, skipping non-positive bases"""
+    prev, curr = values[:-1], values[1:]
+    valid = prev > 0
+    returns = np.divide(curr - prev, prev, out=np.zeros_like(curr), where=valid)
+    return returns, valid
+
+
+def _rolling_ratios(returns: np.ndarray, window: int, risk_free_rate: float) -> tuple:
+    """Annualized rolling Sharpe and Sortino (NaN until the window fills; skipped intervals count as flat)"""
+    n = len(returns)
+    sharpe = np.full(n, np.nan)
+    sortino = np.full(n, np.nan)
+    if n < window:
+        return sharpe, sortino
+
+    def window_sums(x: np.ndarray) -> np.ndarray:
+        c = np.concatenate(([0.0], np.cumsum(x)))
+        return c[window:] - c[:-window]
+
+    mean = window_sums(returns) / window
+    variance = np.maximum(window_sums(returns ** 2) / window - mean ** 2, 0.0)
+    downside = window_sums(np.minimum(returns, 0.0) ** 2) / window
+
+    excess = mean * TRADING_DAYS - risk_free_rate
+    vol = np.sqrt(variance * TRADING_DAYS)
+    down = np.sqrt(downside * TRADING_DAYS)
+    sharpe[window - 1:] = np.divide(excess, vol, out=np.full_like(excess, np.nan), where=vol > 0)
+    sortino[window - 1:] = np.divide(excess, down, out=np.full_like(excess, np.nan), where=down > 0)
+    return sharpe, sortino
+
+
+def _drawdowns(values: np.ndarray) -> tuple:
+    """Drawdown series (fraction below running peak) and the longest stretch below a peak"""
+    peaks = np.maximum.accumulate(values)
+    drawdown = np.divide(peaks - values, peaks, out=np.zeros_like(values), where=peaks > 0)
+
+    # Points at a running high (always includes the first); the gap to the next one is time under water
+    at_peak = np.flatnonzero(drawdown == 0)
+    gaps = np.diff(np.append(at_peak, len(values))) - 1
+    return drawdown, int(gaps.max())
+
+
+def _nan_to_none(array: np.ndarray, digits: int) -> list:
+    return [None if np.isnan(x) else round(float(x), digits) for x in array]
+
+
+def compute_risk(
+    curve: EquityCurve,
+    benchmark: Optional[np.ndarray] = None,
+    window: int = ROLLING_WINDOW,
+    risk_free_rate: float = RISK_FREE_RATE,
+    confidence: float = VAR_CONFIDENCE,
+) -> Dict:
+    """
+    Risk metrics for an equity curve.
+
+    Args:
+        curve: Snapshot arrays from load_equity_curve()
+        benchmark: Benchmark closes aligned to curve.dates (benchmark_closes()), optional
+        window: Rolling Sharpe/Sortino window in snapshots
+
+    Returns:
+        Summary metrics (percentages already x100, as the API reports them)
+        plus per-point "series" arrays: drawdown, rolling_sharpe, rolling_sortino
+    """
+    values = curve.values
+    all_returns, valid = _period_returns(values)
+    returns = all_returns[valid]
+    if len(returns) == 0:
+        return {}
+
+    mean_return = returns.mean()
+    annualized_return = mean_return * TRADING_DAYS
+    annualized_volatility = returns.std() * np.sqrt(TRADING_DAYS)
+    excess = annualized_return - risk_free_rate
+    sharpe = excess / annualized_volatility if annualized_volatility > 0 else 0.0
+
+    downside_deviation = np.sqrt((np.minimum(returns, 0.0) ** 2).sum() / len(returns)) * np.sqrt(TRADING_DAYS)
+    if (returns < 0).any():
+        sortino = excess / downside_deviation if downside_deviation > 0 else 0.0
+    else:
+        sortino = float("inf")
+
+    drawdown, drawdown_duration = _drawdowns(values)
+
+    # Historical VaR/CVaR: loss not exceeded on `confidence` of days, and the mean loss beyond it
+    cutoff = np.quantile(returns, 1 - confidence)
+    var = -cutoff
+    cvar = -returns[returns <= cutoff].mean()
+
+    rolling_sharpe, rolling_sortino = _rolling_ratios(all_returns, window, risk_free_rate)
+
+    up_days = int((returns > 0).sum())
+    down_days = int((returns < 0).sum())
+    metrics = {
+        "days_analyzed": len(values),
+        "annualized_return": round(float(annualized_return) * 100, 2),
+        "annualized_volatility": round(float(annualized_volatility) * 100, 2),
+        "sharpe_ratio": round(float(sharpe), 2),
+        "sortino_ratio": round(float(sortino), 2) if sortino != float("inf") else "∞",
+        "max_drawdown": round(float(drawdown.max()) * 100, 2),
+        "max_drawdown_duration": drawdown_duration,
+        "current_drawdown": round(float(drawdown[-1]) * 100, 2),
+        "var_95": round(float(var) * 100, 2),
+        "cvar_95": round(float(cvar) * 100, 2),
+        "rolling_sharpe": _nan_to_none(rolling_sharpe[-1:], 2)[0],
+        "rolling_sortino": _nan_to_none(rolling_sortino[-1:], 2)[0],
+        "rolling_window": window,
+        "up_days": up_days,
+        "down_days": down_days,
+        "win_day_rate": round(up_days / len(returns) * 100, 1),
+        "best_day": round(float(returns.max()) * 100, 2),
+        "worst_day": round(float(returns.min()) * 100, 2),
+        "avg_daily_return": round(float(mean_return) * 100, 3),
+        "beta": None,
+        "correlation": None,
+    }
+    metrics.update(_benchmark_stats(all_returns, valid, benchmark))
+
+    # Per-point series (first point has no return)
+    metrics["series"] = {
+        "drawdown": [round(float(x) * 100, 2) for x in drawdown],
+        "rolling_sharpe": [None] + _nan_to_none(rolling_sharpe, 2),
+        "rolling_sortino": [None] + _nan_to_none(rolling_sortino, 2),
+    }
+    return metrics
+
+
+def _benchmark_stats(returns: np.ndarray, valid: np.ndarray, benchmark: Optional[np.ndarray]) -> Dict:
+    """Beta and correlation against benchmark returns over the same snapshot intervals"""
+    if benchmark is None or len(benchmark) != len(returns) + 1:
+        return {}
+    prev, curr = benchmark[:-1], benchmark[1:]
+    mask = valid & np.isfinite(prev) & np.isfinite(curr) & (np.nan_to_num(prev) > 0)
+    if mask.sum() < 2:
+        return {}
+
+    portfolio = returns[mask]
+    market = curr[mask] / prev[mask] - 1
+    market_variance = market.var()
+    if market_variance == 0:
+        return {}
+    beta = ((portfolio - portfolio.mean()) * (market - market.mean())).mean() / market_variance
+    correlation = np.corrcoef(portfolio, market)[0, 1] if portfolio.std() > 0 else 0.0
+    return {
+        "beta": round(float(beta), 2),
+        "correlation": round(float(correlation), 2),
+        "benchmark": BENCHMARK,
+    }
+
+
+def portfolio_risk(user_id: int, start_date: Optional[date] = None, with_benchmark: bool = True) -> Dict:
+    """Load a user's snapshots and compute risk metrics (empty dict with <2 snapshots)"""
+    curve = load_equity_curve(user_id, start_date)
+    if len(curve) < 2:
+        return {}
+    benchmark = benchmark_closes(curve.dates) if with_benchmark else None
+    return compute_risk(curve, benchmark)
@@ -1,11 +1,16 @@
 import os
 import logging
 import re
-import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
 import pytz
 
+from src.services.bar_series import BarSeries, seq_sum
+from src.services.bar_store import recent_binance_bars, recent_polygon_bars
+from src.services.swing_points import swing_indices
+from web.instrumentation import timed
+
 logger = logging.getLogger(__name__)
 
 class CandlestickPatterns:
@@ -310,9 +315,10 @@ class CandlestickPatterns:
         }
 
     @classmethod
-    def analyze_patterns(cls, bars: List[Dict]) -> Dict:
+    def analyze_patterns(cls, bars: Union[BarSeries, List[Dict]]) -> Dict:
         """Analyze recent candles for actionable patterns"""
-        if len(bars) < 3:
+        series = BarSeries.coerce(bars)
+        if len(series) < 3:
             return {"patterns": [], "bias": "neutral", "strength": 0, "primary_pattern": None}
 
         detected_patterns = []
@@ -320,9 +326,9 @@ class CandlestickPatterns:
         bearish_score = 0
 
         # Get recent candles
-        curr = cls.get_candle_info(bars[-1])
-        prev = cls.get_candle_info(bars[-2])
-        prev2 = cls.get_candle_info(bars[-3])
+        curr = cls.get_candle_info(series.bar(-1))
+        prev = cls.get_candle_info(series.bar(-2))
+        prev2 = cls.get_candle_info(series.bar(-3))
 
         # Check single candle patterns on current candle
         single_patterns = [
@@ -419,9 +425,10 @@ class VolumeAnalyzer:
     """Volume analysis for trade confirmation"""
 
     @staticmethod
-    def analyze_volume(bars: List[Dict]) -> Dict:
+    def analyze_volume(bars: Union[BarSeries, List[Dict]]) -> Dict:
         """Analyze volume patterns for confirmation signals"""
-        if len(bars) < 20:
+        series = BarSeries.coerce(bars)
+        if len(series) < 20:
             return {
                 "current_volume": 0,
                 "avg_volume": 0,
@@ -431,14 +438,14 @@ class VolumeAnalyzer:
                 "confirmation_strength": 0,
             }
 
-        volumes = [bar.get("v", 0) for bar in bars]
+        volumes = series.v
         # Use second-to-last bar if current bar volume is suspiciously low (incomplete candle)
-        current_volume = volumes[-1]
+        current_volume = float(volumes[-1])
         if current_volume < 1 and len(volumes) > 1:
-            current_volume = volumes[-2]  # Use completed candle
-        avg_volume = sum(volumes[-20:]) / 20
-        recent_avg = sum(volumes[-5:]) / 5
-        older_avg = sum(volumes[-20:-5]) / 15 if len(volumes) >= 20 else avg_volume
+            current_volume = float(volumes[-2])  # Use completed candle
+        avg_volume = seq_sum(volumes[-20:]) / 20
+        recent_avg = seq_sum(volumes[-5:]) / 5
+        older_avg = seq_sum(volumes[-20:-5]) / 15 if len(volumes) >= 20 else avg_volume
 
         volume_ratio = current_volume / avg_volume if avg_volume > 0 else 1.0
 
@@ -485,7 +492,7 @@ class FVGAnalyzer:
     """
 
     @staticmethod
-    def detect_fvg(bars: List[Dict], min_gap_percent: float = 0.1) -> Dict:
+    def detect_fvg(bars: Union[BarSeries, List[Dict]], min_gap_percent: float = 0.1) -> Dict:
         """
         Detect Fair Value Gaps in price action
 
@@ -494,67 +501,59 @@ class FVGAnalyzer:
         - Middle candle creates gap where candle 1 high < candle 3 low (bullish FVG)
         - Or candle 1 low > candle 3 high (bearish FVG)
         """
-        if len(bars) < 10:
+        series = BarSeries.coerce(bars)
+        if len(series) < 10:
             return {"bullish_fvgs": [], "bearish_fvgs": [], "nearest_fvg": None}
 
         bullish_fvgs = []  # Support zones (gaps during rise)
         bearish_fvgs = []  # Resistance zones (gaps during drop)
 
-        current_price = bars[-1].get("c", 0)
-
-        for i in range(2, len(bars)):
-            candle1 = bars[i - 2]
-            candle2 = bars[i - 1]  # Middle candle (the big move)
-            candle3 = bars[i]
-
-            c1_high = candle1.get("h", 0)
-            c1_low = candle1.get("l", 0)
-            c3_high = candle3.get("h", 0)
-            c3_low = candle3.get("l", 0)
-
-            # Bullish FVG: Gap below (candle 1 high < candle 3 low)
-            # This creates a support zone
-            if c1_high < c3_low:
-                gap_size = c3_low - c1_high
-                gap_percent = (gap_size / c1_high * 100) if c1_high > 0 else 0
-
-                if gap_percent >= min_gap_percent:
-                    # FVG strength: Base 60 + bonus for larger gaps
-                    # 0.1% gap = 60, 0.5% gap = 80, 1%+ gap = 100
-                    fvg_strength = min(100, 60 + int(gap_percent * 40))
-                    fvg = {
-                        "type": "bullish",
-                        "top": c3_low,
-                        "bottom": c1_high,
-                        "size": gap_size,
-                        "size_percent": round(gap_percent, 2),
-                        "index": i,
-                        "filled": current_price <= c3_low,  # FVG filled if price came back
-                        "strength": fvg_strength,
-                    }
-                    bullish_fvgs.append(fvg)
-
-            # Bearish FVG: Gap above (candle 1 low > candle 3 high)
-            # This creates a resistance zone
-            if c1_low > c3_high:
-                gap_size = c1_low - c3_high
-                gap_percent = (gap_size / c3_high * 100) if c3_high > 0 else 0
-
-                if gap_percent >= min_gap_percent:
-                    # FVG strength: Base 60 + bonus for larger gaps
-                    # 0.1% gap = 60, 0.5% gap = 80, 1%+ gap = 100
-                    fvg_strength = min(100, 60 + int(gap_percent * 40))
-                    fvg = {
-                        "type": "bearish",
-                        "top": c1_low,
-                        "bottom": c3_high,
-                        "size": gap_size,
-                        "size_percent": round(gap_percent, 2),
-                        "index": i,
-                        "filled": current_price >= c3_high,
-                        "strength": fvg_strength,
-                    }
-                    bearish_fvgs.append(fvg)
+        current_price = float(series.c[-1])
+
+        # Candle 1 = [:-2], candle 3 = [2:]; the middle candle is the big move
+        c1_high, c1_low = series.h[:-2], series.l[:-2]
+        c3_high, c3_low = series.h[2:], series.l[2:]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Bullish FVG: Gap below (candle 1 high < candle 3 low) = support zone
+            bull_gap = c3_low - c1_high
+            bull_percent = np.where(c1_high > 0, bull_gap / c1_high * 100, 0.0)
+            bull_mask = (c1_high < c3_low) & (bull_percent >= min_gap_percent)
+
+            # Bearish FVG: Gap above (candle 1 low > candle 3 high) = resistance zone
+            bear_gap = c1_low - c3_high
+            bear_percent = np.where(c3_high > 0, bear_gap / c3_high * 100, 0.0)
+            bear_mask = (c1_low > c3_high) & (bear_percent >= min_gap_percent)
+
+        # FVG strength: Base 60 + bonus for larger gaps
+        # 0.1% gap = 60, 0.5% gap = 80, 1%+ gap = 100
+        for k in np.flatnonzero(bull_mask).tolist():
+            gap_percent = float(bull_percent[k])
+            top = float(c3_low[k])
+            bullish_fvgs.append({
+                "type": "bullish",
+                "top": top,
+                "bottom": float(c1_high[k]),
+                "size": float(bull_gap[k]),
+                "size_percent": round(gap_percent, 2),
+                "index": k + 2,
+                "filled": current_price <= top,  # FVG filled if price came back
+                "strength": min(100, 60 + int(gap_percent * 40)),
+            })
+
+        for k in np.flatnonzero(bear_mask).tolist():
+            gap_percent = float(bear_percent[k])
+            bottom = float(c3_high[k])
+            bearish_fvgs.append({
+                "type": "bearish",
+                "top": float(c1_low[k]),
+                "bottom": bottom,
+                "size": float(bear_gap[k]),
+                "size_percent": round(gap_percent, 2),
+                "index": k + 2,
+                "filled": current_price >= bottom,
+                "strength": min(100, 60 + int(gap_percent * 40)),
+            })
 
         # Find nearest unfilled FVG to current price
         nearest_fvg = None
@@ -606,114 +605,84 @@ class OrderBlockAnalyzer:
     """
 
     @staticmethod
-    def detect_order_blocks(bars: List[Dict]) -> Dict:
+    def detect_order_blocks(bars: Union[BarSeries, List[Dict]]) -> Dict:
         """Detect Order Blocks (engulfing patterns) as S/R zones"""
-        if len(bars) < 5:
+        series = BarSeries.coerce(bars)
+        if len(series) < 5:
             return {"bullish_obs": [], "bearish_obs": [], "double_ob": None}
 
         bullish_obs = []  # Support zones
         bearish_obs = []  # Resistance zones
         double_ob = None  # Double engulfing (strongest)
 
-        current_price = bars[-1].get("c", 0)
-
-        for i in range(1, len(bars)):
-            prev = bars[i - 1]
-            curr = bars[i]
+        current_price = float(series.c[-1])
 
-            prev_open = prev.get("o", 0)
-            prev_close = prev.get("c", 0)
-            prev_body_top = max(prev_open, prev_close)
-            prev_body_bottom = min(prev_open, prev_close)
+        body_top = series.body_top
+        body_bottom = series.body_bottom
+        is_bullish = series.c > series.o
 
-            curr_open = curr.get("o", 0)
-            curr_close = curr.get("c", 0)
-            curr_body_top = max(curr_open, curr_close)
-            curr_body_bottom = min(curr_open, curr_close)
+        # engulfs[k]: candle k+1 body engulfs candle k body
+        engulfs = (body_bottom[1:] <= body_bottom[:-1]) & (body_top[1:] >= body_top[:-1])
+        prev_bull, curr_bull = is_bullish[:-1], is_bullish[1:]
 
-            prev_is_bullish = prev_close > prev_open
-            curr_is_bullish = curr_close > curr_open
-
-            # Bullish Order Block (상승 장악형)
-            # Previous bearish candle engulfed by current bullish candle
-            if not prev_is_bullish and curr_is_bullish:
-                if curr_body_bottom <= prev_body_bottom and curr_body_top >= prev_body_top:
-                    ob = {
-                        "type": "bullish",
-                        "zone_top": prev_body_top,
-                        "zone_bottom": prev_body_bottom,
-                        "index": i,
-                        "strength": 70,
-                        "is_double": False,
-                    }
-                    bullish_obs.append(ob)
+        # Bullish Order Block (상승 장악형)
+        # Previous bearish candle engulfed by current bullish candle
+        for k in np.flatnonzero(~prev_bull & curr_bull & engulfs).tolist():
+            bullish_obs.append({
+                "type": "bullish",
+                "zone_top": float(body_top[k]),
+                "zone_bottom": float(body_bottom[k]),
+                "index": k + 1,
+                "strength": 70,
+                "is_double": False,
+            })
 
-            # Bearish Order Block (하락 장악형)
-            # Previous bullish candle engulfed by current bearish candle
-            if prev_is_bullish and not curr_is_bullish:
-                if curr_body_bottom <= prev_body_bottom and curr_body_top >= prev_body_top:
-                    ob = {
-                        "type": "bearish",
-                        "zone_top": prev_body_top,
-                        "zone_bottom": prev_body_bottom,
-                        "index": i,
-                        "strength": 70,
-                        "is_double": False,
-                    }
-                    bearish_obs.append(ob)
+        # Bearish Order Block (하락 장악형)
+        # Previous bullish candle engulfed by current bearish candle
+        for k in np.flatnonzero(prev_bull & ~curr_bull & engulfs).tolist():
+            bearish_obs.append({
+                "type": "bearish",
+                "zone_top": float(body_top[k]),
+                "zone_bottom": float(body_bottom[k]),
+                "index": k + 1,
+                "strength": 70,
+                "is_double": False,
+            })
 
         # Detect Double Engulfing (이중 장악형) - VERY STRONG
-        # Pattern: A engulfs B, then C engulfs A
-        for i in range(2, len(bars)):
-            c1 = bars[i - 2]
-            c2 = bars[i - 1]
-            c3 = bars[i]
-
-            c1_body_top = max(c1.get("o", 0), c1.get("c", 0))
-            c1_body_bottom = min(c1.get("o", 0), c1.get("c", 0))
-            c2_body_top = max(c2.get("o", 0), c2.get("c", 0))
-            c2_body_bottom = min(c2.get("o", 0), c2.get("c", 0))
-            c3_body_top = max(c3.get("o", 0), c3.get("c", 0))
-            c3_body_bottom = min(c3.get("o", 0), c3.get("c", 0))
-
-            c1_is_bullish = c1.get("c", 0) > c1.get("o", 0)
-            c2_is_bullish = c2.get("c", 0) > c2.get("o", 0)
-            c3_is_bullish = c3.get("c", 0) > c3.get("o", 0)
-
-            # Bullish Double Engulfing: Bearish engulfs bullish, then bullish engulfs that bearish
-            # Result: Strong support at the middle candle's body
-            if c1_is_bullish and not c2_is_bullish and c3_is_bullish:
-                # Check c2 engulfs c1
-                c2_engulfs_c1 = c2_body_bottom <= c1_body_bottom and c2_body_top >= c1_body_top
-                # Check c3 engulfs c2
-                c3_engulfs_c2 = c3_body_bottom <= c2_body_bottom and c3_body_top >= c2_body_top
-
-                if c2_engulfs_c1 and c3_engulfs_c2:
-                    double_ob = {
-                        "type": "bullish",
-                        "zone_top": c2_body_top,
-                        "zone_bottom": c2_body_bottom,
-                        "index": i,
-                        "strength": 95,  # Very strong!
-                        "is_double": True,
-                        "description": "이중 장악형 - Very Strong Support",
-                    }
-
-            # Bearish Double Engulfing
-            if not c1_is_bullish and c2_is_bullish and not c3_is_bullish:
-                c2_engulfs_c1 = c2_body_bottom <= c1_body_bottom and c2_body_top >= c1_body_top
-                c3_engulfs_c2 = c3_body_bottom <= c2_body_bottom and c3_body_top >= c2_body_top
-
-                if c2_engulfs_c1 and c3_engulfs_c2:
-                    double_ob = {
-                        "type": "bearish",
-                        "zone_top": c2_body_top,
-                        "zone_bottom": c2_body_bottom,
-                        "index": i,
-                        "strength": 95,
-                        "is_double": True,
-                        "description": "이중 장악형 - Very Strong Resistance",
-                    }
+        # Pattern: A engulfs B, then C engulfs A (c2 engulfs c1, c3 engulfs c2)
+        double_engulf = engulfs[:-1] & engulfs[1:]
+        c1_bull, c2_bull, c3_bull = is_bullish[:-2], is_bullish[1:-1], is_bullish[2:]
+
+        # Bullish: bearish engulfs bullish, then bullish engulfs that bearish
+        # Result: Strong support at the middle candle's body
+        bull_double = c1_bull & ~c2_bull & c3_bull & double_engulf
+        bear_double = ~c1_bull & c2_bull & ~c3_bull & double_engulf
+
+        # The latest double engulfing wins
+        hits = np.flatnonzero(bull_double | bear_double)
+        if len(hits):
+            k = int(hits[-1])
+            if bull_double[k]:
+                double_ob = {
+                    "type": "bullish",
+                    "zone_top": float(body_top[k + 1]),
+                    "zone_bottom": float(body_bottom[k + 1]),
+                    "index": k + 2,
+                    "strength": 95,  # Very strong!
+                    "is_double": True,
+                    "description": "이중 장악형 - Very Strong Support",
+                }
+            else:
+                double_ob = {
+                    "type": "bearish",
+                    "zone_top": float(body_top[k + 1]),
+                    "zone_bottom": float(body_bottom[k + 1]),
+                    "index": k + 2,
+                    "strength": 95,
+                    "is_double": True,
+                    "description": "이중 장악형 - Very Strong Resistance",
+                }
 
         # Find nearest Order Block to current price
         nearest_support_ob = None
@@ -758,12 +727,13 @@ class FakeoutDetector:
     """
 
     @staticmethod
-    def detect_fakeout(bars: List[Dict], sr_levels: Dict) -> Dict:
+    def detect_fakeout(bars: Union[BarSeries, List[Dict]], sr_levels: Dict) -> Dict:
         """Detect potential fakeout/trap patterns"""
-        if len(bars) < 10:
+        series = BarSeries.coerce(bars)
+        if len(series) < 10:
             return {"fakeout": None, "trap": None}
 
-        current_price = bars[-1].get("c", 0)
+        current_price = float(series.c[-1])
         support = sr_levels.get("nearest_support")
         resistance = sr_levels.get("nearest_resistance")
 
@@ -775,25 +745,12 @@ class FakeoutDetector:
             support_price = support.get("price") or 0
             if support_price and support_price > 0:
                 # Check last 10 bars for a break below support that reversed
-                broke_support = False
-                lowest_break = None
-                break_index = None
-
-                for i in range(-10, 0):
-                    if i >= -len(bars):
-                        bar = bars[i]
-                        bar_low = bar.get("l") or 0
-                        bar_close = bar.get("c") or 0
-
-                        # Check if bar broke below support
-                        if bar_low > 0 and bar_low < support_price * 0.998:  # 0.2% buffer
-                            broke_support = True
-                            if lowest_break is None or bar_low < lowest_break:
-                                lowest_break = bar_low
-                                break_index = i
+                recent_lows = series.l[-10:]
+                breaks = recent_lows[(recent_lows > 0) & (recent_lows < support_price * 0.998)]  # 0.2% buffer
 
                 # If we broke support but current price is back above it = Fakeout!
-                if broke_support and lowest_break and current_price > support_price:
+                if len(breaks) and current_price > support_price:
+                    lowest_break = float(breaks.min())
                     fakeout = {
                         "type": "bullish",
                         "description": "Fakeout below support - Bullish opportunity",
@@ -808,21 +765,11 @@ class FakeoutDetector:
         if resistance:
             resistance_price = resistance.get("price") or 0
             if resistance_price and resistance_price > 0:
-                broke_resistance = False
-                highest_break = None
-
-                for i in range(-10, 0):
-                    if i >= -len(bars):
-                        bar = bars[i]
-                        bar_high = bar.get("h") or 0
-                        bar_close = bar.get("c") or 0
-
-                        if bar_high > 0 and bar_high > resistance_price * 1.002:
-                            broke_resistance = True
-                            if highest_break is None or bar_high > highest_break:
-                                highest_break = bar_high
+                recent_highs = series.h[-10:]
+                breaks = recent_highs[(recent_highs > 0) & (recent_highs > resistance_price * 1.002)]
 
-                if broke_resistance and highest_break and current_price < resistance_price:
+                if len(breaks) and current_price < resistance_price:
+                    highest_break = float(breaks.max())
                     fakeout = {
                         "type": "bearish",
                         "description": "Fakeout above resistance - Bearish opportunity",
@@ -835,35 +782,32 @@ class FakeoutDetector:
 
         # Detect Trap (Double bottom/top fakeout) - Even stronger
         # Look for W or M pattern at support/resistance
-        if len(bars) >= 20 and support:
+        if len(series) >= 20 and support:
             support_price = support.get("price") or 0
-            if support_price and support_price > 0:
-                lows = [(bar.get("l") or 0) for bar in bars[-20:]]
+            if support_price and support_price > 0 and current_price > support_price:
+                lows = series.l[-20:]
 
-                # Find two lows near each other below support
-                low_points = []
-                for i, low in enumerate(lows):
-                    if low > 0 and low < support_price * 1.005:  # Within 0.5% of support
-                        low_points.append((i, low))
+                # Find lows within 0.5% of support
+                low_points = np.flatnonzero((lows > 0) & (lows < support_price * 1.005))
 
-                # Check for double bottom (trap)
+                # Check for double bottom (trap): a later low at least 3 bars after
+                # the first one at a similar level (within 1%)
                 if len(low_points) >= 2:
-                    # Two lows with some distance between them
-                    first_low = low_points[0]
-                    for second_low in low_points[1:]:
-                        if abs(second_low[0] - first_low[0]) >= 3:  # At least 3 bars apart
-                            if abs(second_low[1] - first_low[1]) / support_price < 0.01:  # Similar levels
-                                if current_price > support_price:
-                                    trap = {
-                                        "type": "bullish",
-                                        "description": "Double Bottom Trap - Strong bullish signal",
-                                        "first_low": first_low[1],
-                                        "second_low": second_low[1],
-                                        "stop_loss": min(first_low[1], second_low[1]) * 0.998,
-                                        "strength": 90,
-                                        "entry_logic": "Enter LONG on break above neckline",
-                                    }
-                                    break
+                    first = low_points[0]
+                    later = low_points[1:]
+                    similar = (np.abs(later - first) >= 3) & (np.abs(lows[later] - lows[first]) / support_price < 0.01)
+                    if similar.any():
+                        first_low = float(lows[first])
+                        second_low = float(lows[later[np.argmax(similar)]])
+                        trap = {
+                            "type": "bullish",
+                            "description": "Double Bottom Trap - Strong bullish signal",
+                            "first_low": first_low,
+                            "second_low": second_low,
+                            "stop_loss": min(first_low, second_low) * 0.998,
+                            "strength": 90,
+                            "entry_logic": "Enter LONG on break above neckline",
+                        }
 
         return {
             "fakeout": fakeout,
@@ -1060,48 +1004,24 @@ class SupportResistance:
     """Support and Resistance level detection based on price action"""
 
     @staticmethod
-    def find_swing_points(bars: List[Dict], lookback: int = 5) -> Dict:
+    def find_swing_points(bars: Union[BarSeries, List[Dict]], lookback: int = 5) -> Dict:
         """Find swing highs and lows for S/R levels"""
-        if len(bars) < lookback * 2 + 1:
+        series = BarSeries.coerce(bars)
+        n = len(series)
+        if n < lookback * 2 + 1:
             return {"swing_highs": [], "swing_lows": [], "nearest_support": None, "nearest_resistance": None}
 
-        swing_highs = []
-        swing_lows = []
-
-        for i in range(lookback, len(bars) - lookback):
-            high = bars[i].get("h", 0)
-            low = bars[i].get("l", 0)
-
-            # Check if this is a swing high
-            is_swing_high = all(
-                high > bars[i - j].get("h", 0) and high > bars[i + j].get("h", 0)
-                for j in range(1, lookback + 1)
-            )
-            if is_swing_high:
-                swing_highs.append({
-                    "price": high,
-                    "index": i,
-                    "touches": 1,
-                })
-
-            # Check if this is a swing low
-            is_swing_low = all(
-                low < bars[i - j].get("l", float("inf")) and low < bars[i + j].get("l", float("inf"))
-                for j in range(1, lookback + 1)
-            )
-            if is_swing_low:
-                swing_lows.append({
-                    "price": low,
-                    "index": i,
-                    "touches": 1,
-                })
+        highs, lows = series.h, series.l
+        high_idx, low_idx = swing_indices(highs, lows, lookback)
+        swing_highs = [{"price": float(highs[i]), "index": i, "touches": 1} for i in high_idx.tolist()]
+        swing_lows = [{"price": float(lows[i]), "index": i, "touches": 1} for i in low_idx.tolist()]
 
         # Cluster nearby levels (within 0.5%)
         swing_highs = SupportResistance._cluster_levels(swing_highs)
         swing_lows = SupportResistance._cluster_levels(swing_lows)
 
         # Find nearest levels to current price
-        current_price = bars[-1].get("c", 0)
+        current_price = float(series.c[-1])
 
         nearest_resistance = None
         for sh in sorted(swing_highs, key=lambda x: x["price"]):
@@ -1217,57 +1137,12 @@ class ScalpAnalyzer:
         interval_map = {"1": "1m", "5": "5m", "15": "15m", "60": "1h", "240": "4h"}
         binance_interval = interval_map.get(interval, "5m")
 
-        # Try Binance.US first (for US users), then fall back to Binance.com
-        endpoints = [
-            "https://api.binance.us/api/v3/klines",
-            "https://api.binance.com/api/v3/klines",
-        ]
-
-        for url in endpoints:
-            try:
-                params = {
-                    "symbol": symbol.upper(),
-                    "interval": binance_interval,
-                    "limit": limit,
-                }
-
-                response = requests.get(url, params=params, timeout=10)
-
-                # Skip to next endpoint if geo-restricted (451)
-                if response.status_code == 451:
-                    logger.warning(f"Binance endpoint geo-restricted: {url}")
-                    continue
-
-                response.raise_for_status()
-                data = response.json()
-
-                # Validate response is a list (klines data)
-                if not isinstance(data, list):
-                    logger.warning(f"Unexpected Binance response format: {data}")
-                    continue
-
-                # Convert Binance format to our standard format
-                # Binance returns: [open_time, open, high, low, close, volume, ...]
-                bars = []
-                for kline in data:
-                    bars.append({
-                        "t": kline[0],  # Open time (timestamp)
-                        "o": float(kline[1]),  # Open
-                        "h": float(kline[2]),  # High
-                        "l": float(kline[3]),  # Low
-                        "c": float(kline[4]),  # Close
-                        "v": float(kline[5]),  # Volume
-                    })
-
-                logger.info(f"Successfully fetched {len(bars)} bars from {url}")
-                return bars
-
-            except Exception as e:
-                logger.warning(f"Failed to fetch from {url}: {e}")
-                continue
-
-        logger.error(f"All Binance endpoints failed for {symbol}")
-        return []
+        # Served from the local bar store; only missing klines are fetched
+        # (Binance.US first, then Binance.com)
+        bars = recent_binance_bars(symbol, int(interval) if interval in interval_map else 5, binance_interval, limit)
+        if bars:
+            logger.info(f"Successfully fetched {len(bars)} bars for {symbol} ({binance_interval})")
+        return bars
 
     def fetch_bars_polygon(self, ticker: str, interval: str = "5", limit: int = 100) -> List[Dict]:
         """Fetch candlestick data from Polygon (for US stocks)"""
@@ -1282,30 +1157,16 @@ class ScalpAnalyzer:
             timespan = timespan_map.get(interval, "minute")
             multiplier = multiplier_map.get(interval, 5)
 
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=2)
-
-            url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
-            params = {"apiKey": self.polygon_key, "limit": limit, "sort": "desc"}
-
-            response = requests.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            # Last two days from the local bar store; only the missing tail is requested
+            bars = recent_polygon_bars(ticker, multiplier, timespan, limit, 2, self.polygon_key)
 
-            if data.get("resultsCount", 0) > 0:
-                bars = list(reversed(data.get("results", [])))
+            if bars:
                 logger.info(f"Fetched {len(bars)} bars for {ticker} ({interval}m)")
                 return bars
 
             logger.warning(f"No bars returned from Polygon for {ticker}")
             return []
 
-        except requests.exceptions.Timeout:
-            logger.error(f"Polygon API timeout for {ticker}")
-            return []
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"Polygon API HTTP error for {ticker}: {e}")
-            return []
         except Exception as e:
             logger.error(f"Failed to fetch Polygon bars for {ticker}: {e}")
             return []
@@ -1326,19 +1187,15 @@ class ScalpAnalyzer:
             logger.info(f"Fetching {ticker} from Polygon (stock)")
             return self.fetch_bars_polygon(ticker, interval, limit)
 
-    def calculate_vwap(self, bars: List[Dict]) -> float:
+    def calculate_vwap(self, bars: Union[BarSeries, List[Dict]]) -> float:
         """Calculate VWAP (used as institutional S/R level, not indicator)"""
-        if not bars:
+        series = BarSeries.coerce(bars)
+        if not len(series):
             return 0
 
-        total_volume = 0
-        total_vwap = 0
-
-        for bar in bars:
-            typical_price = (bar.get("h", 0) + bar.get("l", 0) + bar.get("c", 0)) / 3
-            volume = bar.get("v", 0)
-            total_vwap += typical_price * volume
-            total_volume += volume
+        typical_price = (series.h + series.l + series.c) / 3
+        total_vwap = seq_sum(typical_price * series.v)
+        total_volume = seq_sum(series.v)
 
         if total_volume == 0:
             return 0
@@ -1359,10 +1216,25 @@ class ScalpAnalyzer:
         """
         try:
             ticker = ticker.upper().strip()
-            is_crypto = self.is_crypto(ticker)
             bars = self.fetch_bars(ticker, interval)
+        except Exception as e:
+            logger.error(f"Scalp analysis error for {ticker}: {e}")
+            return {"error": str(e)}
+
+        return self.analyze_bars(ticker, interval, bars)
+
+    def analyze_bars(self, ticker: str, interval: str, bars: Union[BarSeries, List[Dict]]) -> Dict:
+        """
+        Run every analyzer on already-fetched bars (no network access).
 
-            if not bars or len(bars) < 30:
+        Split out of analyze() so the batch scanner can fetch concurrently and
+        analyze in worker processes.
+        """
+        try:
+            ticker = ticker.upper().strip()
+            is_crypto = self.is_crypto(ticker)
+
+            if bars is None or len(bars) < 30:
                 # Check market status for stocks
                 if not is_crypto:
                     try:
@@ -1381,41 +1253,26 @@ class ScalpAnalyzer:
                         pass
                 return {"error": f"Insufficient data for {ticker}. Try crypto pairs like BTCUSDT which trade 24/7."}
 
-            closes = [bar.get("c", 0) for bar in bars]
-            current_price = closes[-1]
-            prev_price = closes[-2] if len(closes) > 1 else current_price
+            # Build the columnar series once and share it across all analyzers
+            series = BarSeries.coerce(bars)
+            current_price = float(series.c[-1])
+            prev_price = float(series.c[-2]) if len(series) > 1 else current_price
 
             # Check if price data is valid
             if current_price == 0 or current_price is None:
                 return {"error": f"Price data unavailable for {ticker}. The market may be closed or API quota exceeded. Try crypto (BTCUSDT) for 24/7 data."}
 
-            # Core Analysis (Candlestick + Volume based)
-            candle_analysis = CandlestickPatterns.analyze_patterns(bars)
-            volume_analysis = VolumeAnalyzer.analyze_volume(bars)
-            sr_levels = SupportResistance.find_swing_points(bars)
-            vwap = self.calculate_vwap(bars[-50:])
-
-            # NEW: Advanced Analysis (쉽알 Strategy)
-            fvg_analysis = FVGAnalyzer.detect_fvg(bars)
-            ob_analysis = OrderBlockAnalyzer.detect_order_blocks(bars)
-            fakeout_analysis = FakeoutDetector.detect_fakeout(bars, sr_levels)
-
-            # NEW: Confluence Scoring (최소 2개 근거 필요)
-            confluence = ConfluenceScorer.calculate_confluence(
-                candle_analysis, volume_analysis, fvg_analysis,
-                ob_analysis, fakeout_analysis, sr_levels, current_price
-            )
-
-            # Determine signal using confluence-based system
-            signal_result = self._determine_signal_v2(
-                current_price, vwap, candle_analysis, volume_analysis,
-                sr_levels, fvg_analysis, ob_analysis, fakeout_analysis, confluence
-            )
-
-            # Calculate entry/stop/target with clear reasoning
-            trade_setup = self._calculate_trade_setup(
-                current_price, candle_analysis, sr_levels, vwap, signal_result["signal"]
-            )
+            core = self.evaluate_signal(series)
+            candle_analysis = core["candle_analysis"]
+            volume_analysis = core["volume_analysis"]
+            sr_levels = core["sr_levels"]
+            vwap = core["vwap"]
+            fvg_analysis = core["fvg_analysis"]
+            ob_analysis = core["ob_analysis"]
+            fakeout_analysis = core["fakeout_analysis"]
+            confluence = core["confluence"]
+            signal_result = core["signal_result"]
+            trade_setup = core["trade_setup"]
 
             # Generate analysis with clear reasoning
             analysis = self._generate_analysis(
@@ -1490,6 +1347,55 @@ class ScalpAnalyzer:
             logger.error(f"Scalp analysis error for {ticker}: {e}")
             return {"error": str(e)}
 
+    def evaluate_signal(self, bars: Union[BarSeries, List[Dict]]) -> Dict:
+        """
+        Signal and trade setup from already-fetched bars, without AI commentary
+        or response formatting (the backtest engine calls this once per bar).
+        """
+        series = BarSeries.coerce(bars)
+        current_price = float(series.c[-1])
+
+        # Core Analysis (Candlestick + Volume based)
+        candle_analysis = CandlestickPatterns.analyze_patterns(series)
+        volume_analysis = VolumeAnalyzer.analyze_volume(series)
+        sr_levels = SupportResistance.find_swing_points(series)
+        vwap = self.calculate_vwap(series[-50:])
+
+        # NEW: Advanced Analysis (쉽알 Strategy)
+        fvg_analysis = FVGAnalyzer.detect_fvg(series)
+        ob_analysis = OrderBlockAnalyzer.detect_order_blocks(series)
+        fakeout_analysis = FakeoutDetector.detect_fakeout(series, sr_levels)
+
+        # NEW: Confluence Scoring (최소 2개 근거 필요)
+        confluence = ConfluenceScorer.calculate_confluence(
+            candle_analysis, volume_analysis, fvg_analysis,
+            ob_analysis, fakeout_analysis, sr_levels, current_price
+        )
+
+        # Determine signal using confluence-based system
+        signal_result = self._determine_signal_v2(
+            current_price, vwap, candle_analysis, volume_analysis,
+            sr_levels, fvg_analysis, ob_analysis, fakeout_analysis, confluence
+        )
+
+        # Calculate entry/stop/target with clear reasoning
+        trade_setup = self._calculate_trade_setup(
+            current_price, candle_analysis, sr_levels, vwap, signal_result["signal"]
+        )
+
+        return {
+            "candle_analysis": candle_analysis,
+            "volume_analysis": volume_analysis,
+            "sr_levels": sr_levels,
+            "vwap": vwap,
+            "fvg_analysis": fvg_analysis,
+            "ob_analysis": ob_analysis,
+            "fakeout_analysis": fakeout_analysis,
+            "confluence": confluence,
+            "signal_result": signal_result,
+            "trade_setup": trade_setup,
+        }
+
     def _determine_signal_v2(
         self,
         price: float,
@@ -1804,7 +1710,8 @@ Provide a 2-3 sentence analysis:
 
 Be direct. Use <strong> tags for key points. Focus ONLY on candlesticks and volume."""
 
-            response = model.generate_content(prompt)
+            with timed("upstream", "gemini"):
+                response = model.generate_content(prompt)
             return response.text.strip()
 
         except Exception as e:
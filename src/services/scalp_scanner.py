@@ -0,0 +1,185 @@
+"""
+Batch Scalp Scanner
+Runs ScalpAnalyzer over a ticker universe in one request:
+- Bars are fetched concurrently in a thread pool (network bound)
+- Analyzers run in a process pool (CPU bound, sidesteps the GIL)
+- Results are yielded as tickers complete and ranked by confluence score
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.services.bar_series import BarSeries
+from src.services.scalp_engine import ScalpAnalyzer
+
+logger = logging.getLogger(__name__)
+
+SCAN_MAX_TICKERS = int(os.getenv("SCALP_SCAN_MAX_TICKERS", "200"))
+SCAN_FETCH_WORKERS = int(os.getenv("SCALP_SCAN_FETCH_WORKERS", "16"))
+SCAN_PROCESS_WORKERS = int(os.getenv("SCALP_SCAN_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# One analyzer per worker process, created on first use
+_worker_analyzer: Optional[ScalpAnalyzer] = None
+
+
+def _analyze_in_worker(ticker: str, interval: str, series: BarSeries) -> Dict:
+    """Process-pool entry point (module level so it pickles)"""
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = ScalpAnalyzer()
+    return _worker_analyzer.analyze_bars(ticker, interval, series)
+
+
+def summarize(result: Dict) -> Dict:
+    """Compact per-ticker row for scan output"""
+    if "error" in result:
+        return {"ticker": result.get("ticker"), "error": result["error"]}
+
+    confluence = result.get("confluence", {})
+    primary = result.get("candlestick", {}).get("primary_pattern")
+    return {
+        "ticker": result["ticker"],
+        "asset_type": result.get("asset_type"),
+        "price": result.get("price"),
+        "change_percent": result.get("change_percent"),
+        "signal": result.get("signal"),
+        "confidence": result.get("confidence"),
+        "confluence_score": confluence.get("total_score", 0),
+        "confluence_direction": confluence.get("direction"),
+        "bullish_count": confluence.get("bullish_count", 0),
+        "bearish_count": confluence.get("bearish_count", 0),
+        "min_confluence_met": confluence.get("min_confluence_met", False),
+        "primary_pattern": primary.get("name") if primary else None,
+        "nearest_support": result.get("levels", {}).get("nearest_support"),
+        "nearest_resistance": result.get("levels", {}).get("nearest_resistance"),
+    }
+
+
+def rank(rows: Iterable[Dict]) -> List[Dict]:
+    """Sort scan rows by confluence score, then confidence (errors last)"""
+    return sorted(
+        rows,
+        key=lambda row: ("error" in row, -(row.get("confluence_score") or 0), -(row.get("confidence") or 0)),
+    )
+
+
+class ScalpScanner:
+    """Concurrent fetch + process-pool analysis over many tickers"""
+
+    def __init__(
+        self,
+        analyzer: Optional[ScalpAnalyzer] = None,
+        fetch_workers: int = SCAN_FETCH_WORKERS,
+        process_workers: int = SCAN_PROCESS_WORKERS,
+    ):
+        self.analyzer = analyzer or ScalpAnalyzer()
+        self.fetch_workers = fetch_workers
+        self.process_workers = process_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Shared process pool (None means analyze inline in the fetch threads)"""
+        if self.process_workers <= 0:
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a threaded web worker can copy held locks
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _discard_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch(self, ticker: str, interval: str) -> Optional[BarSeries]:
+        bars = self.analyzer.fetch_bars(ticker, interval)
+        return BarSeries.from_bars(bars) if bars else None
+
+    def scan(self, tickers: Iterable[str], interval: str = "5") -> Iterator[Dict]:
+        """
+        Analyze every ticker, yielding summary rows in completion order.
+
+        Args:
+            tickers: Ticker universe (deduplicated, capped at SCAN_MAX_TICKERS)
+            interval: Bar interval in minutes ("1", "5", "15", ...)
+        """
+        universe = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))[:SCAN_MAX_TICKERS]
+        if not universe:
+            return
+
+        pool = self._get_pool()
+        with ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(universe))) as fetchers:
+            # future -> (ticker, fetched series); series is None while still fetching
+            pending = {fetchers.submit(self._fetch, ticker, interval): (ticker, None) for ticker in universe}
+
+            def submit_analysis(ticker: str, series: BarSeries):
+                nonlocal pool
+                if pool is not None:
+                    try:
+                        pending[pool.submit(_analyze_in_worker, ticker, interval, series)] = (ticker, series)
+                        return
+                    except (BrokenProcessPool, RuntimeError):
+                        self._discard_pool()
+                        pool = None
+                pending[fetchers.submit(self.analyzer.analyze_bars, ticker, interval, series)] = (ticker, series)
+
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        ticker, series = pending.pop(future)
+                        try:
+                            value = future.result()
+                        except BrokenProcessPool:
+                            # A crashed worker poisons the pool; finish this scan inline
+                            logger.error("Scalp scan process pool broke, analyzing remaining tickers inline")
+                            self._discard_pool()
+                            pool = None
+                            submit_analysis(ticker, series)
+                            continue
+                        except Exception as e:
+                            logger.error(f"Scalp scan failed for {ticker}: {e}")
+                            yield {"ticker": ticker, "error": str(e)}
+                            continue
+
+                        if series is not None:
+                            yield summarize({"ticker": ticker, **value})
+                        elif value is None:
+                            yield {"ticker": ticker, "error": f"Insufficient data for {ticker}"}
+                        else:
+                            submit_analysis(ticker, value)
+            finally:
+                # Client went away mid-stream: don't keep fetching for nobody
+                for future in pending:
+                    future.cancel()
+
+    def scan_ranked(self, tickers: Iterable[str], interval: str = "5") -> List[Dict]:
+        """Run a full scan and return rows ranked by confluence score"""
+        return rank(self.scan(tickers, interval))
+
+    def shutdown(self):
+        self._discard_pool()
+
+
+_scanner: Optional[ScalpScanner] = None
+_scanner_lock = threading.Lock()
+
+
+def get_scalp_scanner() -> ScalpScanner:
+    """Get or create the process-wide scanner"""
+    global _scanner
+    if _scanner is None:
+        with _scanner_lock:
+            if _scanner is None:
+                _scanner = ScalpScanner()
+    return _scanner
@@ -0,0 +1,87 @@
+"""
+Swing Point Detection
+One O(n) swing-high/low detector shared by the structure analyzers
+(scalp engine, pattern recognition, swing/scalp services, multi-timeframe S/R).
+
+Neighbour maxima come from a van Herk/Gil-Werman sliding-window max: block
+prefix/suffix maxima via np.maximum.accumulate, so the cost per bar is
+constant regardless of lookback.
+"""
+
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Max of every length-`window` slice: out[i] = max(values[i:i + window]).
+
+    Returns an array of len(values) - window + 1 (empty if window > len(values)).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if window <= 0 or window > n:
+        return np.empty(0, dtype=np.float64)
+    if window == 1:
+        return values.copy()
+
+    # Pad to whole blocks; -inf never wins a max
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, -np.inf)
+    padded[:n] = values
+    grid = padded.reshape(blocks, window)
+
+    prefix = np.maximum.accumulate(grid, axis=1).ravel()
+    suffix = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+
+    # A window starting at i spans the tail of i's block and the head of the next
+    starts = np.arange(n - window + 1)
+    return np.maximum(suffix[starts], prefix[starts + window - 1])
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """Min of every length-`window` slice (see rolling_max)"""
+    return -rolling_max(-np.asarray(values, dtype=np.float64), window)
+
+
+def swing_indices(highs: np.ndarray, lows: np.ndarray, lookback: int = 5, strict: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Indices of swing highs and swing lows.
+
+    A swing high's high beats every high within `lookback` bars on both sides
+    (strictly, or ties allowed with strict=False); swing lows mirror that on
+    lows. The first and last `lookback` bars are never swings.
+
+    Returns:
+        (swing high indices, swing low indices), ascending
+    """
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    n = len(highs)
+    if lookback < 1 or n < lookback * 2 + 1:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    centers = np.arange(lookback, n - lookback)
+    # Window of `lookback` bars starting at i covers [i, i + lookback)
+    high_windows = rolling_max(highs, lookback)
+    low_windows = rolling_min(lows, lookback)
+    neighbour_high = np.maximum(high_windows[centers - lookback], high_windows[centers + 1])
+    neighbour_low = np.minimum(low_windows[centers - lookback], low_windows[centers + 1])
+
+    if strict:
+        is_high = highs[centers] > neighbour_high
+        is_low = lows[centers] < neighbour_low
+    else:
+        is_high = highs[centers] >= neighbour_high
+        is_low = lows[centers] <= neighbour_low
+    return centers[is_high], centers[is_low]
+
+
+def high_low_arrays(bars: Iterable[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """High/low columns from bar dicts with short (h/l) or long (high/low) keys, missing as 0"""
+    bars = list(bars)
+    highs = np.fromiter((bar.get("h", bar.get("high", 0)) or 0 for bar in bars), dtype=np.float64, count=len(bars))
+    lows = np.fromiter((bar.get("l", bar.get("low", 0)) or 0 for bar in bars), dtype=np.float64, count=len(bars))
+    return highs, lows
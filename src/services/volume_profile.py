@@ -0,0 +1,140 @@
+"""
+Array-based Volume Profile
+Builds a volume-at-price histogram on a fixed price grid:
+- Each bar's bin range comes from two searchsorted calls over the bin edges
+- Volume is spread evenly over a bar's bins with a difference array + cumsum,
+  so a build is O(bars + bins) instead of O(bars x bins)
+- Profiles grow incrementally: appended bars outside the grid extend it by
+  whole bins without rebinning existing volume
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pytz
+
+from src.services.bar_series import BarSeries
+
+SESSION_TZ = pytz.timezone("America/New_York")
+
+
+class VolumeProfile:
+    """
+    Volume at price over bins [price_min + i * bin_size, price_min + (i + 1) * bin_size].
+
+    A bar touches every bin that overlaps [low, high] (edges inclusive) and its
+    volume is split evenly across them.
+    """
+
+    __slots__ = ("price_min", "bin_size", "volume", "touched")
+
+    def __init__(self, price_min: float, bin_size: float, num_bins: int):
+        if bin_size <= 0 or num_bins <= 0:
+            raise ValueError("Volume profile needs a positive bin size and bin count")
+        self.price_min = float(price_min)
+        self.bin_size = float(bin_size)
+        self.volume = np.zeros(num_bins, dtype=np.float64)
+        self.touched = np.zeros(num_bins, dtype=np.int64)  # Bars touching each bin
+
+    @classmethod
+    def from_bars(
+        cls,
+        bars: Union[BarSeries, List[Dict]],
+        num_bins: int = 50,
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+    ) -> Optional["VolumeProfile"]:
+        """Profile spanning the bars' low..high (or the given range) in num_bins bins; None if the range is empty"""
+        series = BarSeries.coerce(bars)
+        if len(series) == 0:
+            return None
+        low = float(series.l.min()) if price_min is None else float(price_min)
+        high = float(series.h.max()) if price_max is None else float(price_max)
+        if low >= high:
+            return None
+
+        profile = cls(low, (high - low) / num_bins, num_bins)
+        profile.add(series, extend=False)
+        return profile
+
+    @property
+    def num_bins(self) -> int:
+        return len(self.volume)
+
+    @property
+    def prices(self) -> np.ndarray:
+        """Bin midpoints"""
+        lows = self.price_min + np.arange(self.num_bins) * self.bin_size
+        return np.round((lows + (lows + self.bin_size)) / 2, 4)
+
+    def _bin_ranges(self, highs: np.ndarray, lows: np.ndarray):
+        """First and last bin overlapping each bar (last < first when none does)"""
+        bin_lows = self.price_min + np.arange(self.num_bins) * self.bin_size
+        bin_highs = bin_lows + self.bin_size
+        # bin_low <= high and bin_high >= low
+        last = np.searchsorted(bin_lows, highs, side="right") - 1
+        first = np.searchsorted(bin_highs, lows, side="left")
+        return first, last
+
+    def _extend_to(self, low: float, high: float):
+        """Grow the grid by whole bins so [low, high] is covered"""
+        # The epsilon keeps float residue at an exact edge from adding a bin
+        below = max(0, int(np.ceil((self.price_min - low) / self.bin_size - 1e-9)))
+        top = self.price_min + self.num_bins * self.bin_size
+        above = max(0, int(np.ceil((high - top) / self.bin_size - 1e-9)))
+        if below or above:
+            self.volume = np.pad(self.volume, (below, above))
+            self.touched = np.pad(self.touched, (below, above))
+            self.price_min -= below * self.bin_size
+
+    def add(self, bars: Union[BarSeries, List[Dict]], extend: bool = True):
+        """
+        Accumulate bars into the profile.
+
+        With extend=True the grid grows to cover bars outside it; otherwise
+        only the part of each bar inside the grid is counted.
+        """
+        series = BarSeries.coerce(bars)
+        if len(series) == 0:
+            return
+        if extend:
+            self._extend_to(float(series.l.min()), float(series.h.max()))
+
+        first, last = self._bin_ranges(series.h, series.l)
+        first = np.maximum(first, 0)
+        last = np.minimum(last, self.num_bins - 1)
+        hit = last >= first
+        if not hit.any():
+            return
+        first, last, v = first[hit], last[hit], series.v[hit]
+        per_bin = v / (last - first + 1)
+
+        # Difference arrays: +x at the first bin, -x after the last, then prefix-sum
+        size = self.num_bins + 1
+        volume_delta = np.bincount(first, weights=per_bin, minlength=size) - np.bincount(last + 1, weights=per_bin, minlength=size)
+        touch_delta = np.bincount(first, minlength=size) - np.bincount(last + 1, minlength=size)
+        covered = np.cumsum(touch_delta)[:-1]
+        # Zero uncovered bins exactly (the running sum leaves float residue past each bar)
+        self.volume += np.where(covered > 0, np.cumsum(volume_delta)[:-1], 0.0)
+        self.touched += covered
+
+    def levels(self) -> Dict[str, np.ndarray]:
+        """Prices and volumes of bins touched by at least one bar, ascending by price"""
+        mask = self.touched > 0
+        return {"price": self.prices[mask], "volume": self.volume[mask]}
+
+
+def session_start_ms(timestamp_ms: float, tz=SESSION_TZ) -> int:
+    """Midnight (exchange time) of the trading day containing timestamp_ms"""
+    local = datetime.fromtimestamp(timestamp_ms / 1000, tz)
+    return int(tz.localize(datetime(local.year, local.month, local.day)).timestamp() * 1000)
+
+
+def session_slice(series: BarSeries, anchor_ms: Optional[int] = None) -> BarSeries:
+    """Bars from anchor_ms on (default: start of the last bar's session)"""
+    if len(series) == 0:
+        return series
+    if anchor_ms is None:
+        anchor_ms = session_start_ms(series.t[-1])
+    return series[int(np.searchsorted(series.t, anchor_ms, side="left")):]
@@ -149,6 +149,18 @@ def mock_news():
         }
     ]
 
+@pytest.fixture
+def feature_store(app_context):
+    """Empty feature store on the test database"""
+    from src.services.feature_store import FeatureStore
+    from web.database import FeatureRow
+
+    FeatureRow.query.delete()
+    db.session.commit()
+    yield FeatureStore()
+    FeatureRow.query.delete()
+    db.session.commit()
+
 # Helper functions for tests
 def login_user(client, email="test@example.com", password="testpassword123"):
     """Helper to log in a user"""
@@ -0,0 +1,139 @@
+"""
+Tests for the AI Score ML pipeline
+
+Checks vectorized feature extraction against the per-prefix calculation,
+and batched multi-horizon scoring against per-ticker predict_score.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+
+import ml.ai_score_system as ai_score_system
+from ml.ai_score_system import (
+    BUNDLE_FILENAME,
+    HORIZON_MODEL_FILES,
+    AIScoreModel,
+    FeatureEngineer,
+    MultiTimeframeAIScoreModel,
+)
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", "models")
+
+def make_prices(count=400, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, count)))
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=count),
+        "open": close * (1 + rng.normal(0, 0.005, count)),
+        "high": close * (1 + rng.random(count) * 0.02),
+        "low": close * (1 - rng.random(count) * 0.02),
+        "close": close,
+        "volume": rng.integers(100_000, 10_000_000, count).astype(float),
+    })
+
+class TestTechnicalFeatureFrame:
+    """Vectorized features must equal calculate_technical_features on each prefix"""
+
+    @pytest.mark.parametrize("index", [199, 200, 250, 399])
+    def test_matches_prefix_features(self, index):
+        prices = make_prices()
+        frame = FeatureEngineer.calculate_technical_feature_frame(prices)
+        expected = FeatureEngineer.calculate_technical_features(prices.iloc[: index + 1])
+
+        assert list(expected) == FeatureEngineer.TECHNICAL_FEATURES
+        for name, value in expected.items():
+            assert frame[name].iloc[index] == pytest.approx(value, rel=1e-12, abs=1e-12), name
+
+    def test_rows_without_history_are_nan(self):
+        frame = FeatureEngineer.calculate_technical_feature_frame(make_prices(250))
+        assert frame.iloc[:199].isna().all().all()
+        assert frame.iloc[199:].notna().all().all()
+
+class TestCollectTrainingData:
+    """Test training sample generation"""
+
+    def test_samples_and_labels(self, tmp_path, feature_store):
+        prices = make_prices()
+        model = AIScoreModel(model_dir=str(tmp_path))
+
+        with patch.object(model, "_fetch_historical_prices", return_value=prices):
+            df = model.collect_training_data(
+                ["AAPL"], "2020-01-01", "2021-12-31", polygon=None, feature_store=feature_store
+            )
+
+        assert len(df) == len(prices) - 230
+        assert list(df.columns) == ["symbol", "date", "forward_return_20d"] + FeatureEngineer.TECHNICAL_FEATURES
+
+        row = df.iloc[10]
+        i = 210
+        assert row["date"] == prices["date"].iloc[i]
+        assert row["forward_return_20d"] == prices["close"].iloc[i + 20] / prices["close"].iloc[i] - 1
+        assert row["rsi_14"] == pytest.approx(
+            FeatureEngineer.calculate_technical_features(prices.iloc[: i + 1])["rsi_14"]
+        )
+
+    def test_second_run_reads_feature_store(self, tmp_path, feature_store):
+        prices = make_prices()
+        model = AIScoreModel(model_dir=str(tmp_path))
+        store = feature_store
+
+        with patch.object(model, "_fetch_historical_prices", return_value=prices):
+            first = model.collect_training_data(["AAPL"], "2020-01-01", "2021-12-31", polygon=None, feature_store=store)
+            with patch.object(FeatureEngineer, "calculate_technical_feature_frame") as compute:
+                second = model.collect_training_data(["AAPL"], "2020-01-01", "2021-12-31", polygon=None, feature_store=store)
+
+        compute.assert_not_called()
+        pd.testing.assert_frame_equal(first, second)
+        assert len(store.read(FeatureEngineer.TECHNICAL_FEATURE_VERSION, "AAPL")) == len(prices) - 199
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    """The committed horizon models in a scratch directory, with no shared bundles loaded"""
+    for filename in HORIZON_MODEL_FILES.values():
+        shutil.copy(os.path.join(MODEL_DIR, filename), tmp_path)
+    monkeypatch.setattr(ai_score_system, "_bundles", {})
+    return str(tmp_path)
+
+class TestMultiTimeframeBatch:
+    """Test the shared model bundle and batch inference"""
+
+    def test_batch_matches_single_predictions(self, model_dir):
+        model = MultiTimeframeAIScoreModel(model_dir=model_dir)
+        rng = np.random.default_rng(1)
+        features_list = [
+            {name: float(x) for name, x in zip(model.feature_names, rng.normal(0, 1, 22) * rng.choice([1, 10, 100], 22))}
+            for _ in range(200)
+        ]
+
+        batch = model.predict_batch(features_list)
+
+        for horizon, filename in HORIZON_MODEL_FILES.items():
+            single = AIScoreModel(model_dir=model_dir)
+            assert single.load(filename)
+            expected = [single.predict_score(features) for features in features_list]
+            assert [scores[f"{horizon}_score"] for scores in batch] == expected, horizon
+
+    def test_bundle_written_and_reused(self, model_dir):
+        assert MultiTimeframeAIScoreModel(model_dir=model_dir).load_all_models()
+        assert os.path.exists(os.path.join(model_dir, BUNDLE_FILENAME))
+
+        ai_score_system._bundles.clear()
+        with patch.object(AIScoreModel, "load") as per_horizon_load:
+            assert MultiTimeframeAIScoreModel(model_dir=model_dir).load_all_models()
+        per_horizon_load.assert_not_called()
+
+    def test_cache_and_non_numeric_rows(self, model_dir):
+        model = MultiTimeframeAIScoreModel(model_dir=model_dir, cache_size=2)
+        first = model.predict_batch([{"rsi": 30.0}, {"rsi": 70.0}, {"rsi": None}])
+
+        assert first[2] == {"short_term_score": None, "medium_term_score": None, "long_term_score": None}
+        assert len(model._cache) == 2
+
+        with patch.object(model.bundle.horizons["short_term"]["model"], "predict_proba") as predict:
+            assert model.predict_batch([{"rsi": 70.0}, {"rsi": 30.0}]) == first[1::-1]
+        predict.assert_not_called()
@@ -0,0 +1,159 @@
+"""
+Tests for the streaming price alert engine
+
+Checks AlertIndex against a brute-force scan and the DB-backed engine's
+load/trigger/flush cycle.
+"""
+
+import random
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from scripts import cron_check_alerts
+from web.alert_engine import AlertIndex, PriceAlertEngine
+from web.advanced_sr_analysis import PriceAlertManager
+from web.database import db, PriceAlert, User
+
+class TestAlertIndex:
+    """Test binary-search triggering"""
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        index = AlertIndex()
+        reference = {}
+        for key in range(2000):
+            ticker = rng.choice(["AAPL", "MSFT"])
+            direction = rng.choice(["above", "below"])
+            threshold = round(rng.uniform(90, 110), 2)
+            index.add(key, ticker, direction, threshold)
+            reference[key] = (ticker, direction, threshold)
+
+        for _ in range(200):
+            ticker = rng.choice(["AAPL", "MSFT"])
+            price = round(rng.uniform(85, 115), 2)
+            expected = {
+                key
+                for key, (t, direction, threshold) in reference.items()
+                if t == ticker and (price >= threshold if direction == "above" else price <= threshold)
+            }
+            fired = {hit["key"] for hit in index.update(ticker, price)}
+
+            assert fired == expected
+            for key in fired:
+                del reference[key]
+
+        assert len(index) == len(reference)
+
+    def test_thresholds_are_inclusive_and_one_shot(self):
+        index = AlertIndex()
+        index.add("up", "aapl", "above", 100.0)
+        index.add("down", "AAPL", "below", 95.0)
+
+        assert index.update("AAPL", 99.99) == []
+        assert [hit["key"] for hit in index.update("AAPL", 100.0)] == ["up"]
+        assert index.update("AAPL", 100.0) == []
+        assert [hit["key"] for hit in index.update("AAPL", 95.0)] == ["down"]
+        assert index.tickers() == []
+
+    def test_remove_and_replace(self):
+        index = AlertIndex()
+        index.add(1, "AAPL", "above", 100.0)
+        index.add(1, "AAPL", "below", 90.0)  # Replaces the "above" alert
+        assert index.update("AAPL", 150.0) == []
+
+        assert index.remove(1)
+        assert not index.remove(1)
+        assert index.update("AAPL", 10.0) == []
+
+class TestPriceAlertEngine:
+    """Test loading, triggering and batched writes"""
+
+    @pytest.fixture
+    def alerts(self, app_context):
+        PriceAlert.query.delete()
+        user = User(username="alerter", email="alerter@example.com", email_verified=True)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        rows = [
+            PriceAlert(user_id=user.id, ticker="AAPL", condition="above", threshold=Decimal("150.00")),
+            PriceAlert(user_id=user.id, ticker="AAPL", condition="below", threshold=Decimal("100.00")),
+            PriceAlert(user_id=user.id, ticker="MSFT", condition="above", threshold=Decimal("400.00")),
+            PriceAlert(user_id=user.id, ticker="MSFT", condition="above", threshold=Decimal("1.00"), is_triggered=True),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        yield rows
+        PriceAlert.query.delete()
+        db.session.delete(user)
+        db.session.commit()
+
+    def test_trigger_and_flush(self, alerts):
+        engine = PriceAlertEngine()
+        assert engine.load() == 3
+
+        triggered = engine.on_price("AAPL", 151.25)
+        assert [alert["id"] for alert in triggered] == [alerts[0].id]
+        assert engine.evaluate_prices({"MSFT": 399.0}) == []
+
+        assert engine.flush() == 1
+        db.session.expire_all()
+        row = db.session.get(PriceAlert, alerts[0].id)
+        assert row.is_triggered and float(row.triggered_price) == 151.25
+
+    def test_reload_skips_triggered_alerts(self, alerts):
+        engine = PriceAlertEngine()
+        engine.load()
+        engine.on_price("AAPL", 99.0)
+
+        # Not yet flushed: a full reload must not re-arm it
+        engine.load()
+        assert engine.on_price("AAPL", 99.0) == []
+
+        engine.flush()
+        engine.load()
+        assert len(engine.index) == 2
+
+class TestCronCheck:
+    """One-shot alert check"""
+
+    def test_no_emails_when_triggers_are_not_saved(self, app, monkeypatch):
+        monkeypatch.setenv("POLYGON_API_KEY", "test")
+        engine = MagicMock()
+        engine.load.return_value = 1
+        engine.evaluate_snapshot.return_value = [{"id": 1, "ticker": "AAPL"}]
+        engine.flush.return_value = 0
+
+        with patch("web.alert_engine.PriceAlertEngine", return_value=engine), patch(
+            "web.polygon_service.PolygonService"
+        ), patch.object(cron_check_alerts, "send_alert_emails") as send:
+            assert cron_check_alerts.check_price_alerts() is False
+            send.assert_not_called()
+
+            engine.flush.return_value = 1
+            assert cron_check_alerts.check_price_alerts() is True
+            send.assert_called_once_with(engine.evaluate_snapshot.return_value)
+
+class TestPriceAlertManager:
+    """S/R alerts run on the same index"""
+
+    def test_sr_alerts_trigger_once(self):
+        manager = PriceAlertManager()
+        alerts = manager.create_sr_alerts("AAPL", [{"price": 100.0, "strength": 80}], [{"price": 110.0}], 105.0)
+        assert manager.get_active_alerts("AAPL")["count"] == len(alerts) == 4
+
+        triggered = manager.check_alerts("AAPL", 100.05)
+        assert {alert["type"] for alert in triggered} == {"approach_support", "touch_support"}
+        assert manager.check_alerts("AAPL", 100.05) == []
+        assert manager.get_active_alerts()["count"] == 2
+        assert manager.clear_alerts("AAPL") == {"cleared": 2, "ticker": "AAPL"}
+
+    def test_alerts_sharing_a_level_are_kept(self):
+        manager = PriceAlertManager()
+        supports = [{"price": 100.0, "strength": 80}, {"price": 100.0, "strength": 60, "source": "volume_profile"}]
+        alerts = manager.create_sr_alerts("AAPL", supports, [], 105.0)
+        assert len({alert["id"] for alert in alerts}) == 4
+        assert manager.get_active_alerts("AAPL")["count"] == 4
+        assert len(manager.check_alerts("AAPL", 100.05)) == 4
@@ -224,6 +224,35 @@ class TestScalpAPI:
             )
             assert response.status_code in [200, 400, 500, 404]
 
+    def test_scalp_scan_requires_auth(self, client):
+        """Test batch scan requires authentication"""
+        response = client.post(
+            "/api/scalp/scan",
+            data=json.dumps({"tickers": ["AAPL"]}),
+            content_type="application/json"
+        )
+        assert response.status_code == 401
+
+    def test_scalp_scan_requires_universe(self, authenticated_client):
+        """Test batch scan rejects a request without a universe"""
+        response = authenticated_client.post(
+            "/api/scalp/scan",
+            data=json.dumps({"interval": "5"}),
+            content_type="application/json"
+        )
+        assert response.status_code in [400, 401]
+
+    def test_scalp_scan_rejects_bad_limit(self, authenticated_client):
+        """Test batch scan rejects a non-integer or non-positive limit"""
+        for limit, error in [("ten", "limit must be an integer"), (-1, "limit must be at least 1"), (0, "limit must be at least 1")]:
+            response = authenticated_client.post(
+                "/api/scalp/scan",
+                data=json.dumps({"tickers": ["AAPL"], "limit": limit}),
+                content_type="application/json"
+            )
+            assert response.status_code == 400
+            assert response.get_json()["error"] == error
+
 class TestSwingAPI:
     """Test swing trading analysis API"""
 
@@ -0,0 +1,53 @@
+"""
+Tests for SSE price streaming
+
+Covers per-subscriber coalescing and lock-free fan-out.
+"""
+
+import json
+import threading
+
+from web.api_sse import PriceMailbox, SSEPriceStreamer
+
+class TestPriceMailbox:
+    """Test latest-value-per-ticker coalescing"""
+
+    def test_newer_update_replaces_pending(self):
+        mailbox = PriceMailbox()
+        mailbox.put("AAPL", "a1")
+        mailbox.put("MSFT", "m1")
+        mailbox.put("AAPL", "a2")
+
+        assert mailbox.get(timeout=0) == ["a2", "m1"]
+        assert mailbox.get(timeout=0) == []
+
+    def test_get_wakes_on_put(self):
+        mailbox = PriceMailbox()
+        timer = threading.Timer(0.05, mailbox.put, args=("AAPL", "a1"))
+        timer.start()
+        assert mailbox.get(timeout=5) == ["a1"]
+
+class TestFanOut:
+    """Test broadcast to many subscribers"""
+
+    def test_lagging_client_gets_newest_price(self):
+        streamer = SSEPriceStreamer()
+        mailboxes = [PriceMailbox() for _ in range(3)]
+        streamer._subscribers = {"AAPL": tuple(mailboxes)}
+
+        for price in range(200):
+            streamer._broadcast("AAPL", {"ticker": "AAPL", "price": price})
+
+        for mailbox in mailboxes:
+            messages = mailbox.get(timeout=0)
+            assert [json.loads(m)["price"] for m in messages] == [199]
+
+    def test_unsubscribe_drops_empty_tickers(self):
+        streamer = SSEPriceStreamer()
+        streamer.start = lambda: None
+        first = streamer.subscribe(["aapl", "MSFT"])
+        second = streamer.subscribe(["AAPL"])
+
+        streamer.unsubscribe(first, ["AAPL", "MSFT"])
+
+        assert streamer._subscribers == {"AAPL": (second,)}
@@ -0,0 +1,206 @@
+"""
+Tests for the backtest engine and the BacktestJob worker
+
+Exit fills, sizing and equity use hand-built bars and a scripted strategy;
+the worker test runs inline against a temporary bar store.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import src.services.bar_store as bar_store_module
+from src.services.backtest_engine import Strategy, find_exit, run_backtest
+from src.services.bar_series import BarSeries
+from src.services.bar_store import BarStore
+from src.services.scalp_engine import ScalpAnalyzer
+from tests.test_scalp_engine import make_bars
+from web import scalp_service, swing_service
+from web.scalp_service import ScalpSignalStream
+from web.swing_service import SwingSignalStream
+
+FIVE_MINUTES = 300_000
+
+def flat_series(count=20, price=100.0, overrides=None):
+    """Bars at a constant price; overrides maps index -> (o, h, l, c)"""
+    o, h, l, c = (np.full(count, price) for _ in range(4))
+    h, l = h + 0.5, l - 0.5
+    for i, (bo, bh, bl, bc) in (overrides or {}).items():
+        o[i], h[i], l[i], c[i] = bo, bh, bl, bc
+    t = 1_700_000_000_000 + np.arange(count) * FIVE_MINUTES
+    return BarSeries(o=o, h=h, l=l, c=c, v=np.full(count, 1000.0), t=t)
+
+class ScriptedStrategy(Strategy):
+    """Signals fixed setups at chosen bars"""
+
+    name = "scripted"
+    window = 3
+    max_hold = 5
+
+    def __init__(self, setups):
+        self.setups = setups
+        self.calls = []
+
+    def prepare(self, series):
+        def evaluate(i):
+            self.calls.append(i)
+            return self.setups.get(i)
+
+        return evaluate
+
+class TestFindExit:
+    """Test stop/target/time exit fills"""
+
+    def test_stop_wins_when_bar_touches_both(self):
+        series = flat_series(overrides={6: (100, 103, 97, 100)})
+        assert find_exit(series, 5, "LONG", 98.0, 102.0, 10) == (6, 98.0, "stop")
+
+    def test_gap_fills_at_open(self):
+        series = flat_series(overrides={7: (96, 96.5, 95, 96)})
+        assert find_exit(series, 5, "LONG", 98.0, 102.0, 10) == (7, 96.0, "stop")
+        assert find_exit(series, 5, "SHORT", 102.0, 98.0, 10) == (7, 96.0, "target")
+
+    def test_time_and_end_of_data(self):
+        series = flat_series()
+        assert find_exit(series, 5, "LONG", 90.0, 110.0, 4) == (8, 100.0, "time")
+        assert find_exit(series, 15, "LONG", 90.0, 110.0, 10) == (19, 100.0, "end_of_data")
+
+class TestRunBacktest:
+    """Test the replay loop, sizing and equity curve"""
+
+    def test_trade_sizing_and_equity(self):
+        series = flat_series(overrides={6: (100, 104.5, 99.6, 104)})
+        strategy = ScriptedStrategy({4: {"direction": "LONG", "stop": 98.0, "target": 104.0}})
+        result = run_backtest(series, strategy, initial_capital=10000, fee_bps=0)
+
+        trade, = result["trades"]
+        # 1% of equity at risk over a $2 stop, capped at 1x equity (100 shares)
+        assert trade["quantity"] == 50.0
+        assert (trade["entry_index"], trade["exit_index"], trade["exit_reason"]) == (5, 6, "target")
+        assert trade["pnl"] == 200.0 and trade["r_multiple"] == 2.0
+
+        assert result["stats"]["final_equity"] == 10200.0
+        assert result["stats"]["win_rate"] == 100.0
+        assert result["equity_curve"][-1]["equity"] == 10200.0
+        # Flat while in the trade: bars 5 and 6 are never evaluated
+        assert 5 not in strategy.calls and 6 in strategy.calls
+
+    def test_invalid_setup_is_skipped(self):
+        series = flat_series()
+        strategy = ScriptedStrategy({4: {"direction": "LONG", "stop": 101.0, "target": 104.0}})
+        assert run_backtest(series, strategy)["trades"] == []
+
+    def test_warmup_bars_are_not_traded(self):
+        series = flat_series()
+        strategy = ScriptedStrategy({})
+        run_backtest(series, strategy, start_ms=int(series.t[10]))
+        assert strategy.calls[0] == 10
+
+    def test_scalp_signal_matches_live_analysis(self):
+        bars = make_bars(11, count=100)
+        analyzer = ScalpAnalyzer()
+        core = analyzer.evaluate_signal(BarSeries.from_bars(bars))
+        live = analyzer.analyze_bars("TEST", "5", bars)
+
+        assert core["signal_result"]["signal"] == live["signal"]
+        assert core["trade_setup"]["stop_loss"] == live["trade_setup"]["stop_loss"]
+
+    def test_signal_streams_match_generators(self, monkeypatch):
+        monkeypatch.setattr(swing_service, "_check_kill_zone", lambda: {"in_optimal_zone": False})
+        bars = make_bars(5, count=300)
+        trades = 0
+        for stream, generate in (
+            (ScalpSignalStream(bars), scalp_service.generate_scalp_signal),
+            (SwingSignalStream(bars), swing_service.generate_swing_signal),
+        ):
+            for i in range(len(bars)):
+                streamed, live = stream.signal(i), generate(bars[max(0, i - 99):i + 1])
+                if live:
+                    del streamed["generated_at"], live["generated_at"]
+                    trades += live["signal"] in ("LONG", "SHORT")
+                assert streamed == live, i
+        assert trades > 0
+
+class TestBacktestWorker:
+    """Test draining BacktestJob rows"""
+
+    def test_drain_jobs_inline(self, app_context, tmp_path, monkeypatch):
+        from scripts.cron_run_backtests import drain_jobs
+        from web.database import db, BacktestJob, User
+
+        bars = make_bars(5, count=400)
+        for i, bar in enumerate(bars):
+            bar["t"] = 1_704_067_200_000 + i * FIVE_MINUTES  # From 2024-01-01 UTC
+        store = BarStore(root=str(tmp_path), offline=False)
+        store.get_bars("BTJOB", "5minute", bars[0]["t"], bars[-1]["t"], fetch=lambda start, end: bars)
+        store.offline = True
+        monkeypatch.setattr(bar_store_module, "_bar_store", store)
+        monkeypatch.delenv("POLYGON_API_KEY", raising=False)
+
+        user = User(username="backtester", email="backtester@example.com")
+        user.set_password("testpassword123")
+        db.session.add(user)
+        db.session.commit()
+        start = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+        jobs = [
+            BacktestJob(user_id=user.id, ticker="BTJOB", start_date=start, end_date=datetime(2024, 1, 3)),
+            BacktestJob(user_id=user.id, ticker="MISSING", start_date=start, end_date=datetime(2024, 1, 3)),
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        try:
+            assert drain_jobs("scalp", "5", workers=0) == {"completed": 1, "failed": 1}
+            done, failed = (db.session.get(BacktestJob, job.id).to_dict() for job in jobs)
+            assert done["status"] == "completed" and done["completed_at"]
+            assert done["result"]["stats"]["bars"] == 256  # 400 bars minus the 144 before noon
+            assert failed["status"] == "failed" and "No stored bars" in failed["error_message"]
+            assert drain_jobs("scalp", "5", workers=0) == {"completed": 0, "failed": 0}
+        finally:
+            for job in jobs:
+                db.session.delete(job)
+            db.session.delete(user)
+            db.session.commit()
+
+    def test_stale_running_jobs_are_failed(self, app_context):
+        from scripts.cron_run_backtests import fail_stale_jobs
+        from web.database import db, BacktestJob, User
+
+        user = User(username="stale", email="stale@example.com")
+        user.set_password("testpassword123")
+        db.session.add(user)
+        db.session.commit()
+        now = datetime.now(timezone.utc)
+        jobs = [
+            BacktestJob(user_id=user.id, ticker="OLD", status="running", started_at=now - timedelta(hours=2),
+                        start_date=now, end_date=now),
+            BacktestJob(user_id=user.id, ticker="NEW", status="running", started_at=now, start_date=now, end_date=now),
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        try:
+            assert fail_stale_jobs(timeout_minutes=30) == 1
+            db.session.expire_all()
+            old, new = (db.session.get(BacktestJob, job.id) for job in jobs)
+            assert old.status == "failed" and "30 minutes" in old.error_message
+            assert new.status == "running"
+        finally:
+            for job in jobs:
+                db.session.delete(job)
+            db.session.delete(user)
+            db.session.commit()
+
+    def test_started_at_migration_is_idempotent(self, tmp_path):
+        from sqlalchemy import create_engine, inspect, text
+
+        from scripts.migrate_add_backtest_started_at import migrate
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        assert migrate(engine) is False  # No table yet: create_all builds it with the column
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE backtest_jobs (id INTEGER PRIMARY KEY, status VARCHAR(20))"))
+
+        assert migrate(engine) is True
+        assert migrate(engine) is False
+        assert "started_at" in {column["name"] for column in inspect(engine).get_columns("backtest_jobs")}
@@ -0,0 +1,135 @@
+"""
+Tests for the local OHLCV bar store
+
+Covers incremental head/tail fetching, offline mode and re-adjustment refetch.
+"""
+
+import pytest
+from unittest.mock import patch
+
+import src.services.bar_store as bar_store_module
+from src.services.bar_store import BarStore
+
+MINUTE = 60_000
+NOW = 1_700_000_000_000 // MINUTE * MINUTE
+
+def make_bars(start, end, scale=1.0):
+    return [
+        {"t": t, "o": t / MINUTE * scale, "h": t / MINUTE * scale + 1, "l": t / MINUTE * scale - 1,
+         "c": t / MINUTE * scale, "v": 100.0}
+        for t in range(start, end + 1, MINUTE)
+    ]
+
+class FakeFetcher:
+    def __init__(self, scale=1.0):
+        self.calls = []
+        self.scale = scale
+
+    def __call__(self, from_ms, to_ms):
+        self.calls.append((from_ms, to_ms))
+        return make_bars(from_ms, min(to_ms, NOW), self.scale)
+
+@pytest.fixture(autouse=True)
+def frozen_time():
+    with patch.object(bar_store_module.time, "time", return_value=NOW / 1000):
+        yield
+
+class TestBarStore:
+    """Test incremental fetching against a fake range fetcher"""
+
+    def test_first_call_fetches_and_second_is_local(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+        fetch = FakeFetcher()
+        start = NOW - 100 * MINUTE
+
+        series = store.get_bars("AAPL", "1minute", start, NOW, fetch)
+        assert len(series) == 101
+        assert series.t[0] == start and series.t[-1] == NOW
+
+        again = store.get_bars("AAPL", "1minute", start + 50 * MINUTE, NOW, fetch)
+        assert len(fetch.calls) == 1
+        assert len(again) == 51
+
+    def test_tail_fetches_only_new_bars(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+        fetch = FakeFetcher()
+        start = NOW - 100 * MINUTE
+        store.get_bars("AAPL", "1minute", start, NOW - 10 * MINUTE, fetch)
+
+        series = store.get_bars("AAPL", "1minute", start, NOW, fetch, refresh_seconds=0)
+
+        # Tail starts at the second-to-last stored bar
+        assert fetch.calls[-1] == (NOW - 11 * MINUTE, NOW)
+        assert len(series) == 101
+        assert list(series.t) == sorted(set(series.t))
+
+    def test_head_extends_history(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+        fetch = FakeFetcher()
+        store.get_bars("AAPL", "1minute", NOW - 50 * MINUTE, NOW, fetch)
+
+        series = store.get_bars("AAPL", "1minute", NOW - 100 * MINUTE, NOW, fetch)
+
+        assert fetch.calls[-1] == (NOW - 100 * MINUTE, NOW - 50 * MINUTE)
+        assert len(series) == 101
+        assert list(series.t) == sorted(set(series.t))
+
+    def test_offline_serves_stored_bars_only(self, tmp_path):
+        BarStore(root=str(tmp_path), offline=False).get_bars(
+            "AAPL", "1minute", NOW - 10 * MINUTE, NOW, FakeFetcher()
+        )
+        fetch = FakeFetcher()
+
+        series = BarStore(root=str(tmp_path), offline=True).get_bars(
+            "AAPL", "1minute", NOW - 100 * MINUTE, NOW, fetch
+        )
+
+        assert fetch.calls == []
+        assert len(series) == 11
+
+    def test_readjusted_history_is_refetched(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+        start = NOW - 100 * MINUTE
+        store.get_bars("AAPL", "1minute", start, NOW - 10 * MINUTE, FakeFetcher())
+
+        split = FakeFetcher(scale=0.5)
+        series = store.get_bars("AAPL", "1minute", start, NOW, split, refresh_seconds=0)
+
+        assert split.calls[-1] == (start, NOW)
+        assert series.c[0] == pytest.approx(start / MINUTE * 0.5)
+        assert len(series) == 101
+
+    def test_failed_fetch_is_not_recorded_as_covered(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+
+        assert len(store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, lambda a, b: None)) == 0
+
+        fetch = FakeFetcher()
+        assert len(store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, fetch)) == 11
+        assert len(fetch.calls) == 1
+
+    def test_vwap_and_trade_count_are_kept(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+
+        def fetch(from_ms, to_ms):
+            return [{**bar, "vw": bar["c"] + 0.5, "n": 42} for bar in make_bars(from_ms, min(to_ms, NOW))]
+
+        store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW - 5 * MINUTE, fetch)
+        series, extras = store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, fetch, refresh_seconds=0, extras=True)
+
+        assert len(series) == len(extras["vw"]) == 11
+        assert list(extras["vw"]) == list(series.c + 0.5)
+        assert set(extras["n"]) == {42.0}
+
+    def test_store_without_extras_is_refetched_once(self, tmp_path):
+        store = BarStore(root=str(tmp_path), offline=False)
+        store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, FakeFetcher())
+        meta_path = tmp_path / "1minute" / "AAPL" / "meta.json"
+        meta_path.write_text(meta_path.read_text().replace(', "extras": ["vw", "n"]', ""))
+
+        fetch = FakeFetcher()
+        series, extras = store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, fetch, extras=True)
+        store.get_bars("AAPL", "1minute", NOW - 10 * MINUTE, NOW, fetch)
+
+        assert len(fetch.calls) == 1
+        assert len(series) == 11 and all(v != v for v in extras["vw"])  # Binance-style bars: NaN
@@ -0,0 +1,118 @@
+"""
+Tests for the AI score cron job
+
+Covers provider rate budgets, the cross-run fundamentals cache, batched ML
+scoring with its rule-based fallback and feature store reads.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from scripts.cron_update_ai_scores import (
+    DEFAULT_FUNDAMENTALS,
+    SCORING_FEATURE_VERSION,
+    SCORING_FEATURES,
+    TokenBucket,
+    fetch_fundamentals,
+    load_cached_fundamentals,
+    predict_scores,
+    score_features,
+    stored_features,
+)
+
+class TestTokenBucket:
+    """Test the per-provider token bucket"""
+
+    def test_budget_is_enforced(self):
+        bucket = TokenBucket(rate=1000, capacity=2, budget=3)
+        assert [bucket.acquire() for _ in range(4)] == [True, True, True, False]
+
+    def test_unbounded_without_budget(self):
+        bucket = TokenBucket(rate=1000, capacity=5)
+        assert all(bucket.acquire() for _ in range(20))
+
+class TestFundamentalsCache:
+    """Test fundamentals reuse from AIScore.features_json"""
+
+    def record(self, age_days, **extra):
+        updated_at = datetime.now(timezone.utc) - timedelta(days=age_days)
+        features = {**DEFAULT_FUNDAMENTALS, "fundamentals_updated_at": updated_at.isoformat(), **extra}
+        return SimpleNamespace(features_json=json.dumps(features))
+
+    def test_fresh_and_stale(self):
+        assert load_cached_fundamentals(self.record(1))["fresh"] is True
+        assert load_cached_fundamentals(self.record(30))["fresh"] is False
+
+    def test_etf_flag_is_cached(self):
+        cached = load_cached_fundamentals(SimpleNamespace(features_json=json.dumps({"is_etf": True})))
+        assert cached == {"is_etf": True}
+
+    def test_missing_features(self):
+        assert load_cached_fundamentals(SimpleNamespace(features_json=None)) is None
+        assert load_cached_fundamentals(SimpleNamespace(features_json="{bad")) is None
+
+    def test_failed_fetch_keeps_previous_fundamentals(self):
+        class RateLimited:
+            def get_company_overview(self, ticker):
+                raise ValueError("Thank you for using Alpha Vantage! Our standard API rate limit is ...")
+
+        technicals = SimpleNamespace(result=lambda: {"is_etf": False})
+        stale = load_cached_fundamentals(self.record(30, pe_ratio=12.5))
+
+        kept = fetch_fundamentals("AAPL", RateLimited(), technicals, stale, TokenBucket(rate=1000))
+        assert kept["pe_ratio"] == 12.5
+        assert kept["fundamentals_updated_at"] == stale["fundamentals_updated_at"]
+
+        defaults = fetch_fundamentals("AAPL", RateLimited(), technicals, None, TokenBucket(rate=1000))
+        assert defaults == DEFAULT_FUNDAMENTALS
+
+class FakeModel:
+    """Batch scorer that gives no ML score to rows flagged missing"""
+
+    def predict_batch(self, features_list):
+        return [
+            {"short_term_score": None, "medium_term_score": None, "long_term_score": None}
+            if features.get("missing") else
+            {"short_term_score": 80, "medium_term_score": 62, "long_term_score": 30}
+            for features in features_list
+        ]
+
+    def get_ratings(self, scores):
+        return {f"{key[:-6]}_rating": "Rated" for key in scores}
+
+class TestBatchScoring:
+    """Test batch ML scores feeding score_features"""
+
+    def test_batch_scores_and_fallback(self):
+        features_list = [dict(DEFAULT_FUNDAMENTALS), {**DEFAULT_FUNDAMENTALS, "missing": True}]
+        scores = predict_scores(FakeModel(), features_list)
+
+        ml = score_features("AAPL", features_list[0], FakeModel(), scores[0])
+        assert (ml["score"], ml["short_term_score"], ml["long_term_rating"]) == (62, 80, "Rated")
+
+        fallback = score_features("MSFT", features_list[1], FakeModel(), scores[1])
+        assert fallback["short_term_score"] is None and fallback["rating"] != "Rated"
+
+    def test_no_model(self):
+        assert predict_scores(None, [{}, {}]) == [None, None]
+
+class TestStoredFeatures:
+    """Test scoring features read back from the feature store"""
+
+    def test_store_rows_merge_over_features_json(self, feature_store):
+        store = feature_store
+        store.append_day(SCORING_FEATURE_VERSION, "2024-01-02", {"AAPL": {"rsi": 61, "is_etf": False}}, SCORING_FEATURES)
+        existing = {
+            "AAPL": SimpleNamespace(features_json=json.dumps({"rsi": 40, "macd": 1.5, "fundamentals_updated_at": "x"})),
+            "MSFT": SimpleNamespace(features_json=json.dumps({"rsi": 50})),
+        }
+
+        features = stored_features(store, ["AAPL", "MSFT", "TSLA"], "2024-01-03", existing)
+        # NaN store values keep the features_json value
+        assert features["AAPL"] == {"rsi": 61.0, "macd": 1.5, "fundamentals_updated_at": "x", "is_etf": 0.0}
+        assert features["MSFT"] == {"rsi": 50}
+        assert "TSLA" not in features
+
+        today = stored_features(store, ["AAPL", "MSFT"], "2024-01-03", existing, max_age_days=0)
+        assert today == {}
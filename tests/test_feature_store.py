@@ -0,0 +1,86 @@
+"""
+Tests for the feature store
+
+Covers daily appends, same-day replacement, backfills, version feature
+checks and point-in-time cross-sections on the feature_rows table.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.services.feature_store import FeatureStore
+from web.database import db
+
+VERSION = "test-v1"
+
+def days(*dates):
+    return np.array(dates, dtype="datetime64[D]")
+
+class TestFeatureStoreWrites:
+    """Test upserts by as-of date"""
+
+    def test_append_and_same_day_replace(self, feature_store):
+        feature_store.write(VERSION, "aapl", days("2024-01-02", "2024-01-03"), {"rsi": [40, 45], "macd": [0.1, 0.2]})
+        feature_store.write(VERSION, "AAPL", days("2024-01-04"), {"macd": [0.3], "rsi": [50]})
+        assert feature_store.write(VERSION, "AAPL", days("2024-01-04"), {"rsi": [55], "macd": [0.4]}) == 3
+
+        rows = feature_store.read(VERSION, "AAPL")
+        assert list(rows.dates) == list(days("2024-01-02", "2024-01-03", "2024-01-04"))
+        assert rows.column("rsi").tolist() == [40, 45, 55]
+        assert rows.row(2) == {"rsi": 55.0, "macd": 0.4}
+
+    def test_backfill_merges_in_date_order(self, feature_store):
+        feature_store.write(VERSION, "MSFT", days("2024-01-03", "2024-01-05"), {"rsi": [3, 5]})
+        feature_store.write(VERSION, "MSFT", days("2024-01-05", "2024-01-02", "2024-01-04"), {"rsi": [50, 2, 4]})
+
+        rows = feature_store.read(VERSION, "MSFT", start="2024-01-03")
+        assert list(rows.dates) == list(days("2024-01-03", "2024-01-04", "2024-01-05"))
+        assert rows.column("rsi").tolist() == [3, 4, 50]
+
+    def test_feature_change_needs_new_version(self, feature_store):
+        feature_store.write(VERSION, "NVDA", days("2024-01-02"), {"rsi": [40]})
+        with pytest.raises(ValueError, match="bump the feature version"):
+            feature_store.write(VERSION, "NVDA", days("2024-01-03"), {"rsi": [40], "macd": [1]})
+        feature_store.write("test-v2", "NVDA", days("2024-01-03"), {"rsi": [40], "macd": [1]})
+        assert feature_store.tickers("test-v2") == ["NVDA"]
+
+    def test_rows_survive_a_new_store(self, feature_store):
+        feature_store.write(VERSION, "AMD", days("2024-01-02"), {"rsi": [float("nan")]})
+        db.session.expire_all()
+
+        rows = FeatureStore().read(VERSION, "AMD")
+        assert len(rows) == 1 and math.isnan(rows.column("rsi")[0])
+
+class TestPointInTimeReads:
+    """Test cross-sections as of a date"""
+
+    def test_as_of_uses_latest_row_on_or_before(self, feature_store):
+        feature_store.write(VERSION, "AAPL", days("2024-01-02", "2024-01-09"), {"rsi": [40, 70]})
+        feature_store.write(VERSION, "MSFT", days("2024-01-05"), {"rsi": [55]})
+        feature_store.write(VERSION, "TSLA", days("2024-01-10"), {"rsi": [20]})
+
+        snapshot = feature_store.as_of(VERSION, ["AAPL", "MSFT", "TSLA", "NONE"], "2024-01-08")
+        assert snapshot.tickers == ["AAPL", "MSFT"]
+        assert snapshot.to_dict() == {"AAPL": {"rsi": 40.0}, "MSFT": {"rsi": 55.0}}
+
+        recent = feature_store.as_of(VERSION, ["AAPL", "MSFT"], "2024-01-08", max_age_days=3)
+        assert recent.tickers == ["MSFT"]
+
+    def test_as_of_mixed_feature_order(self, feature_store):
+        feature_store.write(VERSION, "AAPL", days("2024-01-02", "2024-01-03", "2024-01-04"), {"rsi": [40, 45, 50], "macd": [1, 2, 3]})
+        feature_store.write(VERSION, "MSFT", days("2024-01-02"), {"macd": [9], "rsi": [60]})
+
+        snapshot = feature_store.as_of(VERSION, ["msft", "AAPL"], "2024-01-03")
+        assert snapshot.tickers == ["MSFT", "AAPL"]
+        assert list(snapshot.dates) == list(days("2024-01-02", "2024-01-03"))
+        assert snapshot.to_dict() == {"MSFT": {"macd": 9.0, "rsi": 60.0}, "AAPL": {"macd": 2.0, "rsi": 45.0}}
+        assert feature_store.as_of(VERSION, ["AAPL"], "2024-01-01").tickers == []
+
+    def test_append_day_stores_missing_as_nan(self, feature_store):
+        feature_store.append_day(VERSION, "2024-01-02", {"AAPL": {"rsi": 40, "is_etf": False}, "SPY": {"is_etf": True}}, ["rsi", "is_etf"])
+
+        today = feature_store.as_of(VERSION, ["AAPL", "SPY"], "2024-01-02", max_age_days=0).to_dict()
+        assert today["AAPL"] == {"rsi": 40.0, "is_etf": 0.0}
+        assert math.isnan(today["SPY"]["rsi"]) and today["SPY"]["is_etf"] == 1.0
@@ -0,0 +1,75 @@
+"""
+Tests for latency instrumentation
+
+Checks histogram quantiles against exact percentiles, the Prometheus
+output, and that requests are recorded by URL rule.
+"""
+
+import numpy as np
+import pytest
+
+from web.instrumentation import LatencyHistogram, MetricsRegistry, endpoint_family, registry, timed
+
+class TestLatencyHistogram:
+    """Test log-linear bucket quantiles"""
+
+    def test_quantiles_within_bucket_error(self):
+        rng = np.random.default_rng(3)
+        samples = rng.lognormal(mean=-3, sigma=1, size=20000)  # ~50ms median
+        histogram = LatencyHistogram()
+        for seconds in samples:
+            histogram.record(float(seconds))
+
+        estimates = histogram.quantiles()
+        for q in (0.5, 0.95, 0.99):
+            exact = float(np.quantile(samples, q))
+            assert exact <= estimates[q] <= exact * 1.07
+
+    def test_empty_and_max(self):
+        histogram = LatencyHistogram()
+        assert histogram.snapshot()["p99_ms"] == 0.0
+
+        histogram.record(0.25)
+        assert histogram.quantiles()[0.99] == pytest.approx(0.25)
+
+class TestMetricsRegistry:
+    """Test registry snapshots and Prometheus text"""
+
+    def test_prometheus_format(self):
+        metrics = MetricsRegistry()
+        metrics.observe("upstream", 'polygon "/v2"', 0.1)
+        text = metrics.prometheus()
+
+        assert "# TYPE qunex_latency_seconds summary" in text
+        assert 'qunex_latency_seconds{kind="upstream",name="polygon \\"/v2\\"",quantile="0.95"}' in text
+        assert 'qunex_latency_seconds_count{kind="upstream",name="polygon \\"/v2\\""} 1' in text
+
+    def test_snapshot_sorted_by_p95(self):
+        metrics = MetricsRegistry()
+        metrics.observe("route", "GET /fast", 0.001)
+        metrics.observe("route", "GET /slow", 0.5)
+        assert list(metrics.snapshot()["route"]) == ["GET /slow", "GET /fast"]
+
+    def test_timed_and_endpoint_family(self):
+        with timed("upstream", "test-block"):
+            pass
+        assert registry.histogram("upstream", "test-block").count >= 1
+        assert endpoint_family("/v2/aggs/ticker/AAPL/range/1/day?x=1") == "/v2/aggs"
+        assert endpoint_family("quote", 1) == "/quote"
+
+class TestMetricsEndpoints:
+    """Test request timing and admin-only access"""
+
+    def test_route_recorded_by_rule(self, client):
+        client.get("/api/admin/metrics")
+        assert registry.histogram("route", "GET /api/admin/metrics").count >= 1
+
+    def test_admin_only(self, client):
+        assert client.get("/api/admin/metrics").status_code == 403
+        assert client.get("/metrics").status_code == 403
+
+    def test_metrics_token(self, client, monkeypatch):
+        monkeypatch.setenv("METRICS_TOKEN", "secret")
+        response = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+        assert response.status_code == 200
+        assert b"qunex_latency_seconds" in response.data
@@ -0,0 +1,86 @@
+"""
+Tests for lazy blueprint loading and the boot report
+
+Checks that the committed route manifest matches the eagerly registered
+app, and that a lazy app serves stubs that swap in the real views.
+"""
+
+import importlib
+import sys
+
+import pytest
+
+from web.app import create_app
+from web.boot_report import BootProfile
+from web.config import Config
+from web.lazy_blueprints import build_manifest, load_manifest
+
+class LazyConfig(Config):
+    """Test configuration with lazy blueprints"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    WTF_CSRF_ENABLED = False
+    SECRET_KEY = "test-secret-key"
+    CACHE_TYPE = "SimpleCache"
+    RATELIMIT_ENABLED = False
+    LAZY_BLUEPRINTS = True
+
+@pytest.fixture(scope="module")
+def lazy_app():
+    return create_app(LazyConfig)
+
+class TestManifest:
+    """Test the committed manifest against the eager URL map"""
+
+    def test_manifest_up_to_date(self, app):
+        assert build_manifest(app) == load_manifest(), "Run scripts/build_blueprint_manifest.py"
+
+class TestLazyLoading:
+    """Test stub registration and first-hit loading"""
+
+    def test_url_map_matches_eager(self, app, lazy_app):
+        def rules(flask_app):
+            return sorted((r.rule, r.endpoint, tuple(sorted(r.methods))) for r in flask_app.url_map.iter_rules())
+
+        assert rules(lazy_app) == rules(app)
+
+    def test_first_request_swaps_real_views(self, lazy_app):
+        loader = lazy_app.extensions["lazy_blueprints"]
+        endpoint = "api_journal.get_journal_entries"
+        assert lazy_app.view_functions[endpoint].__name__.startswith("lazy_")
+        assert "web.api_journal" in loader.status()["pending"]
+
+        response = lazy_app.test_client().get("/api/journal/entries")
+
+        assert response.status_code == 401
+        assert lazy_app.view_functions[endpoint].__name__ == "get_journal_entries"
+        assert lazy_app.view_functions["api_journal.create_journal_entry"].__name__ == "create_journal_entry"
+        assert "web.api_journal" in loader.status()["loaded_ms"]
+
+    def test_url_for_before_load(self, lazy_app):
+        from flask import url_for
+
+        with lazy_app.test_request_context():
+            assert url_for("api_agents.get_agent_status", agent_name="scanner") == "/api/agents/scanner"
+
+class TestBootProfile:
+    """Test phase and import timing"""
+
+    def test_phases_and_imports(self):
+        sys.modules.pop("email.mime.audio", None)
+        profile = BootProfile()
+        profile.start(imports=True)
+        with profile.phase("step"):
+            importlib.import_module("email.mime.audio")
+        profile.finish()
+
+        report = profile.report()
+        assert "email.mime.audio" in profile.imports
+        assert profile._timer not in sys.meta_path and not profile.importing
+        assert [p["phase"] for p in report["phases"]] == ["step"]
+        assert report["total_ms"] >= report["phases"][0]["ms"]
+
+        with profile.phase("after boot"):
+            pass
+        assert len(profile.report()["phases"]) == 1
@@ -0,0 +1,122 @@
+"""
+Tests for the materialized leaderboard
+
+Checks that incremental trade updates match a full rebuild from trade history
+and that revaluation uses one shared snapshot for every account.
+"""
+
+from decimal import Decimal
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import text
+
+from web.database import db, LeaderboardMetrics, PaperAccount, PaperTrade, User
+from web.leaderboard_service import apply_trade, rebuild_metrics, reset_metrics, revalue_all, ranked_query
+
+TRADES = [
+    ("AAPL", "buy", "10", "100.00"),
+    ("MSFT", "buy", "5", "300.00"),
+    ("AAPL", "sell", "4", "110.00"),
+    ("TSLA", "buy", "2", "200.00"),
+    ("TSLA", "sell", "2", "190.00"),
+]
+
+COMPARED = ("cash", "total_trades", "wins", "losses", "win_rate", "positions_count", "positions_json", "total_pnl_pct")
+
+def _make_account(username: str) -> PaperAccount:
+    user = User(username=username, email=f"{username}@example.com", email_verified=True)
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    account = PaperAccount(user_id=user.id, balance=Decimal("100000.00"))
+    db.session.add(account)
+    db.session.flush()
+    return account
+
+def _trade(account: PaperAccount, ticker: str, trade_type: str, shares: str, price: str) -> PaperTrade:
+    """Mirror of /api/paper/trade: move cash, record the trade, fold it in"""
+    cost = Decimal(shares) * Decimal(price)
+    account.balance += -cost if trade_type == "buy" else cost
+    trade = PaperTrade(
+        user_id=account.user_id, ticker=ticker, shares=Decimal(shares), price=Decimal(price), trade_type=trade_type
+    )
+    db.session.add(trade)
+    apply_trade(account, trade)
+    db.session.commit()
+    return trade
+
+@pytest.fixture
+def accounts(app_context):
+    LeaderboardMetrics.query.delete()
+    created = [_make_account("leader_a"), _make_account("leader_b")]
+    db.session.commit()
+    yield created
+    for account in created:
+        LeaderboardMetrics.query.filter_by(user_id=account.user_id).delete()
+        PaperTrade.query.filter_by(user_id=account.user_id).delete()
+        user = db.session.get(User, account.user_id)
+        db.session.delete(account)
+        db.session.delete(user)
+    db.session.commit()
+
+class TestIncrementalMetrics:
+    """Test apply_trade against a full replay"""
+
+    def test_incremental_matches_rebuild(self, accounts):
+        account = accounts[0]
+        for trade in TRADES:
+            _trade(account, *trade)
+
+        row = LeaderboardMetrics.query.filter_by(user_id=account.user_id).one()
+        incremental = {field: getattr(row, field) for field in COMPARED}
+
+        rebuilt = rebuild_metrics(account)
+        assert {field: getattr(rebuilt, field) for field in COMPARED} == incremental
+        assert (row.total_trades, row.wins, row.losses, row.positions_count) == (5, 1, 1, 2)
+
+    def test_apply_trade_reloads_the_row(self, accounts):
+        account = accounts[0]
+        _trade(account, "AAPL", "buy", "10", "100.00")
+        row = LeaderboardMetrics.query.filter_by(user_id=account.user_id).one()
+        assert row.total_trades == 1
+
+        # Another worker's trade lands after this session loaded the row
+        db.session.execute(
+            text("UPDATE leaderboard_metrics SET total_trades = 2 WHERE user_id = :user_id"),
+            {"user_id": account.user_id},
+        )
+        _trade(account, "MSFT", "buy", "5", "300.00")
+        assert row.total_trades == 3
+
+    def test_reset_clears_metrics(self, accounts):
+        account = accounts[0]
+        _trade(account, "AAPL", "buy", "10", "100.00")
+
+        PaperTrade.query.filter_by(user_id=account.user_id).delete()
+        account.balance = Decimal("100000.00")
+        reset_metrics(account)
+        db.session.commit()
+
+        row = LeaderboardMetrics.query.filter_by(user_id=account.user_id).one()
+        assert (row.total_trades, row.positions_count, row.total_pnl_pct) == (0, 0, 0)
+
+class TestRevalue:
+    """Test batch mark-to-market and ranking"""
+
+    def test_one_snapshot_for_all_accounts(self, accounts):
+        first, second = accounts
+        _trade(first, "AAPL", "buy", "10", "100.00")
+        _trade(second, "AAPL", "buy", "10", "100.00")
+        _trade(second, "MSFT", "buy", "10", "100.00")
+
+        polygon = Mock()
+        polygon.get_market_snapshot.return_value = {"AAPL": {"price": 110.0}, "MSFT": {"price": 90.0}}
+
+        assert revalue_all(polygon) == 2
+        polygon.get_market_snapshot.assert_called_once_with(["AAPL", "MSFT"])
+
+        db.session.expire_all()
+        ranked = [row.user_id for row in ranked_query().all()]
+        assert ranked == [first.user_id, second.user_id]
+        assert LeaderboardMetrics.query.filter_by(user_id=first.user_id).one().total_pnl_pct == 0.1
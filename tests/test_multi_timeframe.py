@@ -0,0 +1,77 @@
+"""
+Tests for multi-timeframe bar derivation
+
+Checks BarSeries.resample against a dict-based aggregation and that
+MultiTimeframeSR fetches the finest timeframe once, resampling the rest.
+"""
+
+from unittest.mock import patch
+
+import numpy as np
+
+from src.services.bar_series import BarSeries
+from web.advanced_sr_analysis import MultiTimeframeSR, resample_bars
+
+FIVE_MIN = 300_000
+
+def _bars(n: int, start_ms: int = 1_700_000_100_000, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    closes = 50 + np.cumsum(rng.normal(0, 0.2, n))
+    return [
+        {"o": float(c - 0.1), "h": float(c + 0.3), "l": float(c - 0.4), "c": float(c), "v": float(rng.integers(1, 100)),
+         "t": start_ms + i * FIVE_MIN}
+        for i, c in enumerate(closes)
+    ]
+
+def _reference_resample(bars, span_ms):
+    groups = {}
+    for bar in bars:
+        groups.setdefault(bar["t"] // span_ms, []).append(bar)
+    out = []
+    for bucket, group in sorted(groups.items()):
+        out.append({
+            "o": group[0]["o"], "h": max(b["h"] for b in group), "l": min(b["l"] for b in group),
+            "c": group[-1]["c"], "v": sum(b["v"] for b in group), "t": bucket * span_ms,
+        })
+    return out
+
+class TestResample:
+    """Test epoch-aligned OHLCV aggregation"""
+
+    def test_matches_reference(self):
+        bars = _bars(500)
+        span = 15 * 60_000
+        result = BarSeries.from_bars(bars).resample(span, complete_only=False).to_bars()
+        assert result == _reference_resample(bars, span)
+
+    def test_drops_partial_leading_bucket(self):
+        bars = _bars(40)
+        resampled = resample_bars(bars, 60)
+
+        assert resampled[0]["t"] >= bars[0]["t"]
+        assert resampled[0]["t"] % 3_600_000 == 0
+        assert len(resampled) == len(_reference_resample(bars, 3_600_000)) - 1
+
+class TestMultiTimeframeFetch:
+    """Test one base fetch plus native fetches only where depth requires it"""
+
+    def test_plan(self):
+        base, derived, native = MultiTimeframeSR()._plan_timeframes(["5", "15", "60", "240"], 100)
+        assert (base, derived, native) == ("5", ["15", "60"], ["240"])
+
+    def test_base_fetched_once(self):
+        analyzer = MultiTimeframeSR()
+        base = _bars(1200)
+        native_240 = _bars(100, seed=4)
+
+        def fake_fetch(ticker, interval, limit):
+            return base[-limit:] if interval == "5" else native_240
+
+        with patch.object(analyzer, "_fetch_bars", side_effect=fake_fetch) as fetch:
+            data = analyzer.fetch_multi_timeframe_data("AAPL", ["5", "15", "60", "240"])
+
+        assert sorted(call.args[1:] for call in fetch.call_args_list) == [("240", 100), ("5", 1200)]
+        assert len(data["5"]) == 100
+        assert data["15"] == resample_bars(base, 15)[-100:]
+        assert data["60"] == resample_bars(base, 60)[-100:]
+        assert data["240"] is native_240
@@ -0,0 +1,140 @@
+"""
+Tests for the news ingestion pipeline
+
+Covers near-duplicate collapsing, bulk URL dedup, concurrent analysis and
+MarketDataService.refresh_news without touching Polygon or Gemini.
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from web.database import db, NewsArticle
+from src.services import news_pipeline
+from src.services.market_data_service import MarketDataService
+from src.services.news_pipeline import (
+    ANALYZED,
+    DEFERRED,
+    FILTERED,
+    analyze_concurrently,
+    collapse_near_duplicates,
+    select_new_items,
+)
+
+def news_item(title, url, tickers=None):
+    return {
+        "title": title,
+        "description": "desc",
+        "url": url,
+        "source": "Wire",
+        "published_at": "2025-01-02T15:00:00Z",
+        "tickers": tickers or [],
+    }
+
+@pytest.fixture
+def clean_news(app_context):
+    NewsArticle.query.delete()
+    db.session.commit()
+    yield
+    NewsArticle.query.delete()
+    db.session.commit()
+
+class TestNearDuplicates:
+    """Test syndicated headline collapsing"""
+
+    def test_syndicated_titles_collapse(self):
+        items = [
+            news_item("Apple Beats Earnings Estimates as iPhone Sales Surge - Reuters", "u1", ["AAPL"]),
+            news_item("Apple beats earnings estimates as iPhone sales surge | Yahoo Finance", "u2", ["QQQ"]),
+            news_item("Tesla recalls 10,000 vehicles", "u3"),
+        ]
+        kept, dropped = collapse_near_duplicates(items)
+
+        assert dropped == 1
+        assert [item["url"] for item in kept] == ["u1", "u3"]
+        assert kept[0]["tickers"] == ["AAPL", "QQQ"]
+
+    def test_different_stories_are_kept(self):
+        items = [news_item("Apple beats estimates", "u1"), news_item("Apple misses estimates badly", "u2")]
+        kept, dropped = collapse_near_duplicates(items)
+        assert dropped == 0 and len(kept) == 2
+
+class TestSelectNewItems:
+    """Test the bulk existence check"""
+
+    def test_one_query_filters_stored_and_repeated_urls(self, clean_news):
+        stored = news_item("Old story", "https://x/old")
+        db.session.add(
+            NewsArticle(title=stored["title"], url=stored["url"], published_at=news_pipeline.parse_published_at(None))
+        )
+        db.session.commit()
+
+        items = [
+            news_item("Old story", "https://x/old"),
+            news_item("New", "https://x/new"),
+            news_item("New again", "https://x/new"),
+        ]
+        with patch.object(news_pipeline, "existing_urls", wraps=news_pipeline.existing_urls) as lookup:
+            new_items = select_new_items(items)
+
+        lookup.assert_called_once()
+        assert [item["title"] for item in new_items] == ["New"]
+
+class TestAnalyzeConcurrently:
+    """Test concurrent analysis through the API governor"""
+
+    def test_runs_in_parallel_and_keeps_order(self):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def analyze(item):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return {"importance": 5} if item["url"] != "skip" else None
+
+        analyzer = MagicMock()
+        analyzer.analyze_single_news.side_effect = analyze
+        items = [news_item(f"t{i}", "skip" if i == 2 else f"u{i}") for i in range(6)]
+
+        with patch("agents.api_governor.APIGovernor.acquire_permission", return_value=True):
+            results = analyze_concurrently(analyzer, items, workers=6)
+
+        assert [status for status, _ in results] == [ANALYZED, ANALYZED, FILTERED, ANALYZED, ANALYZED, ANALYZED]
+        assert peak[0] > 1
+
+    def test_quota_exhaustion_defers(self):
+        analyzer = MagicMock()
+
+        async def refuse(*args, **kwargs):
+            return False
+
+        with patch("agents.api_governor.APIGovernor.acquire_permission", side_effect=refuse):
+            results = analyze_concurrently(analyzer, [news_item("t", "u")], timeout=0)
+
+        assert results == [(DEFERRED, None)]
+        analyzer.analyze_single_news.assert_not_called()
+
+class TestRefreshNews:
+    """Test the staged refresh end to end"""
+
+    def test_refresh_saves_deduplicated_articles(self, clean_news, monkeypatch):
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        items = [
+            news_item("Fed holds rates steady - Reuters", "https://x/1"),
+            news_item("Fed holds rates steady - CNBC", "https://x/2"),
+            news_item("Oil jumps on supply cut", "https://x/3"),
+        ]
+
+        with patch("src.news_collector.NewsCollector.collect_all_news", return_value=items):
+            first = MarketDataService.refresh_news()
+            second = MarketDataService.refresh_news()
+
+        assert first["success"] and first["count"] == 2 and first["duplicates"] == 1
+        assert second["count"] == 0
+        assert NewsArticle.query.count() == 2
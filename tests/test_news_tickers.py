@@ -0,0 +1,144 @@
+"""
+Tests for the news ticker index
+
+Covers mention extraction, index lookups, indexing during refresh_news and
+the backfill job for articles stored before the index existed.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from scripts.backfill_news_tickers import backfill_news_tickers
+from scripts.cron_update_ai_scores import calculate_news_sentiment
+from src.services.market_data_service import MarketDataService
+from src.services.news_tickers import (
+    average_ratings,
+    extract_tickers,
+    index_articles,
+    index_new_articles,
+    recent_articles,
+)
+from tests.test_news_pipeline import news_item
+from web.database import db, NewsArticle, NewsTicker
+
+@pytest.fixture
+def clean_news(app_context):
+    NewsTicker.query.delete()
+    NewsArticle.query.delete()
+    db.session.commit()
+    yield
+    NewsTicker.query.delete()
+    NewsArticle.query.delete()
+    db.session.commit()
+
+def add_articles(*titles):
+    """Store articles an hour apart, oldest first, without indexing them"""
+    start = datetime(2025, 1, 2, 9)
+    articles = [
+        NewsArticle(title=title, url=f"https://x/{i}", published_at=start + timedelta(hours=i))
+        for i, title in enumerate(titles)
+    ]
+    db.session.add_all(articles)
+    db.session.commit()
+    return articles
+
+class TestExtractTickers:
+    """Test mention extraction"""
+
+    def test_tags_cashtags_and_exchange_references(self):
+        tickers = extract_tickers(
+            "$TSLA rallies as Ford (NYSE: F) cuts prices", "Shares of $tsla peers moved", tagged=["aapl", "TSLA"]
+        )
+        assert tickers == ["AAPL", "TSLA", "F"]
+
+    def test_bare_words_need_a_known_ticker(self):
+        known = {"NVDA", "AI", "T"}
+        tickers = extract_tickers("NVDA CEO says AI demand is strong; AT&T and T-Mobile slip", known=known)
+        # "AI" is a headline acronym and single letters only count as cashtags or tags
+        assert tickers == ["NVDA"]
+        assert extract_tickers("Stocks rise on AI optimism") == []
+
+class TestIndexLookups:
+    """Test recent_articles against the NewsTicker index"""
+
+    def test_newest_first_across_tickers(self, clean_news):
+        articles = add_articles("Apple and Microsoft", "Tesla slips", "Microsoft beats", "Apple falls")
+        tagged = [["AAPL", "MSFT"], ["TSLA"], ["MSFT"], ["AAPL"]]
+        index_articles(
+            [{"id": a.id, "title": a.title, "published_at": a.published_at, "tickers": t} for a, t in zip(articles, tagged)],
+            known=set(),
+        )
+        db.session.commit()
+
+        assert [a.title for a in recent_articles(["aapl", "MSFT"], limit=3)] == [
+            "Apple falls",
+            "Microsoft beats",
+            "Apple and Microsoft",
+        ]
+        assert [a.title for a in recent_articles(["TSLA"])] == ["Tesla slips"]
+        assert recent_articles(["T"]) == []
+
+    def test_average_ratings_and_sentiment(self, clean_news):
+        articles = add_articles("$AAPL beats", "$AAPL slips", "AT&T and AI stocks", "$TSLA unrated")
+        for article, rating in zip(articles, [5, 3, 1, None]):
+            article.ai_rating = rating
+        index_articles(
+            [{"id": a.id, "title": a.title, "published_at": a.published_at} for a in articles], known={"T", "AI"}
+        )
+        db.session.commit()
+
+        assert average_ratings(["aapl", "T", "AI", "TSLA"], datetime(2025, 1, 1)) == {"AAPL": 4.0}
+        assert average_ratings(["AAPL"], datetime(2025, 1, 2, 10)) == {"AAPL": 3.0}
+
+        with patch("scripts.cron_update_ai_scores.datetime") as clock:
+            clock.now.return_value = datetime(2025, 1, 5)
+            assert calculate_news_sentiment(["AAPL", "T"]) == {"AAPL": 0.8, "T": 0.5}
+
+    def test_stock_news_endpoint(self, app, clean_news):
+        article, = add_articles("Buy $AMD now")
+        index_articles([{"id": article.id, "title": article.title, "published_at": article.published_at}], known=set())
+        db.session.commit()
+
+        with app.test_client() as client:
+            data = client.get("/api/stock/amd/news").get_json()
+            searched = client.get("/api/news/search?ticker=AMD&keyword=Buy").get_json()
+        assert [a["title"] for a in data["articles"]] == ["Buy $AMD now"]
+        assert [a["title"] for a in searched["articles"]] == ["Buy $AMD now"]
+
+class TestIndexing:
+    """Test index writes at ingestion and in the backfill job"""
+
+    def test_refresh_indexes_provider_tags(self, clean_news, monkeypatch):
+        monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+        items = [news_item("Chipmakers rally", "https://x/chips", ["NVDA", "AMD"]), news_item("Oil jumps", "https://x/oil")]
+
+        with patch("src.news_collector.NewsCollector.collect_all_news", return_value=items):
+            assert MarketDataService.refresh_news()["count"] == 2
+
+        assert sorted(row.ticker for row in NewsTicker.query) == ["AMD", "NVDA"]
+        assert [a.title for a in recent_articles(["NVDA"])] == ["Chipmakers rally"]
+
+    def test_backfill_is_resumable_and_idempotent(self, clean_news):
+        articles = add_articles("$AAPL gains", "Markets flat", "(NASDAQ: MSFT) update")
+
+        totals = backfill_news_tickers(batch_size=2)
+        assert totals == {"articles": 3, "mentions": 2, "last_id": articles[-1].id}
+
+        resumed = backfill_news_tickers(batch_size=2, start_id=articles[0].id)
+        assert resumed["articles"] == 2
+        assert sorted((row.article_id, row.ticker) for row in NewsTicker.query) == [
+            (articles[0].id, "AAPL"),
+            (articles[2].id, "MSFT"),
+        ]
+
+    def test_index_failure_rolls_back(self, clean_news):
+        article, = add_articles("$AAPL gains")
+        error = OperationalError("INSERT", {}, Exception("database is locked"))
+
+        with patch("src.services.news_tickers.index_articles", side_effect=error):
+            assert index_new_articles([{"url": article.url}]) == 0
+        assert NewsTicker.query.count() == 0
+        assert index_new_articles([{"url": article.url}]) == 1
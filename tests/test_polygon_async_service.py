@@ -0,0 +1,123 @@
+"""
+Tests for the async Polygon bulk client
+
+Uses a fake aiohttp session so no network is touched.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from web.instrumentation import registry
+from web.polygon_async_service import SNAPSHOT_ENDPOINT, AsyncPolygonService, PolygonBulkClient
+from web.polygon_service import PolygonService
+
+class FakeSession:
+    """Minimal aiohttp session stand-in that tracks concurrent requests"""
+
+    def __init__(self, delay=0.02, status=200):
+        self.delay = delay
+        self.status = status
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.urls = []
+
+    def get(self, url, params=None, timeout=None):
+        session = self
+
+        class Response:
+            status = session.status
+
+            async def __aenter__(self):
+                session.urls.append(url)
+                session.in_flight += 1
+                session.max_in_flight = max(session.max_in_flight, session.in_flight)
+                await asyncio.sleep(session.delay)
+                return self
+
+            async def __aexit__(self, *exc):
+                session.in_flight -= 1
+
+            async def json(self):
+                ticker = url.rsplit("/", 1)[-1]
+                return {"status": "OK", "ticker": {"ticker": ticker, "day": {"c": 10.0}, "prevDay": {"c": 9.0}}}
+
+        return Response()
+
+@pytest.fixture
+def bulk_client():
+    client = PolygonBulkClient(AsyncPolygonService(api_key="test", max_concurrency=10))
+    yield client
+    client.run(asyncio.sleep(0))
+    client._loop.call_soon_threadsafe(client._loop.stop)
+
+class TestGetMany:
+    """Test bounded concurrent fan-out"""
+
+    def test_fan_out_is_concurrent_and_bounded(self, bulk_client):
+        session = FakeSession()
+        tickers = [f"T{i}" for i in range(100)] + ["T0"]
+
+        async def get_session():
+            return session
+
+        with patch("src.services.async_http_service.AsyncHttpClient.get_session", side_effect=get_session):
+            results = bulk_client.get_many(SNAPSHOT_ENDPOINT, tickers)
+
+        assert len(results) == 100
+        assert results["T42"]["ticker"]["ticker"] == "T42"
+        assert len(session.urls) == 100  # Duplicate requested once
+        assert session.max_in_flight == 10
+
+    def test_requests_are_timed_as_upstream(self, bulk_client):
+        session = FakeSession(delay=0)
+        histogram = registry.histogram("upstream", "polygon /v2/snapshot")
+        before = histogram.count
+
+        async def get_session():
+            return session
+
+        with patch("src.services.async_http_service.AsyncHttpClient.get_session", side_effect=get_session):
+            bulk_client.get_many(SNAPSHOT_ENDPOINT, ["AAPL", "MSFT", "NVDA"])
+
+        assert histogram.count == before + 3
+
+    def test_http_errors_become_none(self, bulk_client):
+        session = FakeSession(status=403)
+
+        async def get_session():
+            return session
+
+        with patch("src.services.async_http_service.AsyncHttpClient.get_session", side_effect=get_session):
+            assert bulk_client.get_many(SNAPSHOT_ENDPOINT, ["OTCX"]) == {"OTCX": None}
+
+class TestPolygonServiceBulk:
+    """PolygonService bulk endpoints go through the async client"""
+
+    def test_extended_hours_bulk(self, bulk_client):
+        session = FakeSession()
+        polygon = PolygonService(api_key="test")
+
+        async def get_session():
+            return session
+
+        with patch("src.services.async_http_service.AsyncHttpClient.get_session", side_effect=get_session), \
+                patch("web.polygon_service.get_polygon_bulk_client", return_value=bulk_client), \
+                patch.object(polygon, "get_market_status", return_value={"market": "open"}) as status:
+            results = polygon.get_extended_hours_bulk([f"T{i}" for i in range(50)])
+
+        status.assert_called_once()
+        assert len(results) == 50
+        assert results["T7"]["session_type"] == "regular"
+        assert results["T7"]["day_change"] == 1.0
+
+    def test_sequential_fallback_without_bulk_client(self):
+        polygon = PolygonService(api_key="test")
+
+        with patch("web.polygon_service.get_polygon_bulk_client", return_value=None), \
+                patch.object(polygon, "_make_request", return_value={"status": "OK"}) as request:
+            results = polygon.get_many(SNAPSHOT_ENDPOINT, ["AAPL", "MSFT"])
+
+        assert request.call_count == 2
+        assert set(results) == {"AAPL", "MSFT"}
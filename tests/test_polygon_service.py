@@ -0,0 +1,192 @@
+"""
+Tests for PolygonService
+
+Covers snapshot fetching without touching the network.
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+import web.polygon_service as polygon_module
+from web.polygon_service import LRUCache, PolygonService
+
+def raw_ticker(ticker, price):
+    return {
+        "ticker": ticker,
+        "day": {"c": price, "v": 1000},
+        "prevDay": {"c": price - 1},
+        "lastTrade": {"p": price},
+    }
+
+@pytest.fixture(autouse=True)
+def reset_full_snapshot():
+    polygon_module._full_snapshot["fetched_at"] = None
+    polygon_module._full_snapshot["tickers"] = {}
+    yield
+    polygon_module._full_snapshot["fetched_at"] = None
+    polygon_module._full_snapshot["tickers"] = {}
+
+class TestMarketSnapshot:
+    """Test targeted and full-market snapshot modes"""
+
+    def test_targeted_uses_tickers_param(self):
+        polygon = PolygonService(api_key="test")
+
+        def fake_request(endpoint, params=None):
+            tickers = params["tickers"].split(",")
+            return {"status": "OK", "tickers": [raw_ticker(t, 10.0) for t in tickers]}
+
+        with patch.object(polygon, "_make_request", side_effect=fake_request) as request:
+            snapshot = polygon.get_market_snapshot(["AAPL", "MSFT", "AAPL"])
+
+        request.assert_called_once()
+        assert request.call_args[0][1] == {"tickers": "AAPL,MSFT"}
+        assert set(snapshot) == {"AAPL", "MSFT"}
+        assert snapshot["AAPL"]["change"] == 1.0
+
+    def test_targeted_is_chunked(self):
+        polygon = PolygonService(api_key="test")
+        tickers = [f"T{i}" for i in range(polygon_module.SNAPSHOT_CHUNK_SIZE + 5)]
+
+        def fake_request(endpoint, params=None):
+            return {"status": "OK", "tickers": [raw_ticker(t, 5.0) for t in params["tickers"].split(",")]}
+
+        with patch.object(polygon, "_make_request", side_effect=fake_request) as request:
+            snapshot = polygon.get_market_snapshot(tickers)
+
+        assert request.call_count == 2
+        assert len(snapshot) == len(tickers)
+
+    def test_full_market_snapshot_is_shared(self):
+        full = {"status": "OK", "tickers": [raw_ticker("AAPL", 150.0), raw_ticker("MSFT", 300.0)]}
+        first, second = PolygonService(api_key="test"), PolygonService(api_key="test")
+
+        with patch.object(first, "_make_request", return_value=full) as request:
+            snapshot = first.get_market_snapshot(["AAPL"], targeted=False)
+        assert request.call_count == 1
+        assert snapshot["AAPL"]["price"] == 150.0
+
+        # A fresh full-market snapshot serves other instances without a request
+        with patch.object(second, "_make_request") as request:
+            snapshot = second.get_market_snapshot(["MSFT", "NOPE"])
+        request.assert_not_called()
+        assert list(snapshot) == ["MSFT"]
+
+class TestLRUCache:
+    """Test the bounded LRU+TTL response cache"""
+
+    def test_lru_eviction_by_count(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" is now least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        cache = LRUCache(max_entries=100, max_bytes=20)
+        cache.set("a", "x" * 10)
+        cache.set("b", "y" * 10)
+        assert cache.stats()["size"] == 1
+        assert cache.get("b") == "y" * 10
+
+        cache.set("huge", "z" * 100)  # Larger than the whole cache
+        assert cache.get("huge") is None
+
+    def test_ttl_uses_monotonic_clock(self):
+        cache = LRUCache()
+        with patch.object(polygon_module.time, "monotonic", return_value=1000.0):
+            cache.set("a", 1, ttl_seconds=10)
+        with patch.object(polygon_module.time, "monotonic", return_value=1009.0):
+            assert cache.get("a") == 1
+        with patch.object(polygon_module.time, "monotonic", return_value=1010.0):
+            assert cache.get("a") is None
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 1, 1)
+        assert "keys" not in stats
+
+    def test_single_flight_load(self):
+        cache = LRUCache()
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(5)
+            return {"value": 42}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 8
+
+    def test_none_is_not_cached(self):
+        cache = LRUCache()
+        assert cache.get_or_load("k", lambda: None) is None
+        assert cache.get_or_load("k", lambda: 5) == 5
+
+class TestRequestCoalescing:
+    """Concurrent identical requests share one upstream call"""
+
+    def test_concurrent_requests_share_one_call(self):
+        polygon = PolygonService(api_key="test")
+        release = threading.Event()
+        calls = []
+
+        def fake_request_once(endpoint, params):
+            calls.append(endpoint)
+            release.wait(5)
+            return {"status": "OK", "results": {"ticker": "AAPL", "type": "CS"}}
+
+        results = []
+        with patch.object(polygon, "_request_once", side_effect=fake_request_once):
+            threads = [
+                threading.Thread(target=lambda: results.append(polygon.get_ticker_details("AAPL")))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            release.set()
+            for thread in threads:
+                thread.join(5)
+
+            assert polygon.get_ticker_details("AAPL")["type"] == "CS"  # Served from cache
+
+        assert calls == ["/v3/reference/tickers/AAPL"]
+        assert len(results) == 5
+
+class TestAggregates:
+    """Test get_aggregates served from the bar store"""
+
+    def test_vwap_and_transactions_are_returned(self, tmp_path, monkeypatch):
+        import src.services.bar_store as bar_store_module
+
+        monkeypatch.setattr(bar_store_module, "_bar_store", bar_store_module.BarStore(root=str(tmp_path), offline=False))
+        day = 86_400_000
+        start = 1_704_171_600_000  # 2024-01-02 00:00 US/Eastern
+
+        def fetcher(*args, **kwargs):
+            return lambda from_ms, to_ms: [
+                {"t": start + i * day, "o": 10, "h": 11, "l": 9, "c": 10.5, "v": 100, "vw": 10.25, "n": 7} for i in range(3)
+            ]
+
+        monkeypatch.setattr(bar_store_module, "polygon_range_fetcher", fetcher)
+        bars = PolygonService(api_key="test").get_aggregates("AAPL", 1, "day", "2024-01-02", "2024-01-04")
+
+        assert len(bars) == 3
+        assert (bars[0]["vwap"], bars[0]["transactions"]) == (10.25, 7)
@@ -0,0 +1,108 @@
+"""
+Tests for the vectorized portfolio risk engine
+
+Checks the NumPy metrics against straightforward loop implementations and
+beta/correlation against a synthetic benchmark.
+"""
+
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.services.risk_engine import EquityCurve, compute_risk, load_equity_curve
+from web.database import db, PortfolioSnapshot, User
+
+def _curve(values) -> EquityCurve:
+    start = date(2024, 1, 1)
+    return EquityCurve([start + timedelta(days=i) for i in range(len(values))], values, [0.0] * len(values))
+
+def _random_walk(n: int, seed: int = 3) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 100000 * np.cumprod(1 + rng.normal(0.0005, 0.01, n))
+
+class TestComputeRisk:
+    """Test metrics against loop reference implementations"""
+
+    def test_matches_loop_reference(self):
+        values = list(_random_walk(300))
+        metrics = compute_risk(_curve(values))
+
+        returns = [(values[i] - values[i - 1]) / values[i - 1] for i in range(1, len(values))]
+        mean = sum(returns) / len(returns)
+        volatility = math.sqrt(sum((r - mean) ** 2 for r in returns) / len(returns)) * math.sqrt(252)
+        sharpe = (mean * 252 - 0.05) / volatility
+
+        peak, max_drawdown = values[0], 0.0
+        for value in values:
+            peak = max(peak, value)
+            max_drawdown = max(max_drawdown, (peak - value) / peak)
+
+        assert metrics["annualized_volatility"] == round(volatility * 100, 2)
+        assert metrics["sharpe_ratio"] == round(sharpe, 2)
+        assert metrics["max_drawdown"] == round(max_drawdown * 100, 2)
+        assert metrics["up_days"] + metrics["down_days"] == len(returns)
+        assert len(metrics["series"]["drawdown"]) == len(values)
+
+    def test_drawdown_duration_and_var(self):
+        values = [100, 110, 99, 104, 108, 112, 111, 120]
+        metrics = compute_risk(_curve(values))
+
+        # Under the 110 peak for three points (99, 104, 108)
+        assert metrics["max_drawdown_duration"] == 3
+        assert metrics["max_drawdown"] == 10.0
+        assert 0 < metrics["var_95"] <= metrics["cvar_95"]
+        assert metrics["cvar_95"] == -metrics["worst_day"]
+
+    def test_rolling_window(self):
+        metrics = compute_risk(_curve(list(_random_walk(80))), window=20)
+        rolling = metrics["series"]["rolling_sharpe"]
+
+        assert rolling[:20] == [None] * 20
+        assert all(x is not None for x in rolling[20:])
+        assert metrics["rolling_sharpe"] == rolling[-1]
+
+    def test_beta_against_benchmark(self):
+        benchmark = _random_walk(250, seed=11)
+        market = np.diff(benchmark) / benchmark[:-1]
+        # Portfolio moves 1.5x the market each day
+        portfolio = 100000 * np.concatenate(([1.0], np.cumprod(1 + 1.5 * market)))
+
+        metrics = compute_risk(_curve(list(portfolio)), benchmark)
+
+        assert metrics["beta"] == 1.5
+        assert metrics["correlation"] == 1.0
+
+    def test_no_benchmark(self):
+        metrics = compute_risk(_curve([100, 101, 102]))
+        assert metrics["beta"] is None and metrics["sortino_ratio"] == "∞"
+
+class TestLoadEquityCurve:
+    """Test the columnar snapshot query"""
+
+    @pytest.fixture
+    def snapshots(self, app_context):
+        user = User(username="risky", email="risky@example.com", email_verified=True)
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        start = date(2024, 3, 1)
+        for i, value in enumerate([1000, 1010, 990]):
+            db.session.add(PortfolioSnapshot(
+                user_id=user.id, snapshot_date=start + timedelta(days=2 - i), total_value=value, daily_pnl=None
+            ))
+        db.session.commit()
+        yield user
+        PortfolioSnapshot.query.filter_by(user_id=user.id).delete()
+        db.session.delete(user)
+        db.session.commit()
+
+    def test_ordered_arrays(self, snapshots):
+        curve = load_equity_curve(snapshots.id)
+
+        assert list(curve.values) == [990.0, 1010.0, 1000.0]
+        assert str(curve.dates[0]) == "2024-03-01"
+        assert list(curve.pnl) == [0.0, 0.0, 0.0]
+
+        assert len(load_equity_curve(snapshots.id, date(2024, 3, 2))) == 2
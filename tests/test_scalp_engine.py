@@ -0,0 +1,207 @@
+"""
+Tests for the Scalp Engine
+
+Checks the columnar BarSeries analyzers against reference List[Dict] loops.
+"""
+
+import random
+
+import pytest
+
+from src.services.bar_series import BarSeries
+from src.services.scalp_engine import (
+    FakeoutDetector,
+    FVGAnalyzer,
+    OrderBlockAnalyzer,
+    ScalpAnalyzer,
+    SupportResistance,
+    VolumeAnalyzer,
+)
+
+def make_bars(seed, count=300):
+    """Random-walk bars with occasional gaps so FVGs and engulfings show up"""
+    rng = random.Random(seed)
+    bars = []
+    price = 100.0
+    for i in range(count):
+        jump = rng.choice([0, 0, 0, 0, 1.5, -1.5]) * rng.random()
+        open_ = price + jump
+        close = open_ + rng.gauss(0, 0.8)
+        high = max(open_, close) + abs(rng.gauss(0, 0.4))
+        low = min(open_, close) - abs(rng.gauss(0, 0.4))
+        volume = rng.choice([0, rng.randint(1000, 50000), rng.randint(1000, 200000)])
+        bars.append({"t": 1700000000000 + i * 300000, "o": open_, "h": high, "l": low, "c": close, "v": volume})
+        price = close
+    return bars
+
+# Reference List[Dict] implementations (the original per-bar loops)
+
+def reference_fvg(bars, min_gap_percent=0.1):
+    bullish, bearish = [], []
+    current_price = bars[-1].get("c", 0)
+    for i in range(2, len(bars)):
+        c1_high, c1_low = bars[i - 2].get("h", 0), bars[i - 2].get("l", 0)
+        c3_high, c3_low = bars[i].get("h", 0), bars[i].get("l", 0)
+        if c1_high < c3_low:
+            gap = c3_low - c1_high
+            pct = (gap / c1_high * 100) if c1_high > 0 else 0
+            if pct >= min_gap_percent:
+                bullish.append({"type": "bullish", "top": c3_low, "bottom": c1_high, "size": gap,
+                                "size_percent": round(pct, 2), "index": i,
+                                "filled": current_price <= c3_low, "strength": min(100, 60 + int(pct * 40))})
+        if c1_low > c3_high:
+            gap = c1_low - c3_high
+            pct = (gap / c3_high * 100) if c3_high > 0 else 0
+            if pct >= min_gap_percent:
+                bearish.append({"type": "bearish", "top": c1_low, "bottom": c3_high, "size": gap,
+                                "size_percent": round(pct, 2), "index": i,
+                                "filled": current_price >= c3_high, "strength": min(100, 60 + int(pct * 40))})
+    return bullish, bearish
+
+def reference_order_blocks(bars):
+    bullish, bearish, double = [], [], None
+
+    def body(bar):
+        o, c = bar.get("o", 0), bar.get("c", 0)
+        return max(o, c), min(o, c), c > o
+
+    for i in range(1, len(bars)):
+        pt, pb, pbull = body(bars[i - 1])
+        ct, cb, cbull = body(bars[i])
+        engulfs = cb <= pb and ct >= pt
+        if not pbull and cbull and engulfs:
+            bullish.append({"type": "bullish", "zone_top": pt, "zone_bottom": pb, "index": i,
+                            "strength": 70, "is_double": False})
+        if pbull and not cbull and engulfs:
+            bearish.append({"type": "bearish", "zone_top": pt, "zone_bottom": pb, "index": i,
+                            "strength": 70, "is_double": False})
+    for i in range(2, len(bars)):
+        t1, b1, bull1 = body(bars[i - 2])
+        t2, b2, bull2 = body(bars[i - 1])
+        t3, b3, bull3 = body(bars[i])
+        engulfs = b2 <= b1 and t2 >= t1 and b3 <= b2 and t3 >= t2
+        if bull1 and not bull2 and bull3 and engulfs:
+            double = ("bullish", t2, b2, i)
+        if not bull1 and bull2 and not bull3 and engulfs:
+            double = ("bearish", t2, b2, i)
+    return bullish, bearish, double
+
+def reference_swings(bars, lookback=5):
+    highs, lows = [], []
+    for i in range(lookback, len(bars) - lookback):
+        high, low = bars[i].get("h", 0), bars[i].get("l", 0)
+        if all(high > bars[i - j].get("h", 0) and high > bars[i + j].get("h", 0) for j in range(1, lookback + 1)):
+            highs.append({"price": high, "index": i, "touches": 1})
+        if all(low < bars[i - j].get("l", 0) and low < bars[i + j].get("l", 0) for j in range(1, lookback + 1)):
+            lows.append({"price": low, "index": i, "touches": 1})
+    return highs, lows
+
+def reference_trap(bars, support_price):
+    current_price = bars[-1].get("c", 0)
+    lows = [(bar.get("l") or 0) for bar in bars[-20:]]
+    points = [(i, low) for i, low in enumerate(lows) if low > 0 and low < support_price * 1.005]
+    if len(points) >= 2:
+        first = points[0]
+        for second in points[1:]:
+            if abs(second[0] - first[0]) >= 3 and abs(second[1] - first[1]) / support_price < 0.01:
+                if current_price > support_price:
+                    return first[1], second[1]
+    return None
+
+SEEDS = [1, 7, 42, 2024]
+
+class TestBarSeries:
+    """Test the columnar bar container"""
+
+    def test_round_trip(self):
+        bars = make_bars(3, 20)
+        series = BarSeries.from_bars(bars)
+        assert len(series) == 20
+        assert series.to_bars() == [{k: float(v) for k, v in bar.items()} for bar in bars]
+
+    def test_missing_fields_are_zero(self):
+        series = BarSeries.from_bars([{"o": 1, "c": 2, "h": None}])
+        assert series.bar(0) == {"o": 1.0, "h": 0.0, "l": 0.0, "c": 2.0, "v": 0.0, "t": 0.0}
+
+    def test_slice_is_series(self):
+        series = BarSeries.from_bars(make_bars(3, 60))
+        tail = series[-50:]
+        assert isinstance(tail, BarSeries)
+        assert len(tail) == 50
+        assert tail.c[-1] == series.c[-1]
+
+class TestAnalyzerParity:
+    """Vectorized analyzers must reproduce the List[Dict] loop results exactly"""
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_fvg(self, seed):
+        bars = make_bars(seed)
+        bullish, bearish = reference_fvg(bars)
+        result = FVGAnalyzer.detect_fvg(BarSeries.from_bars(bars))
+        assert result["total_bullish"] == len(bullish)
+        assert result["total_bearish"] == len(bearish)
+        assert result["bullish_fvgs"] == bullish[-5:]
+        assert result["bearish_fvgs"] == bearish[-5:]
+        assert FVGAnalyzer.detect_fvg(bars) == result
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_order_blocks(self, seed):
+        bars = make_bars(seed)
+        bullish, bearish, double = reference_order_blocks(bars)
+        result = OrderBlockAnalyzer.detect_order_blocks(BarSeries.from_bars(bars))
+        assert result["bullish_obs"] == bullish[-5:]
+        assert result["bearish_obs"] == bearish[-5:]
+        if double is None:
+            assert result["double_ob"] is None
+        else:
+            ob = result["double_ob"]
+            assert (ob["type"], ob["zone_top"], ob["zone_bottom"], ob["index"]) == double
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_swing_points(self, seed):
+        bars = make_bars(seed)
+        highs, lows = reference_swings(bars)
+        expected_highs = SupportResistance._cluster_levels(highs)
+        expected_lows = SupportResistance._cluster_levels(lows)
+        result = SupportResistance.find_swing_points(BarSeries.from_bars(bars))
+        assert result["swing_highs"] == expected_highs[-5:]
+        assert result["swing_lows"] == expected_lows[-5:]
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_volume(self, seed):
+        bars = make_bars(seed)
+        volumes = [bar["v"] for bar in bars]
+        result = VolumeAnalyzer.analyze_volume(BarSeries.from_bars(bars))
+        current = volumes[-1] if volumes[-1] >= 1 else volumes[-2]
+        avg_volume = sum(volumes[-20:]) / 20
+        assert result["current_volume"] == current
+        assert result["avg_volume"] == avg_volume
+        assert result["volume_ratio"] == round(current / avg_volume if avg_volume > 0 else 1.0, 2)
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_vwap(self, seed):
+        bars = make_bars(seed)[-50:]
+        total_vwap = sum((b["h"] + b["l"] + b["c"]) / 3 * b["v"] for b in bars)
+        total_volume = sum(b["v"] for b in bars)
+        expected = total_vwap / total_volume if total_volume else 0
+        assert ScalpAnalyzer().calculate_vwap(BarSeries.from_bars(bars)) == expected
+
+    @pytest.mark.parametrize("seed", SEEDS)
+    def test_fakeout_and_trap(self, seed):
+        bars = make_bars(seed)
+        series = BarSeries.from_bars(bars)
+        current_price = bars[-1]["c"]
+        for offset in (-0.5, 0.2, 1.0):
+            support = current_price - offset
+            result = FakeoutDetector.detect_fakeout(series, {"nearest_support": {"price": support}})
+            trap = reference_trap(bars, support)
+            if trap is None:
+                assert result["trap"] is None
+            else:
+                assert (result["trap"]["first_low"], result["trap"]["second_low"]) == trap
+
+            breaks = [b["l"] for b in bars[-10:] if 0 < b["l"] < support * 0.998]
+            if breaks and current_price > support:
+                assert result["fakeout"]["false_break_low"] == min(breaks)
+            else:
+                assert result["fakeout"] is None
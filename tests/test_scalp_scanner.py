@@ -0,0 +1,56 @@
+"""
+Tests for the batch scalp scanner
+
+Bars come from a stubbed fetch_bars, so no network is touched.
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.services.scalp_engine import ScalpAnalyzer
+from src.services.scalp_scanner import ScalpScanner, rank
+from tests.test_scalp_engine import make_bars
+
+def fake_fetch(ticker, interval="5", limit=100):
+    if ticker == "EMPTY":
+        return []
+    return make_bars(sum(map(ord, ticker)), count=limit)
+
+@pytest.fixture
+def analyzer():
+    analyzer = ScalpAnalyzer()
+    with patch.object(analyzer, "fetch_bars", side_effect=fake_fetch):
+        yield analyzer
+
+class TestScalpScanner:
+    """Test concurrent scanning and ranking"""
+
+    def test_inline_scan_matches_single_analyze(self, analyzer):
+        scanner = ScalpScanner(analyzer=analyzer, process_workers=0)
+        rows = {row["ticker"]: row for row in scanner.scan(["aapl", "MSFT", "AAPL", "EMPTY"])}
+
+        assert set(rows) == {"AAPL", "MSFT", "EMPTY"}
+        assert "error" in rows["EMPTY"]
+
+        single = analyzer.analyze("MSFT")
+        assert rows["MSFT"]["signal"] == single["signal"]
+        assert rows["MSFT"]["confluence_score"] == single["confluence"]["total_score"]
+
+    def test_process_pool_scan(self, analyzer):
+        scanner = ScalpScanner(analyzer=analyzer, process_workers=1)
+        try:
+            pooled = {row["ticker"]: row for row in scanner.scan(["AAPL", "NVDA"])}
+        finally:
+            scanner.shutdown()
+
+        inline = {row["ticker"]: row for row in ScalpScanner(analyzer=analyzer, process_workers=0).scan(["AAPL", "NVDA"])}
+        assert pooled == inline
+
+    def test_rank_orders_by_confluence_then_confidence(self):
+        rows = [
+            {"ticker": "A", "confluence_score": 2, "confidence": 90},
+            {"ticker": "B", "error": "no data"},
+            {"ticker": "C", "confluence_score": 5, "confidence": 10},
+            {"ticker": "D", "confluence_score": 5, "confidence": 60},
+        ]
+        assert [row["ticker"] for row in rank(rows)] == ["D", "C", "A", "B"]
@@ -0,0 +1,90 @@
+"""
+Tests for the batch keyword sentiment scorer
+
+Checks term matching against the original per-lexicon regexes, weighted
+phrases, negation windows, memoization and per-ticker aggregation.
+"""
+
+import re
+
+from web.sentiment_service import (
+    BEARISH_WORDS,
+    BULLISH_WORDS,
+    NEUTRAL_WORDS,
+    KeywordSentimentScorer,
+    SentimentAnalyzer,
+    news_sentiment,
+)
+
+def _unit_lexicon():
+    lexicon = {word: ("bullish", 1.0) for word in BULLISH_WORDS}
+    lexicon.update({word: ("bearish", 1.0) for word in BEARISH_WORDS})
+    lexicon.update({word: ("neutral", 1.0) for word in NEUTRAL_WORDS})
+    return lexicon
+
+class TestKeywordSentimentScorer:
+    """Test trie matching, weights and negation"""
+
+    def test_counts_match_regex_lexicons(self):
+        texts = [
+            "NVDA breakout: analysts upgrade, shares surge to ATH!",
+            "Short sellers warn of a crash; stock is flat and stable",
+            "Winner's curse? Risk-off selloff, red day, hold steady",
+            "",
+        ]
+        scorer = KeywordSentimentScorer(_unit_lexicon(), negation_window=0)
+        patterns = [re.compile(r"\b(" + "|".join(words) + r")\b") for words in (BULLISH_WORDS, BEARISH_WORDS, NEUTRAL_WORDS)]
+
+        for text, result in zip(texts, scorer.score_batch(texts)):
+            expected = [len(pattern.findall(text.lower())) for pattern in patterns]
+            assert [result["bullish_words"], result["bearish_words"], result["neutral_words"]] == expected
+
+    def test_weighted_phrase_beats_single_words(self):
+        scorer = KeywordSentimentScorer({"beat estimates": ("bullish", 3.0), "beat": ("bullish", 1.0), "miss": ("bearish", 1.0)})
+        result = scorer.score("Company beat estimates but shares miss")
+
+        assert result["bullish_words"] == 1 and result["bearish_words"] == 1
+        assert result["score"] == 75.0
+
+    def test_negation_window(self):
+        scorer = KeywordSentimentScorer(negation_window=3)
+
+        assert scorer.score("This is not bullish")["sentiment"] == "bearish"
+        assert scorer.score("Traders don't expect a crash")["bullish_words"] == 1
+        # Outside the window, and across a clause break
+        assert scorer.score("No news today, the stock may rally")["sentiment"] == "bullish"
+        assert scorer.score("Not today. Rally")["sentiment"] == "bullish"
+
+    def test_batch_order_and_memoization(self):
+        scorer = KeywordSentimentScorer(cache_size=2)
+        texts = ["Stocks rally", "Stocks crash", "Stocks rally"]
+        first = scorer.score_batch(texts)
+
+        assert [r["sentiment"] for r in first] == ["bullish", "bearish", "bullish"]
+        assert list(scorer._cache) == ["Stocks rally", "Stocks crash"]
+
+        scorer.score("Markets flat")
+        assert list(scorer._cache) == ["Stocks crash", "Markets flat"]
+
+class TestNewsSentiment:
+    """Test batch aggregation across articles and tickers"""
+
+    def test_analyze_news_batch(self):
+        result = SentimentAnalyzer(KeywordSentimentScorer()).analyze_news_batch([
+            {"title": "Shares surge", "description": None},
+            {"title": "Shares plunge"},
+            {"title": "Shares rally", "description": "strong growth"},
+        ])
+
+        assert result["articles_analyzed"] == 3
+        assert result["overall_sentiment"] == "bullish"
+        assert result["sentiment_breakdown"] == {"bullish": 2, "bearish": 1, "neutral": 0}
+
+    def test_per_ticker(self):
+        texts = ["AAPL and MSFT rally", "$V downgrade hits payments", "Form V filed; AAPLX surge"]
+        result = news_sentiment(texts, ["AAPL", "MSFT", "V"])
+
+        assert result["market"]["articles_analyzed"] == 3
+        assert set(result["tickers"]) == {"AAPL", "MSFT", "V"}
+        assert result["tickers"]["AAPL"]["articles_analyzed"] == 1
+        assert result["tickers"]["V"]["overall_sentiment"] == "bearish"
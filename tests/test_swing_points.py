@@ -0,0 +1,70 @@
+"""
+Tests for the shared swing-point detector
+
+Checks the sliding-window extrema and swing indices against brute-force
+scans, including ties (where strict and inclusive detection differ).
+"""
+
+import numpy as np
+
+from src.services.swing_points import high_low_arrays, rolling_max, rolling_min, swing_indices
+from web.pattern_recognition import _find_swing_points
+
+def _brute_force(highs, lows, lookback, strict):
+    high_idx, low_idx = [], []
+    for i in range(lookback, len(highs) - lookback):
+        neighbours = [j for j in range(i - lookback, i + lookback + 1) if j != i]
+        if strict:
+            is_high = all(highs[i] > highs[j] for j in neighbours)
+            is_low = all(lows[i] < lows[j] for j in neighbours)
+        else:
+            is_high = all(highs[i] >= highs[j] for j in neighbours)
+            is_low = all(lows[i] <= lows[j] for j in neighbours)
+        if is_high:
+            high_idx.append(i)
+        if is_low:
+            low_idx.append(i)
+    return high_idx, low_idx
+
+class TestRollingExtrema:
+    """Test van Herk/Gil-Werman window max/min"""
+
+    def test_matches_naive(self):
+        rng = np.random.default_rng(5)
+        values = rng.normal(size=103)
+        for window in (1, 2, 5, 7, 103):
+            expected_max = [values[i:i + window].max() for i in range(len(values) - window + 1)]
+            expected_min = [values[i:i + window].min() for i in range(len(values) - window + 1)]
+            assert np.array_equal(rolling_max(values, window), expected_max)
+            assert np.array_equal(rolling_min(values, window), expected_min)
+
+    def test_window_longer_than_input(self):
+        assert len(rolling_max(np.arange(3.0), 4)) == 0
+
+class TestSwingIndices:
+    """Test swing detection against a brute-force scan"""
+
+    def test_matches_brute_force_with_ties(self):
+        rng = np.random.default_rng(9)
+        # Small integer prices so equal neighbours are common
+        highs = rng.integers(0, 12, size=400).astype(float)
+        lows = highs - rng.integers(0, 3, size=400)
+        for lookback in (1, 3, 5, 20):
+            for strict in (True, False):
+                high_idx, low_idx = swing_indices(highs, lows, lookback, strict=strict)
+                expected_high, expected_low = _brute_force(highs, lows, lookback, strict)
+                assert high_idx.tolist() == expected_high
+                assert low_idx.tolist() == expected_low
+
+    def test_too_few_bars(self):
+        high_idx, low_idx = swing_indices([1.0, 2.0, 1.0], [1.0, 0.0, 1.0], lookback=2)
+        assert len(high_idx) == 0 and len(low_idx) == 0
+
+    def test_caller_keeps_bar_values(self):
+        bars = [{"high": h, "low": h - 1} for h in [1, 2, 5, 2, 1, 3, 6, 3, 1]]
+        highs, lows = high_low_arrays(bars)
+        assert highs.tolist() == [1, 2, 5, 2, 1, 3, 6, 3, 1]
+
+        swing_highs, swing_lows = _find_swing_points(bars, lookback=2)
+        assert swing_highs == [{"price": 5, "index": 2}, {"price": 6, "index": 6}]
+        assert swing_lows == [{"price": 0, "index": 4}]
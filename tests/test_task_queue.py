@@ -0,0 +1,95 @@
+"""
+Tests for the autonomous agents' task queue
+
+Covers heap ordering, journal replay after a crash (including a torn final
+record) and compaction into the snapshot file.
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from agents.autonomous.task_queue import Task, TaskPriority, TaskQueue, TaskStatus, TaskType
+
+def make_task(task_id, priority=TaskPriority.MEDIUM, minutes=0):
+    return Task(
+        id=task_id,
+        title=f"Task {task_id}",
+        description="",
+        task_type=TaskType.IMPROVEMENT,
+        priority=priority,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+    )
+
+class TestPendingHeap:
+    """Test dequeue order"""
+
+    def test_priority_then_age(self, tmp_path):
+        queue = TaskQueue(tmp_path / "tasks.json")
+        queue.add_task(make_task("low", TaskPriority.LOW, minutes=0))
+        queue.add_task(make_task("new", TaskPriority.HIGH, minutes=5))
+        queue.add_task(make_task("old", TaskPriority.HIGH, minutes=1))
+
+        assert [t.id for t in queue.get_pending_tasks()] == ["old", "new", "low"]
+        assert queue.get_next_task("fixer").id == "old"
+        assert queue.get_next_task().id == "new"
+        assert [t.id for t in queue.get_pending_tasks()] == ["low"]
+
+    def test_updates_requeue_and_dequeue(self, tmp_path):
+        queue = TaskQueue(tmp_path / "tasks.json")
+        first, second = make_task("a", minutes=0), make_task("b", minutes=1)
+        queue.add_task(first)
+        queue.add_task(second)
+
+        # Delegated outside get_next_task, then bumped in priority
+        first.status = TaskStatus.IN_PROGRESS
+        queue.update_task(first)
+        second.priority = TaskPriority.CRITICAL
+        queue.update_task(second)
+        assert queue.get_next_task().id == "b"
+        assert queue.get_next_task() is None
+
+        queue.complete_task("a", success=False)
+        assert queue.retry_task("a")
+        assert queue.get_next_task().id == "a"
+
+class TestJournal:
+    """Test crash recovery and compaction"""
+
+    def test_replay_after_crash(self, tmp_path):
+        path = tmp_path / "tasks.json"
+        queue = TaskQueue(path)
+        for i in range(3):
+            queue.add_task(make_task(f"t{i}", minutes=i))
+        queue.get_next_task("developer")
+        queue.complete_task("t0")
+        queue.clear_completed(older_than_days=-1)
+        # Crash mid-write: the last record is cut short
+        with open(queue.journal_path, "a") as f:
+            f.write('{"op": "put", "task": {"id"')
+
+        recovered = TaskQueue(path)
+        assert sorted(recovered.tasks) == ["t1", "t2"]
+        assert recovered.history == ["t0"]
+        assert recovered.get_next_task().id == "t1"
+        # Loading folded the journal into the snapshot
+        assert json.loads(path.read_text())["seq"] == recovered._seq - 1
+
+    def test_compaction_bounds_the_journal(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(TaskQueue, "COMPACT_MIN_RECORDS", 10)
+        path = tmp_path / "tasks.json"
+        queue = TaskQueue(path)
+        for i in range(25):
+            queue.add_task(make_task(f"t{i:02d}", minutes=i))
+
+        # Compacted at 10 records; the next waits until the journal matches the 25 tasks
+        assert len(queue.journal_path.read_text().splitlines()) == 15
+        assert len(json.loads(path.read_text())["tasks"]) == 10
+        assert len(TaskQueue(path).get_pending_tasks()) == 25
+
+    def test_reads_legacy_snapshot(self, tmp_path):
+        path = tmp_path / "tasks.json"
+        path.write_text(json.dumps({"tasks": {"x": make_task("x").to_dict()}, "history": []}, indent=2))
+
+        queue = TaskQueue(path)
+        assert queue.get_next_task().id == "x"
+        assert TaskQueue(path).get_task("x").status == TaskStatus.IN_PROGRESS
@@ -0,0 +1,104 @@
+"""
+Tests for the tick ingestion bus
+
+Covers T/Q/A aggregation, the in-process pub/sub stand-in and SSE push.
+"""
+
+import json
+import time
+
+from web.api_sse import PriceMailbox, SSEPriceStreamer
+from web.tick_bus import MemoryPubSub, TickAggregator, TickBus, overlay_tick
+
+MINUTE = 60_000
+BASE = 1_700_000_000_000 // (15 * MINUTE) * (15 * MINUTE)
+
+def trade(price, size, ts, sym="AAPL"):
+    return {"ev": "T", "sym": sym, "p": price, "s": size, "t": ts}
+
+class TestTickAggregator:
+    """Test last-price state and rolling bars"""
+
+    def test_trades_build_bars(self):
+        agg = TickAggregator()
+        agg.ingest(trade(10.0, 100, BASE))
+        agg.ingest(trade(11.0, 50, BASE + 30_000))
+        agg.ingest(trade(9.5, 10, BASE + MINUTE + 1))
+
+        assert agg.get_bars("AAPL", 1) == [
+            {"t": BASE, "o": 10.0, "h": 11.0, "l": 10.0, "c": 11.0, "v": 150},
+            {"t": BASE + MINUTE, "o": 9.5, "h": 9.5, "l": 9.5, "c": 9.5, "v": 10},
+        ]
+        assert agg.get_bars("aapl", 5) == [{"t": BASE, "o": 10.0, "h": 11.0, "l": 9.5, "c": 9.5, "v": 160}]
+
+        last = agg.get_last("AAPL")
+        assert last["price"] == 9.5
+        assert last["volume"] == 160
+
+    def test_late_trade_keeps_close(self):
+        agg = TickAggregator()
+        agg.ingest(trade(10.0, 1, BASE))
+        agg.ingest(trade(11.0, 1, BASE + MINUTE))
+        agg.ingest(trade(12.0, 1, BASE + 10))
+        bar = agg.get_bars("AAPL", 1)[0]
+        assert (bar["h"], bar["c"], bar["v"]) == (12.0, 10.0, 2)
+
+    def test_quotes_and_aggregates(self):
+        agg = TickAggregator()
+        agg.ingest({"ev": "Q", "sym": "MSFT", "bp": 99.9, "ap": 100.1, "bs": 1, "as": 2, "t": BASE})
+        assert agg.get_last("MSFT") is None  # No trade yet
+
+        agg.ingest({"ev": "A", "sym": "MSFT", "o": 100, "h": 101, "l": 99, "c": 100.5, "v": 500, "av": 9000, "s": BASE})
+        last = agg.get_last("MSFT")
+        assert (last["price"], last["bid"], last["ask"], last["volume"]) == (100.5, 99.9, 100.1, 9000)
+
+    def test_stale_state_is_ignored(self):
+        agg = TickAggregator()
+        agg.ingest(trade(10.0, 1, BASE))
+        agg._state["AAPL"]["updated_at"] -= 60
+        assert agg.get_last("AAPL") is None
+        assert agg.get_last("AAPL", max_age=None)["price"] == 10.0
+
+class TestTickBus:
+    """Test consuming from the in-process pub/sub"""
+
+    def test_memory_pubsub_feeds_aggregator(self):
+        broker = MemoryPubSub()
+        bus = TickBus(client=broker)
+        seen = []
+        bus.aggregator.add_listener(lambda ticker, state: seen.append((ticker, state["price"])))
+        bus.start()
+        try:
+            deadline = time.time() + 2
+            while not broker._subscriptions and time.time() < deadline:
+                time.sleep(0.01)
+            broker.publish("market_data:AAPL", json.dumps(trade(10.0, 5, BASE)))
+            while not seen and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            bus.stop()
+
+        assert seen == [("AAPL", 10.0)]
+
+    def test_overlay_tick_recomputes_change(self):
+        data = overlay_tick({"prev_close": 100.0, "day_high": 101.0, "day_low": 99.0}, {"price": 102.0})
+        assert data["change"] == 2.0
+        assert data["change_percent"] == 2.0
+        assert data["day_high"] == 102.0
+
+class TestSSEPush:
+    """Live ticks go straight to SSE subscribers"""
+
+    def test_tick_is_broadcast(self):
+        streamer = SSEPriceStreamer()
+        mailbox = PriceMailbox()
+        streamer._subscribers = {"AAPL": (mailbox,)}
+        streamer._reference["AAPL"] = {"prev_close": 100.0}
+
+        streamer._on_tick("AAPL", {"price": 101.0})
+        streamer._on_tick("MSFT", {"price": 5.0})
+
+        messages = mailbox.get(timeout=0)
+        assert len(messages) == 1
+        update = json.loads(messages[0])
+        assert (update["ticker"], update["price"], update["change"]) == ("AAPL", 101.0, 1.0)
@@ -0,0 +1,106 @@
+"""
+Tests for the array-based volume profile
+
+Checks VolumeProfile against the original per-bar, per-bin loop, plus
+incremental appends and session anchoring.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from src.services.bar_series import BarSeries
+from src.services.volume_profile import VolumeProfile, session_slice, session_start_ms
+from web.advanced_sr_analysis import VolumeProfileAnalyzer
+
+def _bars(n: int, seed: int = 1, start_ms: int = 1_700_000_000_000):
+    rng = np.random.default_rng(seed)
+    closes = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return [
+        {"o": c, "h": c + rng.uniform(0, 1), "l": c - rng.uniform(0, 1), "c": c, "v": float(rng.integers(100, 10000)),
+         "t": start_ms + i * 300_000}
+        for i, c in enumerate(closes)
+    ]
+
+def _loop_profile(bars, num_bins):
+    """The original O(bars x bins) distribution"""
+    price_min = min(b["l"] for b in bars)
+    bin_size = (max(b["h"] for b in bars) - price_min) / num_bins
+    volume_at_price = defaultdict(float)
+    for bar in bars:
+        candle_bins = []
+        for i in range(num_bins):
+            bin_low = price_min + i * bin_size
+            bin_high = bin_low + bin_size
+            if bin_low <= bar["h"] and bin_high >= bar["l"]:
+                candle_bins.append(round((bin_low + bin_high) / 2, 4))
+        for bin_price in candle_bins:
+            volume_at_price[bin_price] += bar["v"] / len(candle_bins)
+    return dict(sorted(volume_at_price.items()))
+
+class TestVolumeProfile:
+    """Test searchsorted + difference-array accumulation"""
+
+    @pytest.mark.parametrize("num_bins", [7, 50, 500])
+    def test_matches_loop(self, num_bins):
+        bars = _bars(200)
+        profile = VolumeProfile.from_bars(bars, num_bins)
+        levels = profile.levels()
+        expected = _loop_profile(bars, num_bins)
+
+        assert levels["price"].tolist() == list(expected)
+        assert np.allclose(levels["volume"], list(expected.values()))
+
+    def test_incremental_append_matches_full_build(self):
+        bars = _bars(300)
+        price_min = min(b["l"] for b in bars)
+        price_max = max(b["h"] for b in bars)
+
+        full = VolumeProfile.from_bars(bars, 100, price_min, price_max)
+        incremental = VolumeProfile.from_bars(bars[:150], 100, price_min, price_max)
+        incremental.add(bars[150:])
+
+        assert incremental.num_bins == 100
+        assert np.allclose(incremental.volume, full.volume)
+        assert np.array_equal(incremental.touched, full.touched)
+
+    def test_append_extends_grid_by_whole_bins(self):
+        profile = VolumeProfile(100.0, 1.0, 10)
+        profile.add([{"h": 105.5, "l": 104.5, "v": 10}])
+        profile.add([{"h": 97.2, "l": 96.8, "v": 4}])
+
+        assert profile.price_min == 96.0 and profile.num_bins == 14
+        assert profile.volume[:2].tolist() == [2, 2]
+        assert profile.volume[4 + 4] == 5 and profile.volume[4 + 5] == 5
+
+    def test_session_slice(self):
+        bars = _bars(400)
+        series = BarSeries.from_bars(bars)
+        session = session_slice(series)
+
+        anchor = session_start_ms(series.t[-1])
+        assert len(session) < len(series)
+        assert session.t[0] >= anchor and series.t[len(series) - len(session) - 1] < anchor
+
+class TestVolumeProfileAnalyzer:
+    """Test the analyzer summary on the array profile"""
+
+    def test_summary(self):
+        bars = _bars(120)
+        result = VolumeProfileAnalyzer(num_bins=500).calculate_volume_profile(bars)
+        volumes = [level["volume"] for level in result["profile"]]
+
+        assert result["num_bins"] == 500
+        assert result["vpoc"]["volume"] == max(volumes)
+        assert result["value_area"]["low"] <= result["vpoc"]["price"] <= result["value_area"]["high"]
+        assert abs(result["total_volume"] - sum(b["v"] for b in bars)) < 1e-6
+
+    def test_insufficient_bars(self):
+        assert "error" in VolumeProfileAnalyzer().calculate_volume_profile(_bars(5))
+
+    @pytest.mark.parametrize("bins", ["abc", "0", "2001"])
+    def test_endpoint_rejects_bad_bins(self, client, bins):
+        response = client.get(f"/api/sr/volume-profile/AAPL?bins={bins}")
+        assert response.status_code == 400
+        assert "bins" in response.get_json()["error"]
@@ -12,20 +12,31 @@ Author: AI Trading System
 """
 
 import os
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
-import requests
-from datetime import timedelta
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
 import json
 from typing import List
 from typing import Optional
 from typing import Tuple
 
+import numpy as np
+
+from src.services.bar_series import BarSeries
+from src.services.bar_store import TIMESPAN_MS, recent_binance_bars, recent_polygon_bars, series_to_bars
+from src.services.swing_points import high_low_arrays, swing_indices
+from src.services.volume_profile import VolumeProfile, session_slice
+from web.alert_engine import AlertIndex
+
 logger = logging.getLogger(__name__)
 
+def resample_bars(bars: List[Dict], minutes: int) -> List[Dict]:
+    """Aggregate bar dicts into `minutes` bars (leading partial bucket dropped)"""
+    return series_to_bars(BarSeries.from_bars(bars).resample(minutes * TIMESPAN_MS["minute"]))
+
 class MultiTimeframeSR:
     """
     Multi-Timeframe Support/Resistance Confluence Analyzer
@@ -49,27 +60,71 @@ class MultiTimeframeSR:
     # Tolerance for level matching (% difference allowed)
     LEVEL_TOLERANCE = 0.005  # 0.5%
 
+    # Deepest base fetch used to resample higher timeframes (100 x 60m from 5m = 1200)
+    MAX_DERIVE_BASE_BARS = 1200
+
     def __init__(self, polygon_key: str = None):
         self.polygon_key = polygon_key or os.getenv("POLYGON_API_KEY")
 
     def fetch_multi_timeframe_data(
         self,
         ticker: str,
-        timeframes: List[str] = ["5", "15", "60"]
+        timeframes: List[str] = ["5", "15", "60"],
+        limit: int = 100,
     ) -> Dict[str, List[Dict]]:
-        """Fetch candlestick data for multiple timeframes"""
-        data = {}
+        """
+        Fetch candlestick data for multiple timeframes
+
+        The finest timeframe is fetched once (deep enough to cover the others)
+        and coarser timeframes are resampled from it. A timeframe that would
+        need more than MAX_DERIVE_BASE_BARS base bars is fetched natively,
+        concurrently with the base fetch.
+        """
+        base_tf, derived, native = self._plan_timeframes(timeframes, limit)
+        base_limit = max([limit] + [limit * int(tf) // int(base_tf) for tf in derived])
 
+        fetched: Dict[str, List[Dict]] = {}
+        requests_needed = {base_tf: base_limit, **{tf: limit for tf in native}}
+        if len(requests_needed) == 1:
+            fetched[base_tf] = self._fetch_bars(ticker, base_tf, base_limit)
+        else:
+            with ThreadPoolExecutor(max_workers=len(requests_needed)) as pool:
+                futures = {tf: pool.submit(self._fetch_bars, ticker, tf, n) for tf, n in requests_needed.items()}
+                fetched = {tf: future.result() for tf, future in futures.items()}
+
+        data = {}
+        base_bars = fetched.get(base_tf) or []
         for tf in timeframes:
-            bars = self._fetch_bars(ticker, tf)
+            if tf == base_tf:
+                bars = base_bars[-limit:]
+            elif tf in derived:
+                bars = resample_bars(base_bars, int(tf))[-limit:] if base_bars else []
+            else:
+                bars = fetched.get(tf) or []
+
             if bars:
                 data[tf] = bars
-                logger.info(f"[MTF] Fetched {len(bars)} bars for {ticker} @ {tf}m")
+                source = "resampled" if tf in derived else "fetched"
+                logger.info(f"[MTF] {source.capitalize()} {len(bars)} bars for {ticker} @ {tf}m")
             else:
                 logger.warning(f"[MTF] Failed to fetch {ticker} @ {tf}m")
 
         return data
 
+    def _plan_timeframes(self, timeframes: List[str], limit: int) -> Tuple[str, List[str], List[str]]:
+        """Split timeframes into (base, resampled from base, fetched natively)"""
+        base_tf = min(timeframes, key=lambda x: int(x))
+        derived, native = [], []
+        for tf in timeframes:
+            if tf == base_tf:
+                continue
+            minutes, base_minutes = int(tf), int(base_tf)
+            if minutes % base_minutes == 0 and limit * minutes // base_minutes <= self.MAX_DERIVE_BASE_BARS:
+                derived.append(tf)
+            else:
+                native.append(tf)
+        return base_tf, derived, native
+
     def _fetch_bars(self, ticker: str, interval: str, limit: int = 100) -> List[Dict]:
         """Fetch bars from Polygon or Binance"""
         try:
@@ -88,7 +143,7 @@ class MultiTimeframeSR:
         return any(ticker.upper().endswith(p) for p in crypto_patterns)
 
     def _fetch_polygon(self, ticker: str, interval: str, limit: int) -> List[Dict]:
-        """Fetch from Polygon.io"""
+        """Fetch from Polygon.io (through the local bar store)"""
         try:
             timespan_map = {"5": "minute", "15": "minute", "60": "hour", "240": "hour"}
             multiplier_map = {"5": 5, "15": 15, "60": 1, "240": 4}
@@ -98,92 +153,27 @@ class MultiTimeframeSR:
 
             # Need more days for higher timeframes
             days_needed = max(3, int(interval) * limit // (60 * 6))
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=days_needed)
-
-            url = f"https://api.polygon.io/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{start_date.strftime('%Y-%m-%d')}/{end_date.strftime('%Y-%m-%d')}"
-            params = {"apiKey": self.polygon_key, "limit": limit, "sort": "desc"}
-
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("resultsCount", 0) > 0:
-                return list(reversed(data.get("results", [])))
-            return []
+            return recent_polygon_bars(ticker, multiplier, timespan, limit, days_needed, self.polygon_key)
         except Exception as e:
             logger.error(f"[MTF] Polygon error: {e}")
             return []
 
     def _fetch_binance(self, symbol: str, interval: str, limit: int) -> List[Dict]:
-        """Fetch from Binance"""
+        """Fetch from Binance (through the local bar store)"""
         try:
             interval_map = {"5": "5m", "15": "15m", "60": "1h", "240": "4h"}
             binance_interval = interval_map.get(interval, "5m")
-
-            endpoints = [
-                "https://api.binance.us/api/v3/klines",
-                "https://api.binance.com/api/v3/klines",
-            ]
-
-            for url in endpoints:
-                try:
-                    params = {"symbol": symbol.upper(), "interval": binance_interval, "limit": limit}
-                    response = requests.get(url, params=params, timeout=10)
-
-                    if response.status_code == 451:  # Geo-restricted
-                        continue
-
-                    response.raise_for_status()
-                    data = response.json()
-
-                    bars = []
-                    for kline in data:
-                        bars.append({
-                            "t": kline[0],
-                            "o": float(kline[1]),
-                            "h": float(kline[2]),
-                            "l": float(kline[3]),
-                            "c": float(kline[4]),
-                            "v": float(kline[5]),
-                        })
-                    return bars
-                except Exception:
-                    continue
-
-            return []
+            interval_minutes = int(interval) if interval in interval_map else 5
+            return recent_binance_bars(symbol, interval_minutes, binance_interval, limit)
         except Exception as e:
             logger.error(f"[MTF] Binance error: {e}")
             return []
 
     def find_swing_points(self, bars: List[Dict], lookback: int = 5) -> Tuple[List[Dict], List[Dict]]:
         """Find swing highs and lows"""
-        if len(bars) < lookback * 2 + 1:
-            return [], []
-
-        swing_highs = []
-        swing_lows = []
-
-        for i in range(lookback, len(bars) - lookback):
-            high = bars[i].get("h", 0)
-            low = bars[i].get("l", 0)
-
-            # Check swing high
-            is_swing_high = all(
-                high > bars[i - j].get("h", 0) and high > bars[i + j].get("h", 0)
-                for j in range(1, lookback + 1)
-            )
-            if is_swing_high:
-                swing_highs.append({"price": high, "index": i, "bar": bars[i]})
-
-            # Check swing low
-            is_swing_low = all(
-                low < bars[i - j].get("l", float("inf")) and low < bars[i + j].get("l", float("inf"))
-                for j in range(1, lookback + 1)
-            )
-            if is_swing_low:
-                swing_lows.append({"price": low, "index": i, "bar": bars[i]})
-
+        high_idx, low_idx = swing_indices(*high_low_arrays(bars), lookback)
+        swing_highs = [{"price": bars[i].get("h", 0), "index": i, "bar": bars[i]} for i in high_idx.tolist()]
+        swing_lows = [{"price": bars[i].get("l", 0), "index": i, "bar": bars[i]} for i in low_idx.tolist()]
         return swing_highs, swing_lows
 
     def _get_timeframe_config(self, tf: str) -> Dict:
@@ -334,88 +324,82 @@ class VolumeProfileAnalyzer:
     def __init__(self, num_bins: int = 50):
         self.num_bins = num_bins
 
-    def _get_price_range(self, bars: List[Dict]) -> Tuple[float, float]:
-        """Find min and max price range from bars"""
-        all_highs = [b.get("h", 0) for b in bars]
-        all_lows = [b.get("l", 0) for b in bars]
-        return min(all_lows), max(all_highs)
-
-    def _distribute_volume(self, bars: List[Dict], price_min: float, bin_size: float) -> Dict[float, float]:
-        """Distribute volume across price bins for each candle"""
-        volume_at_price = defaultdict(float)
-        for bar in bars:
-            h, l, v = bar.get("h", 0), bar.get("l", 0), bar.get("v", 0)
-            candle_bins = []
-            for i in range(self.num_bins):
-                bin_low = price_min + i * bin_size
-                bin_high = bin_low + bin_size
-                if bin_low <= h and bin_high >= l:
-                    candle_bins.append(round((bin_low + bin_high) / 2, 4))
-            
-            if candle_bins:
-                vol_per_bin = v / len(candle_bins)
-                for bin_price in candle_bins:
-                    volume_at_price[bin_price] += vol_per_bin
-        return volume_at_price
-
-    def calculate_volume_profile(self, bars: List[Dict]) -> Dict:
-        """Calculate Volume Profile from OHLCV data"""
-        if not bars or len(bars) < 10:
-            return {"error": "Insufficient data for volume profile"}
+    def build_profile(self, bars: Union[BarSeries, List[Dict]], session: bool = False) -> Optional[VolumeProfile]:
+        """
+        Array volume profile over the bars (num_bins across their range).
 
-        p_min, p_max = self._get_price_range(bars)
-        if p_min >= p_max:
-            return {"error": "Invalid price range"}
+        session=True anchors the profile at the start of the last bar's
+        trading day instead of using every bar.
+        """
+        series = BarSeries.coerce(bars)
+        if session:
+            series = session_slice(series)
+        return VolumeProfile.from_bars(series, self.num_bins)
 
-        bin_size = (p_max - p_min) / self.num_bins
-        vol_at_price = self._distribute_volume(bars, p_min, bin_size)
+    def calculate_volume_profile(self, bars: Union[BarSeries, List[Dict]], session: bool = False,
+                                 profile: Optional[VolumeProfile] = None) -> Dict:
+        """
+        Calculate Volume Profile from OHLCV data
 
-        profile = sorted([{"price": p, "volume": v} for p, v in vol_at_price.items()], key=lambda x: x["price"])
-        total_vol = sum(p["volume"] for p in profile)
-        max_vol = max(p["volume"] for p in profile) if profile else 0
-        vpoc = max(profile, key=lambda x: x["volume"]) if profile else None
-        va = self._calculate_value_area(profile, total_vol)
+        Pass `profile` to summarize an existing (e.g. incrementally appended)
+        VolumeProfile instead of building one from bars.
+        """
+        series = BarSeries.coerce(bars)
+        if profile is None:
+            if len(series) < 10:
+                return {"error": "Insufficient data for volume profile"}
+            profile = self.build_profile(series, session)
+            if profile is None:
+                return {"error": "Invalid price range"}
+
+        levels = profile.levels()
+        prices, volumes = levels["price"], levels["volume"]
+        if len(prices) == 0:
+            return {"error": "Insufficient data for volume profile"}
 
-        avg_vol = total_vol / len(profile) if profile else 0
-        hvn = [p for p in profile if p["volume"] >= avg_vol * 1.5]
-        lvn = [p for p in profile if p["volume"] <= avg_vol * 0.5]
-        curr_p = bars[-1].get("c", 0)
+        total_vol = float(volumes.sum())
+        max_vol = float(volumes.max())
+        poc = int(np.argmax(volumes))
+        va = self._value_area_bounds(volumes, total_vol, poc)
+
+        avg_vol = total_vol / len(volumes)
+        hvn_idx = np.flatnonzero(volumes >= avg_vol * 1.5)
+        hvn_idx = hvn_idx[np.argsort(-volumes[hvn_idx], kind="stable")][:5]
+        lvn_idx = np.flatnonzero(volumes <= avg_vol * 0.5)[:5]
+        curr_p = float(series.c[-1]) if len(series) else float(prices[poc])
+        vpoc_price = float(prices[poc])
 
         return {
-            "vpoc": {"price": vpoc["price"] if vpoc else None, "volume": vpoc["volume"] if vpoc else 0,
-                     "distance_percent": abs(curr_p - vpoc["price"]) / curr_p * 100 if vpoc else 0},
-            "value_area": {"high": va["vah"], "low": va["val"], "volume_percent": 70},
-            "high_volume_nodes": [{"price": h["price"], "volume": h["volume"], "strength": min(100, h["volume"] / max_vol * 100)}
-                                  for h in sorted(hvn, key=lambda x: x["volume"], reverse=True)[:5]],
-            "low_volume_nodes": [{"price": l["price"], "volume": l["volume"]} for l in sorted(lvn, key=lambda x: x["price"])[:5]],
-            "current_price": curr_p, "price_range": {"min": p_min, "max": p_max}, "total_volume": total_vol, "profile": profile
+            "vpoc": {"price": vpoc_price, "volume": float(volumes[poc]),
+                     "distance_percent": abs(curr_p - vpoc_price) / curr_p * 100 if curr_p else 0},
+            "value_area": {"high": float(prices[va[1]]), "low": float(prices[va[0]]), "volume_percent": 70},
+            "high_volume_nodes": [{"price": float(prices[i]), "volume": float(volumes[i]),
+                                   "strength": min(100, float(volumes[i]) / max_vol * 100)} for i in hvn_idx.tolist()],
+            "low_volume_nodes": [{"price": float(prices[i]), "volume": float(volumes[i])} for i in lvn_idx.tolist()],
+            "current_price": curr_p,
+            "price_range": {"min": profile.price_min, "max": profile.price_min + profile.num_bins * profile.bin_size},
+            "total_volume": total_vol,
+            "num_bins": profile.num_bins,
+            "profile": [{"price": p, "volume": v} for p, v in zip(prices.tolist(), volumes.tolist())],
         }
 
-    def _calculate_value_area(
-        self,
-        profile: List[Dict],
-        total_volume: float
-    ) -> Dict:
+    @staticmethod
+    def _value_area_bounds(volumes: np.ndarray, total_volume: float, poc_idx: int) -> Tuple[int, int]:
         """
-        Calculate Value Area (VA) - price range containing 70% of volume
+        Index range of the Value Area (VA) - bins containing 70% of volume
 
-        Standard method: Start from POC, add bars alternately above/below
+        Standard method: Start from POC, add bins alternately above/below
         """
-        if not profile or total_volume == 0:
-            return {"vah": 0, "val": 0}
-
-        # Find POC index
-        poc_idx = max(range(len(profile)), key=lambda i: profile[i]["volume"])
-
+        if total_volume == 0:
+            return poc_idx, poc_idx
         target_volume = total_volume * 0.7
-        accumulated_volume = profile[poc_idx]["volume"]
-
-        lower_idx = poc_idx - 1
-        upper_idx = poc_idx + 1
+        accumulated_volume = volumes[poc_idx]
+        lower_idx, upper_idx = poc_idx - 1, poc_idx + 1
+        n = len(volumes)
 
         while accumulated_volume < target_volume:
-            lower_vol = profile[lower_idx]["volume"] if lower_idx >= 0 else 0
-            upper_vol = profile[upper_idx]["volume"] if upper_idx < len(profile) else 0
+            lower_vol = volumes[lower_idx] if lower_idx >= 0 else 0
+            upper_vol = volumes[upper_idx] if upper_idx < n else 0
 
             if lower_vol == 0 and upper_vol == 0:
                 break
@@ -423,24 +407,23 @@ class VolumeProfileAnalyzer:
             if lower_vol >= upper_vol and lower_idx >= 0:
                 accumulated_volume += lower_vol
                 lower_idx -= 1
-            elif upper_idx < len(profile):
+            elif upper_idx < n:
                 accumulated_volume += upper_vol
                 upper_idx += 1
             else:
                 break
 
-        val = profile[max(0, lower_idx + 1)]["price"]
-        vah = profile[min(len(profile) - 1, upper_idx - 1)]["price"]
-
-        return {"val": val, "vah": vah}
+        return max(0, lower_idx + 1), min(n - 1, upper_idx - 1)
 
-    def get_sr_from_volume_profile(self, bars: List[Dict]) -> Dict:
+    def get_sr_from_volume_profile(self, bars: List[Dict], profile_data: Optional[Dict] = None) -> Dict:
         """
         Extract support/resistance levels from volume profile
 
         HVN = Support/Resistance zones (high institutional interest)
+        Pass profile_data (from calculate_volume_profile) to avoid rebuilding it.
         """
-        profile_data = self.calculate_volume_profile(bars)
+        if profile_data is None:
+            profile_data = self.calculate_volume_profile(bars)
 
         if "error" in profile_data:
             return profile_data
@@ -695,12 +678,14 @@ class PriceAlertManager:
     4. Volume spike at S/R level
     5. Entry signal generated
 
-    Storage: In-memory for now, can be persisted to DB
+    Storage: In-memory AlertIndex (same engine as the DB-backed PriceAlertEngine),
+    so a price update finds crossed alerts by binary search
     """
 
     def __init__(self):
-        # Active alerts: {ticker: [alert_configs]}
-        self.active_alerts = defaultdict(list)
+        # Active alerts indexed by trigger price, keyed by alert id
+        self.index = AlertIndex()
+        self._ids = itertools.count(1)
 
         # Triggered alerts history
         self.triggered_history = []
@@ -795,8 +780,11 @@ class PriceAlertManager:
                 "created_at": datetime.now().isoformat(),
             })
 
-        # Store alerts
-        self.active_alerts[ticker] = alerts
+        # Store alerts (replacing the ticker's previous set)
+        self.index.clear(ticker)
+        for alert in alerts:
+            alert["id"] = next(self._ids)
+            self.index.add(alert["id"], ticker, alert["direction"], alert["trigger_price"], alert)
 
         return alerts
 
@@ -811,66 +799,42 @@ class PriceAlertManager:
 
         Returns list of triggered alerts
         """
-        if ticker not in self.active_alerts:
-            return []
-
         triggered = []
-        remaining = []
-
-        for alert in self.active_alerts[ticker]:
-            trigger_price = alert.get("trigger_price", 0)
-            direction = alert.get("direction", "below")
-
-            is_triggered = False
-
-            if direction == "below" and current_price <= trigger_price:
-                is_triggered = True
-            elif direction == "above" and current_price >= trigger_price:
-                is_triggered = True
-
-            if is_triggered:
-                alert["triggered_at"] = datetime.now().isoformat()
-                alert["triggered_price"] = current_price
-                triggered.append(alert)
-                self.triggered_history.append(alert)
-            else:
-                remaining.append(alert)
-
-        # Update active alerts
-        self.active_alerts[ticker] = remaining
+        for hit in self.index.update(ticker, current_price):
+            alert = hit["payload"]
+            alert["triggered_at"] = datetime.now().isoformat()
+            alert["triggered_price"] = current_price
+            triggered.append(alert)
+            self.triggered_history.append(alert)
 
         return triggered
 
     def get_active_alerts(self, ticker: str = None) -> Dict:
         """Get all active alerts, optionally filtered by ticker"""
         if ticker:
+            alerts = [alert["payload"] for alert in self.index.alerts_for(ticker)]
             return {
                 "ticker": ticker,
-                "alerts": self.active_alerts.get(ticker, []),
-                "count": len(self.active_alerts.get(ticker, [])),
+                "alerts": alerts,
+                "count": len(alerts),
             }
 
-        all_alerts = []
-        for t, alerts in self.active_alerts.items():
-            for a in alerts:
-                all_alerts.append(a)
+        tickers = self.index.tickers()
+        all_alerts = [alert["payload"] for t in tickers for alert in self.index.alerts_for(t)]
 
         return {
             "alerts": all_alerts,
             "count": len(all_alerts),
-            "tickers": list(self.active_alerts.keys()),
+            "tickers": tickers,
         }
 
     def clear_alerts(self, ticker: str = None) -> Dict:
         """Clear alerts for a ticker or all tickers"""
         if ticker:
-            count = len(self.active_alerts.get(ticker, []))
-            self.active_alerts[ticker] = []
-            return {"cleared": count, "ticker": ticker}
+            return {"cleared": self.index.clear(ticker), "ticker": ticker}
+
+        return {"cleared": self.index.clear(), "ticker": "all"}
 
-        total = sum(len(alerts) for alerts in self.active_alerts.values())
-        self.active_alerts.clear()
-        return {"cleared": total, "ticker": "all"}
 
 class AdvancedSRAnalyzer:
     """
@@ -919,7 +883,7 @@ class AdvancedSRAnalyzer:
             volume_sr = None
             if bars:
                 volume_profile = self.volume_analyzer.calculate_volume_profile(bars)
-                volume_sr = self.volume_analyzer.get_sr_from_volume_profile(bars)
+                volume_sr = self.volume_analyzer.get_sr_from_volume_profile(bars, volume_profile)
 
             # 3. Combine S/R from MTF and Volume Profile
             all_supports = mtf_result.get("confluence_supports", [])
@@ -0,0 +1,379 @@
+"""
+Streaming Price Alert Engine
+
+AlertIndex keeps, per ticker, sorted "above" and "below" threshold arrays, so a
+price update finds every crossed alert with one binary search per side
+(O(log n + triggered)) instead of scanning all alerts.
+
+PriceAlertEngine loads untriggered PriceAlert rows into an index, evaluates
+live tick-bus prices (or one bulk snapshot in cron mode), and writes triggered
+state back to the database in batches from a writer thread.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, List, Optional
+
+try:
+    from web.database import db, PriceAlert
+except ImportError:
+    from database import db, PriceAlert
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.5  # seconds between batched trigger writes
+FLUSH_BATCH_SIZE = 500
+REFRESH_INTERVAL = 15  # seconds between incremental loads of newly created alerts
+FULL_RELOAD_INTERVAL = 600  # seconds between full rebuilds (picks up deleted alerts)
+
+
+class _Side:
+    """Thresholds sorted ascending with their alert keys in a parallel list"""
+
+    __slots__ = ("thresholds", "keys")
+
+    def __init__(self):
+        self.thresholds: List[float] = []
+        self.keys: List[Hashable] = []
+
+    def insert(self, threshold: float, key: Hashable):
+        i = bisect_right(self.thresholds, threshold)
+        self.thresholds.insert(i, threshold)
+        self.keys.insert(i, key)
+
+    def remove(self, threshold: float, key: Hashable) -> bool:
+        i = bisect_left(self.thresholds, threshold)
+        while i < len(self.thresholds) and self.thresholds[i] == threshold:
+            if self.keys[i] == key:
+                del self.thresholds[i], self.keys[i]
+                return True
+            i += 1
+        return False
+
+    def pop_range(self, lo: int, hi: int) -> List[Hashable]:
+        keys = self.keys[lo:hi]
+        del self.thresholds[lo:hi], self.keys[lo:hi]
+        return keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+
+class AlertIndex:
+    """
+    In-memory index of one-shot price alerts.
+
+    "above" alerts fire when price >= threshold, "below" alerts when
+    price <= threshold. Each alert fires once and is removed from the index.
+    """
+
+    def __init__(self):
+        self._above: Dict[str, _Side] = {}
+        self._below: Dict[str, _Side] = {}
+        self._alerts: Dict[Hashable, Dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable, ticker: str, direction: str, threshold: float, payload: Optional[Dict] = None):
+        """Add (or replace) an alert; payload is returned with the trigger"""
+        if direction not in ("above", "below"):
+            raise ValueError(f"Unknown alert direction: {direction}")
+
+        ticker = ticker.upper()
+        threshold = float(threshold)
+        with self._lock:
+            self._remove_locked(key)
+            sides = self._above if direction == "above" else self._below
+            sides.setdefault(ticker, _Side()).insert(threshold, key)
+            self._alerts[key] = {
+                "ticker": ticker,
+                "direction": direction,
+                "threshold": threshold,
+                "payload": payload,
+            }
+
+    def remove(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove_locked(key)
+
+    def _remove_locked(self, key: Hashable) -> bool:
+        alert = self._alerts.pop(key, None)
+        if alert is None:
+            return False
+        sides = self._above if alert["direction"] == "above" else self._below
+        side = sides.get(alert["ticker"])
+        if side is not None:
+            side.remove(alert["threshold"], key)
+            if not side:
+                del sides[alert["ticker"]]
+        return True
+
+    def update(self, ticker: str, price: float) -> List[Dict]:
+        """
+        Apply a price and pop every alert it crosses.
+
+        Returns:
+            Triggered alerts as dicts with key, ticker, direction, threshold, payload
+        """
+        if price is None:
+            return []
+
+        ticker = ticker.upper()
+        price = float(price)
+        with self._lock:
+            keys = []
+            above = self._above.get(ticker)
+            if above:
+                # thresholds <= price
+                keys += above.pop_range(0, bisect_right(above.thresholds, price))
+                if not above:
+                    del self._above[ticker]
+
+            below = self._below.get(ticker)
+            if below:
+                # thresholds >= price
+                keys += below.pop_range(bisect_left(below.thresholds, price), len(below))
+                if not below:
+                    del self._below[ticker]
+
+            return [{"key": key, **self._alerts.pop(key)} for key in keys]
+
+    def alerts_for(self, ticker: str) -> List[Dict]:
+        """Active alerts for a ticker (below side first, then above; each ascending)"""
+        ticker = ticker.upper()
+        with self._lock:
+            keys = list(self._below.get(ticker, _Side()).keys) + list(self._above.get(ticker, _Side()).keys)
+            return [{"key": key, **self._alerts[key]} for key in keys]
+
+    def clear(self, ticker: Optional[str] = None) -> int:
+        """Remove all alerts (or all alerts for one ticker); returns how many were removed"""
+        with self._lock:
+            if ticker is None:
+                count = len(self._alerts)
+                self._above.clear()
+                self._below.clear()
+                self._alerts.clear()
+                return count
+
+            ticker = ticker.upper()
+            keys = list(self._below.pop(ticker, _Side()).keys) + list(self._above.pop(ticker, _Side()).keys)
+            for key in keys:
+                self._alerts.pop(key, None)
+            return len(keys)
+
+    def tickers(self) -> List[str]:
+        with self._lock:
+            return sorted(set(self._above) | set(self._below))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._alerts
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+
+class PriceAlertEngine:
+    """PriceAlert rows evaluated against live prices, with batched trigger writes"""
+
+    def __init__(self, app=None, flush_interval: float = FLUSH_INTERVAL, batch_size: int = FLUSH_BATCH_SIZE):
+        self.app = app
+        self.index = AlertIndex()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending: List[Dict] = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # No load query while a trigger write is in flight
+        self._triggered_since_load: set = set()
+        self._wake = threading.Event()
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._max_id = 0
+        self._loaded_at = 0.0
+        self._refreshed_at = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._aggregator = None
+
+    def _context(self):
+        # Without an app the caller must already be inside an app context
+        return self.app.app_context() if self.app is not None else nullcontext()
+
+    # ---- loading -----------------------------------------------------------
+
+    def load(self, full: bool = True) -> int:
+        """
+        Load untriggered alerts into the index.
+
+        full=True rebuilds the index (drops alerts deleted in the database);
+        full=False only adds alerts created since the last load.
+        Returns the number of alerts loaded.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                # Triggered in memory but not yet written (or triggered while the query runs):
+                # the rows still look untriggered, so don't re-add them
+                self._triggered_since_load = {alert["id"] for alert in self._pending}
+
+            with self._context():
+                query = db.session.query(
+                    PriceAlert.id, PriceAlert.user_id, PriceAlert.ticker, PriceAlert.condition, PriceAlert.threshold
+                ).filter(PriceAlert.is_triggered.is_(False))
+                if not full:
+                    query = query.filter(PriceAlert.id > self._max_id)
+                rows = query.all()
+
+        if full:
+            self.index.clear()
+        loaded = 0
+        for alert_id, user_id, ticker, condition, threshold in rows:
+            self._max_id = max(self._max_id, alert_id)
+            if alert_id in self._triggered_since_load or condition not in ("above", "below") or threshold is None:
+                continue
+            self.index.add(alert_id, ticker, condition, float(threshold), {"user_id": user_id})
+            loaded += 1
+
+        now = time.monotonic()
+        self._refreshed_at = now
+        if full:
+            self._loaded_at = now
+        logger.info(f"Alert engine loaded {loaded} alerts ({'full' if full else 'incremental'})")
+        return loaded
+
+    # ---- evaluation --------------------------------------------------------
+
+    def add_trigger_listener(self, callback: Callable[[Dict], None]):
+        """Call callback(alert) for every triggered alert (from the evaluating thread)"""
+        self._listeners.append(callback)
+
+    def on_price(self, ticker: str, price: float) -> List[Dict]:
+        """Evaluate one price update; returns the alerts it triggered"""
+        hits = self.index.update(ticker, price)
+        if not hits:
+            return []
+
+        now = datetime.now(timezone.utc)
+        triggered = [
+            {
+                "id": hit["key"],
+                "user_id": (hit["payload"] or {}).get("user_id"),
+                "ticker": hit["ticker"],
+                "condition": hit["direction"],
+                "threshold": hit["threshold"],
+                "triggered_price": float(price),
+                "triggered_at": now,
+            }
+            for hit in hits
+        ]
+
+        with self._pending_lock:
+            self._pending.extend(triggered)
+            self._triggered_since_load.update(alert["id"] for alert in triggered)
+            if len(self._pending) >= self.batch_size:
+                self._wake.set()
+
+        for alert in triggered:
+            logger.info(
+                f"ALERT TRIGGERED: {alert['ticker']} {alert['condition']} "
+                f"${alert['threshold']} (current: ${alert['triggered_price']})"
+            )
+            for callback in self._listeners:
+                try:
+                    callback(alert)
+                except Exception as e:
+                    logger.error(f"Alert listener error for {alert['ticker']}: {e}")
+        return triggered
+
+    def on_tick(self, ticker: str, state: Dict):
+        """TickAggregator listener"""
+        self.on_price(ticker, state.get("price"))
+
+    def evaluate_prices(self, prices: Dict[str, float]) -> List[Dict]:
+        """Evaluate a batch of prices (e.g. one market snapshot)"""
+        triggered = []
+        for ticker, price in prices.items():
+            triggered += self.on_price(ticker, price)
+        return triggered
+
+    def evaluate_snapshot(self, polygon) -> List[Dict]:
+        """Evaluate every indexed ticker against one targeted market snapshot"""
+        tickers = self.index.tickers()
+        if not tickers:
+            return []
+        snapshot = polygon.get_market_snapshot(tickers)
+        return self.evaluate_prices({ticker: data.get("price") for ticker, data in snapshot.items()})
+
+    # ---- batched writes ----------------------------------------------------
+
+    def flush(self) -> int:
+        """Write pending triggers in one executemany UPDATE; returns rows written"""
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            mappings = [
+                {
+                    "id": alert["id"],
+                    "is_triggered": True,
+                    "triggered_at": alert["triggered_at"],
+                    "triggered_price": alert["triggered_price"],
+                }
+                for alert in batch
+            ]
+            try:
+                with self._context():
+                    db.session.bulk_update_mappings(PriceAlert, mappings)
+                    db.session.commit()
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} triggered alerts, will retry: {e}")
+                with self._context():
+                    db.session.rollback()
+                with self._pending_lock:
+                    self._pending = batch + self._pending
+                return 0
+            return len(batch)
+
+    # ---- lifecycle ---------------------------------------------------------
+
+    def attach(self, aggregator):
+        """Evaluate every price-changing tick from a TickAggregator"""
+        self._aggregator = aggregator
+        aggregator.add_listener(self.on_tick)
+
+    def start(self):
+        """Start the writer thread (also refreshes the index periodically)"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, name="alert-engine", daemon=True)
+        self._thread.start()
+        logger.info("Price alert engine started")
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._aggregator is not None:
+            self._aggregator.remove_listener(self.on_tick)
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.flush()
+        logger.info("Price alert engine stopped")
+
+    def _writer_loop(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+            now = time.monotonic()
+            try:
+                if now - self._loaded_at >= FULL_RELOAD_INTERVAL:
+                    self.load(full=True)
+                elif now - self._refreshed_at >= REFRESH_INTERVAL:
+                    self.load(full=False)
+            except Exception as e:
+                logger.error(f"Alert engine reload failed: {e}")
+
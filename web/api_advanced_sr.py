@@ -34,6 +34,8 @@ logger = logging.getLogger(__name__)
 
 api_advanced_sr = Blueprint("api_advanced_sr", __name__)
 
+MAX_PROFILE_BINS = 2000
+
 @api_advanced_sr.route("/api/sr/analyze/<ticker>")
 @login_required
 def full_sr_analysis(ticker: str):
@@ -128,6 +130,8 @@ def volume_profile_analysis(ticker: str):
     Query Params:
     - interval: Timeframe (default: 5)
     - limit: Number of bars (default: 100)
+    - bins: Price bins, 1 to 2000 (default: 50)
+    - session: true to anchor the profile at the current session start
     """
     ticker = ticker.upper().strip()
 
@@ -136,6 +140,10 @@ def volume_profile_analysis(ticker: str):
 
     interval = request.args.get("interval", "5")
     limit = int(request.args.get("limit", 100))
+    num_bins = request.args.get("bins", type=int) if "bins" in request.args else 50
+    if num_bins is None or not 1 <= num_bins <= MAX_PROFILE_BINS:
+        return jsonify({"error": f"bins must be an integer from 1 to {MAX_PROFILE_BINS}"}), 400
+    session = request.args.get("session", "false").lower() == "true"
 
     # Fetch bars
     mtf_analyzer = MultiTimeframeSR()
@@ -145,19 +153,21 @@ def volume_profile_analysis(ticker: str):
         return jsonify({"error": "Failed to fetch price data"}), 400
 
     # Calculate volume profile
-    vp_analyzer = VolumeProfileAnalyzer()
-    profile = vp_analyzer.calculate_volume_profile(bars)
+    vp_analyzer = VolumeProfileAnalyzer(num_bins=num_bins)
+    profile = vp_analyzer.calculate_volume_profile(bars, session=session)
 
     if "error" in profile:
         return jsonify(profile), 400
 
     # Get S/R from volume profile
-    sr_levels = vp_analyzer.get_sr_from_volume_profile(bars)
+    sr_levels = vp_analyzer.get_sr_from_volume_profile(bars, profile)
 
     return jsonify({
         "ticker": ticker,
         "interval": interval,
         "bars_analyzed": len(bars),
+        "bins": profile.get("num_bins"),
+        "session": session,
         "timestamp": datetime.now().isoformat(),
         "vpoc": profile.get("vpoc"),
         "value_area": profile.get("value_area"),
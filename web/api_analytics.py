@@ -13,7 +13,6 @@ from flask_login import login_required, current_user
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from collections import defaultdict
-import math
 import logging
 from datetime import timedelta
 from datetime import timezone
@@ -25,6 +24,8 @@ except ImportError:
     from database import db, Transaction, PortfolioSnapshot, TradeJournal
     from polygon_service import get_polygon_service
 
+from src.services.risk_engine import benchmark_closes, compute_risk, load_equity_curve
+
 logger = logging.getLogger(__name__)
 
 api_analytics = Blueprint("api_analytics", __name__)
@@ -147,83 +148,25 @@ def get_risk_metrics():
     - Sharpe Ratio
     - Sortino Ratio
     - Max Drawdown
-    - Beta (vs SPY)
+    - Beta / correlation (vs SPY)
     - Volatility
+    - VaR / CVaR (95%, historical)
+    - Rolling Sharpe / Sortino
     """
-    # Get portfolio snapshots for calculations
-    snapshots = PortfolioSnapshot.query.filter_by(
-        user_id=current_user.id
-    ).order_by(PortfolioSnapshot.snapshot_date).all()
+    curve = load_equity_curve(current_user.id)
 
-    if len(snapshots) < 10:
+    if len(curve) < 10:
         return jsonify({
             "message": "Need at least 10 days of data for risk metrics",
-            "days_available": len(snapshots),
+            "days_available": len(curve),
         })
 
-    # Calculate daily returns
-    returns = []
-    for i in range(1, len(snapshots)):
-        prev_val = float(snapshots[i-1].total_value)
-        curr_val = float(snapshots[i].total_value)
-        if prev_val > 0:
-            daily_return = (curr_val - prev_val) / prev_val
-            returns.append(daily_return)
-
-    if not returns:
+    metrics = compute_risk(curve, benchmark_closes(curve.dates))
+    if not metrics:
         return jsonify({"message": "Insufficient data for calculations"})
 
-    # Mean return (annualized)
-    mean_return = sum(returns) / len(returns)
-    annualized_return = mean_return * 252
-
-    # Standard deviation (annualized)
-    variance = sum((r - mean_return) ** 2 for r in returns) / len(returns)
-    std_dev = math.sqrt(variance)
-    annualized_volatility = std_dev * math.sqrt(252)
-
-    # Sharpe Ratio (assuming 5% risk-free rate)
-    risk_free_rate = 0.05
-    sharpe_ratio = (annualized_return - risk_free_rate) / annualized_volatility if annualized_volatility > 0 else 0
-
-    # Sortino Ratio (only downside deviation)
-    negative_returns = [r for r in returns if r < 0]
-    if negative_returns:
-        downside_variance = sum(r ** 2 for r in negative_returns) / len(returns)
-        downside_deviation = math.sqrt(downside_variance) * math.sqrt(252)
-        sortino_ratio = (annualized_return - risk_free_rate) / downside_deviation if downside_deviation > 0 else 0
-    else:
-        sortino_ratio = float('inf')
-
-    # Max Drawdown
-    peak = float(snapshots[0].total_value)
-    max_drawdown = 0
-
-    for snapshot in snapshots:
-        value = float(snapshot.total_value)
-        if value > peak:
-            peak = value
-        drawdown = (peak - value) / peak if peak > 0 else 0
-        max_drawdown = max(max_drawdown, drawdown)
-
-    # Win days vs Loss days
-    up_days = sum(1 for r in returns if r > 0)
-    down_days = sum(1 for r in returns if r < 0)
-
-    return jsonify({
-        "days_analyzed": len(snapshots),
-        "annualized_return": round(annualized_return * 100, 2),
-        "annualized_volatility": round(annualized_volatility * 100, 2),
-        "sharpe_ratio": round(sharpe_ratio, 2),
-        "sortino_ratio": round(sortino_ratio, 2) if sortino_ratio != float('inf') else "∞",
-        "max_drawdown": round(max_drawdown * 100, 2),
-        "up_days": up_days,
-        "down_days": down_days,
-        "win_day_rate": round((up_days / len(returns) * 100), 1) if returns else 0,
-        "best_day": round(max(returns) * 100, 2) if returns else 0,
-        "worst_day": round(min(returns) * 100, 2) if returns else 0,
-        "avg_daily_return": round(mean_return * 100, 3),
-    })
+    metrics.pop("series")
+    return jsonify(metrics)
 
 
 @api_analytics.route("/api/analytics/trade-analysis")
@@ -392,7 +335,8 @@ def get_equity_curve():
     """
     Get equity curve data for charting.
 
-    Returns daily portfolio values over time.
+    Returns daily portfolio values over time with drawdown and rolling
+    Sharpe per point, plus risk metrics for the period.
     """
     period = request.args.get("period", "1M")
 
@@ -402,23 +346,28 @@ def get_equity_curve():
     days = period_days.get(period, 30)
     start_date = datetime.now().date() - timedelta(days=days)
 
-    snapshots = PortfolioSnapshot.query.filter(
-        PortfolioSnapshot.user_id == current_user.id,
-        PortfolioSnapshot.snapshot_date >= start_date
-    ).order_by(PortfolioSnapshot.snapshot_date).all()
-
-    data_points = []
-    for snapshot in snapshots:
-        data_points.append({
-            "date": snapshot.snapshot_date.isoformat(),
-            "value": float(snapshot.total_value),
-            "pnl": float(snapshot.daily_pnl) if snapshot.daily_pnl else 0,
-        })
+    curve = load_equity_curve(current_user.id, start_date)
+    risk = compute_risk(curve, benchmark_closes(curve.dates)) if len(curve) >= 2 else {}
+    series = risk.pop("series", {})
+    drawdown = series.get("drawdown") or [0.0] * len(curve)
+    rolling_sharpe = series.get("rolling_sharpe") or [None] * len(curve)
+
+    data_points = [
+        {
+            "date": str(day),
+            "value": float(value),
+            "pnl": float(pnl),
+            "drawdown": drawdown[i],
+            "rolling_sharpe": rolling_sharpe[i],
+        }
+        for i, (day, value, pnl) in enumerate(zip(curve.dates, curve.values, curve.pnl))
+    ]
 
     return jsonify({
         "period": period,
         "data_points": data_points,
         "count": len(data_points),
+        "risk": risk,
     })
 
 
@@ -12,6 +12,7 @@ Features:
 from flask import Blueprint, jsonify, request
 from flask_login import login_required, current_user
 from web.extensions import csrf, limiter
+from web.instrumentation import timed
 from web.polygon_service import get_polygon_service
 from web.database import db, Watchlist, PaperTrade, PaperAccount
 import os
@@ -254,7 +255,8 @@ USER MESSAGE: {message}
 
 Respond helpfully and concisely:"""
 
-            response = model.generate_content(full_prompt)
+            with timed("upstream", "gemini"):
+                response = model.generate_content(full_prompt)
 
             # Handle response safely
             if not response or not response.text:
@@ -1,7 +1,8 @@
 from flask import Blueprint, jsonify, request
-from web.database import NewsArticle, EconomicEvent, db, User
+from web.database import NewsArticle, NewsTicker, EconomicEvent, db, User
 from src.services.db_service import DatabaseService
 from src.services.market_data_service import MarketDataService
+from src.services.news_tickers import recent_articles
 from web.polygon_service import get_polygon_service
 from datetime import datetime, timezone, timedelta
 from sqlalchemy import or_
@@ -51,9 +52,14 @@ def search_news():
     keyword = request.args.get("keyword")
 
     query = NewsArticle.query
+    order = NewsArticle.published_at.desc()
 
     if ticker:
-        query = query.filter(NewsArticle.title.contains(ticker))
+        # Ticker mentions index instead of a substring scan of every title
+        query = query.join(NewsTicker, NewsTicker.article_id == NewsArticle.id).filter(
+            NewsTicker.ticker == ticker.strip().upper()
+        )
+        order = NewsTicker.published_at.desc()
 
     if keyword:
         query = query.filter(
@@ -63,7 +69,7 @@ def search_news():
             )
         )
 
-    articles = query.order_by(NewsArticle.published_at.desc()).limit(50).all()
+    articles = query.order_by(order).limit(50).all()
     return jsonify({"success": True, "articles": [a.to_dict() for a in articles]})
 
 
@@ -111,12 +117,7 @@ def get_stock_chart(ticker):
 @api_main.route("/api/stock/<ticker>/news")
 def get_stock_news(ticker):
     """Get news for a specific stock"""
-    articles = (
-        NewsArticle.query.filter(NewsArticle.title.contains(ticker))
-        .order_by(NewsArticle.published_at.desc())
-        .limit(10)
-        .all()
-    )
+    articles = recent_articles([ticker], limit=10)
 
     return jsonify({"success": True, "articles": [a.to_dict() for a in articles]})
 
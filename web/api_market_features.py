@@ -7,6 +7,7 @@ from flask_login import login_required, current_user
 from web.database import db, Transaction, Watchlist
 from web.polygon_service import get_polygon_service
 from web.extensions import cache
+from src.services.risk_engine import portfolio_risk
 from datetime import datetime, timedelta
 from decimal import Decimal
 from collections import defaultdict
@@ -468,7 +469,7 @@ def get_portfolio_analytics():
     - Best/worst trades
     - Daily/weekly/monthly P&L
     - Performance by ticker
-    - Risk metrics
+    - Risk metrics (trade-based, plus snapshot risk from the shared risk engine)
     """
     try:
         user_id = current_user.id
@@ -622,6 +623,10 @@ def get_portfolio_analytics():
         # Risk/Reward ratio
         risk_reward = abs(avg_win / avg_loss) if avg_loss != 0 else 0
 
+        # Volatility/drawdown/VaR/beta from daily snapshots
+        portfolio_risk_metrics = portfolio_risk(user_id)
+        portfolio_risk_metrics.pop("series", None)
+
         # Monthly P&L breakdown
         monthly_pnl = defaultdict(float)
         for trade in realized_trades:
@@ -663,6 +668,7 @@ def get_portfolio_analytics():
                 # Risk metrics
                 "profit_factor": round(profit_factor, 2) if profit_factor != float('inf') else "∞",
                 "risk_reward_ratio": round(risk_reward, 2),
+                "portfolio_risk": portfolio_risk_metrics,
 
                 # Trades
                 "best_trades": [
@@ -0,0 +1,80 @@
+"""
+Latency Metrics API
+
+Routes:
+- GET /api/admin/metrics - p50/p95/p99 per route and upstream provider (admin only)
+- GET /api/admin/metrics/slow-requests - Sampled stacks of slow requests (admin only)
+- GET /api/admin/boot-report - Boot time by phase and module, lazy blueprint state (admin only)
+- GET /metrics - Prometheus text format (admin session or METRICS_TOKEN bearer)
+"""
+
+import hmac
+import os
+import time
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import current_user
+
+from web import instrumentation
+from web.boot_report import boot
+
+api_metrics = Blueprint("api_metrics", __name__)
+
+def _is_admin() -> bool:
+    return current_user.is_authenticated and current_user.subscription_tier == "developer"
+
+def _has_metrics_token() -> bool:
+    token = os.getenv("METRICS_TOKEN")
+    provided = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return bool(token) and hmac.compare_digest(provided, token)
+
+@api_metrics.route("/api/admin/metrics")
+def get_latency_metrics():
+    """Latency percentiles, slowest p95 first"""
+    if not _is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify({
+        "success": True,
+        "uptime_seconds": round(time.time() - instrumentation.registry.started_at),
+        "latency": instrumentation.registry.snapshot(),
+        "profiling": {
+            "enabled": instrumentation.profiler.enabled,
+            "threshold_ms": instrumentation.profiler.threshold_ms,
+            "sample_rate": instrumentation.profiler.sample_rate,
+        },
+    })
+
+@api_metrics.route("/api/admin/metrics/slow-requests")
+def get_slow_requests():
+    """Most recent sampled slow requests with their hottest stacks"""
+    if not _is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+
+    return jsonify({
+        "success": True,
+        "enabled": instrumentation.profiler.enabled,
+        "profiles": list(reversed(instrumentation.profiler.profiles)),
+    })
+
+@api_metrics.route("/api/admin/boot-report")
+def get_boot_report():
+    """Where worker boot time went (module timings need BOOT_REPORT=true)"""
+    if not _is_admin():
+        return jsonify({"error": "Unauthorized"}), 403
+
+    loader = current_app.extensions.get("lazy_blueprints")
+    return jsonify({
+        "success": True,
+        "import_timing": bool(boot.imports),
+        "boot": boot.report(),
+        "lazy_blueprints": loader.status() if loader is not None else None,
+    })
+
+@api_metrics.route("/metrics")
+def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    if not (_has_metrics_token() or _is_admin()):
+        return Response("Unauthorized\n", status=403, mimetype="text/plain")
+
+    return Response(instrumentation.registry.prometheus(), mimetype="text/plain; version=0.0.4")
@@ -7,6 +7,7 @@ from flask_login import login_required, current_user
 from web.database import db, PaperAccount, PaperTrade
 from web.polygon_service import get_polygon_service
 from web.extensions import csrf
+from web.leaderboard_service import apply_trade, reset_metrics
 from decimal import Decimal
 from datetime import datetime, timezone
 import logging
@@ -188,6 +189,7 @@ def execute_trade():
     )
 
     db.session.add(trade)
+    apply_trade(account, trade)
     db.session.commit()
 
     return jsonify({
@@ -227,6 +229,7 @@ def reset_account():
     # Reset balance
     account.balance = INITIAL_BALANCE
     account.last_reset = datetime.now(timezone.utc)
+    reset_metrics(account)
 
     db.session.commit()
 
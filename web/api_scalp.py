@@ -23,15 +23,18 @@ Supported Markets:
 - Crypto via Binance API (BTCUSDT, ETHUSDT, etc.)
 """
 
-from flask import Blueprint, jsonify, request
-from flask_login import login_required
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_login import current_user, login_required
 import os
+import json
 import logging
 from datetime import datetime, timedelta, timezone
 import re
-from web.polygon_service import PolygonService
+from web.database import db, SavedScreener, Watchlist
+from web.polygon_service import PolygonService, get_polygon_service
 from web.scalp_service import generate_scalp_signal
 from src.services.scalp_engine import ScalpAnalyzer
+from src.services.scalp_scanner import SCAN_MAX_TICKERS, get_scalp_scanner, rank
 
 logger = logging.getLogger(__name__)
 
@@ -215,3 +218,114 @@ def full_analysis(ticker: str):
         # Return basic analysis if advanced fails
         scalp_result["advanced_sr"] = {"error": str(e)}
         return jsonify(scalp_result)
+
+def _resolve_scan_universe(data: dict):
+    """
+    Tickers to scan from a request body.
+
+    Accepts an explicit "tickers" list (or comma string), "watchlist": true for
+    the user's watchlist, or "screener_id" for one of the user's saved screeners.
+    Returns (tickers, source) or (None, error message).
+    """
+    if data.get("tickers"):
+        tickers = data["tickers"]
+        if isinstance(tickers, str):
+            tickers = tickers.split(",")
+        tickers = [str(t).upper().strip() for t in tickers if str(t).strip()]
+        if any(len(t) > 12 or not re.match(r"^[A-Z0-9.]+$", t) for t in tickers):
+            return None, "Invalid ticker in list"
+        return tickers, "list"
+
+    if data.get("watchlist"):
+        rows = Watchlist.query.filter_by(user_id=current_user.id).order_by(Watchlist.added_at).all()
+        return [row.ticker for row in rows], "watchlist"
+
+    if data.get("screener_id"):
+        screener = SavedScreener.query.filter_by(id=data["screener_id"], user_id=current_user.id).first()
+        if not screener:
+            return None, "Screener not found"
+
+        criteria = {
+            key: getattr(screener, key)
+            for key in ("min_volume", "min_price", "max_price", "min_change_percent", "max_change_percent")
+            if getattr(screener, key) is not None
+        }
+        results = get_polygon_service().screen_stocks(criteria)
+        # Most liquid names first: they are the ones worth scalping
+        results.sort(key=lambda row: row.get("volume") or 0, reverse=True)
+
+        screener.last_used = datetime.now(timezone.utc)
+        db.session.commit()
+        return [row["ticker"] for row in results if row.get("ticker")], f"screener:{screener.id}"
+
+    return None, "Provide tickers, watchlist or screener_id"
+
+@api_scalp.route("/api/scalp/scan", methods=["POST"])
+@login_required
+def scan_universe():
+    """
+    Scalp-analyze a whole universe in one request.
+
+    Body (JSON):
+        tickers | watchlist | screener_id: Universe to scan
+        interval: Bar interval in minutes (default "5")
+        stream: true (default) streams one SSE "result" event per ticker as it
+                completes, then a "done" event with the ranked list;
+                false returns the ranked list as JSON
+        limit: Max ranked rows returned, 1 to SCAN_MAX_TICKERS (default all)
+    """
+    data = request.get_json() or {}
+    interval = str(data.get("interval", "5"))
+    if interval not in ("1", "5", "15", "60", "240"):
+        return jsonify({"error": "Invalid interval"}), 400
+
+    limit = None
+    if data.get("limit") is not None:
+        try:
+            limit = int(data["limit"])
+        except (TypeError, ValueError):
+            return jsonify({"error": "limit must be an integer"}), 400
+        if limit < 1:
+            return jsonify({"error": "limit must be at least 1"}), 400
+        limit = min(limit, SCAN_MAX_TICKERS)
+
+    tickers, source = _resolve_scan_universe(data)
+    if tickers is None:
+        return jsonify({"error": source}), 400
+    if not tickers:
+        return jsonify({"error": "Universe is empty"}), 400
+
+    tickers = list(dict.fromkeys(tickers))
+    truncated = len(tickers) > SCAN_MAX_TICKERS
+    tickers = tickers[:SCAN_MAX_TICKERS]
+    scanner = get_scalp_scanner()
+
+    if not data.get("stream", True):
+        ranked = scanner.scan_ranked(tickers, interval)
+        return jsonify({
+            "source": source,
+            "interval": interval,
+            "count": len(tickers),
+            "truncated": truncated,
+            "results": ranked[:limit] if limit else ranked,
+            "timestamp": datetime.now().isoformat(),
+        })
+
+    def generate():
+        yield f"event: started\ndata: {json.dumps({'source': source, 'count': len(tickers), 'truncated': truncated})}\n\n"
+        rows = []
+        for row in scanner.scan(tickers, interval):
+            rows.append(row)
+            yield f"event: result\ndata: {json.dumps(row)}\n\n"
+        ranked = rank(rows)
+        done = {"results": ranked[:limit] if limit else ranked, "timestamp": datetime.now().isoformat()}
+        yield f"event: done\ndata: {json.dumps(done)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        },
+    )
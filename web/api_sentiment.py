@@ -14,7 +14,9 @@ try:
         SentimentAnalyzer,
         analyze_ticker_sentiment,
         get_fear_greed_proxy,
-        calculate_price_sentiment
+        calculate_price_sentiment,
+        news_sentiment,
+        recent_news_texts,
     )
     from web.polygon_service import get_polygon_service
     from web.extensions import cache
@@ -23,7 +25,9 @@ except ImportError:
         SentimentAnalyzer,
         analyze_ticker_sentiment,
         get_fear_greed_proxy,
-        calculate_price_sentiment
+        calculate_price_sentiment,
+        news_sentiment,
+        recent_news_texts,
     )
     from polygon_service import get_polygon_service
     from extensions import cache
@@ -32,6 +36,29 @@ logger = logging.getLogger(__name__)
 
 api_sentiment = Blueprint("api_sentiment", __name__)
 
+NEWS_LOOKBACK_HOURS = 72
+NEWS_HEADLINE_LIMIT = 500
+
+
+def _news_sentiment(tickers=None):
+    """Batch-scored sentiment of recent stored headlines (market-wide and per ticker)"""
+    try:
+        return news_sentiment(recent_news_texts(NEWS_LOOKBACK_HOURS, NEWS_HEADLINE_LIMIT), tickers)
+    except Exception as e:
+        logger.warning(f"News sentiment unavailable: {e}")
+        return {"market": {"overall_score": 50, "overall_sentiment": "neutral", "articles_analyzed": 0}, "tickers": {}}
+
+
+def _news_fields(news: dict, ticker: str) -> dict:
+    summary = news["tickers"].get(ticker)
+    if not summary:
+        return {"news_score": None, "news_sentiment": None, "news_articles": 0}
+    return {
+        "news_score": summary["overall_score"],
+        "news_sentiment": summary["overall_sentiment"],
+        "news_articles": summary["articles_analyzed"],
+    }
+
 
 @api_sentiment.route("/api/sentiment/<ticker>")
 @login_required
@@ -110,12 +137,19 @@ def get_market_mood():
     # Get fear/greed
     fear_greed = get_fear_greed_proxy()
 
+    # Headline sentiment (all recent articles, scored in one batch)
+    news = _news_sentiment()["market"]
+
     # Calculate mood score
     sector_score = (positive_sectors / len(sectors) * 100) if sectors else 50
     index_score = (positive_indices / len(indices) * 100) if indices else 50
     fg_score = fear_greed.get("score", 50) if "score" in fear_greed else 50
+    components = [sector_score, index_score, fg_score]
+    news_score = news["overall_score"] if news["articles_analyzed"] else None
+    if news_score is not None:
+        components.append(news_score)
 
-    overall_score = (sector_score + index_score + fg_score) / 3
+    overall_score = sum(components) / len(components)
 
     if overall_score >= 65:
         mood = "Bullish"
@@ -141,6 +175,7 @@ def get_market_mood():
             "sector_score": round(sector_score, 1),
             "index_score": round(index_score, 1),
             "fear_greed_score": round(fg_score, 1),
+            "news_score": news_score,
         },
         "details": {
             "positive_sectors": positive_sectors,
@@ -148,6 +183,7 @@ def get_market_mood():
             "positive_indices": positive_indices,
             "total_indices": len(indices),
             "fear_greed": fear_greed.get("level", "Unknown"),
+            "news_articles": news["articles_analyzed"],
         },
         "timestamp": datetime.now().isoformat(),
     })
@@ -167,6 +203,7 @@ def get_trending_sentiment():
     ]
 
     polygon = get_polygon_service()
+    news = _news_sentiment(tickers)
     results = []
 
     for ticker in tickers:
@@ -195,6 +232,7 @@ def get_trending_sentiment():
                 "score": tech_sentiment["score"],
                 "rsi": technicals.get("rsi_14"),
                 "factors": tech_sentiment.get("factors", []),
+                **_news_fields(news, ticker),
             })
 
         except Exception as e:
@@ -244,6 +282,7 @@ def get_watchlist_sentiment():
         })
 
     polygon = get_polygon_service()
+    news = _news_sentiment([item.ticker for item in watchlist[:20]])
     results = []
 
     for item in watchlist[:20]:  # Max 20
@@ -273,6 +312,7 @@ def get_watchlist_sentiment():
                 "sentiment": tech_sentiment["sentiment"],
                 "score": tech_sentiment["score"],
                 "rsi": technicals.get("rsi_14"),
+                **_news_fields(news, ticker),
             })
 
         except Exception as e:
@@ -14,13 +14,13 @@ from flask_login import login_required, current_user
 from web.extensions import csrf
 from web.database import Watchlist
 from web.polygon_service import get_polygon_service
+from web.tick_bus import TICK_STALE_SECONDS, get_tick_bus, overlay_tick
 import logging
 import json
 import time
 from datetime import datetime, timezone
-from typing import Generator, List, Dict, Optional
+from typing import Generator, List, Dict, Optional, Tuple
 import threading
-from queue import Queue, Empty
 from datetime import timezone
 from typing import Dict
 from typing import List
@@ -32,22 +32,59 @@ api_sse = Blueprint("api_sse", __name__)
 csrf.exempt(api_sse)
 
 
+class PriceMailbox:
+    """
+    Per-subscriber mailbox holding the latest serialized update per key.
+
+    A newer update for a ticker replaces the pending one instead of queueing
+    behind it, so a lagging client skips stale prices rather than losing the
+    newest ones, and memory stays bounded by the number of subscribed tickers.
+    """
+
+    __slots__ = ("_pending", "_cond")
+
+    def __init__(self):
+        self._pending: Dict[str, str] = {}
+        self._cond = threading.Condition(threading.Lock())
+
+    def put(self, key: str, message: str):
+        with self._cond:
+            self._pending[key] = message
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> List[str]:
+        """Wait up to timeout seconds and drain every pending message (oldest key first)"""
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            messages = list(self._pending.values())
+            self._pending.clear()
+        return messages
+
+
 class SSEPriceStreamer:
     """
     Manages Server-Sent Events for real-time price streaming.
 
-    Uses a background thread to fetch prices and broadcast to all connected clients.
+    Live ticks from the tick bus are pushed as they arrive. A background thread
+    polls REST snapshots only for tickers without a fresh tick, and refreshes
+    the reference data (prev_close etc.) used to compute change.
     """
 
     def __init__(self):
         self.polygon = None
-        self._subscribers: Dict[str, List[Queue]] = {}  # ticker -> list of queues
-        self._global_subscribers: List[Queue] = []  # subscribers to all updates
+        self.tick_bus = None
+        self._reference: Dict[str, Dict] = {}  # ticker -> last REST snapshot
+        self._reference_time: Dict[str, float] = {}
+        # Copy-on-write: writers swap in new tuples under _lock, broadcasts read without it
+        self._subscribers: Dict[str, Tuple[PriceMailbox, ...]] = {}  # ticker -> mailboxes
+        self._global_subscribers: Tuple[PriceMailbox, ...] = ()  # subscribers to all updates
         self._running = False
         self._thread: Optional[threading.Thread] = None
         self._lock = threading.Lock()
         self._update_interval = 5  # seconds between price updates
         self._heartbeat_interval = 30  # seconds between heartbeats
+        self._reference_interval = 60  # seconds between snapshot refreshes for live tickers
 
     def _get_polygon(self):
         """Lazy initialization of polygon service"""
@@ -61,6 +98,11 @@ class SSEPriceStreamer:
             return
 
         self._running = True
+
+        self.tick_bus = get_tick_bus()
+        self.tick_bus.aggregator.add_listener(self._on_tick)
+        self.tick_bus.start()
+
         self._thread = threading.Thread(target=self._price_loop, daemon=True)
         self._thread.start()
         logger.info("SSE Price Streamer started")
@@ -68,11 +110,13 @@ class SSEPriceStreamer:
     def stop(self):
         """Stop the background thread"""
         self._running = False
+        if self.tick_bus:
+            self.tick_bus.aggregator.remove_listener(self._on_tick)
         if self._thread:
             self._thread.join(timeout=5)
         logger.info("SSE Price Streamer stopped")
 
-    def subscribe(self, tickers: List[str] = None) -> Queue:
+    def subscribe(self, tickers: List[str] = None) -> PriceMailbox:
         """
         Subscribe to price updates.
 
@@ -80,44 +124,73 @@ class SSEPriceStreamer:
             tickers: List of tickers to subscribe to. If None, subscribes to all updates.
 
         Returns:
-            Queue that will receive price updates
+            PriceMailbox that will receive price updates
         """
-        queue = Queue(maxsize=100)
+        mailbox = PriceMailbox()
 
         with self._lock:
             if tickers:
+                subscribers = dict(self._subscribers)
                 for ticker in tickers:
                     ticker = ticker.upper()
-                    if ticker not in self._subscribers:
-                        self._subscribers[ticker] = []
-                    self._subscribers[ticker].append(queue)
+                    subscribers[ticker] = subscribers.get(ticker, ()) + (mailbox,)
+                self._subscribers = subscribers
             else:
-                self._global_subscribers.append(queue)
+                self._global_subscribers = self._global_subscribers + (mailbox,)
 
         # Ensure streamer is running
         self.start()
 
-        return queue
+        return mailbox
 
-    def unsubscribe(self, queue: Queue, tickers: List[str] = None):
+    def unsubscribe(self, mailbox: PriceMailbox, tickers: List[str] = None):
         """Remove a subscriber"""
         with self._lock:
             if tickers:
+                subscribers = dict(self._subscribers)
                 for ticker in tickers:
                     ticker = ticker.upper()
-                    if ticker in self._subscribers:
-                        try:
-                            self._subscribers[ticker].remove(queue)
-                        except ValueError:
-                            pass
+                    remaining = tuple(m for m in subscribers.get(ticker, ()) if m is not mailbox)
+                    if remaining:
+                        subscribers[ticker] = remaining
+                    else:
+                        # Stop polling tickers nobody watches
+                        subscribers.pop(ticker, None)
+                self._subscribers = subscribers
             else:
-                try:
-                    self._global_subscribers.remove(queue)
-                except ValueError:
-                    pass
+                self._global_subscribers = tuple(m for m in self._global_subscribers if m is not mailbox)
+
+    def _on_tick(self, ticker: str, tick: Dict):
+        """Push a live trade to subscribers as soon as the tick bus applies it"""
+        if ticker not in self._subscribers:
+            return
+
+        self._broadcast(ticker, self._price_update(ticker, overlay_tick(self._reference.get(ticker), tick)))
+
+    def _price_update(self, ticker: str, data: Dict) -> Dict:
+        return {
+            "event": "price_update",
+            "ticker": ticker,
+            "price": data.get("price"),
+            "change": data.get("change"),
+            "change_percent": data.get("change_percent"),
+            "volume": data.get("volume"),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
+    def _tickers_to_poll(self, tickers: List[str]) -> List[str]:
+        """Tickers without a fresh tick, plus live tickers whose reference data is due"""
+        now = time.time()
+        aggregator = self.tick_bus.aggregator if self.tick_bus else None
+        due = []
+        for ticker in tickers:
+            live = aggregator is not None and aggregator.get_last(ticker, TICK_STALE_SECONDS) is not None
+            if not live or now - self._reference_time.get(ticker, 0) >= self._reference_interval:
+                due.append(ticker)
+        return due
 
     def _price_loop(self):
-        """Background thread that fetches prices and broadcasts updates"""
+        """Background thread that polls REST snapshots for tickers the tick bus doesn't cover"""
         last_heartbeat = time.time()
 
         while self._running:
@@ -126,24 +199,24 @@ class SSEPriceStreamer:
                 with self._lock:
                     all_tickers = list(self._subscribers.keys())
 
-                if all_tickers:
+                tickers_to_poll = self._tickers_to_poll(all_tickers)
+                if tickers_to_poll:
                     # Fetch prices
                     polygon = self._get_polygon()
                     try:
-                        snapshots = polygon.get_market_snapshot(all_tickers[:50])  # Limit batch size
+                        # Targeted tickers= fetch, chunked inside PolygonService
+                        snapshots = polygon.get_market_snapshot(tickers_to_poll)
+                        now = time.time()
 
                         for ticker, data in snapshots.items():
                             if data:
-                                price_update = {
-                                    "event": "price_update",
-                                    "ticker": ticker,
-                                    "price": data.get("price"),
-                                    "change": data.get("change"),
-                                    "change_percent": data.get("change_percent"),
-                                    "volume": data.get("volume"),
-                                    "timestamp": datetime.now(timezone.utc).isoformat()
-                                }
-                                self._broadcast(ticker, price_update)
+                                self._reference[ticker] = data
+                                self._reference_time[ticker] = now
+
+                                # Live tickers are pushed by _on_tick; only refresh their reference
+                                tick = self.tick_bus.aggregator.get_last(ticker) if self.tick_bus else None
+                                if tick is None:
+                                    self._broadcast(ticker, self._price_update(ticker, data))
 
                     except Exception as e:
                         logger.error(f"Price fetch error: {e}")
@@ -160,24 +233,11 @@ class SSEPriceStreamer:
                 time.sleep(5)
 
     def _broadcast(self, ticker: str, data: dict):
-        """Broadcast update to subscribers"""
+        """Serialize once and post to every subscriber's mailbox (no global lock held)"""
         message = json.dumps(data)
 
-        with self._lock:
-            # Send to ticker-specific subscribers
-            queues = self._subscribers.get(ticker, [])
-            for queue in queues[:]:  # Copy list to avoid modification during iteration
-                try:
-                    queue.put_nowait(message)
-                except Exception:
-                    pass  # Queue full, skip
-
-            # Send to global subscribers
-            for queue in self._global_subscribers[:]:
-                try:
-                    queue.put_nowait(message)
-                except Exception:
-                    pass
+        for mailbox in self._subscribers.get(ticker, ()) + self._global_subscribers:
+            mailbox.put(ticker, message)
 
     def _broadcast_heartbeat(self):
         """Send heartbeat to all subscribers"""
@@ -186,25 +246,21 @@ class SSEPriceStreamer:
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
-        with self._lock:
-            all_queues = list(self._global_subscribers)
-            for queues in self._subscribers.values():
-                all_queues.extend(queues)
+        mailboxes = set(self._global_subscribers)
+        for subscribers in list(self._subscribers.values()):
+            mailboxes.update(subscribers)
 
-            for queue in all_queues:
-                try:
-                    queue.put_nowait(heartbeat)
-                except Exception:
-                    pass
+        for mailbox in mailboxes:
+            mailbox.put("heartbeat", heartbeat)
 
 
 # Global streamer instance
 price_streamer = SSEPriceStreamer()
 
 
-def generate_sse_stream(queue: Queue, tickers: List[str] = None) -> Generator[str, None, None]:
+def generate_sse_stream(mailbox: PriceMailbox, tickers: List[str] = None) -> Generator[str, None, None]:
     """
-    Generate SSE stream from queue.
+    Generate SSE stream from a subscriber mailbox.
 
     Yields SSE-formatted messages.
     """
@@ -213,20 +269,21 @@ def generate_sse_stream(queue: Queue, tickers: List[str] = None) -> Generator[st
         yield f"event: connected\ndata: {json.dumps({'status': 'connected', 'tickers': tickers})}\n\n"
 
         while True:
-            try:
-                # Wait for message with timeout
-                message = queue.get(timeout=35)  # Slightly longer than heartbeat interval
-                yield f"data: {message}\n\n"
-            except Empty:
+            # Wait for messages with timeout (slightly longer than heartbeat interval)
+            messages = mailbox.get(timeout=35)
+            if not messages:
                 # Send keepalive comment
                 yield ": keepalive\n\n"
+                continue
+
+            yield "".join(f"data: {message}\n\n" for message in messages)
 
     except GeneratorExit:
         # Client disconnected
         logger.debug("SSE client disconnected")
     finally:
         # Cleanup subscription
-        price_streamer.unsubscribe(queue, tickers)
+        price_streamer.unsubscribe(mailbox, tickers)
 
 
 @api_sse.route("/api/sse/prices")
@@ -251,10 +308,10 @@ def stream_prices():
         tickers = tickers[:20]  # Limit to 20 tickers
 
     # Subscribe to updates
-    queue = price_streamer.subscribe(tickers)
+    mailbox = price_streamer.subscribe(tickers)
 
     return Response(
-        stream_with_context(generate_sse_stream(queue, tickers)),
+        stream_with_context(generate_sse_stream(mailbox, tickers)),
         mimetype="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -278,10 +335,10 @@ def stream_watchlist():
         return {"error": "Watchlist is empty"}, 400
 
     tickers = [w.ticker for w in watchlist]
-    queue = price_streamer.subscribe(tickers)
+    mailbox = price_streamer.subscribe(tickers)
 
     return Response(
-        stream_with_context(generate_sse_stream(queue, tickers)),
+        stream_with_context(generate_sse_stream(mailbox, tickers)),
         mimetype="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -299,10 +356,10 @@ def stream_market_pulse():
     Automatically subscribes to SPY, QQQ, DIA, IWM, VIX.
     """
     indices = ["SPY", "QQQ", "DIA", "IWM", "VIX"]
-    queue = price_streamer.subscribe(indices)
+    mailbox = price_streamer.subscribe(indices)
 
     return Response(
-        stream_with_context(generate_sse_stream(queue, indices)),
+        stream_with_context(generate_sse_stream(mailbox, indices)),
         mimetype="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -323,6 +380,7 @@ def sse_status():
             "global": len(price_streamer._global_subscribers)
         },
         "update_interval": price_streamer._update_interval,
+        "live_tickers": len(price_streamer.tick_bus.aggregator.tickers()) if price_streamer.tick_bus else 0,
         "heartbeat_interval": price_streamer._heartbeat_interval
     }
 
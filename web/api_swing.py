@@ -26,6 +26,7 @@ import re
 import pytz
 from web.polygon_service import PolygonService
 from web.finnhub_service import get_finnhub_service
+from web.instrumentation import timed
 from web.swing_service import generate_swing_signal
 from datetime import timedelta
 from datetime import timezone
@@ -126,7 +127,8 @@ def fetch_binance_candles(symbol: str, interval: str = "4h", limit: int = 100) -
 
     for url in endpoints:
         try:
-            response = requests.get(url, params=params, timeout=10)
+            with timed("upstream", "binance /api/v3/klines"):
+                response = requests.get(url, params=params, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -13,6 +13,7 @@ from flask_login import login_required, current_user
 from web.extensions import csrf, cache
 from web.database import db, Watchlist
 from web.polygon_service import get_polygon_service
+from web.tick_bus import get_tick_bus, overlay_tick
 
 import logging
 
@@ -34,23 +35,31 @@ class PriceStreamManager:
 
     def __init__(self):
         self.polygon = get_polygon_service()
+        self.tick_bus = get_tick_bus()
         self._cache = {}
         self._cache_time = {}
         self._cache_ttl = 5  # 5 seconds cache
+        self._reference = {}  # ticker -> last REST snapshot (prev_close for live ticks)
+        self._reference_ttl = 60  # seconds before live tickers refresh their snapshot
 
     def get_live_prices(self, tickers: List[str]) -> Dict:
-        """Get live prices for multiple tickers with caching"""
+        """Get live prices for multiple tickers, preferring tick bus state over cached snapshots"""
         if not tickers:
             return {}
 
+        self.tick_bus.start()
+
         now = time.time()
         results = {}
         tickers_to_fetch = []
 
-        # Check cache first
+        # Live ticks first, then the snapshot cache
         for ticker in tickers:
             ticker = ticker.upper()
-            if ticker in self._cache and (now - self._cache_time.get(ticker, 0)) < self._cache_ttl:
+            tick = self.tick_bus.aggregator.get_last(ticker)
+            if tick and ticker in self._reference and (now - self._cache_time.get(ticker, 0)) < self._reference_ttl:
+                results[ticker] = self._price_data(ticker, overlay_tick(self._reference[ticker], tick))
+            elif ticker in self._cache and (now - self._cache_time.get(ticker, 0)) < self._cache_ttl:
                 results[ticker] = self._cache[ticker]
             else:
                 tickers_to_fetch.append(ticker)
@@ -63,20 +72,11 @@ class PriceStreamManager:
                 for ticker in tickers_to_fetch:
                     data = snapshots.get(ticker, {})
                     if data:
-                        price_data = {
-                            "ticker": ticker,
-                            "price": data.get("price"),
-                            "change": data.get("change"),
-                            "change_percent": data.get("change_percent"),
-                            "volume": data.get("volume"),
-                            "high": data.get("high"),
-                            "low": data.get("low"),
-                            "open": data.get("open"),
-                            "prev_close": data.get("prev_close"),
-                            "timestamp": datetime.now(timezone.utc).isoformat()
-                        }
+                        tick = self.tick_bus.aggregator.get_last(ticker)
+                        price_data = self._price_data(ticker, overlay_tick(data, tick) if tick else data)
 
                         # Update cache
+                        self._reference[ticker] = data
                         self._cache[ticker] = price_data
                         self._cache_time[ticker] = now
                         results[ticker] = price_data
@@ -90,6 +90,21 @@ class PriceStreamManager:
 
         return results
 
+    @staticmethod
+    def _price_data(ticker: str, data: Dict) -> Dict:
+        return {
+            "ticker": ticker,
+            "price": data.get("price"),
+            "change": data.get("change"),
+            "change_percent": data.get("change_percent"),
+            "volume": data.get("volume"),
+            "high": data.get("high"),
+            "low": data.get("low"),
+            "open": data.get("open"),
+            "prev_close": data.get("prev_close"),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+
     def get_price_changes(self, tickers: List[str], last_prices: Dict) -> List[Dict]:
         """Compare current prices with last known prices and return changes"""
         current_prices = self.get_live_prices(tickers)
@@ -3,6 +3,11 @@ Flask Web Application - Qunex Trade
 Professional trading tools with real-time market data
 """
 
+# Boot profiling starts before the heavy imports below (BOOT_REPORT=true adds per-module timings)
+from web.boot_report import boot
+
+boot.start()
+
 from flask import (
     Flask,
     Response,
@@ -46,12 +51,13 @@ def create_app(config_class=Config):
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
 
     # Initialize extensions
-    db.init_app(app)
-    mail.init_app(app)
-    csrf.init_app(app)
-    cache.init_app(app)
-    limiter.init_app(app)
-    login_manager.init_app(app)
+    with boot.phase("init extensions"):
+        db.init_app(app)
+        mail.init_app(app)
+        csrf.init_app(app)
+        cache.init_app(app)
+        limiter.init_app(app)
+        login_manager.init_app(app)
 
     login_manager.login_view = "auth.login"
 
@@ -79,71 +85,27 @@ def create_app(config_class=Config):
     csrf.exempt("web.auth.ping")
 
     # Register Blueprints
-    from web.auth import auth, oauth
-    from web.api_polygon import api_polygon
-    from web.api_watchlist import api_watchlist
-    from web.api_portfolio import api_portfolio
-    from web.api_scalp import api_scalp
-    from web.api_swing import api_swing
-    from web.api_advanced_sr import api_advanced_sr
-    from web.api_market_features import api_market_features
-    from web.main import main as main_blueprint
-    from web.api_main import api_main
-    from web.api_paper import api_paper
-
-    # New feature APIs
-    from web.api_tools import api_tools
-    from web.api_earnings import api_earnings
-    from web.api_journal import api_journal
-    from web.api_analytics import api_analytics
-    from web.api_comparison import api_comparison
-    from web.api_options import api_options
-    from web.api_patterns import api_patterns
-    from web.api_sentiment import api_sentiment
-
-    # Advanced features - Chat, Leaderboard, Flow, WebSocket, SSE
-    from web.api_chat import api_chat
-    from web.api_leaderboard import api_leaderboard
-    from web.api_flow import api_flow
-    from web.api_websocket import api_websocket
-    from web.api_sse import api_sse
-
-    # Automated Agents API
-    from web.api_agents import api_agents
+    with boot.phase("import auth and main blueprints"):
+        from web.auth import auth, oauth
+        from web.main import main as main_blueprint
+
+    # Latency metrics
+    from web import instrumentation
+    from web.api_metrics import api_metrics
+    from web.lazy_blueprints import register_blueprints
 
     oauth.init_app(app)
 
     app.register_blueprint(auth, url_prefix="/auth")
-    app.register_blueprint(api_polygon)
-    app.register_blueprint(api_watchlist)
-    app.register_blueprint(api_portfolio)
-    app.register_blueprint(api_scalp)
-    app.register_blueprint(api_swing)
-    app.register_blueprint(api_advanced_sr)
-    app.register_blueprint(api_market_features)
     app.register_blueprint(main_blueprint)
-    app.register_blueprint(api_main)
-    app.register_blueprint(api_paper)
-
-    # Register new feature APIs
-    app.register_blueprint(api_tools)
-    app.register_blueprint(api_earnings)
-    app.register_blueprint(api_journal)
-    app.register_blueprint(api_analytics)
-    app.register_blueprint(api_comparison)
-    app.register_blueprint(api_options)
-    app.register_blueprint(api_patterns)
-    app.register_blueprint(api_sentiment)
-
-    # Register advanced features - Chat, Leaderboard, Flow, WebSocket, SSE
-    app.register_blueprint(api_chat)
-    app.register_blueprint(api_leaderboard)
-    app.register_blueprint(api_flow)
-    app.register_blueprint(api_websocket)
-    app.register_blueprint(api_sse)
-
-    # Register Automated Agents API
-    app.register_blueprint(api_agents)
+
+    # API blueprints (stubs imported on first request when LAZY_BLUEPRINTS is set)
+    with boot.phase("register API blueprints"):
+        register_blueprints(app, lazy=app.config.get("LAZY_BLUEPRINTS", False))
+
+    # Per-route latency histograms
+    instrumentation.init_app(app)
+    app.register_blueprint(api_metrics)
 
     # Apply rate limiting to auth routes
     auth_routes = [
@@ -205,7 +167,7 @@ def create_app(config_class=Config):
     # Create tables (configurable to avoid unintended schema changes in prod)
     auto_create_tables = os.getenv("AUTO_CREATE_TABLES", "true").lower() == "true"
     if auto_create_tables:
-        with app.app_context():
+        with app.app_context(), boot.phase("db.create_all"):
             try:
                 db.create_all()
             except Exception as e:
@@ -217,6 +179,7 @@ def create_app(config_class=Config):
 
 
 app = create_app()
+boot.finish()
 
 
 def _wants_json() -> bool:
@@ -0,0 +1,164 @@
+"""
+Boot Profiling
+Breaks worker boot time down for slow-start investigations:
+- phase() times named steps of create_app (extension init, blueprint
+  registration, create_all)
+- With BOOT_REPORT=true an import hook times every module import; self time
+  excludes nested imports, like `python -X importtime`
+- report() aggregates both, slowest first, and is logged once boot finishes
+
+Standard library only; start() must run before the imports it should see.
+"""
+
+import importlib.abc
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BOOT_REPORT = os.getenv("BOOT_REPORT", "false").lower() == "true"
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Finds specs through the remaining finders and times each loader's exec_module"""
+
+    def __init__(self, profile: "BootProfile"):
+        self.profile = profile
+        self.active = False
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                self._wrap(spec.loader)
+                return spec
+        return None
+
+    def _wrap(self, loader):
+        # Built-in and frozen importers are classes shared by every module
+        if loader is None or isinstance(loader, type) or not hasattr(loader, "exec_module"):
+            return
+        if getattr(loader.exec_module, "_boot_timed", False):
+            return
+        original = loader.exec_module
+
+        def exec_module(module):
+            if not self.active:
+                return original(module)
+            stack = self._stack()
+            stack.append(0.0)  # Time spent in nested imports
+            start = time.perf_counter()
+            try:
+                return original(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.profile.record_import(module.__name__, elapsed, elapsed - nested)
+
+        exec_module._boot_timed = True
+        try:
+            loader.exec_module = exec_module
+        except AttributeError:
+            pass
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class BootProfile:
+    """Phase and per-module import timings for one process boot"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}  # module -> (cumulative, self) seconds
+        self._timer = _ImportTimer(self)
+
+    @property
+    def importing(self) -> bool:
+        return self._timer.active
+
+    def start(self, imports: bool = BOOT_REPORT):
+        """Begin timing; with imports=True install the import hook"""
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        if imports and not self._timer.active:
+            sys.meta_path.insert(0, self._timer)
+            self._timer.active = True
+
+    def finish(self):
+        """End of boot: remove the import hook and log the report if requested"""
+        if self.finished_at is not None:
+            return
+        self.finished_at = time.perf_counter()
+        if self._timer.active:
+            self._timer.active = False
+            if self._timer in sys.meta_path:
+                sys.meta_path.remove(self._timer)
+            for line in self.summary_lines():
+                logger.info(line)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            # Only the first boot counts; later create_app() calls (tests) are ignored
+            if self.finished_at is None:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def record_import(self, module: str, cumulative: float, self_time: float):
+        self.imports[module] = (cumulative, self_time)
+
+    def report(self, limit: int = 25) -> Dict:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        modules = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+
+        packages: Dict[str, List[float]] = {}
+        for module, (_, self_time) in self.imports.items():
+            entry = packages.setdefault(module.split(".")[0], [0.0, 0])
+            entry[0] += self_time
+            entry[1] += 1
+
+        return {
+            "total_ms": round((end - self.started_at) * 1000, 1),
+            "import_ms": round(sum(self_time for _, self_time in self.imports.values()) * 1000, 1),
+            "phases": [
+                {"phase": name, "ms": round(seconds * 1000, 1)}
+                for name, seconds in sorted(self.phases, key=lambda item: item[1], reverse=True)
+            ],
+            "packages": [
+                {"package": package, "self_ms": round(self_time * 1000, 1), "modules": count}
+                for package, (self_time, count) in sorted(packages.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+            ],
+            "modules": [
+                {"module": module, "self_ms": round(self_time * 1000, 1), "cumulative_ms": round(cumulative * 1000, 1)}
+                for module, (cumulative, self_time) in modules[:limit]
+            ],
+        }
+
+    def summary_lines(self, limit: int = 15) -> List[str]:
+        report = self.report(limit)
+        lines = [f"Boot: {report['total_ms']}ms total, {report['import_ms']}ms in imports"]
+        lines += [f"  phase {p['phase']}: {p['ms']}ms" for p in report["phases"][:limit]]
+        lines += [f"  package {p['package']}: {p['self_ms']}ms ({p['modules']} modules)" for p in report["packages"]]
+        lines += [f"  module {m['module']}: {m['self_ms']}ms self, {m['cumulative_ms']}ms cumulative" for m in report["modules"]]
+        return lines
+
+
+boot = BootProfile()
@@ -90,3 +90,6 @@ class Config:
     NEWS_ANALYSIS_LIMIT = 50
     CALENDAR_DAYS_AHEAD = 60
     AUTO_REFRESH_INTERVAL = 3600
+
+    # Boot: register API blueprints as stubs and import them on first request
+    LAZY_BLUEPRINTS = os.getenv("LAZY_BLUEPRINTS", "false").lower() == "true"
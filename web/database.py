@@ -231,6 +231,26 @@ class NewsArticle(db.Model):
         }
 
 
+class NewsTicker(db.Model):
+    """Tickers mentioned by a news article (ticker -> news lookups without scanning titles)"""
+
+    __tablename__ = "news_tickers"
+
+    article_id = db.Column(
+        db.Integer, db.ForeignKey("news_articles.id", ondelete="CASCADE"), primary_key=True
+    )
+    ticker = db.Column(db.String(10), primary_key=True)
+    # Copy of the article's published_at so (ticker, published_at) answers "latest news for X" from the index
+    published_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_news_tickers_ticker_published_at", "ticker", "published_at"),
+    )
+
+    def __repr__(self):
+        return f"<NewsTicker {self.ticker} - {self.article_id}>"
+
+
 class EconomicEvent(db.Model):
     """Economic calendar events"""
 
@@ -344,6 +364,21 @@ class AIScore(db.Model):
         }
 
 
+class FeatureRow(db.Model):
+    """One ticker's model features as of a date (src/services/feature_store.py)"""
+
+    __tablename__ = "feature_rows"
+
+    # A feature version fixes its feature list, e.g. "technical-v1"
+    feature_version = db.Column(db.String(50), primary_key=True)
+    ticker = db.Column(db.String(20), primary_key=True)
+    as_of_date = db.Column(db.Date, primary_key=True)
+    values_json = db.Column(db.Text, nullable=False)  # {feature: value}, null for missing
+
+    def __repr__(self):
+        return f"<FeatureRow {self.feature_version} {self.ticker} {self.as_of_date}>"
+
+
 class Transaction(db.Model):
     """
     User portfolio transactions (buy/sell).
@@ -422,6 +457,7 @@ class BacktestJob(db.Model):
     created_at = db.Column(
         db.DateTime, default=lambda: datetime.now(timezone.utc), index=True
     )
+    started_at = db.Column(db.DateTime, nullable=True)  # Set when a worker claims the job
     completed_at = db.Column(db.DateTime, nullable=True)
 
     # Relationship
@@ -445,6 +481,7 @@ class BacktestJob(db.Model):
             "result": json.loads(self.result_json) if self.result_json else None,
             "error_message": self.error_message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": (
                 self.completed_at.isoformat() if self.completed_at else None
             ),
@@ -456,7 +493,8 @@ class PriceAlert(db.Model):
     Price alerts for watchlist stocks.
 
     Users can set alerts to be notified when a stock price crosses a threshold.
-    Checked every 5 minutes by cron_check_alerts.py cron job.
+    Evaluated by web/alert_engine.py (scripts/cron_check_alerts.py runs it
+    every 5 minutes, or continuously on live ticks with --stream).
     """
 
     __tablename__ = "price_alerts"
@@ -724,6 +762,63 @@ class PaperTrade(db.Model):
         }
 
 
+class LeaderboardMetrics(db.Model):
+    """
+    Materialized paper trading metrics per account for the leaderboard.
+
+    Trade-driven fields are updated incrementally when a paper trade executes;
+    valuation fields are refreshed for all accounts in one batch pass against a
+    shared market snapshot. Rankings are a single ORDER BY total_pnl_pct.
+    """
+
+    __tablename__ = "leaderboard_metrics"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("user.id"), nullable=False, unique=True, index=True
+    )
+    username = db.Column(db.String(80), nullable=True)  # Denormalized for rank queries
+
+    # Trade-driven (incremental)
+    cash = db.Column(db.Numeric(precision=14, scale=2), nullable=False, default=100000)
+    total_trades = db.Column(db.Integer, nullable=False, default=0, index=True)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    win_rate = db.Column(db.Float, nullable=False, default=0)
+    first_trade_at = db.Column(db.DateTime, nullable=True)
+    last_reset = db.Column(db.DateTime, nullable=True, index=True)
+    # {ticker: {shares, cost, buy_n, buy_sum, sell_n, sell_sum}} as strings (Decimal-safe)
+    positions_json = db.Column(db.Text, nullable=True)
+    positions_count = db.Column(db.Integer, nullable=False, default=0)
+    marks_json = db.Column(db.Text, nullable=True)  # {ticker: price} used in the last valuation
+
+    # Valuation (batch revalued)
+    portfolio_value = db.Column(db.Float, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=100000)
+    total_pnl = db.Column(db.Float, nullable=False, default=0)
+    total_pnl_pct = db.Column(db.Float, nullable=False, default=0, index=True)
+    revalued_at = db.Column(db.DateTime, nullable=True)
+
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    user = db.relationship("User", backref=db.backref("leaderboard_metrics", uselist=False))
+
+    def __repr__(self):
+        return f"<LeaderboardMetrics {self.user_id} {self.total_pnl_pct:.2f}%>"
+
+    @property
+    def positions(self) -> dict:
+        return json.loads(self.positions_json) if self.positions_json else {}
+
+    @property
+    def marks(self) -> dict:
+        return json.loads(self.marks_json) if self.marks_json else {}
+
+
 class TradeJournal(db.Model):
     """
     Trade Journal for tracking and improving trading performance.
@@ -16,6 +16,11 @@ import json
 from typing import Dict
 from typing import Optional
 
+try:
+    from web.instrumentation import endpoint_family, timed
+except ImportError:
+    from instrumentation import endpoint_family, timed
+
 logger = logging.getLogger(__name__)
 
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
@@ -38,7 +43,8 @@ class FinnhubService:
 
         try:
             url = f"{self.base_url}/{endpoint}"
-            response = self.session.get(url, params=params, timeout=10)
+            with timed("upstream", f"finnhub {endpoint_family(endpoint, 1)}"):
+                response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.Timeout:
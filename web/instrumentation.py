@@ -0,0 +1,333 @@
+"""
+Latency Instrumentation
+Per-route and per-upstream-call latency histograms with p50/p95/p99:
+- LatencyHistogram: HDR-style log-linear buckets (16 sub-buckets per power of
+  two, ~3% relative error), O(1) record, fixed memory
+- init_app() times every Flask request by URL rule
+- timed() wraps upstream calls (Polygon, Finnhub, Binance, Gemini)
+- Opt-in sampling profiler keeps stack samples of slow requests
+- Prometheus text output (summary type) for scraping; report_at_exit() for cron jobs
+
+Standard library only, so any module (including src/ and scripts/) can import it.
+"""
+
+import atexit
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUB_BUCKET_BITS = 4  # 16 linear sub-buckets per power of two
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_EXPONENT = 40  # Microseconds up to 2^44 (~200 days)
+NUM_BUCKETS = (MAX_EXPONENT + 1) * SUB_BUCKETS
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Slow-request profiling (off unless PROFILE_SLOW_REQUEST_MS is set)
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1"))  # Fraction of requests sampled
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_KEEP = 50  # Slow-request profiles retained
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram over microseconds"""
+
+    __slots__ = ("counts", "count", "total", "max", "_lock")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0  # seconds
+        self.max = 0.0  # seconds
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(micros: int) -> int:
+        if micros < SUB_BUCKETS:
+            return micros
+        exponent = micros.bit_length() - 1 - SUB_BUCKET_BITS
+        if exponent >= MAX_EXPONENT:
+            return NUM_BUCKETS - 1
+        sub = (micros >> exponent) - SUB_BUCKETS
+        return (exponent + 1) * SUB_BUCKETS + sub
+
+    @staticmethod
+    def _upper_bound(index: int) -> float:
+        """Largest value (seconds) that lands in bucket `index`"""
+        if index < SUB_BUCKETS:
+            return index / 1e6
+        exponent = index // SUB_BUCKETS - 1
+        sub = index % SUB_BUCKETS + SUB_BUCKETS
+        return (((sub + 1) << exponent) - 1) / 1e6
+
+    def record(self, seconds: float):
+        index = self._index(max(0, int(seconds * 1e6)))
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantiles(self, qs=QUANTILES) -> Dict[float, float]:
+        """Quantile -> seconds (bucket upper bound, capped at the observed max)"""
+        with self._lock:
+            counts, count, observed_max = list(self.counts), self.count, self.max
+        if count == 0:
+            return {q: 0.0 for q in qs}
+
+        result = {}
+        targets = sorted((max(1, int(q * count + 0.999999)), q) for q in qs)
+        seen = 0
+        t = 0
+        for index, n in enumerate(counts):
+            if not n:
+                continue
+            seen += n
+            while t < len(targets) and seen >= targets[t][0]:
+                result[targets[t][1]] = min(self._upper_bound(index), observed_max)
+                t += 1
+            if t == len(targets):
+                break
+        return result
+
+    def snapshot(self) -> Dict:
+        q = self.quantiles()
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(q[0.5] * 1000, 3),
+            "p95_ms": round(q[0.95] * 1000, 3),
+            "p99_ms": round(q[0.99] * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class MetricsRegistry:
+    """Histograms keyed by (kind, name), e.g. ("route", "GET /api/scalp/scan")"""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def histogram(self, kind: str, name: str) -> LatencyHistogram:
+        key = (kind, name)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def observe(self, kind: str, name: str, seconds: float):
+        self.histogram(kind, name).record(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """{kind: {name: stats}} sorted by p95 descending"""
+        with self._lock:
+            items = list(self._histograms.items())
+        result: Dict[str, Dict[str, Dict]] = {}
+        for (kind, name), histogram in items:
+            result.setdefault(kind, {})[name] = histogram.snapshot()
+        return {
+            kind: dict(sorted(stats.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+            for kind, stats in result.items()
+        }
+
+    def prometheus(self) -> str:
+        """Prometheus text exposition (summary per histogram)"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        lines = [
+            "# HELP qunex_latency_seconds Request and upstream call latency",
+            "# TYPE qunex_latency_seconds summary",
+        ]
+        for (kind, name), histogram in items:
+            labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+            for q, seconds in histogram.quantiles().items():
+                lines.append(f'qunex_latency_seconds{{{labels},quantile="{q}"}} {seconds:.6f}')
+            lines.append(f"qunex_latency_seconds_sum{{{labels}}} {histogram.total:.6f}")
+            lines.append(f"qunex_latency_seconds_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def timed(kind: str, name: str):
+    """Record the duration of the block, e.g. with timed("upstream", "gemini"): ..."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(kind, name, time.perf_counter() - start)
+
+
+def timed_call(kind: str, name: str):
+    """Decorator form of timed()"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(kind, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def endpoint_family(path: str, segments: int = 2) -> str:
+    """Low-cardinality label for an upstream path ("/v2/aggs/ticker/AAPL/..." -> "/v2/aggs")"""
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    return "/" + "/".join(parts[:segments])
+
+
+# ---- slow-request sampling profiler -----------------------------------------
+
+
+class SlowRequestProfiler:
+    """
+    Samples the stacks of in-flight profiled requests from one background
+    thread; requests slower than threshold_ms keep their aggregated samples.
+    """
+
+    def __init__(self, threshold_ms: float, sample_rate: float = PROFILE_SAMPLE_RATE, interval: float = PROFILE_INTERVAL):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.profiles = deque(maxlen=PROFILE_KEEP)
+        self._active: Dict[int, Counter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0 and self.sample_rate > 0
+
+    def begin(self) -> bool:
+        """Start sampling the current thread (subject to the sample rate)"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return False
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._sample_loop, name="slow-request-profiler", daemon=True)
+                self._thread.start()
+        return True
+
+    def end(self, label: str, seconds: float):
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or seconds * 1000 < self.threshold_ms:
+            return
+        self.profiles.append({
+            "route": label,
+            "duration_ms": round(seconds * 1000, 1),
+            "at": time.time(),
+            "samples": sum(samples.values()),
+            "top_stacks": [{"stack": stack, "samples": n} for stack, n in samples.most_common(10)],
+        })
+
+    def _sample_loop(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = list(self._active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, samples in active:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    samples[_collapse(frame)] += 1
+
+
+def _collapse(frame, depth: int = 12) -> str:
+    """Innermost `depth` frames as "file:line func" joined root-first"""
+    stack = traceback.extract_stack(frame, limit=depth)
+    return " <- ".join(f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in reversed(stack))
+
+
+profiler = SlowRequestProfiler(PROFILE_SLOW_REQUEST_MS)
+
+
+# ---- integrations -------------------------------------------------------------
+
+
+def init_app(app):
+    """Time every request by method + URL rule (and sample slow ones if enabled)"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._instrument_start = time.perf_counter()
+        g._instrument_profiled = profiler.begin()
+
+    @app.teardown_request
+    def _record_latency(exc=None):
+        start = g.pop("_instrument_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        label = f"{request.method} {rule}"
+        registry.observe("route", label, elapsed)
+        if g.pop("_instrument_profiled", False):
+            profiler.end(label, elapsed)
+
+
+def summary_lines(limit: int = 20) -> List[str]:
+    """Human-readable p50/p95/p99 lines, slowest p95 first"""
+    lines = []
+    for kind, stats in registry.snapshot().items():
+        for name, s in list(stats.items())[:limit]:
+            lines.append(
+                f"[{kind}] {name}: n={s['count']} p50={s['p50_ms']}ms p95={s['p95_ms']}ms "
+                f"p99={s['p99_ms']}ms max={s['max_ms']}ms"
+            )
+    return lines
+
+
+def report_at_exit(job: str):
+    """
+    For cron scripts: log latency percentiles when the process exits and, if
+    METRICS_TEXTFILE_DIR is set, write Prometheus text for a textfile collector.
+    """
+
+    def report():
+        for line in summary_lines():
+            logger.info(f"[{job}] {line}")
+        directory = os.getenv("METRICS_TEXTFILE_DIR")
+        if directory:
+            path = os.path.join(directory, f"{job}.prom")
+            try:
+                tmp = f"{path}.tmp"
+                with open(tmp, "w") as f:
+                    f.write(registry.prometheus())
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"Failed to write metrics for {job}: {e}")
+
+    atexit.register(report)
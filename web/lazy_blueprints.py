@@ -0,0 +1,231 @@
+"""
+Lazy Blueprints
+Registers the API blueprints, optionally without importing them at boot:
+- Eager mode imports each module and registers its blueprint (the default)
+- Lazy mode (LAZY_BLUEPRINTS=true) registers a stub view for every rule in
+  blueprint_manifest.json under the real endpoint name, so the URL map and
+  url_for() are complete without importing pandas, Gemini or the agents package
+- The first request to one of a blueprint's endpoints imports its module and
+  swaps the real views in before CSRF and rate-limit checks run
+- Modules missing from the manifest are registered eagerly
+
+Only blueprint-scoped hooks are carried over; blueprints with app-wide hooks
+(before_app_request and friends) must stay eager. After adding or changing
+routes, regenerate the manifest with scripts/build_blueprint_manifest.py.
+"""
+
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from flask import Flask, abort, current_app
+
+from web.boot_report import boot
+from web.instrumentation import registry
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blueprint_manifest.json")
+
+# (module, blueprint attribute) in registration order
+BLUEPRINTS = [
+    ("web.api_polygon", "api_polygon"),
+    ("web.api_watchlist", "api_watchlist"),
+    ("web.api_portfolio", "api_portfolio"),
+    ("web.api_scalp", "api_scalp"),
+    ("web.api_swing", "api_swing"),
+    ("web.api_advanced_sr", "api_advanced_sr"),
+    ("web.api_market_features", "api_market_features"),
+    ("web.api_main", "api_main"),
+    ("web.api_paper", "api_paper"),
+    # New feature APIs
+    ("web.api_tools", "api_tools"),
+    ("web.api_earnings", "api_earnings"),
+    ("web.api_journal", "api_journal"),
+    ("web.api_analytics", "api_analytics"),
+    ("web.api_comparison", "api_comparison"),
+    ("web.api_options", "api_options"),
+    ("web.api_patterns", "api_patterns"),
+    ("web.api_sentiment", "api_sentiment"),
+    # Advanced features - Chat, Leaderboard, Flow, WebSocket, SSE
+    ("web.api_chat", "api_chat"),
+    ("web.api_leaderboard", "api_leaderboard"),
+    ("web.api_flow", "api_flow"),
+    ("web.api_websocket", "api_websocket"),
+    ("web.api_sse", "api_sse"),
+    # Automated Agents API
+    ("web.api_agents", "api_agents"),
+]
+
+# Blueprint-scoped hook registries copied from the scratch app on load
+_HOOK_ATTRS = (
+    "before_request_funcs",
+    "after_request_funcs",
+    "teardown_request_funcs",
+    "url_value_preprocessors",
+    "url_default_functions",
+    "template_context_processors",
+)
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> Dict[str, Dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Blueprint manifest unavailable ({e}); registering blueprints eagerly")
+        return {}
+
+
+def build_manifest(app: Flask) -> Dict[str, Dict]:
+    """{module: {"blueprint": name, "rules": [...]}} from an eagerly registered app"""
+    names = {}
+    for module, attribute in BLUEPRINTS:
+        names[getattr(importlib.import_module(module), attribute).name] = module
+
+    manifest = {module: {"blueprint": name, "rules": []} for name, module in names.items()}
+    for rule in app.url_map.iter_rules():
+        module = names.get(rule.endpoint.rpartition(".")[0])
+        if module is None:
+            continue
+        entry = {
+            "rule": rule.rule,
+            "endpoint": rule.endpoint,
+            "methods": sorted(rule.methods - {"HEAD", "OPTIONS"}),
+        }
+        if rule.defaults:
+            entry["defaults"] = rule.defaults
+        manifest[module]["rules"].append(entry)
+
+    for entry in manifest.values():
+        entry["rules"].sort(key=lambda r: (r["rule"], r["endpoint"], r["methods"]))
+    return manifest
+
+
+def write_manifest(app: Flask, path: str = MANIFEST_PATH):
+    with open(path, "w") as f:
+        json.dump(build_manifest(app), f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+class LazyBlueprintLoader:
+    """Stub endpoints per blueprint module, replaced by the real views on first hit"""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.pending: Dict[str, str] = {}  # endpoint -> module
+        self.attributes: Dict[str, str] = {}  # module -> blueprint attribute
+        self.loaded: Dict[str, float] = {}  # module -> import seconds
+        self._stubs: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+        app.url_value_preprocessor(self._preprocess)
+
+    def add(self, module: str, attribute: str, rules: List[Dict]):
+        self.attributes[module] = attribute
+        for rule in rules:
+            endpoint = rule["endpoint"]
+            if endpoint not in self._stubs:
+                self._stubs[endpoint] = self._make_stub(endpoint)
+            self.pending[endpoint] = module
+            self.app.add_url_rule(
+                rule["rule"],
+                endpoint=endpoint,
+                view_func=self._stubs[endpoint],
+                methods=rule["methods"],
+                defaults=rule.get("defaults"),
+            )
+
+    def _make_stub(self, endpoint: str) -> Callable:
+        def stub(**kwargs):
+            self.ensure_loaded(endpoint)
+            return current_app.view_functions[endpoint](**kwargs)
+
+        stub.__name__ = f"lazy_{endpoint.replace('.', '_')}"
+        return stub
+
+    def _preprocess(self, endpoint: Optional[str], values):
+        # URL value preprocessors run before every before_request hook, so CSRF
+        # exemptions and rate limits see the real view, not the stub
+        if endpoint in self.pending:
+            self.ensure_loaded(endpoint)
+
+    def ensure_loaded(self, endpoint: str):
+        module = self.pending.get(endpoint)
+        if module is None:
+            return
+        with self._lock:
+            if endpoint in self.pending:
+                self._load(module)
+
+    def load_all(self):
+        """Import every pending blueprint now (e.g. from a warm-up job)"""
+        for module in sorted(set(self.pending.values())):
+            with self._lock:
+                if module in self.pending.values():
+                    self._load(module)
+
+    def _load(self, module: str):
+        start = time.perf_counter()
+        blueprint = getattr(importlib.import_module(module), self.attributes[module])
+
+        # A throwaway app resolves url_prefix, subdomain and deferred setup for us
+        scratch = Flask(self.app.import_name)
+        scratch.register_blueprint(blueprint)
+
+        stubbed = {endpoint for endpoint, owner in self.pending.items() if owner == module}
+        prefix = f"{blueprint.name}."
+        real = {endpoint: view for endpoint, view in scratch.view_functions.items() if endpoint.startswith(prefix)}
+
+        for endpoint in stubbed:
+            # A rule removed since the manifest was built answers 404 instead of looping on its stub
+            self.app.view_functions[endpoint] = real.get(endpoint, _gone)
+            del self.pending[endpoint]
+
+        for attr in _HOOK_ATTRS:
+            funcs = getattr(scratch, attr).get(blueprint.name)
+            if funcs:
+                getattr(self.app, attr).setdefault(blueprint.name, []).extend(funcs)
+        if blueprint.name in scratch.error_handler_spec:
+            self.app.error_handler_spec[blueprint.name] = scratch.error_handler_spec[blueprint.name]
+
+        stale = sorted((set(real) - stubbed) | (stubbed - set(real)))
+        if stale:
+            logger.warning(f"Blueprint manifest is stale for {module} ({', '.join(stale)}); regenerate it")
+
+        elapsed = time.perf_counter() - start
+        self.loaded[module] = elapsed
+        registry.observe("lazy_import", module, elapsed)
+        logger.info(f"Lazy-loaded {module} in {elapsed * 1000:.0f}ms")
+
+    def status(self) -> Dict:
+        return {
+            "pending": sorted(set(self.pending.values())),
+            "loaded_ms": {module: round(seconds * 1000, 1) for module, seconds in self.loaded.items()},
+        }
+
+
+def _gone(**kwargs):
+    abort(404)
+
+
+def register_blueprints(app: Flask, lazy: bool = False) -> Optional[LazyBlueprintLoader]:
+    """Register every API blueprint; lazily (from the manifest) when lazy=True"""
+    manifest = load_manifest() if lazy else {}
+    loader = LazyBlueprintLoader(app) if manifest else None
+    if loader is not None:
+        app.extensions["lazy_blueprints"] = loader
+
+    for module, attribute in BLUEPRINTS:
+        entry = manifest.get(module)
+        if loader is not None and entry and entry.get("rules"):
+            loader.add(module, attribute, entry["rules"])
+            continue
+        with boot.phase(f"import {module}"):
+            blueprint = getattr(importlib.import_module(module), attribute)
+        app.register_blueprint(blueprint)
+
+    return loader
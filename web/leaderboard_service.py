@@ -0,0 +1,282 @@
+"""
+Materialized Leaderboard Metrics
+
+Keeps one LeaderboardMetrics row per paper account:
+- apply_trade() folds each executed PaperTrade into the row (same transaction)
+- revalue_all() marks every open position to market in one batch pass using a
+  single shared snapshot for the union of held tickers
+- Rank queries read the table with one indexed ORDER BY
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from web.database import db, LeaderboardMetrics, PaperAccount, PaperTrade, User
+from web.polygon_service import get_polygon_service
+
+logger = logging.getLogger(__name__)
+
+INITIAL_BALANCE = Decimal("100000.00")
+REVALUE_MAX_AGE = 60  # seconds; same as the /api/leaderboard cache
+
+_revalue_lock = threading.Lock()
+_last_revalue: Optional[datetime] = None
+
+
+def _empty_position() -> Dict:
+    return {"shares": "0", "cost": "0", "buy_n": 0, "buy_sum": 0.0, "sell_n": 0, "sell_sum": 0.0}
+
+
+def _canonical(value: Decimal) -> str:
+    # Same string whether the trade came from the request or back from the database
+    return format(value.normalize(), "f")
+
+
+def _fold_trade(positions: Dict, ticker: str, trade_type: str, shares: Decimal, price: Decimal):
+    """Apply one trade to the per-ticker position state (same math as the original trade replay)"""
+    position = positions.setdefault(ticker, _empty_position())
+    sign = 1 if trade_type == "buy" else -1
+    position["shares"] = _canonical(Decimal(position["shares"]) + sign * shares)
+    position["cost"] = _canonical(Decimal(position["cost"]) + sign * shares * price)
+    side = "buy" if trade_type == "buy" else "sell"
+    position[f"{side}_n"] += 1
+    position[f"{side}_sum"] += float(price)
+
+
+def _win_loss(positions: Dict) -> tuple:
+    """Per ticker with both buys and sells: a win if the average sell beats the average buy"""
+    wins = losses = 0
+    for position in positions.values():
+        if position["buy_n"] and position["sell_n"]:
+            if position["sell_sum"] / position["sell_n"] > position["buy_sum"] / position["buy_n"]:
+                wins += 1
+            else:
+                losses += 1
+    return wins, losses
+
+
+def _open_positions(positions: Dict) -> Dict[str, Decimal]:
+    return {ticker: Decimal(p["shares"]) for ticker, p in positions.items() if Decimal(p["shares"]) > 0}
+
+
+def _store_positions(row: LeaderboardMetrics, positions: Dict):
+    """Persist positions and every field derived from them"""
+    row.positions_json = json.dumps(positions)
+    row.positions_count = len(_open_positions(positions))
+    row.wins, row.losses = _win_loss(positions)
+    closed = row.wins + row.losses
+    row.win_rate = round(row.wins / closed * 100, 1) if closed else 0
+
+
+def _valuation(row: LeaderboardMetrics, positions: Dict, marks: Dict[str, float]) -> Dict:
+    """Valuation fields for cash + open positions marked at `marks`"""
+    held = _open_positions(positions)
+    marks = {ticker: float(marks.get(ticker) or 0.0) for ticker in held}
+    portfolio_value = sum(float(shares) * marks[ticker] for ticker, shares in held.items())
+    total_value = float(row.cash) + portfolio_value
+    total_pnl = total_value - float(INITIAL_BALANCE)
+    return {
+        "portfolio_value": portfolio_value,
+        "total_value": total_value,
+        "total_pnl": total_pnl,
+        "total_pnl_pct": round(total_pnl / float(INITIAL_BALANCE) * 100, 2),
+        "marks_json": json.dumps(marks),
+        "revalued_at": datetime.now(timezone.utc),
+    }
+
+
+def _set_valuation(row: LeaderboardMetrics, positions: Dict, marks: Dict[str, float]):
+    for key, value in _valuation(row, positions, marks).items():
+        setattr(row, key, value)
+
+
+def apply_trade(account: PaperAccount, trade: PaperTrade):
+    """
+    Fold a just-executed trade into the account's metrics row.
+
+    Call after updating account.balance and before committing, so the trade
+    and its metrics land in the same transaction. The traded ticker is marked
+    at the execution price until the next revalue pass.
+
+    The row is locked (SELECT ... FOR UPDATE) and reloaded, so concurrent
+    trades by the same user fold into positions_json one after the other
+    instead of overwriting each other.
+    """
+    row = (
+        LeaderboardMetrics.query.filter_by(user_id=account.user_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+    if row is None:
+        # First trade (or an account from before the table): replay includes this trade
+        db.session.flush()
+        rebuild_metrics(account, commit=False)
+        return
+
+    positions = row.positions
+    _fold_trade(positions, trade.ticker, trade.trade_type, Decimal(str(trade.shares)), Decimal(str(trade.price)))
+    _store_positions(row, positions)
+    row.cash = account.balance
+    row.total_trades += 1
+    if row.first_trade_at is None:
+        row.first_trade_at = trade.trade_date or datetime.now(timezone.utc)
+    _set_valuation(row, positions, {**row.marks, trade.ticker: float(trade.price)})
+
+
+def rebuild_metrics(account: PaperAccount, commit: bool = True) -> LeaderboardMetrics:
+    """Recompute an account's row from its full trade history (backfill / repair)"""
+    trades = PaperTrade.query.filter_by(user_id=account.user_id).order_by(PaperTrade.id).all()
+    row = LeaderboardMetrics.query.filter_by(user_id=account.user_id).first()
+    if row is None:
+        row = LeaderboardMetrics(user_id=account.user_id)
+        db.session.add(row)
+
+    positions: Dict = {}
+    marks: Dict[str, float] = {}
+    for trade in trades:
+        _fold_trade(positions, trade.ticker, trade.trade_type, Decimal(str(trade.shares)), Decimal(str(trade.price)))
+        marks[trade.ticker] = float(trade.price)  # Last trade price until the next revalue
+
+    user = account.user
+    row.username = user.username if user else None
+    row.cash = account.balance
+    row.last_reset = account.last_reset
+    row.total_trades = len(trades)
+    row.first_trade_at = min((t.trade_date for t in trades if t.trade_date), default=None)
+    _store_positions(row, positions)
+    _set_valuation(row, positions, marks)
+
+    if commit:
+        db.session.commit()
+    return row
+
+
+def reset_metrics(account: PaperAccount):
+    """Account reset: trades deleted and balance restored (caller commits)"""
+    row = LeaderboardMetrics.query.filter_by(user_id=account.user_id).first()
+    if row is None:
+        return
+    row.cash = account.balance
+    row.last_reset = account.last_reset
+    row.total_trades = 0
+    row.first_trade_at = None
+    _store_positions(row, {})
+    _set_valuation(row, {}, {})
+
+
+def backfill_missing() -> int:
+    """Create rows for accounts that predate the table (one-time, then a cheap anti-join)"""
+    accounts = (
+        PaperAccount.query.outerjoin(LeaderboardMetrics, LeaderboardMetrics.user_id == PaperAccount.user_id)
+        .filter(LeaderboardMetrics.id.is_(None))
+        .all()
+    )
+    for account in accounts:
+        rebuild_metrics(account, commit=False)
+    if accounts:
+        db.session.commit()
+        logger.info(f"Backfilled leaderboard metrics for {len(accounts)} accounts")
+    return len(accounts)
+
+
+def revalue_all(polygon=None) -> int:
+    """
+    Mark every open position to market in one pass.
+
+    One targeted snapshot covers the union of held tickers across all accounts;
+    rows are written with a single bulk update. Returns the rows revalued.
+    """
+    rows = LeaderboardMetrics.query.filter(LeaderboardMetrics.positions_count > 0).all()
+    if not rows:
+        return 0
+
+    positions = {row.id: row.positions for row in rows}
+    tickers = sorted({ticker for held in positions.values() for ticker in _open_positions(held)})
+    snapshot = (polygon or get_polygon_service()).get_market_snapshot(tickers)
+    fresh = {ticker: data["price"] for ticker, data in snapshot.items() if data.get("price")}
+
+    # Tickers missing from this snapshot keep their last mark
+    mappings = [
+        {"id": row.id, **_valuation(row, positions[row.id], {**row.marks, **fresh})}
+        for row in rows
+    ]
+    db.session.bulk_update_mappings(LeaderboardMetrics, mappings)
+    db.session.commit()
+    return len(mappings)
+
+
+def refresh_if_stale(max_age: int = REVALUE_MAX_AGE, polygon=None) -> bool:
+    """
+    Backfill + revalue at most once per max_age seconds per process.
+
+    Concurrent callers don't wait: if another request is already revaluing,
+    they read the current (slightly older) valuations.
+    """
+    global _last_revalue
+    now = datetime.now(timezone.utc)
+    if _last_revalue is not None and now - _last_revalue < timedelta(seconds=max_age):
+        return False
+    if not _revalue_lock.acquire(blocking=False):
+        return False
+    try:
+        backfill_missing()
+        revalue_all(polygon)
+        _last_revalue = now
+        return True
+    except Exception as e:
+        logger.error(f"Leaderboard revalue failed: {e}")
+        db.session.rollback()
+        return False
+    finally:
+        _revalue_lock.release()
+
+
+def ranked_query(period: str = "all"):
+    """Rows ordered by P&L %, filtered by reset date for weekly/monthly boards"""
+    query = LeaderboardMetrics.query
+    if period in ("week", "month"):
+        cutoff = datetime.now(timezone.utc) - timedelta(days=7 if period == "week" else 30)
+        query = query.filter(db.or_(LeaderboardMetrics.last_reset.is_(None), LeaderboardMetrics.last_reset >= cutoff))
+    return query.order_by(LeaderboardMetrics.total_pnl_pct.desc(), LeaderboardMetrics.user_id)
+
+
+def metrics_dict(row: LeaderboardMetrics) -> Dict:
+    """Metrics in the shape calculate_user_metrics has always returned"""
+    now = datetime.now(timezone.utc)
+    first_trade = _aware(row.first_trade_at)
+    days_active = max(1, (now - first_trade).days) if first_trade else None
+    last_reset = _aware(row.last_reset)
+    return {
+        "total_value": row.total_value,
+        "total_pnl": row.total_pnl,
+        "total_pnl_pct": row.total_pnl_pct,
+        "cash": float(row.cash),
+        "portfolio_value": row.portfolio_value,
+        "total_trades": row.total_trades,
+        "win_rate": row.win_rate,
+        "wins": row.wins,
+        "losses": row.losses,
+        "trades_per_day": round(row.total_trades / days_active, 2) if days_active else 0,
+        "positions_count": row.positions_count,
+        "days_since_reset": (now - last_reset).days if last_reset else 0,
+    }
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def usernames_for(rows: Iterable[LeaderboardMetrics]) -> Dict[int, str]:
+    """Fill in usernames for rows created before the user was loaded (one query)"""
+    missing = [row.user_id for row in rows if not row.username]
+    if not missing:
+        return {}
+    return dict(User.query.with_entities(User.id, User.username).filter(User.id.in_(missing)).all())
@@ -1,13 +1,12 @@
 from flask import render_template, jsonify, current_app, request, redirect, url_for
 from flask_login import login_required, current_user
-from web.database import db, NewsArticle, Watchlist, AIScore, Transaction
+from web.database import db, Watchlist, AIScore, Transaction
 from web.polygon_service import PolygonService, get_polygon_service
 from . import main
 import logging
 from decimal import Decimal
 from collections import defaultdict
 from sqlalchemy.orm import joinedload
-from sqlalchemy import or_
 
 logger = logging.getLogger(__name__)
 
@@ -103,14 +102,10 @@ def dashboard():
 
         related_news = []
         if watchlist_tickers:
+            from src.services.news_tickers import recent_articles
+
             search_tickers = watchlist_tickers[:5]
-            filters = [NewsArticle.title.contains(ticker) for ticker in search_tickers]
-            ticker_news = (
-                NewsArticle.query.filter(or_(*filters))
-                .order_by(NewsArticle.published_at.desc())
-                .limit(15)
-                .all()
-            )
+            ticker_news = recent_articles(search_tickers, limit=15)
             related_news = [article.to_dict() for article in ticker_news]
 
         seen_urls = set()
@@ -22,6 +22,8 @@ from typing import Optional
 from typing import Any
 from typing import Tuple
 
+from src.services.swing_points import high_low_arrays, swing_indices
+
 logger = logging.getLogger(__name__)
 
 def _get_candle_info(bar: Dict) -> Dict:
@@ -39,39 +41,9 @@ def _get_candle_info(bar: Dict) -> Dict:
 
 def _find_swing_points(bars: List[Dict], lookback: int = 5) -> Tuple[List[Dict], List[Dict]]:
     """Find swing highs and lows in price data."""
-    if len(bars) < lookback * 2 + 1:
-        return [], []
-
-    swing_highs = []
-    swing_lows = []
-
-    for i in range(lookback, len(bars) - lookback):
-        candle = _get_candle_info(bars[i])
-
-        # Check for swing high
-        is_high = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["high"] >= candle["high"]:
-                    is_high = False
-                    break
-
-        if is_high:
-            swing_highs.append({"price": candle["high"], "index": i})
-
-        # Check for swing low
-        is_low = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["low"] <= candle["low"]:
-                    is_low = False
-                    break
-
-        if is_low:
-            swing_lows.append({"price": candle["low"], "index": i})
-
+    high_idx, low_idx = swing_indices(*high_low_arrays(bars), lookback)
+    swing_highs = [{"price": _get_candle_info(bars[i])["high"], "index": i} for i in high_idx.tolist()]
+    swing_lows = [{"price": _get_candle_info(bars[i])["low"], "index": i} for i in low_idx.tolist()]
     return swing_highs, swing_lows
 
 def detect_head_and_shoulders(bars: List[Dict], tolerance: float = 0.02) -> Optional[Dict]:
@@ -0,0 +1,210 @@
+"""
+Async Polygon.io Client
+Concurrent bulk requests over the shared AsyncHttpClient connection pool,
+with a sync facade so Flask routes and PolygonService can fan out per-ticker
+endpoints in about one round-trip instead of N.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from web.instrumentation import endpoint_family, timed
+except ImportError:
+    from instrumentation import endpoint_family, timed
+
+logger = logging.getLogger(__name__)
+
+# Max in-flight Polygon requests per process (paid plans have no per-minute cap)
+MAX_CONCURRENCY = int(os.getenv("POLYGON_ASYNC_CONCURRENCY", "25"))
+REQUEST_TIMEOUT = 10  # seconds, same as PolygonService
+
+SNAPSHOT_ENDPOINT = "/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
+PREV_CLOSE_ENDPOINT = "/v2/aggs/ticker/{ticker}/prev"
+TICKER_DETAILS_ENDPOINT = "/v3/reference/tickers/{ticker}"
+
+
+def get_async_http_client():
+    """
+    AsyncHttpClient class, or None if unavailable.
+
+    Imported lazily: the src package re-exports web.polygon_service, which
+    imports this module, so a module-level import would be circular.
+    """
+    if aiohttp is None:
+        return None
+    try:
+        from src.services.async_http_service import AsyncHttpClient
+    except ImportError:
+        return None
+    return AsyncHttpClient
+
+
+class AsyncPolygonService:
+    """Async mirror of PolygonService request handling with bounded fan-out"""
+
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = MAX_CONCURRENCY):
+        self.api_key = api_key or os.getenv("POLYGON_API_KEY")
+        self.base_url = "https://api.polygon.io"
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Make API request with error handling (same semantics as PolygonService._make_request).
+
+        Returns:
+            API response data or None if request fails
+        """
+        if not self.api_key:
+            logger.error("Polygon API key not set! Check POLYGON_API_KEY environment variable")
+            return None
+
+        url = f"{self.base_url}{endpoint}"
+        params = dict(params or {})
+        params["apiKey"] = self.api_key
+
+        async with self._get_semaphore():
+            session = await get_async_http_client().get_session()
+            for attempt in range(2):
+                try:
+                    with timed("upstream", f"polygon {endpoint_family(endpoint)}"):
+                        async with session.get(
+                            url, params=params, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+                        ) as response:
+                            if response.status == 403:
+                                # Handle 403 quietly (common for OTC stocks on free tier)
+                                logger.debug(f"Polygon API 403 for {endpoint} (OTC/unsupported ticker)")
+                                return None
+                            if response.status >= 400:
+                                logger.warning(f"Polygon API HTTP error for {endpoint}: {response.status}")
+                                return None
+
+                            data = await response.json()
+                            if data.get("status") == "ERROR":
+                                logger.error(
+                                    f"Polygon API error for {endpoint}: {data.get('error', 'Unknown error')}"
+                                )
+                            return data
+
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    logger.error(f"Polygon API request failed for {endpoint}: {e}")
+                    if attempt == 0:
+                        await asyncio.sleep(0.5)
+                        continue
+                    return None
+
+    async def get_many(
+        self, endpoint_template: str, tickers: Iterable[str], params: Optional[Dict] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Request endpoint_template.format(ticker=...) for every ticker concurrently.
+
+        Args:
+            endpoint_template: Endpoint path with a {ticker} placeholder
+            tickers: Tickers to request (duplicates are requested once)
+            params: Optional query parameters shared by every request
+
+        Returns:
+            Dict of ticker -> raw response (None for failed requests)
+        """
+        unique = list(dict.fromkeys(tickers))
+        responses = await asyncio.gather(
+            *(self._make_request(endpoint_template.format(ticker=ticker), params) for ticker in unique)
+        )
+        return dict(zip(unique, responses))
+
+    async def get_snapshots(self, tickers: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        return await self.get_many(SNAPSHOT_ENDPOINT, tickers)
+
+    async def get_previous_closes(self, tickers: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        return await self.get_many(PREV_CLOSE_ENDPOINT, tickers)
+
+
+class PolygonBulkClient:
+    """
+    Sync facade over AsyncPolygonService.
+
+    Runs one event loop in a daemon thread so every Flask worker thread shares
+    the same aiohttp connection pool and concurrency limit.
+    """
+
+    def __init__(self, service: Optional[AsyncPolygonService] = None):
+        self.service = service or AsyncPolygonService()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="polygon-async", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro, timeout: float = 60):
+        """Run a coroutine on the shared loop and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        return future.result(timeout)
+
+    def get_many(
+        self, endpoint_template: str, tickers: Iterable[str], params: Optional[Dict] = None
+    ) -> Dict[str, Optional[Dict]]:
+        """Blocking get_many for sync callers"""
+        return self.run(self.service.get_many(endpoint_template, tickers, params))
+
+    def get_many_batches(self, requests: Dict[str, tuple]) -> Dict[str, Dict[str, Optional[Dict]]]:
+        """
+        Run several get_many calls in one round-trip.
+
+        Args:
+            requests: name -> (endpoint_template, tickers)
+        """
+        async def gather():
+            names = list(requests)
+            results = await asyncio.gather(
+                *(self.service.get_many(template, tickers) for template, tickers in requests.values())
+            )
+            return dict(zip(names, results))
+
+        return self.run(gather())
+
+    def close(self):
+        """Close the pooled session and stop the loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(get_async_http_client().close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_bulk_instance: Optional[PolygonBulkClient] = None
+_bulk_lock = threading.Lock()
+
+
+def get_polygon_bulk_client() -> Optional[PolygonBulkClient]:
+    """Get or create the shared bulk client (None if aiohttp is unavailable)"""
+    global _bulk_instance
+    if get_async_http_client() is None:
+        return None
+    if _bulk_instance is None:
+        with _bulk_lock:
+            if _bulk_instance is None:
+                _bulk_instance = PolygonBulkClient()
+    return _bulk_instance
+
@@ -5,52 +5,235 @@ Real-time and historical stock market data
 
 import requests
 import os
+import sys
 import logging
+import math
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+import threading
 import time
 from datetime import timedelta
 import json
 from typing import List
 from typing import Optional
 
+try:
+    from web.instrumentation import endpoint_family, timed
+    from web.polygon_async_service import PREV_CLOSE_ENDPOINT, SNAPSHOT_ENDPOINT, get_polygon_bulk_client
+except ImportError:
+    from instrumentation import endpoint_family, timed
+    from polygon_async_service import PREV_CLOSE_ENDPOINT, SNAPSHOT_ENDPOINT, get_polygon_bulk_client
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Callers asking for at most this many tickers get a targeted tickers= snapshot
+TARGETED_SNAPSHOT_MAX_TICKERS = 250
+# Tickers per targeted snapshot request (keeps the query string short)
+SNAPSHOT_CHUNK_SIZE = 100
+
+# Full-market snapshot shared by every PolygonService instance in the process,
+# indexed by ticker and stamped with its monotonic fetch time
+_full_snapshot_lock = threading.Lock()
+_full_snapshot = {"fetched_at": None, "tickers": {}}
+
+# Max tickers per get_extended_hours_bulk call (fetched concurrently)
+EXTENDED_HOURS_BULK_MAX = 250
+
+# Response cache bounds per PolygonService instance
+CACHE_MAX_ENTRIES = int(os.getenv("POLYGON_CACHE_MAX_ENTRIES", "4096"))
+CACHE_MAX_BYTES = int(os.getenv("POLYGON_CACHE_MAX_MB", "64")) * 1024 * 1024
+
 
-class SimpleCache:
-    """Simple in-memory cache with TTL (Time To Live)"""
+class _Flight:
+    """One in-progress load that concurrent callers wait on"""
+
+    __slots__ = ("done", "value", "error")
 
     def __init__(self):
-        self._cache = {}
-        self._expiry = {}
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn once per key at a time.
+
+        Returns:
+            (value, leader) - leader is False when the value came from another caller's run
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, False
+
+        try:
+            flight.value = fn()
+            return flight.value, True
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry TTL.
+
+    Bounded by entry count and by an estimate of the JSON-serialized size of the
+    values. Expiry uses the monotonic clock. get_or_load() is single-flight:
+    concurrent misses on one key run the loader once.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _estimate_size(value) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return sys.getsizeof(value)
 
     def get(self, key: str):
         """Get value from cache if not expired"""
-        if key not in self._cache:
-            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
 
-        # Check if expired
-        if datetime.now() > self._expiry[key]:
-            del self._cache[key]
-            del self._expiry[key]
-            return None
+            if time.monotonic() >= entry[1]:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
 
-        return self._cache[key]
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
 
     def set(self, key: str, value, ttl_seconds: int = 60):
-        """Set value in cache with TTL"""
-        self._cache[key] = value
-        self._expiry[key] = datetime.now() + timedelta(seconds=ttl_seconds)
+        """Set value in cache with TTL, evicting least recently used entries past the bounds"""
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Cache value for {key} too large to cache ({size} bytes)")
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.monotonic() + ttl_seconds, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl_seconds: int = 60):
+        """
+        Return the cached value, or run loader once for all concurrent callers.
+
+        None results are returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        def load():
+            # A caller that just finished a load may have filled the key
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            loaded = loader()
+            if loaded is not None:
+                self.set(key, loaded, ttl_seconds)
+            return loaded
+
+        value, _ = self._loads.do(key, load)
+        return value
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def _remove(self, key: str):
+        """Drop an entry (caller holds the lock)"""
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def purge_expired(self) -> int:
+        """Remove expired entries. Returns count of removed entries."""
+        now = time.monotonic()
+        with self._lock:
+            expired = [key for key, (_, expires_at, _) in self._data.items() if now >= expires_at]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+        return len(expired)
 
     def clear(self):
         """Clear all cached data"""
-        self._cache.clear()
-        self._expiry.clear()
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
 
     def stats(self):
         """Get cache statistics"""
-        return {"size": len(self._cache), "keys": list(self._cache.keys())}
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def _eastern_date_ms(date_str: str, end_of_day: bool = False) -> int:
+    """YYYY-MM-DD as ms since epoch at US/Eastern midnight (or the last ms of that day)"""
+    day = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=ZoneInfo("America/New_York"))
+    if end_of_day:
+        return int((day + timedelta(days=1)).timestamp() * 1000) - 1
+    return int(day.timestamp() * 1000)
 
 
 class PolygonService:
@@ -60,7 +243,9 @@ class PolygonService:
         self.api_key = api_key or os.getenv("POLYGON_API_KEY")
         self.base_url = "https://api.polygon.io"
         self.session = requests.Session()
-        self.cache = SimpleCache()
+        self.cache = LRUCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+        # Identical concurrent requests share one HTTP call
+        self._requests = SingleFlight()
         # Cache TTL settings (in seconds)
         self.cache_ttl = {
             "market_status": 300,  # 5 minutes
@@ -69,6 +254,8 @@ class PolygonService:
             "gainers_losers": 60,  # 1 minute
             "stock_quote": 60,  # 1 minute
             "screener": 120,  # 2 minutes
+            "full_snapshot": 5,  # 5 seconds (one SSE polling cycle)
+            "ticker_details": 86400,  # 1 day (reference data)
         }
         # Polygon.io uses query params for auth, not headers
 
@@ -87,13 +274,20 @@ class PolygonService:
             logger.error("Polygon API key not set! Check POLYGON_API_KEY environment variable")
             return None
 
+        params = dict(params or {})
+        key = (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+        data, _ = self._requests.do(key, lambda: self._request_once(endpoint, params))
+        return data
+
+    def _request_once(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Perform the HTTP request (one retry on connection errors)"""
         url = f"{self.base_url}{endpoint}"
-        params = params or {}
         params["apiKey"] = self.api_key
 
         for attempt in range(2):
             try:
-                response = self.session.get(url, params=params, timeout=10)
+                with timed("upstream", f"polygon {endpoint_family(endpoint)}"):
+                    response = self.session.get(url, params=params, timeout=10)
                 response.raise_for_status()
                 data = response.json()
 
@@ -117,6 +311,33 @@ class PolygonService:
                     continue
                 return None
 
+    def get_many_batches(self, requests: Dict[str, Tuple[str, List[str]]]) -> Dict[str, Dict[str, Optional[Dict]]]:
+        """
+        Fetch per-ticker endpoints concurrently via the async bulk client.
+
+        Args:
+            requests: name -> (endpoint template with {ticker}, tickers)
+
+        Returns:
+            name -> {ticker: raw response or None}; falls back to sequential
+            requests when aiohttp is unavailable or this instance uses another key
+        """
+        bulk = get_polygon_bulk_client()
+        if bulk is not None and bulk.service.api_key == self.api_key:
+            try:
+                return bulk.get_many_batches(requests)
+            except Exception as e:
+                logger.warning(f"Async bulk request failed, falling back to sequential: {e}")
+
+        return {
+            name: {ticker: self._make_request(template.format(ticker=ticker)) for ticker in dict.fromkeys(tickers)}
+            for name, (template, tickers) in requests.items()
+        }
+
+    def get_many(self, endpoint_template: str, tickers: List[str]) -> Dict[str, Optional[Dict]]:
+        """Fetch endpoint_template.format(ticker=...) for every ticker in about one round-trip"""
+        return self.get_many_batches({"results": (endpoint_template, tickers)})["results"]
+
     def get_stock_quote(self, ticker: str) -> Optional[Dict]:
         """Get latest quote for a stock (15-min delayed on Starter plan)"""
         endpoint = f"/v2/last/trade/{ticker}"
@@ -186,49 +407,82 @@ class PolygonService:
         if not to_date:
             to_date = datetime.now().strftime("%Y-%m-%d")
 
-        endpoint = f"/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
-        params = {"adjusted": "true", "sort": "asc", "limit": limit}
-
-        data = self._make_request(endpoint, params)
-
-        if not data:
-            logger.warning(f"Polygon get_aggregates: No data returned for {ticker}")
-            return None
-
-        # Accept both "OK" and "DELAYED" status (starter plans return delayed data)
-        status = data.get("status", "")
-        if status not in ["OK", "DELAYED"]:
-            error_msg = data.get("error", data.get("message", "No error message"))
-            logger.warning(
-                f"Polygon get_aggregates: API returned status={status} for {ticker}: {error_msg}"
-            )
-            return None
-
-        results = data.get("results", [])
-        if not results:
+        series, extras = self.get_bar_series(ticker, multiplier, timespan, from_date, to_date, extras=True)
+        if not len(series):
             logger.warning(
                 f"Polygon get_aggregates: Empty results for {ticker} (from={from_date}, to={to_date}, limit={limit})"
             )
             return None
 
-        logger.debug(f"Polygon get_aggregates: Retrieved {len(results)} bars for {ticker}")
+        # Same window as Polygon's sort=asc&limit=N: the first N bars of the range
+        series = series[:limit]
+        logger.debug(f"Polygon get_aggregates: Retrieved {len(series)} bars for {ticker}")
 
         return [
             {
-                "timestamp": r.get("t"),
-                "open": r.get("o"),
-                "high": r.get("h"),
-                "low": r.get("l"),
-                "close": r.get("c"),
-                "volume": r.get("v"),
-                "vwap": r.get("vw"),
-                "transactions": r.get("n"),
+                "timestamp": int(t),
+                "open": o,
+                "high": h,
+                "low": l,
+                "close": c,
+                "volume": v,
+                "vwap": None if math.isnan(vw) else vw,
+                "transactions": None if math.isnan(n) else int(n),
             }
-            for r in results
+            for t, o, h, l, c, v, vw, n in zip(
+                series.t.tolist(), series.o.tolist(), series.h.tolist(),
+                series.l.tolist(), series.c.tolist(), series.v.tolist(),
+                extras["vw"][:limit].tolist(), extras["n"][:limit].tolist(),
+            )
         ]
 
+    def get_bar_series(
+        self, ticker: str, multiplier: int, timespan: str, from_date: str, to_date: str, extras: bool = False
+    ):
+        """
+        Aggregate bars for a date range as a BarSeries, served from the local bar store.
+
+        Only the part of the range the store hasn't seen yet (plus the live tail)
+        is requested from Polygon. Dates are US/Eastern session dates.
+
+        Returns:
+            BarSeries (empty if nothing is stored and the fetch failed); with
+            extras, (BarSeries, {"vw": ..., "n": ...}) with NaN where missing
+        """
+        from src.services.bar_store import (
+            default_refresh_seconds,
+            get_bar_store,
+            polygon_range_fetcher,
+            timeframe_key,
+        )
+
+        ticker = ticker.upper()
+        store = get_bar_store()
+        timeframe = timeframe_key(multiplier, timespan)
+        start_ms = _eastern_date_ms(from_date)
+        end_ms = _eastern_date_ms(to_date, end_of_day=True)
+
+        if not self.api_key:
+            logger.error("Polygon API key not set! Serving stored bars only")
+            return store.read(ticker, timeframe, start_ms, end_ms, extras=extras)
+
+        return store.get_bars(
+            ticker,
+            timeframe,
+            start_ms,
+            end_ms,
+            fetch=polygon_range_fetcher(ticker, multiplier, timespan, self.api_key, self.session),
+            refresh_seconds=default_refresh_seconds(timespan),
+            extras=extras,
+        )
+
     def get_ticker_details(self, ticker: str) -> Optional[Dict]:
-        """Get detailed information about a ticker"""
+        """Get detailed information about a ticker - Cached for 1 day"""
+        return self.cache.get_or_load(
+            f"ticker_details_{ticker}", lambda: self._fetch_ticker_details(ticker), self.cache_ttl["ticker_details"]
+        )
+
+    def _fetch_ticker_details(self, ticker: str) -> Optional[Dict]:
         endpoint = f"/v3/reference/tickers/{ticker}"
         data = self._make_request(endpoint)
 
@@ -264,58 +518,132 @@ class PolygonService:
             "weighted_shares_outstanding": result.get("weighted_shares_outstanding"),
         }
 
-    def get_market_snapshot(self, tickers: List[str]) -> Dict[str, Dict]:
-        """Get snapshot of multiple tickers"""
-        endpoint = "/v2/snapshot/locale/us/markets/stocks/tickers"
-        data = self._make_request(endpoint)
+    def get_market_snapshot(self, tickers: List[str], targeted: Optional[bool] = None) -> Dict[str, Dict]:
+        """
+        Get snapshot of multiple tickers
 
-        # Accept both "OK" and "DELAYED" status
-        if not data or data.get("status") not in ["OK", "DELAYED"]:
+        Small requests use the tickers= query parameter so only the requested
+        symbols are downloaded. Large requests (or any request made while a
+        fresh full-market snapshot is cached) are served from the shared
+        full-market snapshot instead.
+
+        Args:
+            tickers: Stock symbols
+            targeted: Force targeted (True) or full-market (False) mode;
+                      None picks automatically
+        """
+        tickers = list(dict.fromkeys(t for t in tickers if t))
+        if not tickers:
             return {}
 
-        results = data.get("tickers", [])
+        if targeted is None:
+            fresh = self._cached_full_snapshot()
+            if fresh is not None:
+                return self._build_snapshot(fresh.get(t) for t in tickers)
+            targeted = len(tickers) <= TARGETED_SNAPSHOT_MAX_TICKERS
+
+        if targeted:
+            return self._build_snapshot(self._fetch_targeted_snapshot(tickers))
+
+        full = self.get_full_market_snapshot()
+        return self._build_snapshot(full.get(t) for t in tickers)
+
+    def get_full_market_snapshot(self) -> Dict[str, Dict]:
+        """
+        Get the raw full-market snapshot indexed by ticker - Cached for 5 seconds
+
+        The cache is shared across instances and guarded by a lock, so many
+        callers in the same window trigger a single download.
+        """
+        cached = self._cached_full_snapshot()
+        if cached is not None:
+            return cached
+
+        with _full_snapshot_lock:
+            # Another thread may have refreshed it while we waited
+            cached = self._cached_full_snapshot()
+            if cached is not None:
+                return cached
+
+            endpoint = "/v2/snapshot/locale/us/markets/stocks/tickers"
+            data = self._make_request(endpoint)
+
+            # Accept both "OK" and "DELAYED" status
+            if not data or data.get("status") not in ["OK", "DELAYED"]:
+                return {}
+
+            indexed = {t.get("ticker"): t for t in data.get("tickers", []) if t.get("ticker")}
+            _full_snapshot["tickers"] = indexed
+            _full_snapshot["fetched_at"] = time.monotonic()
+            return indexed
+
+    def _cached_full_snapshot(self) -> Optional[Dict[str, Dict]]:
+        """Return the shared full-market snapshot if it is still inside its window"""
+        fetched_at = _full_snapshot["fetched_at"]
+        if fetched_at is None or time.monotonic() - fetched_at > self.cache_ttl["full_snapshot"]:
+            return None
+        return _full_snapshot["tickers"]
+
+    def _fetch_targeted_snapshot(self, tickers: List[str]) -> List[Dict]:
+        """Fetch raw snapshot entries for specific tickers, chunked by SNAPSHOT_CHUNK_SIZE"""
+        endpoint = "/v2/snapshot/locale/us/markets/stocks/tickers"
+        results = []
+        for i in range(0, len(tickers), SNAPSHOT_CHUNK_SIZE):
+            chunk = tickers[i:i + SNAPSHOT_CHUNK_SIZE]
+            data = self._make_request(endpoint, {"tickers": ",".join(chunk)})
+
+            # Accept both "OK" and "DELAYED" status
+            if not data or data.get("status") not in ["OK", "DELAYED"]:
+                continue
+            results.extend(data.get("tickers", []))
+        return results
+
+    @staticmethod
+    def _build_snapshot(entries) -> Dict[str, Dict]:
+        """Convert raw Polygon snapshot entries to our snapshot format"""
         snapshot = {}
 
-        for ticker_data in results:
+        for ticker_data in entries:
+            if not ticker_data:
+                continue
             ticker = ticker_data.get("ticker")
-            if ticker in tickers:
-                day = ticker_data.get("day", {})
-                prev_day = ticker_data.get("prevDay", {})
-                last_trade = ticker_data.get("lastTrade", {})
-                market_cap = ticker_data.get("marketCap")
+            day = ticker_data.get("day", {})
+            prev_day = ticker_data.get("prevDay", {})
+            last_trade = ticker_data.get("lastTrade", {})
+            market_cap = ticker_data.get("marketCap")
 
-                # Use prev_close as fallback for pre/after market hours
-                prev_close = prev_day.get("c", 0)
-                current_price = last_trade.get("p") or day.get("c") or prev_close
+            # Use prev_close as fallback for pre/after market hours
+            prev_close = prev_day.get("c", 0)
+            current_price = last_trade.get("p") or day.get("c") or prev_close
 
-                snapshot[ticker] = {
-                    "ticker": ticker,
-                    "price": current_price,
-                    "size": last_trade.get("s"),
-                    "timestamp": last_trade.get("t"),
-                    "day_open": day.get("o"),
-                    "day_high": day.get("h"),
-                    "day_low": day.get("l"),
-                    "day_close": day.get("c"),
-                    "day_volume": day.get("v"),
-                    "day_vwap": day.get("vw"),
-                    "market_cap": market_cap,
-                    "prev_close": prev_close,
-                    "prev_open": prev_day.get("o"),
-                    "prev_high": prev_day.get("h"),
-                    "prev_low": prev_day.get("l"),
-                    "prev_volume": prev_day.get("v"),
-                    "change": (
-                        current_price - prev_close
-                        if current_price and prev_close
-                        else 0
-                    ),
-                    "change_percent": (
-                        ((current_price - prev_close) / prev_close) * 100
-                        if current_price and prev_close
-                        else 0
-                    ),
-                }
+            snapshot[ticker] = {
+                "ticker": ticker,
+                "price": current_price,
+                "size": last_trade.get("s"),
+                "timestamp": last_trade.get("t"),
+                "day_open": day.get("o"),
+                "day_high": day.get("h"),
+                "day_low": day.get("l"),
+                "day_close": day.get("c"),
+                "day_volume": day.get("v"),
+                "day_vwap": day.get("vw"),
+                "market_cap": market_cap,
+                "prev_close": prev_close,
+                "prev_open": prev_day.get("o"),
+                "prev_high": prev_day.get("h"),
+                "prev_low": prev_day.get("l"),
+                "prev_volume": prev_day.get("v"),
+                "change": (
+                    current_price - prev_close
+                    if current_price and prev_close
+                    else 0
+                ),
+                "change_percent": (
+                    ((current_price - prev_close) / prev_close) * 100
+                    if current_price and prev_close
+                    else 0
+                ),
+            }
 
         return snapshot
 
@@ -361,16 +689,17 @@ class PolygonService:
             direction: 'gainers' or 'losers'
         """
         cache_key = f"gainers_losers_{direction}"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return self.cache.get_or_load(
+            cache_key, lambda: self._fetch_gainers_losers(direction), self.cache_ttl["gainers_losers"]
+        ) or []
 
+    def _fetch_gainers_losers(self, direction: str) -> Optional[List[Dict]]:
         endpoint = f"/v2/snapshot/locale/us/markets/stocks/{direction}"
         data = self._make_request(endpoint)
 
         # Accept both "OK" and "DELAYED" status
         if not data or data.get("status") not in ["OK", "DELAYED"]:
-            return []
+            return None
 
         results = data.get("tickers", [])
 
@@ -406,16 +735,13 @@ class PolygonService:
             if len(filtered) >= 15:
                 break
 
-        self.cache.set(cache_key, filtered, self.cache_ttl["gainers_losers"])
         return filtered
 
     def get_market_status(self) -> Optional[Dict]:
         """Get current market status (open/closed) - Cached for 5 minutes"""
-        cache_key = "market_status"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return self.cache.get_or_load("market_status", self._fetch_market_status, self.cache_ttl["market_status"])
 
+    def _fetch_market_status(self) -> Optional[Dict]:
         endpoint = "/v1/marketstatus/now"
         data = self._make_request(endpoint)
 
@@ -436,7 +762,6 @@ class PolygonService:
             },
         }
 
-        self.cache.set(cache_key, result, self.cache_ttl["market_status"])
         return result
 
     def search_tickers(self, query: str, limit: int = 10) -> List[Dict]:
@@ -536,11 +861,9 @@ class PolygonService:
         2. Set POLYGON_INDICES_API_KEY in .env
         3. Set USE_FREE_INDICES=true in .env
         """
-        cache_key = "market_indices"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return self.cache.get_or_load("market_indices", self._fetch_market_indices, self.cache_ttl["market_indices"])
 
+    def _fetch_market_indices(self) -> Dict[str, Dict]:
         # Check if Polygon Indices Free API is enabled
         use_free_indices = os.getenv("USE_FREE_INDICES", "false").lower() == "true"
 
@@ -584,7 +907,6 @@ class PolygonService:
                             }
 
                     if result:
-                        self.cache.set(cache_key, result, self.cache_ttl["market_indices"])
                         return result
                     else:
                         logger.warning(
@@ -605,19 +927,21 @@ class PolygonService:
             "VXX": "VIX (VXX)",
         }
 
+        # Previous day data and current snapshots for every proxy in one round-trip
+        responses = self.get_many_batches({
+            "prev": (PREV_CLOSE_ENDPOINT, list(indices)),
+            "snapshot": (SNAPSHOT_ENDPOINT, list(indices)),
+        })
+
         result = {}
         for ticker, name in indices.items():
-            # Get previous day data for comparison
-            endpoint = f"/v2/aggs/ticker/{ticker}/prev"
-            prev_data = self._make_request(endpoint)
+            prev_data = responses["prev"].get(ticker)
 
             if prev_data and prev_data.get("status") == "OK" and prev_data.get("results"):
                 prev_result = prev_data["results"][0]
                 prev_close = prev_result.get("c")
 
-                # Get current snapshot
-                snapshot_endpoint = f"/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
-                snapshot = self._make_request(snapshot_endpoint)
+                snapshot = responses["snapshot"].get(ticker)
 
                 if snapshot and snapshot.get("status") == "OK":
                     ticker_data = snapshot.get("ticker", {})
@@ -656,16 +980,13 @@ class PolygonService:
                             "day_low": low_price,
                         }
 
-        self.cache.set(cache_key, result, self.cache_ttl["market_indices"])
         return result
 
     def get_sector_performance(self) -> List[Dict]:
         """Get sector ETF performance as proxy for sector performance - Cached for 1 minute"""
-        cache_key = "sectors"
-        cached = self.cache.get(cache_key)
-        if cached is not None:
-            return cached
+        return self.cache.get_or_load("sectors", self._fetch_sector_performance, self.cache_ttl["sectors"])
 
+    def _fetch_sector_performance(self) -> List[Dict]:
         sectors = {
             "XLK": "Technology",
             "XLF": "Financial",
@@ -680,11 +1001,12 @@ class PolygonService:
             "XLC": "Communication",
         }
 
+        # Snapshot data (current price and previous close) for every sector ETF at once
+        snapshots = self.get_many(SNAPSHOT_ENDPOINT, list(sectors))
+
         result = []
         for ticker, name in sectors.items():
-            # Get snapshot data which includes current price and previous close
-            endpoint = f"/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
-            snapshot = self._make_request(endpoint)
+            snapshot = snapshots.get(ticker)
 
             if snapshot and snapshot.get("status") == "OK":
                 ticker_data = snapshot.get("ticker", {})
@@ -715,7 +1037,6 @@ class PolygonService:
         # Sort by performance
         result.sort(key=lambda x: x["change_percent"], reverse=True)
 
-        self.cache.set(cache_key, result, self.cache_ttl["sectors"])
         return result
 
     def screen_stocks(self, criteria: Dict) -> List[Dict]:
@@ -730,14 +1051,7 @@ class PolygonService:
         - max_change_percent: Maximum % change
         """
         # Get all stocks snapshot (this returns active stocks)
-        endpoint = "/v2/snapshot/locale/us/markets/stocks/tickers"
-        data = self._make_request(endpoint)
-
-        # Accept both "OK" and "DELAYED" status
-        if not data or data.get("status") not in ["OK", "DELAYED"]:
-            return []
-
-        tickers = data.get("tickers", [])
+        tickers = list(self.get_full_market_snapshot().values())
         results = []
 
         for ticker_data in tickers[:500]:  # Limit to 500 for performance
@@ -801,11 +1115,13 @@ class PolygonService:
         - Afterhours price and change
         - Regular session close for comparison
         """
-        try:
-            # Get the snapshot which includes extended hours data
-            endpoint = f"/v2/snapshot/locale/us/markets/stocks/tickers/{ticker}"
-            snapshot = self._make_request(endpoint)
+        # Get the snapshot which includes extended hours data
+        snapshot = self._make_request(SNAPSHOT_ENDPOINT.format(ticker=ticker))
+        return self._parse_extended_hours(ticker, snapshot, self.get_market_status())
 
+    def _parse_extended_hours(self, ticker: str, snapshot: Optional[Dict], market_status: Optional[Dict]) -> Optional[Dict]:
+        """Build extended hours data from a ticker snapshot response and the market status"""
+        try:
             if not snapshot or snapshot.get("status") not in ["OK", "DELAYED"]:
                 return None
 
@@ -829,7 +1145,6 @@ class PolygonService:
             )
 
             # Calculate if we're in extended hours based on market status
-            market_status = self.get_market_status()
             market_phase = market_status.get("market", "closed") if market_status else "closed"
 
             # Determine session type
@@ -888,10 +1203,14 @@ class PolygonService:
             return None
 
     def get_extended_hours_bulk(self, tickers: List[str]) -> Dict[str, Dict]:
-        """Get extended hours data for multiple tickers"""
+        """Get extended hours data for multiple tickers (snapshots fetched concurrently)"""
+        tickers = tickers[:EXTENDED_HOURS_BULK_MAX]
+        market_status = self.get_market_status()  # Once for all tickers
+        snapshots = self.get_many(SNAPSHOT_ENDPOINT, tickers)
+
         results = {}
-        for ticker in tickers[:20]:  # Limit to 20 to avoid rate limits
-            data = self.get_extended_hours_data(ticker)
+        for ticker in tickers:
+            data = self._parse_extended_hours(ticker, snapshots.get(ticker), market_status)
             if data:
                 results[ticker] = data
         return results
@@ -17,6 +17,7 @@ Key Rules:
 - TP at ACTUAL S/R levels (not fixed R:R) ← FIXED!
 """
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple
 from statistics import mean
@@ -26,6 +27,10 @@ from typing import Optional
 from typing import Any
 from typing import Tuple
 
+import numpy as np
+
+from src.services.swing_points import high_low_arrays, swing_indices
+
 def _get_candle_info(bar: Dict) -> Dict:
     """Extract candle components"""
     o = bar.get("o", bar.get("open", 0))
@@ -48,6 +53,19 @@ def _get_candle_info(bar: Dict) -> Dict:
         "is_bearish": c < o,
     }
 
+def _normalize_candles(candles: List[Dict]) -> List[Dict]:
+    """Normalize candle keys to standard format"""
+    normalized = []
+    for c in candles:
+        normalized.append({
+            "o": c.get("o", c.get("open", 0)),
+            "h": c.get("h", c.get("high", 0)),
+            "l": c.get("l", c.get("low", 0)),
+            "c": c.get("c", c.get("close", 0)),
+            "v": c.get("v", c.get("volume", 0)),
+        })
+    return normalized
+
 def _detect_swing_levels(bars: List[Dict], lookback: int = 5) -> Dict:
     """
     Detect Swing Highs and Swing Lows
@@ -57,48 +75,17 @@ def _detect_swing_levels(bars: List[Dict], lookback: int = 5) -> Dict:
 
     These are key S/R levels for TP targeting!
     """
-    if len(bars) < lookback * 2 + 1:
-        return {"swing_highs": [], "swing_lows": []}
-
-    swing_highs = []
-    swing_lows = []
-
-    for i in range(lookback, len(bars) - lookback):
-        candle = _get_candle_info(bars[i])
-
-        # Check for Swing High
-        is_swing_high = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["high"] >= candle["high"]:
-                    is_swing_high = False
-                    break
-
-        if is_swing_high:
-            swing_highs.append({
-                "price": candle["high"],
-                "index": i,
-                "type": "resistance",
-                "strength": 70 + min(30, lookback * 5)  # More lookback = stronger
-            })
-
-        # Check for Swing Low
-        is_swing_low = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["low"] <= candle["low"]:
-                    is_swing_low = False
-                    break
-
-        if is_swing_low:
-            swing_lows.append({
-                "price": candle["low"],
-                "index": i,
-                "type": "support",
-                "strength": 70 + min(30, lookback * 5)
-            })
+    high_idx, low_idx = swing_indices(*high_low_arrays(bars), lookback)
+    strength = 70 + min(30, lookback * 5)  # More lookback = stronger
+
+    swing_highs = [
+        {"price": _get_candle_info(bars[i])["high"], "index": i, "type": "resistance", "strength": strength}
+        for i in high_idx.tolist()
+    ]
+    swing_lows = [
+        {"price": _get_candle_info(bars[i])["low"], "index": i, "type": "support", "strength": strength}
+        for i in low_idx.tolist()
+    ]
 
     return {
         "swing_highs": swing_highs,
@@ -192,42 +179,45 @@ def _detect_fvg(bars: List[Dict], min_gap_percent: float = 0.15) -> Dict:
     for i in range(2, len(bars)):
         c1 = _get_candle_info(bars[i - 2])
         c3 = _get_candle_info(bars[i])
-
-        # Bullish FVG: Candle 1 high < Candle 3 low (gap up)
-        if c1["high"] < c3["low"]:
-            gap_size = c3["low"] - c1["high"]
-            gap_percent = (gap_size / c1["high"]) * 100 if c1["high"] > 0 else 0
-            if gap_percent >= min_gap_percent:
-                fvg = {
-                    "zone_top": c3["low"],
-                    "zone_bottom": c1["high"],
-                    "zone_mid": (c3["low"] + c1["high"]) / 2,
-                    "size_percent": round(gap_percent, 2),
-                    "strength": min(100, 60 + int(gap_percent * 20)),
-                    "type": "support"
-                }
-                bullish_fvgs.append(fvg)
-
-        # Bearish FVG: Candle 1 low > Candle 3 high (gap down)
-        if c1["low"] > c3["high"]:
-            gap_size = c1["low"] - c3["high"]
-            gap_percent = (gap_size / c3["high"]) * 100 if c3["high"] > 0 else 0
-            if gap_percent >= min_gap_percent:
-                fvg = {
-                    "zone_top": c1["low"],
-                    "zone_bottom": c3["high"],
-                    "zone_mid": (c1["low"] + c3["high"]) / 2,
-                    "size_percent": round(gap_percent, 2),
-                    "strength": min(100, 60 + int(gap_percent * 20)),
-                    "type": "resistance"
-                }
-                bearish_fvgs.append(fvg)
+        _process_fvg_candidates(c1, c3, min_gap_percent, bullish_fvgs, bearish_fvgs)
 
     return {
         "bullish": bullish_fvgs[-5:],
         "bearish": bearish_fvgs[-5:]
     }
 
+def _process_fvg_candidates(c1: Dict, c3: Dict, min_gap_percent: float, bullish_fvgs: List, bearish_fvgs: List):
+    """Check and add the FVGs between candle 1 and candle 3"""
+    # Bullish FVG: Candle 1 high < Candle 3 low (gap up)
+    if c1["high"] < c3["low"]:
+        gap_size = c3["low"] - c1["high"]
+        gap_percent = (gap_size / c1["high"]) * 100 if c1["high"] > 0 else 0
+        if gap_percent >= min_gap_percent:
+            fvg = {
+                "zone_top": c3["low"],
+                "zone_bottom": c1["high"],
+                "zone_mid": (c3["low"] + c1["high"]) / 2,
+                "size_percent": round(gap_percent, 2),
+                "strength": min(100, 60 + int(gap_percent * 20)),
+                "type": "support"
+            }
+            bullish_fvgs.append(fvg)
+
+    # Bearish FVG: Candle 1 low > Candle 3 high (gap down)
+    if c1["low"] > c3["high"]:
+        gap_size = c1["low"] - c3["high"]
+        gap_percent = (gap_size / c3["high"]) * 100 if c3["high"] > 0 else 0
+        if gap_percent >= min_gap_percent:
+            fvg = {
+                "zone_top": c1["low"],
+                "zone_bottom": c3["high"],
+                "zone_mid": (c1["low"] + c3["high"]) / 2,
+                "size_percent": round(gap_percent, 2),
+                "strength": min(100, 60 + int(gap_percent * 20)),
+                "type": "resistance"
+            }
+            bearish_fvgs.append(fvg)
+
 def _detect_fakeout(bars: List[Dict], lookback: int = 20) -> Optional[Dict]:
     """
     Detect Fakeout (헛돌파)
@@ -238,9 +228,12 @@ def _detect_fakeout(bars: List[Dict], lookback: int = 20) -> Optional[Dict]:
     if len(bars) < lookback:
         return None
 
-    recent = bars[-lookback:]
-    highs = [_get_candle_info(b)["high"] for b in recent[:-3]]
-    lows = [_get_candle_info(b)["low"] for b in recent[:-3]]
+    return _find_fakeout([_get_candle_info(b) for b in bars[-lookback:]])
+
+def _find_fakeout(recent: List[Dict]) -> Optional[Dict]:
+    """Fakeout of the last 3 candles against the range of the ones before (candle infos)"""
+    highs = [c["high"] for c in recent[:-3]]
+    lows = [c["low"] for c in recent[:-3]]
 
     if not highs or not lows:
         return None
@@ -248,7 +241,7 @@ def _detect_fakeout(bars: List[Dict], lookback: int = 20) -> Optional[Dict]:
     resistance = max(highs)
     support = min(lows)
 
-    last_3 = [_get_candle_info(b) for b in bars[-3:]]
+    last_3 = recent[-3:]
     current = last_3[-1]
 
     # Bullish Fakeout: Broke below support but closed back above
@@ -312,7 +305,10 @@ def _analyze_volume(bars: List[Dict]) -> Dict:
     if len(bars) < 20:
         return {"ratio": 1.0, "spike": False, "exit_warning": None}
 
-    volumes = [_get_candle_info(b)["volume"] for b in bars]
+    return _volume_info([_get_candle_info(b)["volume"] for b in bars[-20:]])
+
+def _volume_info(volumes: List[float]) -> Dict:
+    """Volume ratio of the last bar to the average of the last 20"""
     current_vol = volumes[-1]
     avg_vol = mean(volumes[-20:])
 
@@ -617,19 +613,9 @@ def generate_scalp_signal(
         return None
 
     # Normalize candle keys
-    normalized = []
-    for c in candles:
-        normalized.append({
-            "o": c.get("o", c.get("open", 0)),
-            "h": c.get("h", c.get("high", 0)),
-            "l": c.get("l", c.get("low", 0)),
-            "c": c.get("c", c.get("close", 0)),
-            "v": c.get("v", c.get("volume", 0)),
-        })
-    candles = normalized
+    candles = _normalize_candles(candles)
 
     current_candle = _get_candle_info(candles[-1])
-    current_price = current_candle["close"]
 
     # Detect all zones
     order_blocks = _detect_order_blocks(candles)
@@ -639,6 +625,24 @@ def generate_scalp_signal(
     vwap = _get_vwap(candles)
     volume_info = _analyze_volume(candles)
 
+    return _build_scalp_signal(
+        candles, current_candle, order_blocks, fvgs, swing_levels, fakeout, vwap, volume_info, risk_reward
+    )
+
+def _build_scalp_signal(
+    candles: List[Dict],
+    current_candle: Dict,
+    order_blocks: Dict,
+    fvgs: Dict,
+    swing_levels: Dict,
+    fakeout: Optional[Dict],
+    vwap: Optional[float],
+    volume_info: Dict,
+    risk_reward: float,
+) -> Optional[Dict[str, Any]]:
+    """Signal, stop and S/R targets from the detected zones (candles: the window, last bar current)"""
+    current_price = current_candle["close"]
+
     # Build S/R levels from all sources
     sr_levels = _build_sr_levels(current_price, order_blocks, fvgs, swing_levels)
 
@@ -831,3 +835,109 @@ def generate_scalp_signal(
         },
         "generated_at": datetime.now(timezone.utc).isoformat(),
     }
+
+class ScalpSignalStream:
+    """
+    generate_scalp_signal on every trailing window of one candle list (backtests).
+
+    Order blocks, double engulfings, FVGs and swing levels depend only on the
+    candles that form them, so they are found once for the whole list and
+    each step keeps the ones inside its window; VWAP, volume and fakeout
+    checks read precomputed columns. signal(i) returns what
+    generate_scalp_signal(candles[i - window + 1:i + 1]) returns without
+    re-detecting anything over the window.
+    """
+
+    def __init__(self, candles: List[Dict[str, Any]], window: int = 100, risk_reward: float = 2.0):
+        self.candles = _normalize_candles(candles)
+        self.window = window
+        self.risk_reward = risk_reward
+        self.infos = infos = [_get_candle_info(c) for c in self.candles]
+        self.volumes = [info["volume"] for info in infos]
+        self.tp_volume = np.array(
+            [(info["high"] + info["low"] + info["close"]) / 3 * info["volume"] for info in infos], dtype=np.float64
+        )
+        self.volume_column = np.array(self.volumes, dtype=np.float64)
+
+        # Zones by the index of the candle that completes them
+        self.zones = {kind: ([], []) for kind in (
+            "bullish_ob", "bearish_ob", "double_ob", "bullish_fvg", "bearish_fvg", "swing_high", "swing_low"
+        )}
+        for j in range(1, len(infos)):
+            bullish, bearish = [], []
+            _process_bullish_ob(infos[j - 1], infos[j], bullish)
+            _process_bearish_ob(infos[j - 1], infos[j], bearish)
+            self._add("bullish_ob", j, bullish)
+            self._add("bearish_ob", j, bearish)
+            if j < 2:
+                continue
+            double_ob = _detect_double_engulfing(infos[j - 2], infos[j - 1], infos[j], None)
+            self._add("double_ob", j, [double_ob] if double_ob else [])
+            bullish, bearish = [], []
+            _process_fvg_candidates(infos[j - 2], infos[j], 0.15, bullish, bearish)  # _detect_fvg default gap
+            self._add("bullish_fvg", j, bullish)
+            self._add("bearish_fvg", j, bearish)
+
+        # A swing point needs 5 candles on both sides, so it is fixed once formed
+        swing_levels = _detect_swing_levels(self.candles, lookback=5)
+        for level in swing_levels["swing_highs"]:
+            self._add("swing_high", level["index"], [level])
+        for level in swing_levels["swing_lows"]:
+            self._add("swing_low", level["index"], [level])
+
+    def _add(self, kind: str, index: int, zones: List[Dict]):
+        indices, found = self.zones[kind]
+        for zone in zones:
+            indices.append(index)
+            found.append(zone)
+
+    def _between(self, kind: str, first: int, last: int, count: Optional[int] = None) -> List[Dict]:
+        """The last `count` zones (all if None) completed by candles first..last"""
+        indices, zones = self.zones[kind]
+        stop = bisect_right(indices, last)
+        start = bisect_left(indices, first)
+        if count is not None:
+            start = max(start, stop - count)
+        return zones[start:stop]
+
+    def signal(self, i: int) -> Optional[Dict[str, Any]]:
+        """generate_scalp_signal on the window of candles ending at index i"""
+        start = max(0, i - self.window + 1)
+        if i + 1 - start < 30:
+            return None
+
+        # Same spans as the detectors: order blocks over the last 30 candles, the rest over the window
+        ob_start = max(start, i - 29)
+        double_ob = self._between("double_ob", ob_start + 2, i, 1)
+        order_blocks = {
+            "bullish": self._between("bullish_ob", ob_start + 1, i, 5),
+            "bearish": self._between("bearish_ob", ob_start + 1, i, 5),
+            "double_ob": double_ob[0] if double_ob else None,
+        }
+        fvgs = {
+            "bullish": self._between("bullish_fvg", start + 2, i, 5),
+            "bearish": self._between("bearish_fvg", start + 2, i, 5),
+        }
+        swing_levels = {
+            f"swing_{side}s": [
+                {**level, "index": level["index"] - start}
+                for level in self._between(f"swing_{side}", start + 5, i - 5)
+            ]
+            for side in ("high", "low")
+        }
+
+        tp_volume = float(np.cumsum(self.tp_volume[start:i + 1])[-1])
+        volume = float(np.cumsum(self.volume_column[start:i + 1])[-1])
+        vwap = tp_volume / volume if volume > 0 else None
+
+        return _build_scalp_signal(
+            self.candles[start:i + 1],
+            self.infos[i],
+            order_blocks,
+            fvgs,
+            swing_levels,
+            _find_fakeout(self.infos[i - 19:i + 1]),
+            vwap,
+            _volume_info(self.volumes[i - 19:i + 1]),
+            self.risk_reward,
+        )
@@ -10,10 +10,12 @@ For full social media sentiment (Reddit, Twitter),
 specialized APIs are needed (not included here for API key requirements).
 """
 
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import logging
 import re
+import threading
 from datetime import timedelta
 from datetime import timezone
 from typing import List
@@ -21,46 +23,219 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# Sentiment word lists
+BULLISH_WORDS = [
+    "bullish", "buy", "long", "moon", "rocket", "breakout", "surge", "rally",
+    "soar", "jump", "spike", "explode", "boom", "strong", "beat", "upgrade",
+    "growth", "profit", "gain", "winner", "outperform", "undervalued",
+    "accumulate", "positive", "optimistic", "momentum", "upside", "catalyst",
+    "squeeze", "rip", "pump", "calls", "bullrun", "ath", "green"
+]
+
+BEARISH_WORDS = [
+    "bearish", "sell", "short", "crash", "dump", "plunge", "tank", "drop",
+    "fall", "sink", "collapse", "weak", "miss", "downgrade", "loss",
+    "loser", "underperform", "overvalued", "avoid", "negative", "pessimistic",
+    "downside", "warning", "risk", "puts", "red", "dead", "rekt", "bag"
+]
+
+NEUTRAL_WORDS = [
+    "hold", "neutral", "wait", "watch", "sideways", "consolidate", "range",
+    "stable", "flat", "unchanged", "maintain", "steady"
+]
+
+# Weighted headline phrases (single words above weigh 1.0)
+WEIGHTED_TERMS = {
+    "beat estimates": ("bullish", 2.0),
+    "raises guidance": ("bullish", 2.0),
+    "raised guidance": ("bullish", 2.0),
+    "record revenue": ("bullish", 1.5),
+    "price target raised": ("bullish", 1.5),
+    "missed estimates": ("bearish", 2.0),
+    "cuts guidance": ("bearish", 2.0),
+    "cut guidance": ("bearish", 2.0),
+    "price target cut": ("bearish", 1.5),
+    "bankruptcy": ("bearish", 2.0),
+    "in line": ("neutral", 1.0),
+}
+
+NEGATIONS = {"not", "no", "never", "neither", "nor", "without", "hardly", "barely"}
+
+# Words, "n't" contractions, clause breaks (end a negation window) and the batch separator
+_TOKEN_RE = re.compile(r"[a-z0-9]+?n't|[a-z0-9]+|[.!?;]|\x00")
+_CLAUSE_BREAKS = {".", "!", "?", ";"}
+_DOC_BREAK = "\x00"
+
+_FLIP = {"bullish": "bearish", "bearish": "bullish", "neutral": "neutral"}
+
+
+class KeywordSentimentScorer:
+    """
+    Lexicon sentiment over many texts in one tokenizer pass:
+    - All lexicons live in one word-level trie, so multi-word phrases and
+      single words are matched together (longest match wins)
+    - A negation ("not", "no", "don't", ...) flips bullish/bearish terms within
+      the next negation_window tokens of the same clause
+    - Per-text results are memoized (LRU), so repeated headlines are free
+    """
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, Tuple[str, float]]] = None,
+        negation_window: int = 3,
+        cache_size: int = 4096,
+    ):
+        if lexicon is None:
+            lexicon = default_lexicon()
+        self.negation_window = negation_window
+        self.cache_size = cache_size
+        self._trie: Dict = {}
+        self._max_len = 1
+        for term, (polarity, weight) in lexicon.items():
+            words = _TOKEN_RE.findall(term.lower())
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[None] = (polarity, float(weight))
+            self._max_len = max(self._max_len, len(words))
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, tokens: List[str], start: int, end: int) -> Dict:
+        totals = {"bullish": 0.0, "bearish": 0.0, "neutral": 0.0}
+        counts = {"bullish": 0, "bearish": 0, "neutral": 0}
+        trie, window = self._trie, self.negation_window
+        negated_until = -1
+        i = start
+        while i < end:
+            token = tokens[i]
+            node = trie.get(token)
+            if node is None:
+                if token in _CLAUSE_BREAKS:
+                    negated_until = -1
+                elif token in NEGATIONS or token.endswith("n't"):
+                    negated_until = i + window
+                i += 1
+                continue
+
+            # Longest term starting here
+            term, length = node.get(None), 1
+            j = i + 1
+            while j < end and j - i < self._max_len:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if None in node:
+                    term, length = node[None], j - i
+            if term is not None:
+                polarity, weight = term
+                if i <= negated_until:
+                    polarity = _FLIP[polarity]
+                totals[polarity] += weight
+                counts[polarity] += 1
+            i += length
+        return _result(totals, counts)
+
+    def _tokens(self, text: str) -> List[str]:
+        return _TOKEN_RE.findall(text.lower())
+
+    def score(self, text: str) -> Dict:
+        return self.score_batch([text])[0]
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict]:
+        """Score texts in input order; uncached texts share one tokenizer pass"""
+        texts = [text or "" for text in texts]
+        results: Dict[str, Dict] = {}
+        with self._lock:
+            for text in texts:
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    results[text] = cached
+
+        pending = list(dict.fromkeys(text for text in texts if text not in results))
+        if pending:
+            tokens = self._tokens(_DOC_BREAK.join(text.replace(_DOC_BREAK, " ") for text in pending))
+            start = 0
+            for n, text in enumerate(pending, 1):
+                end = tokens.index(_DOC_BREAK, start) if n < len(pending) else len(tokens)
+                results[text] = self._count(tokens, start, end)
+                start = end + 1
+            with self._lock:
+                for text in pending:
+                    self._cache[text] = results[text]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return [dict(results[text]) for text in texts]
+
+
+def default_lexicon() -> Dict[str, Tuple[str, float]]:
+    lexicon = {}
+    for polarity, words in (("bullish", BULLISH_WORDS), ("bearish", BEARISH_WORDS), ("neutral", NEUTRAL_WORDS)):
+        for word in words:
+            lexicon[word] = (polarity, 1.0)
+    lexicon.update(WEIGHTED_TERMS)
+    return lexicon
+
+
+def _result(totals: Dict[str, float], counts: Dict[str, int]) -> Dict:
+    """Score 0-100 (50 neutral) from weighted term totals"""
+    total_weight = sum(totals.values())
+    total_matches = sum(counts.values())
+
+    if total_matches == 0:
+        return {"score": 50, "sentiment": "neutral", "confidence": 20,
+                "bullish_words": 0, "bearish_words": 0, "neutral_words": 0}
+
+    # Score: 0-100 where 50 is neutral
+    score = 50 + (totals["bullish"] / total_weight * 50) - (totals["bearish"] / total_weight * 50)
+    score = max(0, min(100, score))
+
+    # Determine sentiment
+    if score >= 60:
+        sentiment = "bullish"
+    elif score <= 40:
+        sentiment = "bearish"
+    else:
+        sentiment = "neutral"
+
+    # Confidence based on total matches
+    confidence = min(100, total_matches * 10 + 30)
+
+    return {
+        "score": round(score, 1),
+        "sentiment": sentiment,
+        "confidence": confidence,
+        "bullish_words": counts["bullish"],
+        "bearish_words": counts["bearish"],
+        "neutral_words": counts["neutral"],
+    }
+
+
+_scorer_instance: Optional[KeywordSentimentScorer] = None
+
+
+def get_sentiment_scorer() -> KeywordSentimentScorer:
+    """Get or create the shared scorer (its headline cache is process-wide)"""
+    global _scorer_instance
+    if _scorer_instance is None:
+        _scorer_instance = KeywordSentimentScorer()
+    return _scorer_instance
+
+
 class SentimentAnalyzer:
     """
     Analyze sentiment from text and market data.
     """
 
-    # Sentiment word lists
-    BULLISH_WORDS = [
-        "bullish", "buy", "long", "moon", "rocket", "breakout", "surge", "rally",
-        "soar", "jump", "spike", "explode", "boom", "strong", "beat", "upgrade",
-        "growth", "profit", "gain", "winner", "outperform", "undervalued",
-        "accumulate", "positive", "optimistic", "momentum", "upside", "catalyst",
-        "squeeze", "rip", "pump", "calls", "bullrun", "ath", "green"
-    ]
-
-    BEARISH_WORDS = [
-        "bearish", "sell", "short", "crash", "dump", "plunge", "tank", "drop",
-        "fall", "sink", "collapse", "weak", "miss", "downgrade", "loss",
-        "loser", "underperform", "overvalued", "avoid", "negative", "pessimistic",
-        "downside", "warning", "risk", "puts", "red", "dead", "rekt", "bag"
-    ]
-
-    NEUTRAL_WORDS = [
-        "hold", "neutral", "wait", "watch", "sideways", "consolidate", "range",
-        "stable", "flat", "unchanged", "maintain", "steady"
-    ]
-
-    def __init__(self):
-        # Compile regex patterns for efficiency
-        self.bullish_pattern = re.compile(
-            r'\b(' + '|'.join(self.BULLISH_WORDS) + r')\b',
-            re.IGNORECASE
-        )
-        self.bearish_pattern = re.compile(
-            r'\b(' + '|'.join(self.BEARISH_WORDS) + r')\b',
-            re.IGNORECASE
-        )
-        self.neutral_pattern = re.compile(
-            r'\b(' + '|'.join(self.NEUTRAL_WORDS) + r')\b',
-            re.IGNORECASE
-        )
+    BULLISH_WORDS = BULLISH_WORDS
+    BEARISH_WORDS = BEARISH_WORDS
+    NEUTRAL_WORDS = NEUTRAL_WORDS
+
+    def __init__(self, scorer: Optional[KeywordSentimentScorer] = None):
+        self.scorer = scorer or get_sentiment_scorer()
 
     def analyze_text(self, text: str) -> Dict:
         """
@@ -74,44 +249,7 @@ class SentimentAnalyzer:
         if not text:
             return {"score": 50, "sentiment": "neutral", "confidence": 0}
 
-        text = text.lower()
-
-        bullish_matches = len(self.bullish_pattern.findall(text))
-        bearish_matches = len(self.bearish_pattern.findall(text))
-        neutral_matches = len(self.neutral_pattern.findall(text))
-
-        total_matches = bullish_matches + bearish_matches + neutral_matches
-
-        if total_matches == 0:
-            return {"score": 50, "sentiment": "neutral", "confidence": 20}
-
-        # Calculate weighted score
-        bullish_weight = bullish_matches / total_matches
-        bearish_weight = bearish_matches / total_matches
-
-        # Score: 0-100 where 50 is neutral
-        score = 50 + (bullish_weight * 50) - (bearish_weight * 50)
-        score = max(0, min(100, score))
-
-        # Determine sentiment
-        if score >= 60:
-            sentiment = "bullish"
-        elif score <= 40:
-            sentiment = "bearish"
-        else:
-            sentiment = "neutral"
-
-        # Confidence based on total matches
-        confidence = min(100, total_matches * 10 + 30)
-
-        return {
-            "score": round(score, 1),
-            "sentiment": sentiment,
-            "confidence": confidence,
-            "bullish_words": bullish_matches,
-            "bearish_words": bearish_matches,
-            "neutral_words": neutral_matches,
-        }
+        return self.scorer.score(text)
 
     def analyze_news_batch(self, articles: List[Dict]) -> Dict:
         """
@@ -130,35 +268,93 @@ class SentimentAnalyzer:
                 "articles_analyzed": 0,
             }
 
-        scores = []
-        sentiments = {"bullish": 0, "bearish": 0, "neutral": 0}
+        texts = [(article.get("title") or "") + " " + (article.get("description") or "") for article in articles]
+        return aggregate_sentiment(self.scorer.score_batch(texts))
+
 
-        for article in articles:
-            text = article.get("title", "") + " " + article.get("description", "")
-            analysis = self.analyze_text(text)
+def aggregate_sentiment(analyses: List[Dict]) -> Dict:
+    """Average score and sentiment breakdown over per-text analyses"""
+    if not analyses:
+        return {
+            "overall_score": 50,
+            "overall_sentiment": "neutral",
+            "articles_analyzed": 0,
+        }
 
-            scores.append(analysis["score"])
-            sentiments[analysis["sentiment"]] += 1
+    sentiments = {"bullish": 0, "bearish": 0, "neutral": 0}
+    for analysis in analyses:
+        sentiments[analysis["sentiment"]] += 1
 
-        avg_score = sum(scores) / len(scores) if scores else 50
+    avg_score = sum(analysis["score"] for analysis in analyses) / len(analyses)
 
-        # Determine overall sentiment
-        max_sentiment = max(sentiments.items(), key=lambda x: x[1])
-        overall_sentiment = max_sentiment[0]
+    # Determine overall sentiment
+    max_sentiment = max(sentiments.items(), key=lambda x: x[1])
+    overall_sentiment = max_sentiment[0]
+
+    return {
+        "overall_score": round(avg_score, 1),
+        "overall_sentiment": overall_sentiment,
+        "articles_analyzed": len(analyses),
+        "sentiment_breakdown": {
+            "bullish": sentiments["bullish"],
+            "bearish": sentiments["bearish"],
+            "neutral": sentiments["neutral"],
+        },
+        "bullish_pct": round((sentiments["bullish"] / len(analyses)) * 100, 1),
+        "bearish_pct": round((sentiments["bearish"] / len(analyses)) * 100, 1),
+        "neutral_pct": round((sentiments["neutral"] / len(analyses)) * 100, 1),
+    }
+
+
+def _ticker_pattern(tickers: Iterable[str]) -> "re.Pattern":
+    """Case-sensitive mentions; one-letter tickers only as $V or (V)"""
+    long_ones = sorted((t for t in tickers if len(t) > 1), key=len, reverse=True)
+    short_ones = [t for t in tickers if len(t) == 1]
+    parts = []
+    if long_ones:
+        parts.append(r"(?<![A-Za-z0-9])\$?(" + "|".join(map(re.escape, long_ones)) + r")(?![A-Za-z0-9])")
+    if short_ones:
+        alternation = "|".join(map(re.escape, short_ones))
+        parts.append(r"\$(" + alternation + r")(?![A-Za-z0-9])")
+        parts.append(r"\((" + alternation + r")\)")
+    return re.compile("|".join(parts))
+
+
+def recent_news_texts(hours: int = 72, limit: int = 500) -> List[str]:
+    """Title + description of the most recent stored articles"""
+    from web.database import db, NewsArticle
+
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=hours)
+    rows = (
+        db.session.query(NewsArticle.title, NewsArticle.description)
+        .filter(NewsArticle.published_at >= since)
+        .order_by(NewsArticle.published_at.desc())
+        .limit(limit)
+        .all()
+    )
+    return [f"{title or ''} {description or ''}" for title, description in rows]
+
+
+def news_sentiment(texts: List[str], tickers: Optional[List[str]] = None) -> Dict:
+    """
+    Batch-score headlines once; aggregate over all of them ("market") and,
+    if tickers are given, per ticker mentioned in each text.
+    """
+    scorer = get_sentiment_scorer()
+    analyses = scorer.score_batch(texts)
+    result = {"market": aggregate_sentiment(analyses), "tickers": {}}
+    if not tickers:
+        return result
+
+    pattern = _ticker_pattern(tickers)
+    per_ticker: Dict[str, List[Dict]] = {}
+    for text, analysis in zip(texts, analyses):
+        mentioned = {next(group for group in match.groups() if group) for match in pattern.finditer(text)}
+        for ticker in mentioned:
+            per_ticker.setdefault(ticker, []).append(analysis)
+    result["tickers"] = {ticker: aggregate_sentiment(items) for ticker, items in per_ticker.items()}
+    return result
 
-        return {
-            "overall_score": round(avg_score, 1),
-            "overall_sentiment": overall_sentiment,
-            "articles_analyzed": len(articles),
-            "sentiment_breakdown": {
-                "bullish": sentiments["bullish"],
-                "bearish": sentiments["bearish"],
-                "neutral": sentiments["neutral"],
-            },
-            "bullish_pct": round((sentiments["bullish"] / len(articles)) * 100, 1),
-            "bearish_pct": round((sentiments["bearish"] / len(articles)) * 100, 1),
-            "neutral_pct": round((sentiments["neutral"] / len(articles)) * 100, 1),
-        }
 
 def calculate_price_sentiment(current_price: float, sma_20: float, sma_50: float,
                               rsi: float, volume_ratio: float) -> Dict:
@@ -321,7 +517,7 @@ def analyze_ticker_sentiment(ticker: str) -> Dict:
     """
     try:
         from web.polygon_service import get_polygon_service
-        from web.database import NewsArticle
+        from src.services.news_tickers import recent_articles
     except ImportError:
         return {"error": "Required modules not available"}
 
@@ -355,9 +551,7 @@ def analyze_ticker_sentiment(ticker: str) -> Dict:
     # Get news sentiment
     try:
         # Check for news in database
-        recent_news = NewsArticle.query.filter(
-            NewsArticle.title.contains(ticker)
-        ).order_by(NewsArticle.published_at.desc()).limit(10).all()
+        recent_news = recent_articles([ticker], limit=10)
 
         if recent_news:
             articles = [{"title": n.title, "description": n.description} for n in recent_news]
@@ -21,6 +21,7 @@ Sources:
 - https://tradingfinder.com/education/forex/
 """
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 from statistics import mean
@@ -31,6 +32,10 @@ from typing import Optional
 from typing import Any
 from typing import Tuple
 
+import numpy as np
+
+from src.services.swing_points import high_low_arrays, swing_indices
+
 # =============================================================================
 # CANDLE UTILITIES
 # =============================================================================
@@ -89,46 +94,17 @@ def _find_swing_points(bars: List[Dict], lookback: int = 5) -> Dict:
     Swing High: Candle with highest high among N candles on both sides
     Swing Low: Candle with lowest low among N candles on both sides
     """
-    if len(bars) < lookback * 2 + 1:
-        return {"swing_highs": [], "swing_lows": []}
+    high_idx, low_idx = swing_indices(*high_low_arrays(bars), lookback)
 
     swing_highs = []
-    swing_lows = []
-
-    for i in range(lookback, len(bars) - lookback):
+    for i in high_idx.tolist():
         candle = _get_candle_info(bars[i])
+        swing_highs.append({"price": candle["high"], "index": i, "timestamp": candle.get("timestamp")})
 
-        # Check for Swing High
-        is_swing_high = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["high"] >= candle["high"]:
-                    is_swing_high = False
-                    break
-
-        if is_swing_high:
-            swing_highs.append({
-                "price": candle["high"],
-                "index": i,
-                "timestamp": candle.get("timestamp"),
-            })
-
-        # Check for Swing Low
-        is_swing_low = True
-        for j in range(i - lookback, i + lookback + 1):
-            if j != i:
-                other = _get_candle_info(bars[j])
-                if other["low"] <= candle["low"]:
-                    is_swing_low = False
-                    break
-
-        if is_swing_low:
-            swing_lows.append({
-                "price": candle["low"],
-                "index": i,
-                "timestamp": candle.get("timestamp"),
-            })
+    swing_lows = []
+    for i in low_idx.tolist():
+        candle = _get_candle_info(bars[i])
+        swing_lows.append({"price": candle["low"], "index": i, "timestamp": candle.get("timestamp")})
 
     return {
         "swing_highs": swing_highs,
@@ -181,6 +157,10 @@ def _detect_bos_choch(trend, current_price, last_high, last_low, prev_high, prev
 def _detect_market_structure(bars: List[Dict], lookback: int = 5) -> Dict:
     """Detect Market Structure: Trend, BOS, and CHoCH"""
     swing_points = _find_swing_points(bars, lookback)
+    return _market_structure(swing_points, _get_candle_info(bars[-1])["close"])
+
+def _market_structure(swing_points: Dict, current_price: float) -> Dict:
+    """Trend, BOS and CHoCH from swing points and the current price"""
     sh, sl = swing_points["swing_highs"], swing_points["swing_lows"]
 
     if len(sh) < 2 or len(sl) < 2:
@@ -190,8 +170,7 @@ def _detect_market_structure(bars: List[Dict], lookback: int = 5) -> Dict:
     recent_h, recent_l = sh[-4:], sl[-4:]
     hh, lh, hl, ll = _analyze_swing_counts(recent_h, recent_l)
     trend = _determine_trend(hh, hl, lh, ll)
-    
-    current_price = _get_candle_info(bars[-1])["close"]
+
     bos, choch = _detect_bos_choch(trend, current_price, recent_h[-1]["price"], recent_l[-1]["price"], 
                                    recent_h[-2]["price"], recent_l[-2]["price"])
 
@@ -263,6 +242,10 @@ def _detect_liquidity_zones(bars: List[Dict], lookback: int = 20) -> Dict:
                 })
                 break
 
+    return _liquidity(bars, bsl_zones, ssl_zones)
+
+def _liquidity(bars: List[Dict], bsl_zones: List[Dict], ssl_zones: List[Dict]) -> Dict:
+    """Sorted BSL/SSL zones plus the sweeps of them in the last candles"""
     # Detect liquidity sweeps in recent candles
     sweeps = _detect_liquidity_sweeps(bars, bsl_zones, ssl_zones)
 
@@ -292,10 +275,13 @@ def _detect_liquidity_sweeps(
 
     last_candles = [_get_candle_info(b) for b in bars[-5:]]
     current = last_candles[-1]
+    # A level is swept by some earlier candle iff it is swept by the one reaching furthest
+    lowest = min(last_candles[:-1], key=lambda c: c["low"])
+    highest = max(last_candles[:-1], key=lambda c: c["high"])
 
     # Check for bullish sweep (SSL taken then recovered)
     for ssl in ssl_zones:
-        if any(_is_bullish_sweep(c, current["close"], ssl["price"]) for c in last_candles[:-1]):
+        if _is_bullish_sweep(lowest, current["close"], ssl["price"]):
             sweeps.append({
                 "type": "bullish",
                 "level": ssl["price"],
@@ -305,7 +291,7 @@ def _detect_liquidity_sweeps(
 
     # Check for bearish sweep (BSL taken then rejected)
     for bsl in bsl_zones:
-        if any(_is_bearish_sweep(c, current["close"], bsl["price"]) for c in last_candles[:-1]):
+        if _is_bearish_sweep(highest, current["close"], bsl["price"]):
             sweeps.append({
                 "type": "bearish",
                 "level": bsl["price"],
@@ -439,28 +425,33 @@ def _detect_fvg(bars: List[Dict], min_gap_percent: float = 0.1) -> Dict:
 
     for i in range(2, len(bars)):
         c1, c2, c3 = _get_candle_info(bars[i-2]), _get_candle_info(bars[i-1]), _get_candle_info(bars[i])
-        
-        is_bull, bull_gap = _is_bullish_fvg(c1, c2, c3, min_gap_percent)
-        if is_bull:
-            bullish_fvgs.append({
-                "zone_top": c3["low"], "zone_bottom": c1["high"], "zone_mid": (c3["low"] + c1["high"]) / 2,
-                "size_percent": round(bull_gap, 2), "strength": min(100, 65 + int(bull_gap * 15)),
-                "filled": current_price < c1["high"], "index": i
-            })
-
-        is_bear, bear_gap = _is_bearish_fvg(c1, c2, c3, min_gap_percent)
-        if is_bear:
-            bearish_fvgs.append({
-                "zone_top": c1["low"], "zone_bottom": c3["high"], "zone_mid": (c1["low"] + c3["high"]) / 2,
-                "size_percent": round(bear_gap, 2), "strength": min(100, 65 + int(bear_gap * 15)),
-                "filled": current_price > c1["low"], "index": i
-            })
+        _process_fvg_candidates(c1, c2, c3, i, current_price, min_gap_percent, bullish_fvgs, bearish_fvgs)
 
     return {
         "bullish": [f for f in bullish_fvgs if not f["filled"]][-5:],
         "bearish": [f for f in bearish_fvgs if not f["filled"]][-5:]
     }
 
+def _process_fvg_candidates(
+    c1: Dict, c2: Dict, c3: Dict, index: int, current_price: float, min_gap_percent: float, bullish_fvgs: List, bearish_fvgs: List
+):
+    """Check and add FVG candidates"""
+    is_bull, bull_gap = _is_bullish_fvg(c1, c2, c3, min_gap_percent)
+    if is_bull:
+        bullish_fvgs.append({
+            "zone_top": c3["low"], "zone_bottom": c1["high"], "zone_mid": (c3["low"] + c1["high"]) / 2,
+            "size_percent": round(bull_gap, 2), "strength": min(100, 65 + int(bull_gap * 15)),
+            "filled": current_price < c1["high"], "index": index
+        })
+
+    is_bear, bear_gap = _is_bearish_fvg(c1, c2, c3, min_gap_percent)
+    if is_bear:
+        bearish_fvgs.append({
+            "zone_top": c1["low"], "zone_bottom": c3["high"], "zone_mid": (c1["low"] + c3["high"]) / 2,
+            "size_percent": round(bear_gap, 2), "strength": min(100, 65 + int(bear_gap * 15)),
+            "filled": current_price > c1["low"], "index": index
+        })
+
 # =============================================================================
 # PREMIUM/DISCOUNT & OTE (OPTIMAL TRADE ENTRY)
 # =============================================================================
@@ -481,6 +472,10 @@ def _calculate_premium_discount(bars: List[Dict], lookback: int = 50) -> Dict:
 
     highest = max(_get_candle_info(b)["high"] for b in recent)
     lowest = min(_get_candle_info(b)["low"] for b in recent)
+    return _premium_discount(highest, lowest, _get_candle_info(bars[-1])["close"])
+
+def _premium_discount(highest: float, lowest: float, current_price: float) -> Dict:
+    """Premium/discount and OTE zones of the highest-lowest range"""
     range_size = highest - lowest
 
     if range_size == 0:
@@ -497,8 +492,6 @@ def _calculate_premium_discount(bars: List[Dict], lookback: int = 50) -> Dict:
     ote_bearish_top = lowest + (range_size * 0.79)
     ote_bearish_bottom = lowest + (range_size * 0.62)
 
-    current_price = _get_candle_info(bars[-1])["close"]
-
     # Determine if price is in premium or discount
     price_position = (current_price - lowest) / range_size if range_size > 0 else 0.5
 
@@ -750,11 +743,7 @@ def generate_swing_signal(
 
     # Check if price data is valid
     if current_price == 0 or current_price is None:
-        return {
-            "signal": "ERROR",
-            "error": "Price data unavailable. The market may be closed or API quota exceeded.",
-            "generated_at": datetime.now(timezone.utc).isoformat(),
-        }
+        return _price_unavailable()
 
     # Analyze all ICT concepts
     market_structure = _detect_market_structure(candles, lookback=5)
@@ -764,6 +753,29 @@ def generate_swing_signal(
     premium_discount = _calculate_premium_discount(candles, lookback=50)
     kill_zone = _check_kill_zone()
 
+    return _build_swing_signal(
+        candles, timeframe, current_price, market_structure, liquidity, order_blocks, fvgs, premium_discount, kill_zone
+    )
+
+def _price_unavailable() -> Dict[str, Any]:
+    return {
+        "signal": "ERROR",
+        "error": "Price data unavailable. The market may be closed or API quota exceeded.",
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+def _build_swing_signal(
+    candles: List[Dict],
+    timeframe: str,
+    current_price: float,
+    market_structure: Dict,
+    liquidity: Dict,
+    order_blocks: Dict,
+    fvgs: Dict,
+    premium_discount: Dict,
+    kill_zone: Dict,
+) -> Dict[str, Any]:
+    """Signal, stop and targets from the detected ICT concepts (candles: the window, last bar current)"""
     # Calculate confluence
     confluence = _calculate_confluence(
         current_price,
@@ -974,3 +986,144 @@ def generate_swing_signal(
         },
         "generated_at": datetime.now(timezone.utc).isoformat(),
     }
+
+# =============================================================================
+# BACKTEST REPLAY
+# =============================================================================
+
+def _next_equal(values: np.ndarray, span: int) -> np.ndarray:
+    """Index of the first later value within span - 1 bars that is within 0.1% (-1 if none)"""
+    found = np.full(len(values), -1, dtype=np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Farthest first, so the nearest match is written last
+        for distance in range(span - 1, 0, -1):
+            hit = np.abs(values[:-distance] - values[distance:]) / values[:-distance] < 0.001
+            found[:-distance][hit] = np.flatnonzero(hit) + distance
+    return found
+
+class SwingSignalStream:
+    """
+    generate_swing_signal on every trailing window of one candle list (backtests).
+
+    Swing points, order block candidates, FVGs and equal highs/lows depend
+    only on the candles that form them, so they are found once for the whole
+    list; each step keeps the ones inside its window and only re-checks what
+    depends on the current price (OB validity, filled FVGs, breakers, BOS).
+    signal(i) returns what generate_swing_signal(candles[i - window + 1:i + 1])
+    returns without re-detecting anything over the window.
+    """
+
+    def __init__(self, candles: List[Dict[str, Any]], window: int = 100, timeframe: str = "4H"):
+        self.candles = _normalize_candles(candles)
+        self.window = window
+        self.timeframe = timeframe
+        self.infos = infos = [_get_candle_info(c) for c in self.candles]
+        self.highs = [info["high"] for info in infos]
+        self.lows = [info["low"] for info in infos]
+        self.next_equal_high = _next_equal(np.array(self.highs, dtype=np.float64), 30).tolist()
+        self.next_equal_low = _next_equal(np.array(self.lows, dtype=np.float64), 30).tolist()
+
+        # Zones by candle index; OB validity and FVG fills depend on the current price and are set per window
+        self.zones = {kind: ([], []) for kind in (
+            "structure_high", "structure_low", "liquidity_high", "liquidity_low",
+            "bullish_ob", "bearish_ob", "bullish_fvg", "bearish_fvg",
+        )}
+        for kind, lookback in (("structure", 5), ("liquidity", 3)):
+            swing_points = _find_swing_points(self.candles, lookback)
+            for point in swing_points["swing_highs"]:
+                self._add(f"{kind}_high", point["index"], [point])
+            for point in swing_points["swing_lows"]:
+                self._add(f"{kind}_low", point["index"], [point])
+
+        unknown = float("nan")
+        for j in range(2, len(infos)):
+            bullish, bearish = [], []
+            if j + 1 < len(infos):
+                _process_ob_candidates(infos[j - 1], infos[j], infos[j + 1], j, unknown, bullish, bearish)
+            self._add("bullish_ob", j, bullish)
+            self._add("bearish_ob", j, bearish)
+            bullish, bearish = [], []
+            _process_fvg_candidates(infos[j - 2], infos[j - 1], infos[j], j, unknown, 0.1, bullish, bearish)  # _detect_fvg default gap
+            self._add("bullish_fvg", j, bullish)
+            self._add("bearish_fvg", j, bearish)
+
+    def _add(self, kind: str, index: int, zones: List[Dict]):
+        indices, found = self.zones[kind]
+        for zone in zones:
+            indices.append(index)
+            found.append(zone)
+
+    def _between(self, kind: str, first: int, last: int) -> List[Dict]:
+        """Zones at candles first..last"""
+        indices, zones = self.zones[kind]
+        return zones[bisect_left(indices, first):bisect_right(indices, last)]
+
+    def signal(self, i: int) -> Optional[Dict[str, Any]]:
+        """generate_swing_signal on the window of candles ending at index i"""
+        start = max(0, i - self.window + 1)
+        if i + 1 - start < 50:
+            return None
+        current_price = self.infos[i]["close"]
+        if current_price == 0 or current_price is None:
+            return _price_unavailable()
+        window = self.candles[start:i + 1]
+
+        # Same spans as generate_swing_signal: structure over the window, liquidity over
+        # the last 30 candles, order blocks and premium/discount over the last 50
+        market_structure = _market_structure(
+            {
+                f"swing_{side}s": [
+                    {**point, "index": point["index"] - start}
+                    for point in self._between(f"structure_{side}", start + 5, i - 5)
+                ]
+                for side in ("high", "low")
+            },
+            current_price,
+        )
+
+        recent = i - 29
+        bsl = [{"price": p["price"], "type": "swing_high", "strength": 70} for p in self._between("liquidity_high", recent + 3, i - 3)]
+        ssl = [{"price": p["price"], "type": "swing_low", "strength": 70} for p in self._between("liquidity_low", recent + 3, i - 3)]
+        for a in range(recent, i):
+            b = self.next_equal_high[a]
+            if 0 <= b <= i:
+                bsl.append({"price": (self.highs[a] + self.highs[b]) / 2, "type": "equal_highs", "strength": 85})
+        for a in range(recent, i):
+            b = self.next_equal_low[a]
+            if 0 <= b <= i:
+                ssl.append({"price": (self.lows[a] + self.lows[b]) / 2, "type": "equal_lows", "strength": 85})
+        liquidity = _liquidity(window, bsl, ssl)
+
+        ob_start = i - 49
+        bullish_obs = [
+            {**ob, "index": ob["index"] - ob_start, "valid": current_price >= ob["zone_bottom"]}
+            for ob in self._between("bullish_ob", ob_start + 2, i - 1)
+        ]
+        bearish_obs = [
+            {**ob, "index": ob["index"] - ob_start, "valid": current_price <= ob["zone_top"]}
+            for ob in self._between("bearish_ob", ob_start + 2, i - 1)
+        ]
+        order_blocks = {
+            "bullish": [ob for ob in bullish_obs if ob["valid"]][-5:],
+            "bearish": [ob for ob in bearish_obs if ob["valid"]][-5:],
+            "breakers": _detect_breaker_blocks(window, bullish_obs, bearish_obs),
+        }
+
+        fvgs = {
+            "bullish": [
+                {**fvg, "filled": False, "index": fvg["index"] - start}
+                for fvg in self._between("bullish_fvg", start + 2, i)
+                if not current_price < fvg["zone_bottom"]
+            ][-5:],
+            "bearish": [
+                {**fvg, "filled": False, "index": fvg["index"] - start}
+                for fvg in self._between("bearish_fvg", start + 2, i)
+                if not current_price > fvg["zone_top"]
+            ][-5:],
+        }
+
+        premium_discount = _premium_discount(max(self.highs[ob_start:i + 1]), min(self.lows[ob_start:i + 1]), current_price)
+
+        return _build_swing_signal(
+            window, self.timeframe, current_price, market_structure, liquidity, order_blocks, fvgs, premium_discount, _check_kill_zone()
+        )